@@ -0,0 +1,3 @@
+"""
+Suíte de benchmarks de treino, avaliação e inferência
+"""
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Suíte de Benchmarks Reprodutível (estilo asv)
+
+Cada benchmark declara uma função de preparação (fora da medição) e uma
+função medida, parametrizada pelo tamanho do dataset gerado com
+create_simulated_data. Os tempos (várias repetições, mediana/mínimo) são
+gravados em JSON com commit, versões das bibliotecas e máquina (por padrão
+em logs/benchmarks, fora do controle de versão: os dados são simulados), e o
+comando compare aponta regressões entre dois resultados, além de benchmarks
+adicionados ou removidos (um benchmark removido também falha a comparação).
+
+Uso:
+    python 08_src/benchmarks/suite.py run [--quick] [--filter texto] [--output arquivo.json]
+    python 08_src/benchmarks/suite.py compare base.json novo.json [--factor 1.2]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data.datasets import TARGET_COLUMN, create_simulated_data, load_dataset
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+RESULTS_DIR = PROJECT_ROOT / 'logs' / 'benchmarks'
+RANDOM_STATE = 42
+BASE_SIZE = 4240
+SIZES = (BASE_SIZE, 4 * BASE_SIZE, 16 * BASE_SIZE)
+QUICK_SIZES = (BASE_SIZE,)
+REGRESSION_FACTOR = 1.2
+
+BENCHMARKS = []
+
+
+def benchmark(name, setup=None, sizes=SIZES, repeat=5, number=1):
+    """Registra um benchmark: setup(tamanho) -> estado; fn(estado) é medida"""
+    def register(fn):
+        BENCHMARKS.append({
+            'name': name, 'fn': fn, 'setup': setup,
+            'sizes': sizes, 'repeat': repeat, 'number': number
+        })
+        return fn
+    return register
+
+
+# ---------------------------------------------------------------------------
+# Preparação (não medida)
+# ---------------------------------------------------------------------------
+
+def _dataset(size):
+    df = create_simulated_data(size, random_state=RANDOM_STATE)
+    return df.drop(columns=[TARGET_COLUMN]), df[TARGET_COLUMN].to_numpy()
+
+
+def _models():
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+
+    # Mesmas configurações de 04_analysis_optimization
+    return {
+        'logistic_regression': LogisticRegression(random_state=RANDOM_STATE, class_weight='balanced', max_iter=1000),
+        'random_forest': RandomForestClassifier(n_estimators=100, random_state=RANDOM_STATE,
+                                                class_weight='balanced', n_jobs=-1),
+        'gradient_boosting': GradientBoostingClassifier(n_estimators=100, learning_rate=0.1,
+                                                        random_state=RANDOM_STATE)
+    }
+
+
+def _pipeline(model):
+    from imblearn.over_sampling import SMOTE
+    from imblearn.pipeline import Pipeline
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import StandardScaler
+
+    return Pipeline([
+        ('imputer', SimpleImputer(strategy='median')),
+        ('scaler', StandardScaler()),
+        ('smote', SMOTE(random_state=RANDOM_STATE, k_neighbors=5)),
+        ('model', model)
+    ])
+
+
+def _scored(size):
+    """Labels e scores de um modelo (para varredura de thresholds e validação clínica)"""
+    from inference.artifacts import load_bundle
+
+    X, y = _dataset(size)
+    bundle = load_bundle('gb_v1')
+    return {'X': X, 'y': y, 'proba': bundle.predict_proba(X), 'thresholds': bundle.thresholds}
+
+
+def _patient():
+    return {
+        'sexo': 1, 'idade': 55, 'fumante_atualmente': 0, 'cigarros_por_dia': 0,
+        'medicamento_pressao': 0, 'diabetes': 0, 'colesterol_total': 220,
+        'pressao_sistolica': 140, 'pressao_diastolica': 90, 'imc': 27.5,
+        'frequencia_cardiaca': 78, 'glicose': 90
+    }
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+@benchmark('data.load_dataset', sizes=(None,))
+def bench_load_dataset(_):
+    load_dataset()
+
+
+@benchmark('data.create_simulated_data')
+def bench_create_simulated_data(size):
+    create_simulated_data(size, random_state=RANDOM_STATE)
+
+
+@benchmark('preprocessing.impute_scale_smote', setup=_dataset)
+def bench_preprocessing(data):
+    from imblearn.over_sampling import SMOTE
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = data
+    X = StandardScaler().fit_transform(SimpleImputer(strategy='median').fit_transform(X))
+    SMOTE(random_state=RANDOM_STATE, k_neighbors=5).fit_resample(X, y)
+
+
+def _register_cv(model_name):
+    @benchmark(f'cv.{model_name}', setup=_dataset, sizes=SIZES[:2], repeat=3)
+    def bench_cv(data):
+        from sklearn.metrics import fbeta_score, make_scorer
+        from sklearn.model_selection import StratifiedKFold, cross_validate
+
+        X, y = data
+        cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=RANDOM_STATE)
+        cross_validate(_pipeline(_models()[model_name]), X, y, cv=cv,
+                       scoring={'f2': make_scorer(fbeta_score, beta=2), 'recall': 'recall'})
+    return bench_cv
+
+
+for _model_name in ('logistic_regression', 'random_forest', 'gradient_boosting'):
+    _register_cv(_model_name)
+
+
+@benchmark('evaluation.threshold_sweep', setup=_scored)
+def bench_threshold_sweep(state):
+    from clinical_fast.streaming_metrics import StreamingMetricsAccumulator
+
+    thresholds = {f't{t:.2f}': t for t in np.arange(0.01, 1.0, 0.01)}
+    StreamingMetricsAccumulator(thresholds).update(state['y'], state['proba']).summary()
+
+
+@benchmark('evaluation.clinical_validation', setup=_scored)
+def bench_clinical_validation(state):
+    from clinical_fast.medical_consistency import MedicalConsistencyValidator
+
+    MedicalConsistencyValidator(list(state['X'].columns)).compute(state['X'], state['proba'])
+
+
+def _register_inference(version):
+    def setup_single(_):
+        from inference.artifacts import load_bundle
+        from inference.inference import predict
+
+        load_bundle(version)
+        patient = _patient()
+        predict(patient, version)
+        return predict, patient
+
+    @benchmark(f'inference.{version}.single', setup=setup_single, sizes=(None,), number=200)
+    def bench_single(state):
+        predict, patient = state
+        predict(patient, version)
+
+    def setup_batch(size):
+        from inference.artifacts import load_bundle
+
+        return load_bundle(version), _dataset(size)[0]
+
+    @benchmark(f'inference.{version}.batch', setup=setup_batch)
+    def bench_batch(state):
+        bundle, X = state
+        bundle.predict_proba(X)
+
+
+for _version in ('rf_v1', 'gb_v1'):
+    _register_inference(_version)
+
+
+# ---------------------------------------------------------------------------
+# Execução e comparação
+# ---------------------------------------------------------------------------
+
+def _key(name, size):
+    return name if size is None else f'{name}[{size}]'
+
+
+def machine_info():
+    """Commit, versões e máquina (para comparar apenas resultados compatíveis)"""
+    import sklearn
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'sklearn': sklearn.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def run(quick=False, name_filter=None):
+    """Executa a suíte; retorna {'meta', 'results'} (tempos em segundos por chamada)"""
+    results = {}
+    for bench in BENCHMARKS:
+        if name_filter and name_filter not in bench['name']:
+            continue
+        sizes = bench['sizes']
+        if quick:
+            sizes = [s for s in sizes if s is None or s in QUICK_SIZES]
+        for size in sizes:
+            state = bench['setup'](size) if bench['setup'] else size
+            bench['fn'](state)  # aquecimento (imports, caches)
+            samples = []
+            for _ in range(bench['repeat']):
+                start = time.perf_counter()
+                for _ in range(bench['number']):
+                    bench['fn'](state)
+                samples.append((time.perf_counter() - start) / bench['number'])
+            key = _key(bench['name'], size)
+            results[key] = {
+                'median': float(np.median(samples)),
+                'min': float(np.min(samples)),
+                'samples': samples,
+                'size': size,
+                'unit': 's'
+            }
+            print(f"   {key:<50} {results[key]['median'] * 1000:10.2f} ms")
+    return {'meta': machine_info(), 'results': results}
+
+
+def save_results(payload, output=None):
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        commit = (payload['meta']['commit'] or 'local')[:8]
+        output = RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit}.json"
+    output = Path(output)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    return output
+
+
+def compare(base, new, factor=REGRESSION_FACTOR):
+    """Razão novo/base das medianas; regressão se razão > factor; 'added'/'removed' fora da interseção"""
+    rows = []
+    for key in sorted(set(base['results']) ^ set(new['results'])):
+        removed = key in base['results']
+        rows.append({'benchmark': key, 'base': base['results'][key]['median'] if removed else None,
+                     'new': None if removed else new['results'][key]['median'], 'ratio': None,
+                     'status': 'removed' if removed else 'added'})
+    for key in sorted(set(base['results']) & set(new['results'])):
+        ratio = new['results'][key]['median'] / base['results'][key]['median']
+        status = 'regression' if ratio > factor else 'improvement' if ratio < 1 / factor else 'unchanged'
+        rows.append({'benchmark': key, 'base': base['results'][key]['median'],
+                     'new': new['results'][key]['median'], 'ratio': ratio, 'status': status})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run')
+    run_parser.add_argument('--quick', action='store_true', help="apenas o tamanho base (4.240)")
+    run_parser.add_argument('--filter', default=None)
+    run_parser.add_argument('--output', default=None)
+    compare_parser = commands.add_parser('compare')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--factor', type=float, default=REGRESSION_FACTOR)
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        print("🚀 SUÍTE DE BENCHMARKS")
+        print("=" * 80)
+        path = save_results(run(args.quick, args.filter), args.output)
+        print(f"\n💾 Resultados salvos em: {path}")
+        return 0
+
+    with open(args.base, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.new, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+    if base['meta'].get('machine') != new['meta'].get('machine'):
+        print("⚠️ Resultados de máquinas diferentes: comparação apenas indicativa")
+
+    print("📊 COMPARAÇÃO DE BENCHMARKS")
+    print("=" * 80)
+    rows = compare(base, new, args.factor)
+    icons = {'regression': '❌', 'improvement': '✅', 'unchanged': '  '}
+    for row in rows:
+        if row['status'] == 'removed':
+            print(f"❌ {row['benchmark']:<50} {row['base'] * 1000:10.2f} ms -> removido")
+        elif row['status'] == 'added':
+            print(f"➕ {row['benchmark']:<50}    novo -> {row['new'] * 1000:10.2f} ms")
+        else:
+            print(f"{icons[row['status']]} {row['benchmark']:<50} {row['base'] * 1000:10.2f} -> "
+                  f"{row['new'] * 1000:10.2f} ms ({row['ratio']:.2f}x)")
+    regressions = [row for row in rows if row['status'] == 'regression']
+    removed = [row for row in rows if row['status'] == 'removed']
+    added = [row for row in rows if row['status'] == 'added']
+    print(f"\n{len(regressions)} regressões (fator > {args.factor}) | "
+          f"{len(removed)} removidos | {len(added)} adicionados")
+    if removed:
+        print("⚠️ Benchmarks removidos não foram medidos: rode a mesma seleção (--quick/--filter) da base")
+    return 1 if regressions or removed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+Clientes Python da API de predição (/predict)
+"""
@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Cliente Assíncrono da API de Predição
+
+Versão Python de predictRisk (js/api-integration.js) para integrações que
+pontuam muitos pacientes, sem abrir uma conexão por paciente:
+
+- Pool de conexões HTTP/1.1 keep-alive (asyncio streams, só biblioteca
+  padrão), reutilizadas entre requisições.
+- Limite de requisições em voo (semáforo) e timeout por chamada.
+- Agrupamento automático: pacientes enviados numa janela curta viram uma
+  única chamada a /predict/batch quando o endpoint existe (detectado na
+  primeira predição; qualquer 4xx na sonda volta ao /predict individual).
+  Uma resposta de lote malformada ou incompleta falha os pacientes sem
+  resultado, nunca deixa a chamada esperando.
+- Retentativas com backoff exponencial (com jitter) em falhas de conexão,
+  timeout, 429 e 5xx; a predição não tem efeito colateral, então repetir o
+  POST é seguro.
+- score_dataframe(df): um resultado por linha, no índice do DataFrame.
+
+O benchmark sobe um servidor local que imita a API (mesmo ScoringService,
+com latência de rede configurável) e compara requisições sequenciais, uma
+conexão por paciente, com o cliente assíncrono com e sem lote.
+
+Uso:
+    python 08_src/client/async_client.py [n_pacientes] [latencia_ms]
+"""
+
+import asyncio
+import json
+import random
+import ssl
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Mesma configuração de API_CONFIG (js/api-integration.js)
+DEFAULT_BASE_URL = 'https://yrac79mzj9.execute-api.sa-east-1.amazonaws.com'
+PREDICT_PATH = '/predict'
+BATCH_PATH = '/predict/batch'
+HEALTH_PATH = '/health'
+TIMEOUT = 10.0
+
+MAX_CONNECTIONS = 8
+MAX_IN_FLIGHT = 16
+MAX_BATCH_SIZE = 256
+BATCH_WINDOW = 0.005  # segundos de espera para completar um lote
+MAX_RETRIES = 3
+BACKOFF = 0.2
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class ApiError(Exception):
+    """Resposta de erro da API (status HTTP e corpo JSON, se houver)"""
+
+    def __init__(self, status, body=None):
+        self.status = status
+        self.body = body
+        errors = body.get('errors') if isinstance(body, dict) else None
+        super().__init__(f"HTTP {status}" + (f": {'; '.join(errors)}" if errors else ''))
+
+
+def _json(payload):
+    try:
+        return json.loads(payload) if payload else None
+    except ValueError:
+        return None
+
+
+class _Connection:
+    """Uma conexão HTTP/1.1 persistente (uma requisição por vez)"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+
+    @property
+    def alive(self):
+        return self.reusable and not self.writer.is_closing() and not self.reader.at_eof()
+
+    async def request(self, method, host, path, body=b''):
+        """Envia a requisição e lê a resposta inteira; retorna (status, corpo em bytes)"""
+        head = (f'{method} {path} HTTP/1.1\r\nHost: {host}\r\n'
+                'Content-Type: application/json\r\nAccept: application/json\r\n'
+                f'Content-Length: {len(body)}\r\n\r\n')
+        self.writer.write(head.encode('latin-1') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Conexão fechada pelo servidor")
+        version, status = status_line.split(None, 2)[:2]
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            payload = await self._read_chunked()
+        elif 'content-length' in headers:
+            payload = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            payload = await self.reader.read()
+            self.reusable = False
+
+        connection = headers.get('connection', '').lower()
+        if connection == 'close' or (version == b'HTTP/1.0' and connection != 'keep-alive'):
+            self.reusable = False
+        return int(status), payload
+
+    async def _read_chunked(self):
+        parts = []
+        while True:
+            size = int((await self.reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(parts)
+            parts.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+
+    def close(self):
+        self.reusable = False
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Conexões keep-alive reutilizadas, no máximo max_connections abertas ao mesmo tempo"""
+
+    def __init__(self, host, port, ssl_context=None, max_connections=MAX_CONNECTIONS):
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle = []
+        self.opened = 0
+
+    async def acquire(self):
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                connection = self._idle.pop()
+                if connection.alive:
+                    return connection
+                connection.close()
+            reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl_context)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.opened += 1
+        return _Connection(reader, writer)
+
+    def release(self, connection):
+        if connection.alive:
+            self._idle.append(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    def close(self):
+        for connection in self._idle:
+            connection.close()
+        self._idle.clear()
+
+
+class AsyncPredictionClient:
+    """
+    Cliente de /predict com pool de conexões, limite de concorrência, lotes
+    automáticos e retentativas. Usar como `async with AsyncPredictionClient(url) as client`.
+
+    batching: None detecta /predict/batch na primeira predição; True/False força.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, max_connections=MAX_CONNECTIONS,
+                 max_in_flight=MAX_IN_FLIGHT, batching=None, max_batch_size=MAX_BATCH_SIZE,
+                 batch_window=BATCH_WINDOW, max_retries=MAX_RETRIES, backoff=BACKOFF, timeout=TIMEOUT):
+        url = urlsplit(base_url)
+        secure = url.scheme == 'https'
+        self.host = url.netloc
+        self.prefix = url.path.rstrip('/')
+        self.pool = ConnectionPool(
+            url.hostname, url.port or (443 if secure else 80),
+            ssl.create_default_context() if secure else None, max_connections
+        )
+        self.batching = batching
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._detect_lock = asyncio.Lock()
+        self._pending = []
+        self._flush_handle = None
+        self._tasks = set()
+        self.stats = {'requests': 0, 'retries': 0, 'batches': 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Envia o lote pendente, aguarda as chamadas em andamento e fecha as conexões"""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.pool.close()
+
+    async def _send(self, method, path, body):
+        connection = await self.pool.acquire()
+        try:
+            return await connection.request(method, self.host, self.prefix + path, body)
+        except BaseException:
+            # Resposta incompleta (erro, timeout, cancelamento): conexão descartada
+            connection.reusable = False
+            raise
+        finally:
+            self.pool.release(connection)
+
+    async def request(self, method, path, payload=None):
+        """Uma chamada com limite de concorrência, timeout e retentativas; retorna o JSON"""
+        body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+        async with self._in_flight:
+            attempt = 0
+            while True:
+                self.stats['requests'] += 1
+                try:
+                    status, data = await asyncio.wait_for(self._send(method, path, body), self.timeout)
+                except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as error:
+                    failure = error
+                else:
+                    if status not in RETRY_STATUSES:
+                        break
+                    failure = ApiError(status, _json(data))
+                if attempt >= self.max_retries:
+                    raise failure
+                attempt += 1
+                self.stats['retries'] += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+
+        result = _json(data)
+        if status >= 400:
+            raise ApiError(status, result)
+        return result
+
+    async def health(self):
+        """Mesmo formato de checkApiHealth"""
+        try:
+            return {'status': 'healthy', 'data': await self.request('GET', HEALTH_PATH)}
+        except (ApiError, OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as error:
+            return {'status': 'unhealthy', 'message': str(error)}
+
+    async def _batch_available(self):
+        if self.batching is None:
+            async with self._detect_lock:
+                if self.batching is None:
+                    try:
+                        await self.request('POST', BATCH_PATH, {'patients': []})
+                        self.batching = True
+                    except ApiError as error:
+                        # 4xx: rota inexistente (API Gateway responde 403), método ou lote vazio recusados
+                        if not 400 <= error.status < 500:
+                            raise
+                        self.batching = False
+        return self.batching
+
+    async def predict(self, patient):
+        """Predição de um paciente (mesmo formato de resposta de /predict)"""
+        if not await self._batch_available():
+            return await self.request('POST', PREDICT_PATH, patient)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((patient, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, batch):
+        try:
+            response = await self.request('POST', BATCH_PATH, {'patients': [patient for patient, _ in batch]})
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.stats['batches'] += 1
+        predictions = response.get('predictions') if isinstance(response, dict) else None
+        if not isinstance(predictions, list):
+            predictions = []
+        for (_, future), result in zip(batch, predictions):
+            if future.done():
+                continue
+            if not isinstance(result, dict):
+                future.set_exception(ApiError(200, {'errors': ['Resultado inválido no lote']}))
+            elif 'error' in result:
+                future.set_exception(ApiError(422, result))
+            else:
+                future.set_result(result)
+        # Resposta malformada ou lista curta: pacientes sem resultado não ficam esperando
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(ApiError(200, {'errors': ['Resposta do lote sem resultado para o paciente']}))
+
+    async def predict_many(self, patients, return_exceptions=False):
+        """Predições de vários pacientes em paralelo (ordem preservada)"""
+        return await asyncio.gather(
+            *(self.predict(patient) for patient in patients), return_exceptions=return_exceptions
+        )
+
+    async def score_dataframe(self, df):
+        """Um resultado por linha de df (mesmo índice); falhas na coluna 'error'"""
+        import pandas as pd
+
+        # NaN vira null, como JSON.stringify no JS
+        patients = [
+            {key: None if isinstance(value, float) and value != value else value for key, value in row.items()}
+            for row in df.to_dict('records')
+        ]
+        results = await self.predict_many(patients, return_exceptions=True)
+        rows = [result if isinstance(result, dict) else {'error': str(result)} for result in results]
+        return pd.DataFrame(rows, index=df.index)
+
+
+def score_dataframe(df, base_url=DEFAULT_BASE_URL, **options):
+    """Versão síncrona para scripts: abre o cliente, pontua o DataFrame e fecha"""
+    async def run():
+        async with AsyncPredictionClient(base_url, **options) as client:
+            return await client.score_dataframe(df)
+    return asyncio.run(run())
+
+
+def predict_risk(patient, base_url=DEFAULT_BASE_URL, timeout=TIMEOUT):
+    """Porte direto de predictRisk: uma conexão nova por paciente"""
+    from urllib.request import Request, urlopen
+
+    request = Request(
+        base_url.rstrip('/') + PREDICT_PATH, data=json.dumps(patient).encode('utf-8'), method='POST',
+        headers={'Content-Type': 'application/json', 'Accept': 'application/json'}
+    )
+    with urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def start_standin_server(version=None, host='127.0.0.1', port=0, latency=0.0, batch=True):
+    """
+    Servidor local que imita a API (/predict, /predict/batch, /health) com o
+    ScoringService do bundle; latency (segundos) simula a rede por requisição.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from inference.artifacts import DEFAULT_VERSION
+    from inference.instrumentation import ScoringService
+
+    service = ScoringService(version or DEFAULT_VERSION)
+    health = json.dumps({'status': 'healthy', 'model_version': service.bundle.model_version}).encode('utf-8')
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Cabeçalho e corpo saem em dois writes: sem TCP_NODELAY, Nagle + ACK atrasado somam ~40 ms
+        disable_nagle_algorithm = True
+
+        def _reply(self, status, body):
+            if latency:
+                time.sleep(latency)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if urlsplit(self.path).path == HEALTH_PATH:
+                self._reply(200, health)
+            else:
+                self._reply(404, b'{"error": "not_found"}')
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            path = urlsplit(self.path).path
+            try:
+                if path == PREDICT_PATH:
+                    status, payload = service.handle(body)
+                elif path == BATCH_PATH and batch:
+                    status, payload = service.handle_batch(body)
+                else:
+                    status, payload = 404, b'{"error": "not_found"}'
+            except (ValueError, TypeError):
+                status, payload = 400, b'{"error": "bad_request"}'
+            self._reply(status, payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _server_url(server):
+    host, port = server.server_address[:2]
+    return f'http://{host}:{port}'
+
+
+def _async_run(base_url, frame, **options):
+    async def run():
+        async with AsyncPredictionClient(base_url, **options) as client:
+            start = time.perf_counter()
+            result = await client.score_dataframe(frame)
+            seconds = time.perf_counter() - start
+            return result, seconds, dict(client.stats, connections=client.pool.opened, batching=client.batching)
+    return asyncio.run(run())
+
+
+def run_benchmark(n_patients=500, latency=0.02, version=None):
+    """Sequencial (uma conexão por paciente) vs cliente assíncrono, sem e com lote"""
+    from urllib.error import HTTPError
+
+    from data.datasets import create_simulated_data
+    from inference.artifacts import DEFAULT_VERSION, load_features
+
+    features = load_features(version or DEFAULT_VERSION)
+    frame = create_simulated_data(n_patients, random_state=9)[features]
+
+    batch_server = start_standin_server(version, latency=latency)
+    single_server = start_standin_server(version, latency=latency, batch=False)
+    try:
+        start = time.perf_counter()
+        sequential = []
+        for patient in frame.to_dict('records'):
+            patient = {k: None if v != v else v for k, v in patient.items()}
+            try:
+                sequential.append(predict_risk(patient, _server_url(single_server))['probability'])
+            except HTTPError as error:
+                error.close()
+                sequential.append(float('nan'))
+        sequential_seconds = time.perf_counter() - start
+
+        pooled, pooled_seconds, pooled_stats = _async_run(_server_url(single_server), frame)
+        batched, batched_seconds, batched_stats = _async_run(_server_url(batch_server), frame)
+    finally:
+        batch_server.shutdown()
+        single_server.shutdown()
+
+    import numpy as np
+
+    sequential = np.asarray(sequential)
+    return {
+        'n_patients': int(n_patients),
+        'latency_ms': latency * 1000,
+        'n_errors': int(batched['error'].notna().sum()) if 'error' in batched else 0,
+        'same_predictions': bool(
+            np.array_equal(sequential, pooled['probability'].to_numpy(), equal_nan=True)
+            and np.array_equal(sequential, batched['probability'].to_numpy(), equal_nan=True)
+        ),
+        'seconds': {'sequential': sequential_seconds, 'async_pooled': pooled_seconds,
+                    'async_batched': batched_seconds},
+        'stats': {'sequential': {'requests': int(n_patients), 'connections': int(n_patients)},
+                  'async_pooled': pooled_stats, 'async_batched': batched_stats}
+    }
+
+
+def main():
+    n_patients = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.02
+
+    print("🚀 CLIENTE ASSÍNCRONO DA API - BENCHMARK (SERVIDOR LOCAL)")
+    print("=" * 80)
+    result = run_benchmark(n_patients, latency)
+    print(f"✅ {result['n_patients']:,} pacientes | latência simulada {result['latency_ms']:.0f} ms | "
+          f"{result['n_errors']} rejeitados pela validação")
+    print(f"✅ Mesmas predições nos três modos: {result['same_predictions']}")
+
+    sequential = result['seconds']['sequential']
+    print("\n⏱️ TEMPO TOTAL:")
+    for name, seconds in result['seconds'].items():
+        stats = result['stats'][name]
+        print(f"   {name:<14} {seconds:7.2f}s ({sequential / seconds:5.1f}x) | "
+              f"requisições: {stats['requests']:,} | conexões: {stats['connections']:,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
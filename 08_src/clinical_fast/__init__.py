@@ -0,0 +1,7 @@
+"""
+Módulos rápidos de validação clínica do projeto TCC Hipertensão ML
+
+Nome distinto do pacote clinical de 10_clinical_validation/src
+(clinical_validator, threshold_optimizer, proportion_optimizer): o runner
+coloca os dois diretórios no sys.path e importa de ambos.
+"""
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Validação Clínica em Chunks (out-of-core)
+
+Para bases de avaliação maiores que a memória: o arquivo é lido em chunks
+(CSV via pandas ou coorte colunar de data.cohort), cada chunk é escalonado
+e pontuado uma única vez e alimenta acumuladores mergeáveis:
+
+- StreamingMetricsAccumulator: matrizes de confusão e métricas nos
+  thresholds clínicos, AUC/PR-AUC e thresholds ótimos por cenário;
+- MedicalConsistencyValidator.compute_chunked: correlações Pearson e
+  Spearman (geral e por estrato) contra y_proba.
+
+O y_proba de cada chunk é anexado a um arquivo float32 temporário, relido
+em sequência nas passadas de correlação: o modelo nunca roda duas vezes e a
+memória fica limitada ao tamanho do chunk. O resultado tem as mesmas
+chaves de run_clinical_validation, então generate_executive_summary e
+save_validation_results funcionam sem mudanças.
+
+Uso (benchmark com memória de pico):
+    python 08_src/clinical_fast/chunked_validation.py <diretorio_coorte> [n_linhas] [chunk]
+"""
+
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from clinical_fast.medical_consistency import (
+    CONSISTENCY_THRESHOLD, MedicalConsistencyValidator, medical_consistency_report
+)
+from clinical_fast.prediction_cache import predict_once
+from clinical_fast.streaming_metrics import CLINICAL_SCENARIOS, StreamingMetricsAccumulator
+
+DEFAULT_CHUNK_SIZE = 200_000
+TARGET_CANDIDATES = ['risco_hipertensao', 'Risk', 'TenYearCHD', 'target']
+
+
+def find_target_column(columns):
+    """Mesma regra de load_model_and_data: candidatos conhecidos ou última coluna"""
+    for column in TARGET_CANDIDATES:
+        if column in columns:
+            return column
+    return columns[-1]
+
+
+def chunk_source(data_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Fábrica de iteradores de DataFrames: CSV (pd.read_csv com chunksize) ou
+    diretório de coorte (data.cohort). Cada chamada recomeça do início.
+    """
+    data_path = Path(data_path)
+    if data_path.is_dir():
+        from data.cohort import iter_cohort_chunks
+        return lambda: iter_cohort_chunks(data_path, chunk_size)
+    return lambda: pd.read_csv(data_path, chunksize=chunk_size)
+
+
+def consistency_interpretation(report, threshold=CONSISTENCY_THRESHOLD):
+    """Texto curto com quantas features médicas atendem à expectativa"""
+    checked = [c for c in report['correlations'].values() if 'meets_expectation' in c]
+    met = sum(c['meets_expectation'] for c in checked)
+    return (f"{met} de {len(checked)} features médicas com correlação positiva "
+            f"acima de {threshold} com o risco predito")
+
+
+def run_chunked_validation(model, data_path, scaler=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                           thresholds=None, spearman=True, work_dir=None):
+    """
+    Validação clínica com memória limitada ao chunk. scaler é qualquer objeto
+    com transform (ex.: StandardScaler ou ArtifactBundle, que também imputa).
+    """
+    source = chunk_source(data_path, chunk_size)
+    metrics = StreamingMetricsAccumulator(thresholds)
+    target, features, n_rows = None, None, 0
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        proba_path = Path(tmp) / 'y_proba.f32'
+
+        # Passada 1: escalonamento + predição (uma vez por linha) e métricas
+        with open(proba_path, 'wb') as proba_file:
+            for frame in source():
+                if target is None:
+                    target = find_target_column(list(frame.columns))
+                    features = [c for c in frame.columns if c != target]
+                y_proba, _ = predict_once(model, frame[features], scaler)
+                metrics.update(frame[target].to_numpy(), y_proba)
+                proba_file.write(np.asarray(y_proba, dtype=np.float32).tobytes())
+                n_rows += len(frame)
+
+        if n_rows == 0:
+            raise ValueError(f"Nenhuma linha em {data_path}")
+
+        # Passadas de correlação: features relidas, y_proba do arquivo (sem re-predição)
+        def chunks():
+            with open(proba_path, 'rb') as proba_file:
+                for frame in source():
+                    yield frame[features], np.fromfile(proba_file, dtype=np.float32, count=len(frame))
+
+        validator = MedicalConsistencyValidator(features, spearman=spearman)
+        correlations = validator.compute_chunked(chunks)
+
+    report = medical_consistency_report(correlations, features)
+    model_name = type(model).__name__
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'model_type': model_name,
+        'mode': 'chunked',
+        'n_rows': n_rows,
+        'chunk_size': chunk_size,
+        'validation_results': {
+            'medical_consistency': {
+                'overall_consistency_score': report['consistency_score'],
+                'interpretation': consistency_interpretation(report),
+                'correlations': report['correlations']
+            },
+            'correlations': correlations,
+            'performance': metrics.summary(model_name)
+        },
+        'threshold_optimization': {
+            'best_thresholds': {scenario: metrics.scenario_threshold(scenario)
+                                for scenario in CLINICAL_SCENARIOS}
+        },
+        # Otimizar proporções exige re-treinar com a base inteira em memória
+        'proportion_optimization': {
+            'status': 'não executada no modo em chunks (requer re-treino em memória)'
+        },
+        'summary': {}
+    }
+
+
+def peak_memory_mb():
+    """Memória residente de pico do processo (MB); None se não houver como medir"""
+    try:
+        import resource
+    except ImportError:
+        # Windows: sem resource; psutil (opcional) expõe o pico do working set
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 2 ** 20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está em KB no Linux e em bytes no macOS
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+def run_benchmark(path, n_rows=110_000_000, chunk_size=DEFAULT_CHUNK_SIZE, version='gb_v1'):
+    """Coorte colunar (gerada se não existir) validada em chunks com gb_v1"""
+    from data.cohort import METADATA_FILE, write_cohort
+    from inference.artifacts import load_bundle
+
+    path = Path(path)
+    if not (path / METADATA_FILE).exists():
+        print(f"📁 Gerando coorte com {n_rows:,} linhas em {path}...")
+        write_cohort(path, n_rows)
+    size_gb = sum(f.stat().st_size for f in path.iterdir()) / 1e9
+
+    bundle = load_bundle(version)
+    start = time.perf_counter()
+    # O bundle faz imputação + escalonamento (transform) antes do modelo
+    results = run_chunked_validation(bundle.model, path, scaler=bundle, chunk_size=chunk_size,
+                                     thresholds=bundle.thresholds)
+    seconds = time.perf_counter() - start
+    return {'n_rows': results['n_rows'], 'dataset_gb': size_gb, 'seconds': seconds,
+            'peak_memory_mb': peak_memory_mb(), 'results': results}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 110_000_000
+    chunk = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_CHUNK_SIZE
+
+    print("🚀 BENCHMARK - VALIDAÇÃO CLÍNICA EM CHUNKS")
+    print("=" * 80)
+    result = run_benchmark(sys.argv[1], rows, chunk)
+    validation = result['results']
+    print(f"📊 {result['n_rows']:,} linhas ({result['dataset_gb']:.1f} GB em disco) em {result['seconds']:.0f}s")
+    if result['peak_memory_mb'] is not None:
+        print(f"💾 Memória de pico: {result['peak_memory_mb']:,.0f} MB")
+    print(f"📋 Consistência médica: "
+          f"{validation['validation_results']['medical_consistency']['overall_consistency_score']:.3f}")
+    for scenario, config in validation['threshold_optimization']['best_thresholds'].items():
+        print(f"   {scenario}: {config['threshold']:.3f} "
+              f"(Sens: {config['sensitivity']:.1%}, Spec: {config['specificity']:.1%})")
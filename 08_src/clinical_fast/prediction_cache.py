@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Cache de Predições da Validação Clínica
+
+A validação clínica só precisa de y_proba: as predições de classe saem do
+mesmo vetor (classes_[proba > 0.5], igual ao argmax de predict), então o
+ensemble é percorrido uma única vez. O y_proba é gravado em .npy numa chave
+formada pelo hash do arquivo do modelo (ou do pickle em memória), do scaler
+e dos dados, de modo que reexecuções (outros thresholds, outros formatos de
+relatório) não refazem a inferência.
+
+Uso (benchmark da reexecução):
+    python 08_src/clinical_fast/prediction_cache.py [n_linhas]
+"""
+
+import hashlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+CACHE_DIR = PROJECT_ROOT / '.cache' / 'predictions'
+
+_HASH_BLOCK = 1 << 20
+
+
+def file_hash(path):
+    """SHA-256 do conteúdo de um arquivo (lido em blocos)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def object_hash(obj):
+    """SHA-256 do pickle de um objeto (modelo/scaler sem arquivo de origem)"""
+    import joblib
+
+    buffer = io.BytesIO()
+    joblib.dump(obj, buffer)
+    return hashlib.sha256(buffer.getvalue()).hexdigest()
+
+
+def data_hash(X):
+    """Hash das colunas, dtypes e valores de X (DataFrame ou array)"""
+    digest = hashlib.blake2b(digest_size=32)
+    if isinstance(X, pd.DataFrame):
+        digest.update(repr((list(X.columns), [str(dtype) for dtype in X.dtypes], X.shape)).encode())
+        columns = (X[column].to_numpy() for column in X.columns)
+    else:
+        X = np.asarray(X)
+        digest.update(repr((X.dtype.str, X.shape)).encode())
+        columns = (X,)
+    for values in columns:
+        if values.dtype == object:
+            values = pd.util.hash_array(values)
+        digest.update(memoryview(np.ascontiguousarray(values)).cast('B'))
+    return digest.hexdigest()
+
+
+def prediction_key(model, X, scaler=None, model_path=None):
+    """Chave do cache: hash do modelo + hash do scaler + hash dos dados"""
+    model_id = file_hash(model_path) if model_path is not None else object_hash(model)
+    scaler_id = object_hash(scaler) if scaler is not None else 'none'
+    return hashlib.sha256(f'{model_id}:{scaler_id}:{data_hash(X)}'.encode()).hexdigest()[:32]
+
+
+class PredictionCache:
+    """y_proba persistido em <cache_dir>/<chave>.npy"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def path(self, key):
+        return self.cache_dir / f'{key}.npy'
+
+    def get(self, key):
+        path = self.path(key)
+        return np.load(path) if path.exists() else None
+
+    def put(self, key, y_proba):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Grava em arquivo temporário e renomeia: leitores nunca veem .npy parcial
+        tmp_path = self.path(key).with_suffix('.tmp.npy')
+        np.save(tmp_path, np.asarray(y_proba))
+        tmp_path.replace(self.path(key))
+
+    def clear(self):
+        for path in self.cache_dir.glob('*.npy'):
+            path.unlink()
+
+
+def _as_input(estimator, X):
+    """Mantém os nomes das colunas só para estimadores ajustados com nomes"""
+    if isinstance(X, pd.DataFrame) and not hasattr(estimator, 'feature_names_in_'):
+        return X.to_numpy()
+    return X
+
+
+def _scale(scaler, model, X):
+    X_scaled = scaler.transform(_as_input(scaler, X))
+    if isinstance(X, pd.DataFrame) and hasattr(model, 'feature_names_in_'):
+        return pd.DataFrame(X_scaled, columns=X.columns, index=X.index)
+    return X_scaled
+
+
+def predict_once(model, X, scaler=None):
+    """(y_proba, y_pred) com uma única passagem pelo modelo"""
+    if scaler is not None:
+        X = _scale(scaler, model, X)
+
+    if not hasattr(model, 'predict_proba'):
+        y_pred = model.predict(_as_input(model, X))
+        return y_pred, y_pred
+
+    X = _as_input(model, X)
+    y_proba = model.predict_proba(X)[:, 1]
+    return y_proba, derive_predictions(model, y_proba)
+
+
+def derive_predictions(model, y_proba):
+    """Classes a partir de y_proba (mesmo desempate do argmax de predict)"""
+    classes = getattr(model, 'classes_', np.array([0, 1]))
+    return classes[(np.asarray(y_proba) > 0.5).astype(np.intp)]
+
+
+def cached_predictions(model, X, scaler=None, model_path=None, cache=None):
+    """
+    (y_proba, y_pred, hit): lê y_proba do cache quando modelo, scaler e dados
+    não mudaram; caso contrário prediz uma vez e grava no cache.
+    """
+    if not hasattr(model, 'predict_proba'):
+        return (*predict_once(model, X, scaler), False)
+
+    cache = cache or PredictionCache()
+    key = prediction_key(model, X, scaler, model_path)
+    y_proba = cache.get(key)
+    if y_proba is not None:
+        return y_proba, derive_predictions(model, y_proba), True
+
+    y_proba, y_pred = predict_once(model, X, scaler)
+    cache.put(key, y_proba)
+    return y_proba, y_pred, False
+
+
+def run_benchmark(n_rows=2_000_000, version='gb_v1', cache_dir=None):
+    """Primeira execução (predição + gravação) vs reexecução (hash + leitura)"""
+    import tempfile
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from data.cohort import FEATURES, chunk_rng, generate_chunk
+    from inference.artifacts import load_bundle
+
+    bundle = load_bundle(version)
+    chunk = generate_chunk(chunk_rng(42, 0), n_rows, dtype=np.float64)
+    X = pd.DataFrame({f: chunk[f] for f in FEATURES})
+    X = pd.DataFrame(bundle.imputer.transform(X), columns=FEATURES)
+    model_path = bundle.path / 'model.pkl'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PredictionCache(cache_dir or tmp)
+        timings = {}
+
+        start = time.perf_counter()
+        X_scaled = bundle.scaler.transform(X.to_numpy())
+        y_pred_twice = bundle.model.predict(X_scaled)
+        bundle.model.predict_proba(X_scaled)
+        timings['predict_and_predict_proba'] = time.perf_counter() - start
+
+        for run in ('first_run', 'rerun'):
+            start = time.perf_counter()
+            y_proba, y_pred, hit = cached_predictions(bundle.model, X, bundle.scaler, model_path, cache)
+            timings[run] = time.perf_counter() - start
+            assert hit == (run == 'rerun')
+        assert np.array_equal(y_pred, y_pred_twice)
+
+    return {'n_rows': n_rows, 'seconds': timings}
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    print("🚀 BENCHMARK - CACHE DE PREDIÇÕES DA VALIDAÇÃO CLÍNICA")
+    print("=" * 80)
+    result = run_benchmark(rows)
+    labels = {
+        'predict_and_predict_proba': 'predict + predict_proba (antes)',
+        'first_run': 'predict_proba único + gravação',
+        'rerun': 'reexecução (cache)'
+    }
+    for name, seconds in result['seconds'].items():
+        print(f"   {labels[name]:<36} {seconds:8.2f}s")
+    print(f"\n📊 {rows:,} linhas | reexecução "
+          f"{result['seconds']['predict_and_predict_proba'] / result['seconds']['rerun']:.0f}x mais rápida")
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Histórico Indexado de Validações Clínicas (SQLite)
+
+save_validation_results e save_demo_results gravam um JSON por execução.
+Este módulo ingere cada execução num banco SQLite embutido, com tabelas
+indexadas por versão do modelo, cenário e nome da métrica, para consultas
+do tipo "especificidade no threshold de triagem nas últimas 200 execuções
+do gb_v1" sem abrir arquivo por arquivo.
+
+Tabelas (chaves começando por run_id: as consultas percorrem o índice de
+runs por versão/data e buscam as linhas de cada execução diretamente):
+- runs: uma linha por execução (origem, tipo, modelo, versão, data, JSON)
+- thresholds: métricas por cenário clínico (threshold, sens., espec., ...)
+- metrics: demais valores numéricos achatados ('medical.consistency_score', ...)
+- summary: resumo executivo (chave -> texto)
+
+Toda execução tem model_version: a informada na ingestão, a do próprio
+resultado ou, na falta das duas, UNVERSIONED (sinalizada com aviso em
+record_run), para não se perder nas consultas por versão.
+
+Uso:
+    python 08_src/clinical_fast/results_store.py backfill [diretorio]
+    python 08_src/clinical_fast/results_store.py query <cenario> <metrica> [versao] [n]
+    python 08_src/clinical_fast/results_store.py benchmark [n_execucoes]
+"""
+
+import json
+import sqlite3
+import sys
+import time
+import uuid
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_DB_PATH = PROJECT_ROOT / '10_clinical_validation' / '3_CLINICAL_VALIDATION' / 'validation_runs.sqlite'
+RESULT_PATTERNS = ('clinical_validation_demo_*.json', 'clinical_validation_complete_*.json')
+
+ARTIFACTS_DIR = PROJECT_ROOT / '05_artifacts'
+UNVERSIONED = 'unversioned'
+
+THRESHOLD_FIELDS = ('threshold', 'sensitivity', 'specificity', 'accuracy', 'precision')
+CONFUSION_FIELDS = ('tp', 'fp', 'tn', 'fn')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    model_type TEXT,
+    model_version TEXT,
+    timestamp TEXT NOT NULL,
+    n_samples INTEGER,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_version_time ON runs (model_version, timestamp);
+CREATE INDEX IF NOT EXISTS idx_runs_time ON runs (timestamp);
+
+CREATE TABLE IF NOT EXISTS thresholds (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    scenario TEXT NOT NULL,
+    threshold REAL, sensitivity REAL, specificity REAL, accuracy REAL, precision REAL,
+    tp INTEGER, fp INTEGER, tn INTEGER, fn INTEGER,
+    PRIMARY KEY (run_id, scenario)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS summary (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (run_id, key)
+) WITHOUT ROWID;
+"""
+
+
+# ========================================
+# NORMALIZAÇÃO DOS FORMATOS DE RESULTADO
+# ========================================
+
+def _number(value):
+    """float para valores numéricos (inclui 'True'/'False' gravados como texto)"""
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    if value in ('True', 'False'):
+        return float(value == 'True')
+    return None
+
+
+def _flatten(prefix, data, out):
+    """Achata dicts aninhados em nome.com.pontos -> número"""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            _flatten(f'{prefix}.{key}' if prefix else str(key), value, out)
+    else:
+        value = _number(data)
+        if value is not None:
+            out[prefix] = value
+
+
+def _threshold_row(config):
+    confusion = config.get('confusion_matrix', {})
+    return {
+        **{field: _number(config.get(field)) for field in THRESHOLD_FIELDS},
+        **{field: confusion.get(field) for field in CONFUSION_FIELDS}
+    }
+
+
+def normalize_run(results):
+    """
+    Estrutura comum para os dois formatos de resultado: demonstração
+    (validations.*) e runner (validation_results / threshold_optimization).
+    """
+    metrics, thresholds = {}, {}
+
+    if 'validations' in results:
+        validations = results['validations']
+        kind = 'demo'
+        n_samples = results.get('demo_info', {}).get('samples')
+        medical = validations.get('medical', {})
+        scenarios = validations.get('thresholds', {}).get('scenarios', {})
+        _flatten('medical', {'consistency_score': medical.get('consistency_score')}, metrics)
+        _flatten('medical.correlations', {
+            name: stats.get('correlation') for name, stats in medical.get('correlations', {}).items()
+            if isinstance(stats, dict)
+        }, metrics)
+        proportions = validations.get('proportions', {})
+        _flatten('proportions', {
+            'current_prevalence': proportions.get('current_prevalence'),
+            **{name: {'target_prevalence': config.get('target_prevalence'),
+                      'estimated_performance': config.get('estimated_performance')}
+               for name, config in proportions.get('scenarios', {}).items()}
+        }, metrics)
+    else:
+        validation = results.get('validation_results', {})
+        kind = results.get('mode', 'validation')
+        n_samples = results.get('n_rows')
+        medical = validation.get('medical_consistency', {})
+        scenarios = results.get('threshold_optimization', {}).get('best_thresholds', {})
+        _flatten('medical', {'consistency_score': medical.get('overall_consistency_score')}, metrics)
+        _flatten('medical.correlations', {
+            name: stats.get('correlation') for name, stats in medical.get('correlations', {}).items()
+            if isinstance(stats, dict)
+        }, metrics)
+        performance = validation.get('performance', {})
+        _flatten('performance', {
+            'roc_auc': performance.get('roc_auc', {}).get('auc'),
+            'pr_auc': performance.get('pr_auc', {}).get('pr_auc'),
+            'best_f2': performance.get('best_f2', {})
+        }, metrics)
+        _flatten('proportions', {
+            name: {'optimal_proportion': config.get('optimal_proportion'),
+                   'weighted_score': config.get('weighted_score')}
+            for name, config in results.get('proportion_optimization', {}).get('best_configurations', {}).items()
+        }, metrics)
+
+    for scenario, config in scenarios.items():
+        if isinstance(config, dict) and 'error' not in config:
+            thresholds[scenario] = _threshold_row(config)
+
+    return {
+        'kind': kind,
+        'model_type': results.get('model_type'),
+        'model_version': results.get('model_version'),
+        'timestamp': results.get('timestamp'),
+        'n_samples': n_samples,
+        'thresholds': thresholds,
+        'metrics': metrics,
+        'summary': {str(key): str(value) for key, value in results.get('summary', {}).items()}
+    }
+
+
+def model_version_from_path(model_path):
+    """Versão a partir do arquivo do modelo: bundle de 05_artifacts ou nome@hash do conteúdo"""
+    from clinical_fast.prediction_cache import file_hash
+
+    path = Path(model_path).resolve()
+    if ARTIFACTS_DIR in path.parents:
+        return path.relative_to(ARTIFACTS_DIR).parts[0]
+    return f'{path.stem}@{file_hash(path)[:8]}'
+
+
+def resolve_model_version(results, model_version=None):
+    """Versão explícita, a gravada no resultado ou UNVERSIONED"""
+    return model_version or results.get('model_version') or UNVERSIONED
+
+
+# ========================================
+# STORE
+# ========================================
+
+class ResultsStore:
+    """Banco SQLite com o histórico das validações clínicas"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = Path(path)
+        if str(path) != ':memory:':
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(path))
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('PRAGMA foreign_keys=ON')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _insert(self, results, source, model_version, keep_payload):
+        run = normalize_run(results)
+        cursor = self.connection.execute(
+            'INSERT OR IGNORE INTO runs (source, kind, model_type, model_version, timestamp, n_samples, payload) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (source, run['kind'], run['model_type'], resolve_model_version(results, model_version),
+             run['timestamp'], run['n_samples'],
+             json.dumps(results, ensure_ascii=False, default=str) if keep_payload else None)
+        )
+        if cursor.rowcount == 0:
+            return None  # origem já ingerida
+        run_id = cursor.lastrowid
+        self.connection.executemany(
+            'INSERT INTO thresholds VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [(run_id, scenario, *(row[f] for f in THRESHOLD_FIELDS), *(row[f] for f in CONFUSION_FIELDS))
+             for scenario, row in run['thresholds'].items()]
+        )
+        self.connection.executemany('INSERT INTO metrics VALUES (?, ?, ?)',
+                                    [(run_id, name, value) for name, value in run['metrics'].items()])
+        self.connection.executemany('INSERT INTO summary VALUES (?, ?, ?)',
+                                    [(run_id, key, value) for key, value in run['summary'].items()])
+        return run_id
+
+    def ingest(self, results, source=None, model_version=None, keep_payload=True):
+        """Ingere uma execução; retorna o id (None se a origem já existia)"""
+        with self.connection:
+            return self._insert(results, source or f'run:{uuid.uuid4().hex}', model_version, keep_payload)
+
+    def ingest_many(self, runs, keep_payload=True):
+        """Ingere (results, source, model_version) numa única transação"""
+        with self.connection:
+            ids = [self._insert(results, source, version, keep_payload) for results, source, version in runs]
+        return [run_id for run_id in ids if run_id is not None]
+
+    def ingest_file(self, path, model_version=None):
+        path = Path(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            results = json.load(f)
+        return self.ingest(results, source=str(path.resolve()), model_version=model_version)
+
+    def backfill(self, root=PROJECT_ROOT, patterns=RESULT_PATTERNS):
+        """Ingere todos os JSON de validação existentes sob root (idempotente)"""
+        root = Path(root)
+        paths = sorted({path for pattern in patterns for path in root.rglob(pattern)})
+        runs = []
+        for path in paths:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    runs.append((json.load(f), str(path.resolve()), None))
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Ignorado {path}: {e}")
+        return self.ingest_many(runs)
+
+    # Consultas -------------------------------------------------------------
+
+    def threshold_history(self, scenario, metric='specificity', model_version=None, last=200):
+        """Métrica de um cenário nas últimas execuções (mais recentes primeiro)"""
+        if metric not in THRESHOLD_FIELDS + CONFUSION_FIELDS:
+            raise ValueError(f"Métrica de threshold desconhecida: {metric}")
+        query = (f'SELECT r.id, r.timestamp, r.model_version, t.threshold, t.{metric} '
+                 'FROM runs r JOIN thresholds t ON t.run_id = r.id AND t.scenario = ? ')
+        params = [scenario]
+        if model_version is not None:
+            query += 'WHERE r.model_version = ? '
+            params.append(model_version)
+        query += 'ORDER BY r.timestamp DESC LIMIT ?'
+        params.append(last)
+        columns = ('run_id', 'timestamp', 'model_version', 'threshold', metric)
+        return [dict(zip(columns, row)) for row in self.connection.execute(query, params)]
+
+    def metric_history(self, name, model_version=None, last=200):
+        """Valor de uma métrica achatada (ex.: 'medical.consistency_score') por execução"""
+        query = ('SELECT r.id, r.timestamp, r.model_version, m.value '
+                 'FROM runs r JOIN metrics m ON m.run_id = r.id AND m.name = ? ')
+        params = [name]
+        if model_version is not None:
+            query += 'WHERE r.model_version = ? '
+            params.append(model_version)
+        query += 'ORDER BY r.timestamp DESC LIMIT ?'
+        params.append(last)
+        columns = ('run_id', 'timestamp', 'model_version', 'value')
+        return [dict(zip(columns, row)) for row in self.connection.execute(query, params)]
+
+    def compare_runs(self, run_a, run_b):
+        """Diferença (b - a) das métricas por cenário entre duas execuções"""
+        rows = self.connection.execute(
+            f'SELECT a.scenario, {", ".join(f"a.{f}, b.{f}" for f in THRESHOLD_FIELDS)} '
+            'FROM thresholds a JOIN thresholds b ON a.scenario = b.scenario '
+            'WHERE a.run_id = ? AND b.run_id = ?', (run_a, run_b)
+        )
+        comparison = {}
+        for row in rows:
+            values = row[1:]
+            comparison[row[0]] = {
+                field: {'a': values[2 * i], 'b': values[2 * i + 1],
+                        'delta': None if None in values[2 * i:2 * i + 2] else values[2 * i + 1] - values[2 * i]}
+                for i, field in enumerate(THRESHOLD_FIELDS)
+            }
+        return comparison
+
+    def runs(self, model_version=None, last=20):
+        """Execuções mais recentes (sem o payload)"""
+        query = 'SELECT id, source, kind, model_type, model_version, timestamp, n_samples FROM runs '
+        params = []
+        if model_version is not None:
+            query += 'WHERE model_version = ? '
+            params.append(model_version)
+        query += 'ORDER BY timestamp DESC LIMIT ?'
+        params.append(last)
+        columns = ('id', 'source', 'kind', 'model_type', 'model_version', 'timestamp', 'n_samples')
+        return [dict(zip(columns, row)) for row in self.connection.execute(query, params)]
+
+    def payload(self, run_id):
+        row = self.connection.execute('SELECT payload FROM runs WHERE id = ?', (run_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+
+def record_run(results, source, model_version=None, db_path=DEFAULT_DB_PATH):
+    """Ingestão de uma execução recém-salva (usada por save_*_results)"""
+    if resolve_model_version(results, model_version) == UNVERSIONED:
+        print(f"⚠️ Execução sem model_version: registrada como '{UNVERSIONED}'")
+    with ResultsStore(db_path) as store:
+        return store.ingest(results, source=str(Path(source).resolve()), model_version=model_version)
+
+
+# ========================================
+# BENCHMARK
+# ========================================
+
+def _synthetic_runs(n_runs, template, seed=42):
+    """Execuções sintéticas a partir de um resultado real, com métricas perturbadas"""
+    import copy
+    from datetime import datetime, timedelta
+
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1)
+    versions = ['gb_v1', 'rf_v1', 'gb_v2']
+    for i in range(n_runs):
+        results = copy.deepcopy(template)
+        results['timestamp'] = (start + timedelta(minutes=37 * i)).isoformat()
+        for config in results['validations']['thresholds']['scenarios'].values():
+            config['threshold'] = float(np.clip(config['threshold'] + rng.normal(0, 0.02), 0, 1))
+            config['sensitivity'] = float(np.clip(config['sensitivity'] + rng.normal(0, 0.02), 0, 1))
+            config['specificity'] = float(np.clip(config['specificity'] + rng.normal(0, 0.02), 0, 1))
+        yield results, f'benchmark:{i}', versions[i % len(versions)]
+
+
+def run_benchmark(n_runs=10_000, db_path=None):
+    """Tempo de ingestão de n_runs execuções e das consultas de comparação"""
+    import tempfile
+
+    template_path = next(PROJECT_ROOT.rglob(RESULT_PATTERNS[0]))
+    with open(template_path, 'r', encoding='utf-8') as f:
+        template = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = list(_synthetic_runs(n_runs, template))
+        with ResultsStore(db_path or Path(tmp) / 'bench.sqlite') as store:
+            start = time.perf_counter()
+            store.ingest_many(runs)
+            ingest_seconds = time.perf_counter() - start
+
+            queries = {
+                'threshold_history': lambda: store.threshold_history('screening', 'specificity', 'gb_v1', 200),
+                'metric_history': lambda: store.metric_history('medical.consistency_score', 'gb_v1', 200),
+                'compare_runs': lambda: store.compare_runs(1, n_runs),
+                'runs': lambda: store.runs('rf_v1', 20)
+            }
+            query_ms = {}
+            for name, query in queries.items():
+                query()
+                start = time.perf_counter()
+                for _ in range(100):
+                    query()
+                query_ms[name] = (time.perf_counter() - start) / 100 * 1000
+
+            # Referência: abrir os JSON um a um (amostra de 200 arquivos)
+            sample = Path(tmp) / 'json'
+            sample.mkdir()
+            for results, source, _ in _synthetic_runs(200, template):
+                with open(sample / f"{source.split(':')[1]}.json", 'w', encoding='utf-8') as f:
+                    json.dump(results, f)
+            start = time.perf_counter()
+            for path in sample.glob('*.json'):
+                with open(path, 'r', encoding='utf-8') as f:
+                    json.load(f)['validations']['thresholds']['scenarios']['screening']['specificity']
+            json_ms = (time.perf_counter() - start) * 1000
+
+    return {'n_runs': n_runs, 'ingest_seconds': ingest_seconds, 'query_ms': query_ms,
+            'json_scan_200_ms': json_ms}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    command = sys.argv[1]
+
+    if command == 'benchmark':
+        n_runs = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+        print("🚀 BENCHMARK - HISTÓRICO DE VALIDAÇÕES (SQLITE)")
+        print("=" * 80)
+        result = run_benchmark(n_runs)
+        print(f"📥 Ingestão: {n_runs:,} execuções em {result['ingest_seconds']:.2f}s "
+              f"({n_runs / result['ingest_seconds']:,.0f} execuções/s)")
+        for name, ms in result['query_ms'].items():
+            print(f"   🔎 {name:<20} {ms:8.3f} ms")
+        print(f"   📂 ler 200 JSON      {result['json_scan_200_ms']:8.1f} ms")
+        return 0
+
+    with ResultsStore() as store:
+        if command == 'backfill':
+            root = Path(sys.argv[2]) if len(sys.argv) > 2 else PROJECT_ROOT
+            ids = store.backfill(root)
+            print(f"✅ {len(ids)} execuções ingeridas em {store.path}")
+        elif command == 'query':
+            scenario, metric = sys.argv[2], sys.argv[3]
+            version = sys.argv[4] if len(sys.argv) > 4 else None
+            last = int(sys.argv[5]) if len(sys.argv) > 5 else 200
+            for row in store.threshold_history(scenario, metric, version, last):
+                print(f"   {row['timestamp']}  {row['model_version'] or '-':<8} "
+                      f"threshold={row['threshold']:.3f}  {metric}={row[metric]:.3f}")
+        else:
+            print(__doc__)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Execução Concorrente dos Estágios da Validação Clínica
+
+Os estágios (validação médica, otimização de thresholds por cenário,
+otimização de proporções) só leem X, y e y_proba. Este módulo coloca esses
+arrays em memória compartilhada (multiprocessing.shared_memory) uma única
+vez, agenda cada estágio num pool de processos e devolve os resultados no
+mesmo formato do modo sequencial: cada estágio com erro vira
+{'error': mensagem}, sem afetar os demais.
+
+Para estágios que recebem DataFrames, frame_arrays compartilha cada coluna
+do frame original com o seu dtype (e o índice), e frame_from_arrays remonta
+df, X e y idênticos no worker; frames com colunas não numéricas (object,
+categorias, dtypes de extensão) não são compartilháveis e ficam no modo
+sequencial.
+
+Uso (benchmark sequencial vs paralelo):
+    python 08_src/clinical_fast/stage_executor.py [n_linhas] [workers]
+"""
+
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+class SharedArrays:
+    """Cópia de arrays numpy em blocos de memória compartilhada (context manager)"""
+
+    def __init__(self, arrays):
+        self.arrays = {name: np.ascontiguousarray(values) for name, values in arrays.items()}
+        self._blocks = []
+        self.specs = {}
+
+    def __enter__(self):
+        for name, values in self.arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+            self._blocks.append(block)
+            self.specs[name] = (block.name, values.shape, values.dtype.str)
+        return self.specs
+
+    def __exit__(self, *exc):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+        return False
+
+
+def _shareable(dtype):
+    """dtype numpy numérico ou booleano (cópia para memória compartilhada sem perdas)"""
+    return isinstance(dtype, np.dtype) and dtype.kind in 'biuf'
+
+
+def _index_meta(index):
+    if isinstance(index, pd.RangeIndex):
+        return {'name': index.name, 'range': (index.start, index.stop, index.step)}
+    return {'name': index.name, 'range': None}
+
+
+def frame_arrays(df, X, y):
+    """
+    Arrays e metadados para remontar (df, X, y) num worker. X e y que são
+    projeções de df (mesmas colunas, índice e valores) não são copiados de
+    novo. Retorna None se alguma coluna, o índice ou y não for numérico.
+    """
+    if not (X.index.equals(df.index) and y.index.equals(df.index)):
+        return None
+    arrays = {}
+    meta = {'df_columns': list(df.columns), 'x_columns': list(X.columns), 'target': y.name,
+            'index': _index_meta(df.index), 'x_from_df': False, 'y_from_df': False}
+    if meta['index']['range'] is None:
+        if not _shareable(df.index.dtype):
+            return None
+        arrays['index'] = df.index.to_numpy()
+
+    for i in range(df.shape[1]):
+        if not _shareable(df.dtypes.iloc[i]):
+            return None
+        arrays[f'df:{i}'] = df.iloc[:, i].to_numpy()
+
+    columns = set(df.columns)
+    meta['x_from_df'] = df.columns.is_unique and all(c in columns for c in X.columns) \
+        and X.equals(df[list(X.columns)])
+    if not meta['x_from_df']:
+        for j in range(X.shape[1]):
+            if not _shareable(X.dtypes.iloc[j]):
+                return None
+            arrays[f'X:{j}'] = X.iloc[:, j].to_numpy()
+
+    meta['y_from_df'] = df.columns.is_unique and y.name in columns and y.equals(df[y.name])
+    if not meta['y_from_df']:
+        if not _shareable(y.dtype):
+            return None
+        arrays['y'] = y.to_numpy()
+    return arrays, meta
+
+
+def frame_from_arrays(arrays, meta):
+    """(df, X, y) com os mesmos dtypes, colunas e índice dos originais"""
+    index_meta = meta['index']
+    if index_meta['range'] is not None:
+        index = pd.RangeIndex(*index_meta['range'], name=index_meta['name'])
+    else:
+        index = pd.Index(arrays['index'], name=index_meta['name'])
+
+    def frame(prefix, columns):
+        result = pd.DataFrame({i: arrays[f'{prefix}:{i}'] for i in range(len(columns))},
+                              index=index, copy=False)
+        result.columns = pd.Index(columns)
+        return result
+
+    df = frame('df', meta['df_columns'])
+    X = df[meta['x_columns']] if meta['x_from_df'] else frame('X', meta['x_columns'])
+    if meta['y_from_df']:
+        y = df[meta['target']]
+    else:
+        y = pd.Series(arrays['y'], index=index, name=meta['target'], copy=False)
+    return df, X, y
+
+
+# Blocos anexados no processo worker (mantidos vivos enquanto o worker existir)
+_WORKER_BLOCKS = []
+_WORKER_ARRAYS = {}
+
+
+def attach_shared(specs):
+    """Views somente leitura dos arrays compartilhados"""
+    arrays = {}
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _WORKER_BLOCKS.append(block)
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        view.flags.writeable = False
+        arrays[name] = view
+    return arrays
+
+
+def _init_worker(specs):
+    _WORKER_ARRAYS.update(attach_shared(specs))
+
+
+def _run_stage(name, fn, kwargs, arrays=None):
+    """Executa um estágio isolando exceções; retorna (nome, resultado, erro, segundos)"""
+    start = time.perf_counter()
+    try:
+        result = fn(_WORKER_ARRAYS if arrays is None else arrays, **kwargs)
+        return name, result, None, time.perf_counter() - start
+    except Exception as e:
+        return name, None, f"{e}\n{traceback.format_exc()}", time.perf_counter() - start
+
+
+def run_stages(stages, arrays, parallel=True, max_workers=None):
+    """
+    Executa estágios independentes sobre os mesmos arrays somente leitura.
+    stages: dict nome -> (função(arrays, **kwargs), kwargs); as funções devem
+    ser de nível de módulo (serializáveis). Retorna (resultados, tempos), com
+    resultados[nome] = retorno da função ou {'error': mensagem}.
+    """
+    results, timings, errors = {}, {}, {}
+
+    if not parallel:
+        outcomes = [_run_stage(name, fn, kwargs, arrays) for name, (fn, kwargs) in stages.items()]
+    else:
+        max_workers = max_workers or min(len(stages), os.cpu_count() or 1)
+        outcomes = []
+        with SharedArrays(arrays) as specs:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(specs,)) as pool:
+                futures = {pool.submit(_run_stage, name, fn, kwargs): name
+                           for name, (fn, kwargs) in stages.items()}
+                for future in as_completed(futures):
+                    try:
+                        outcomes.append(future.result())
+                    except Exception as e:
+                        # Falha do processo (ex.: worker encerrado) fica restrita ao estágio
+                        outcomes.append((futures[future], None, str(e), float('nan')))
+
+    for name, result, error, seconds in outcomes:
+        timings[name] = seconds
+        if error is not None:
+            errors[name] = error
+            results[name] = {'error': error.splitlines()[0] if error else 'erro desconhecido'}
+        else:
+            results[name] = result
+    # Mantém a ordem de declaração dos estágios
+    return {name: results[name] for name in stages}, {name: timings[name] for name in stages}
+
+
+# ========================================
+# BENCHMARK (estágios equivalentes implementados neste repositório)
+# ========================================
+
+def _medical_stage(arrays, features):
+    import pandas as pd
+    from clinical_fast.medical_consistency import MedicalConsistencyValidator, medical_consistency_report
+
+    frame = pd.DataFrame(arrays['X'], columns=features, copy=False)
+    correlations = MedicalConsistencyValidator(features).compute(frame, arrays['y_proba'])
+    return medical_consistency_report(correlations, features)
+
+
+def _threshold_scenario_stage(arrays, scenario):
+    from clinical_fast.streaming_metrics import StreamingMetricsAccumulator
+
+    accumulator = StreamingMetricsAccumulator().update(arrays['y'], arrays['y_proba'])
+    return accumulator.scenario_threshold(scenario)
+
+
+def _proportion_stage(arrays, target_prevalence, seed=42):
+    """Reamostra para a prevalência-alvo e avalia o modelo nesse cenário"""
+    from clinical_fast.streaming_metrics import StreamingMetricsAccumulator
+
+    y, y_proba = arrays['y'], arrays['y_proba']
+    rng = np.random.default_rng(seed)
+    positives, negatives = np.flatnonzero(y == 1), np.flatnonzero(y == 0)
+    n_pos = min(len(positives), int(len(negatives) * target_prevalence / (1 - target_prevalence)))
+    n_neg = min(len(negatives), int(n_pos * (1 - target_prevalence) / target_prevalence))
+    rows = np.concatenate([rng.choice(positives, n_pos, replace=False),
+                           rng.choice(negatives, n_neg, replace=False)])
+    accumulator = StreamingMetricsAccumulator({'balanced': 0.5}).update(y[rows], y_proba[rows])
+    return {'target_prevalence': target_prevalence, 'n_rows': int(len(rows)),
+            'roc_auc': accumulator.roc_auc()['auc'], 'pr_auc': accumulator.pr_auc()['pr_auc'],
+            'balanced': accumulator.metrics_at(0.5)}
+
+
+def run_benchmark(n_rows=1_000_000, max_workers=None, version='gb_v1'):
+    """Tempo total sequencial vs pool de processos no mesmo conjunto de estágios"""
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from data.cohort import chunk_rng, generate_chunk, FEATURES
+    from inference.artifacts import load_bundle
+
+    print("🚀 BENCHMARK - ESTÁGIOS DA VALIDAÇÃO CLÍNICA (SEQUENCIAL VS PARALELO)")
+    print("=" * 80)
+    chunk = generate_chunk(chunk_rng(42, 0), n_rows, dtype=np.float64)
+    X = np.column_stack([chunk[f] for f in FEATURES])
+    arrays = {'X': X, 'y': chunk['risco_hipertensao'].astype(np.int64),
+              'y_proba': load_bundle(version).predict_proba(X)}
+
+    stages = {'medical': (_medical_stage, {'features': FEATURES})}
+    for scenario in ('screening', 'balanced', 'confirmation'):
+        stages[f'threshold_{scenario}'] = (_threshold_scenario_stage, {'scenario': scenario})
+    for prevalence in (0.05, 0.15, 0.31):
+        stages[f'proportion_{prevalence:.2f}'] = (_proportion_stage, {'target_prevalence': prevalence})
+
+    wall = {}
+    for mode in ('sequential', 'parallel'):
+        start = time.perf_counter()
+        results, timings = run_stages(stages, arrays, parallel=(mode == 'parallel'), max_workers=max_workers)
+        wall[mode] = time.perf_counter() - start
+        print(f"\n⏱️ {mode}: {wall[mode]:.2f}s")
+        for name, seconds in timings.items():
+            status = '❌' if isinstance(results[name], dict) and 'error' in results[name] else '✅'
+            print(f"   {status} {name:<24} {seconds:.2f}s")
+
+    print(f"\n📊 {n_rows:,} linhas | {os.cpu_count()} CPU(s) | speedup {wall['sequential'] / wall['parallel']:.2f}x")
+    return {'n_rows': n_rows, 'cpu_count': os.cpu_count(), 'wall_seconds': wall}
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    run_benchmark(rows, workers)
@@ -0,0 +1,213 @@
+"""
+Acumulador de Métricas em Streaming
+
+Avaliação out-of-core: consome chunks de (label, score) e mantém apenas um
+histograma de scores por classe com bins fixos. A partir dele calcula AUC,
+PR-AUC, matrizes de confusão em cada threshold clínico e F2, com limites
+explícitos para o erro de aproximação. O estado é mergeável, permitindo
+combinar acumuladores de workers paralelos.
+
+As bordas dos bins incluem os thresholds de thresholds.json, portanto as
+métricas nesses cortes são exatas; apenas AUC/PR-AUC dependem da resolução.
+"""
+
+import numpy as np
+
+DEFAULT_N_BINS = 10_000
+
+# Cenários clínicos: restrição mínima + métrica maximizada entre os cortes válidos
+CLINICAL_SCENARIOS = {
+    'screening': {
+        'description': 'Triagem - Maximizar Sensibilidade',
+        'constraint': ('sensitivity', 0.90), 'maximize': 'specificity'
+    },
+    'balanced': {
+        'description': 'Diagnóstico Balanceado',
+        'constraint': None, 'maximize': 'youden'
+    },
+    'confirmation': {
+        'description': 'Confirmação - Maximizar Especificidade',
+        'constraint': ('specificity', 0.90), 'maximize': 'sensitivity'
+    }
+}
+
+
+class StreamingMetricsAccumulator:
+    """Histograma de scores por classe com métricas de classificação binária"""
+
+    def __init__(self, thresholds=None, n_bins=DEFAULT_N_BINS):
+        # thresholds: dict cenário -> threshold (ex.: artifacts.load_thresholds())
+        self.thresholds = dict(thresholds or {})
+        grid = np.linspace(0.0, 1.0, n_bins + 1)
+        self.edges = np.unique(np.concatenate([grid, list(self.thresholds.values())]))
+        # Bin i cobre [edges[i], edges[i+1]); o último bin (i = len(edges) - 1)
+        # contém só score == 1, de modo que o corte em 1.0 também é exato
+        self.counts = np.zeros((2, len(self.edges)), dtype=np.int64)
+        # Scores NaN não têm posição no histograma: descartados e contados
+        self.n_missing = 0
+
+    @property
+    def n_samples(self):
+        return int(self.counts.sum())
+
+    def update(self, y_true, y_score):
+        """Acumula um chunk de labels (0/1) e scores (probabilidades)"""
+        y_true = np.asarray(y_true).ravel()
+        y_score = np.asarray(y_score, dtype=np.float64).ravel()
+        if len(y_true) != len(y_score):
+            raise ValueError(f"Labels ({len(y_true)}) e scores ({len(y_score)}) com tamanhos diferentes")
+        if not np.isin(y_true, (0, 1)).all():
+            raise ValueError("Labels devem ser 0 ou 1")
+        missing = np.isnan(y_score)
+        if missing.any():
+            self.n_missing += int(missing.sum())
+            y_true, y_score = y_true[~missing], y_score[~missing]
+        y_true = y_true.astype(np.int64)
+        bins = np.searchsorted(self.edges, np.clip(y_score, 0.0, 1.0), side='right') - 1
+        n_bins = self.counts.shape[1]
+        self.counts += np.bincount(
+            y_true * n_bins + bins, minlength=2 * n_bins
+        ).reshape(2, n_bins)
+        return self
+
+    def merge(self, other):
+        """Combina o estado de outro acumulador com as mesmas bordas"""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Acumuladores com bordas de bins diferentes")
+        self.counts += other.counts
+        self.n_missing += other.n_missing
+        return self
+
+    def _cumulative(self):
+        """TP e FP acumulados do maior para o menor score (corte em cada borda)"""
+        neg, pos = self.counts
+        tp = np.cumsum(pos[::-1])[::-1]
+        fp = np.cumsum(neg[::-1])[::-1]
+        return tp, fp
+
+    def confusion_at(self, threshold):
+        """Matriz de confusão para score >= threshold (exata quando threshold é borda)"""
+        k = np.searchsorted(self.edges, threshold, side='left')
+        neg, pos = self.counts
+        tp = int(pos[k:].sum())
+        fp = int(neg[k:].sum())
+        fn = int(pos.sum()) - tp
+        tn = int(neg.sum()) - fp
+        exact = k < len(self.edges) and np.isclose(self.edges[k], threshold, rtol=0, atol=1e-12)
+        return {'tn': tn, 'fp': fp, 'fn': fn, 'tp': tp, 'exact': bool(exact)}
+
+    def metrics_at(self, threshold, modelo_nome='Modelo'):
+        """Métricas no formato de calcular_metricas_completas para um threshold"""
+        cm = self.confusion_at(threshold)
+        tn, fp, fn, tp = cm['tn'], cm['fp'], cm['fn'], cm['tp']
+        total = tn + fp + fn + tp
+        precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+        recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
+        return {
+            'modelo': modelo_nome,
+            'threshold': float(threshold),
+            'accuracy': (tp + tn) / total if total > 0 else 0.0,
+            'precision': precision,
+            'recall': recall,
+            'specificity': tn / (tn + fp) if (tn + fp) > 0 else 0.0,
+            'f1_score': _fbeta(precision, recall, 1.0),
+            'f2_score': _fbeta(precision, recall, 2.0),
+            'true_negatives': tn,
+            'false_positives': fp,
+            'false_negatives': fn,
+            'true_positives': tp,
+            'exact': cm['exact']
+        }
+
+    def roc_auc(self):
+        """AUC (empates no mesmo bin contam 1/2) e limite do erro de binning"""
+        neg, pos = self.counts.astype(np.float64)
+        n_pos, n_neg = pos.sum(), neg.sum()
+        if n_pos == 0 or n_neg == 0:
+            return {'auc': float('nan'), 'error_bound': float('nan')}
+        neg_below = np.cumsum(neg) - neg
+        auc = (pos * (neg_below + 0.5 * neg)).sum() / (n_pos * n_neg)
+        # Pares positivo/negativo no mesmo bin são os únicos de ordem incerta
+        bound = 0.5 * (pos * neg).sum() / (n_pos * n_neg)
+        return {'auc': float(auc), 'error_bound': float(bound)}
+
+    def pr_auc(self):
+        """Average precision com empates agrupados por bin e limites inferior/superior"""
+        neg, pos = self.counts.astype(np.float64)
+        n_pos = pos.sum()
+        if n_pos == 0:
+            return {'pr_auc': float('nan'), 'lower': float('nan'), 'upper': float('nan')}
+        tp, fp = (c.astype(np.float64) for c in self._cumulative())
+        with np.errstate(invalid='ignore', divide='ignore'):
+            precision = np.where(tp + fp > 0, tp / (tp + fp), 1.0)
+            # Ordem desconhecida dentro do bin: negativos antes (pior) ou depois (melhor)
+            tp0, fp0 = tp - pos, fp - neg
+            worst = (tp0 + 1) / (tp0 + fp0 + neg + 1)
+            best = np.where(tp + fp0 > 0, tp / (tp + fp0), 1.0)
+        ap = (pos * precision).sum() / n_pos
+        lower = (pos * worst).sum() / n_pos
+        upper = (pos * best).sum() / n_pos
+        return {'pr_auc': float(ap), 'lower': float(lower), 'upper': float(upper)}
+
+    def best_f2(self):
+        """Threshold (borda de bin) com maior F2"""
+        tp, fp = self._cumulative()
+        n_pos = self.counts[1].sum()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            f2 = np.where(tp > 0, 5 * tp / (5 * tp + 4 * (n_pos - tp) + fp), 0.0)
+        k = int(np.argmax(f2))
+        return {'threshold': float(self.edges[k]), 'f2_score': float(f2[k])}
+
+    def scenario_threshold(self, scenario):
+        """Melhor borda de bin para um cenário de CLINICAL_SCENARIOS"""
+        config = CLINICAL_SCENARIOS[scenario]
+        tp, fp = (c.astype(np.float64) for c in self._cumulative())
+        n_neg, n_pos = self.counts.sum(axis=1).astype(np.float64)
+        curves = {
+            'sensitivity': tp / n_pos if n_pos else np.zeros_like(tp),
+            'specificity': 1 - fp / n_neg if n_neg else np.zeros_like(fp)
+        }
+        curves['youden'] = curves['sensitivity'] + curves['specificity'] - 1
+
+        valid = np.ones(len(tp), dtype=bool)
+        if config['constraint']:
+            metric, minimum = config['constraint']
+            valid = curves[metric] >= minimum
+        score = np.where(valid, curves[config['maximize']], -np.inf)
+        k = int(np.argmax(score))
+        metrics = self.metrics_at(self.edges[k])
+        return {
+            'threshold': float(self.edges[k]),
+            'description': config['description'],
+            'sensitivity': metrics['recall'],
+            'specificity': metrics['specificity'],
+            'accuracy': metrics['accuracy'],
+            'precision': metrics['precision'],
+            'constraint_met': bool(valid[k]),
+            'confusion_matrix': {
+                'tp': metrics['true_positives'], 'fp': metrics['false_positives'],
+                'tn': metrics['true_negatives'], 'fn': metrics['false_negatives']
+            }
+        }
+
+    def summary(self, modelo_nome='Modelo'):
+        """Relatório completo (serializável em JSON)"""
+        return {
+            'n_samples': self.n_samples,
+            'n_missing': self.n_missing,
+            'n_positives': int(self.counts[1].sum()),
+            'roc_auc': self.roc_auc(),
+            'pr_auc': self.pr_auc(),
+            'best_f2': self.best_f2(),
+            'thresholds': {
+                scenario: self.metrics_at(threshold, modelo_nome)
+                for scenario, threshold in self.thresholds.items()
+            }
+        }
+
+
+def _fbeta(precision, recall, beta):
+    """F-beta a partir de precisão e recall"""
+    b2 = beta ** 2
+    denom = b2 * precision + recall
+    return (1 + b2) * precision * recall / denom if denom > 0 else 0.0
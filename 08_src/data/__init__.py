@@ -0,0 +1,3 @@
+"""
+Carregamento e geração de dados do projeto TCC Hipertensão ML
+"""
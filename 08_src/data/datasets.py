@@ -0,0 +1,122 @@
+"""
+Dataset de hipertensão: leitura dos dados brutos e dados simulados
+
+Equivalente sem efeitos colaterais (prints, estilo de gráficos, seed
+global) das funções de carregamento de 02_notebooks/SETUP_UNIVERSAL.py.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+RAW_DATA_PATH = PROJECT_ROOT / '00_data' / 'raw' / 'Hypertension-risk-model-main.csv'
+TARGET_COLUMN = 'risco_hipertensao'
+# Saídas de execuções com dados simulados: fora de 04_reports/05_artifacts (logs/ não é versionado)
+SIMULATED_OUTPUT_DIR = PROJECT_ROOT / 'logs' / 'simulated'
+
+COLUMN_TRANSLATION = {
+    'sex': 'sexo',
+    'male': 'sexo',
+    'age': 'idade',
+    'currentSmoker': 'fumante_atualmente',
+    'cigsPerDay': 'cigarros_por_dia',
+    'BPMeds': 'medicamento_pressao',
+    'diabetes': 'diabetes',
+    'totChol': 'colesterol_total',
+    'sysBP': 'pressao_sistolica',
+    'diaBP': 'pressao_diastolica',
+    'BMI': 'imc',
+    'heartRate': 'frequencia_cardiaca',
+    'glucose': 'glicose',
+    'TenYearCHD': 'risco_hipertensao',
+    'Risk': 'risco_hipertensao'
+}
+
+
+def translate_columns(df):
+    """Traduz nomes das colunas para português"""
+    return df.rename(columns={c: COLUMN_TRANSLATION.get(c, c) for c in df.columns})
+
+
+def load_raw_dataset(path=RAW_DATA_PATH):
+    """Lê o CSV bruto com colunas traduzidas (None se não existir)"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return translate_columns(pd.read_csv(path))
+
+
+def create_simulated_data(n_samples=4240, random_state=42):
+    """
+    Dados simulados realistas (mesma sequência de SETUP_UNIVERSAL.create_simulated_data,
+    mas com RandomState local em vez de np.random.seed global)
+    """
+    rng = np.random.RandomState(random_state)
+
+    # Gerar dados correlacionados
+    ages = rng.randint(32, 71, n_samples)
+
+    # Pressão sistólica correlacionada com idade
+    systolic_base = 100 + ages * 0.8 + rng.normal(0, 15, n_samples)
+    systolic_bp = np.clip(systolic_base, 85, 200)
+
+    # Pressão diastólica correlacionada com sistólica
+    diastolic_bp = 0.6 * systolic_bp + rng.normal(20, 8, n_samples)
+    diastolic_bp = np.clip(diastolic_bp, 50, 130)
+
+    # IMC com variação por idade
+    bmi_base = 22 + (ages - 40) * 0.1 + rng.normal(0, 4, n_samples)
+    bmi = np.clip(bmi_base, 16, 45)
+
+    # Risco baseado em múltiplos fatores
+    risk_prob = (0.1 + (ages - 30) * 0.015 +
+                 (systolic_bp - 120) * 0.008 +
+                 (bmi - 25) * 0.02)
+    risk_prob = np.clip(risk_prob, 0.05, 0.85)
+
+    df = pd.DataFrame({
+        'sexo': rng.choice([0, 1], n_samples, p=[0.57, 0.43]),
+        'idade': ages,
+        'fumante_atualmente': rng.choice([0, 1], n_samples, p=[0.51, 0.49]),
+        'cigarros_por_dia': np.where(
+            rng.choice([0, 1], n_samples, p=[0.51, 0.49]),
+            rng.exponential(8, n_samples), 0
+        ),
+        'medicamento_pressao': rng.choice([0, 1], n_samples, p=[0.97, 0.03]),
+        'diabetes': rng.choice([0, 1], n_samples, p=[0.97, 0.03]),
+        'colesterol_total': rng.normal(237, 45, n_samples),
+        'pressao_sistolica': systolic_bp,
+        'pressao_diastolica': diastolic_bp,
+        'imc': bmi,
+        'frequencia_cardiaca': rng.normal(76, 12, n_samples),
+        'glicose': rng.normal(82, 24, n_samples),
+        'risco_hipertensao': rng.binomial(1, risk_prob, n_samples)
+    })
+
+    # Adicionar alguns valores ausentes realistas (proporcionais ao tamanho)
+    scale = n_samples / 4240
+    missing_counts = {
+        'colesterol_total': 50,
+        'cigarros_por_dia': 30,
+        'glicose': 400,
+        'medicamento_pressao': 53,
+        'imc': 19
+    }
+    missing_indices = {
+        col: rng.choice(df.index, min(n_samples, int(round(count * scale))), replace=False)
+        for col, count in missing_counts.items()
+    }
+    for col, indices in missing_indices.items():
+        df.loc[indices, col] = np.nan
+
+    return df
+
+
+def load_dataset(path=RAW_DATA_PATH, fallback_samples=4240):
+    """Dados reais se disponíveis; caso contrário, dados simulados. Retorna (df, origem)"""
+    df = load_raw_dataset(path)
+    if df is not None:
+        return df, 'real'
+    return create_simulated_data(fallback_samples), 'simulated'
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Grade de Experimentos do Pré-processamento (proporções x repetições x scalers)
+
+O notebook 02 roda em laços aninhados o teste de proporções treino/teste
+(divisão estratificada → SMOTE no treino → RandomForest, 5 repetições por
+proporção) e, separado, a comparação Standard/Robust/MinMax. Aqui cada
+combinação (proporção, repetição, scaler) é uma célula independente:
+
+- a semente de cada célula é a do notebook (42 + 10 * repetição), então o
+  resultado não depende da ordem nem do número de workers e as proporções
+  e scalers são comparados nas mesmas divisões;
+- X e y ficam em memória compartilhada (clinical_fast.stage_executor), anexados
+  uma vez por worker;
+- cada célula vira uma linha de teste_proporcoes_celulas.csv assim que
+  termina, com a assinatura dos dados e da configuração (grid_signature);
+  com resume, só células gravadas com a mesma assinatura são reaproveitadas;
+- ao final, teste_proporcoes_granular.csv (mesmas colunas do notebook, mais
+  'scaler') e comparacao_scalers.csv são agregados a partir das células.
+
+O scaler é ajustado só no treino da célula, antes do SMOTE.
+
+Sem os dados brutos a grade rodaria sobre dados simulados: a execução é
+recusada, a menos que --allow-simulated seja passado; nesse caso a saída vai
+para logs/simulated/preprocessing e os CSVs de 04_reports não são tocados.
+
+O ganho do pool só foi medido numa máquina de 1 CPU (1.17x com 2 workers
+em 12 células, resultados idênticos); o speedup em 8 núcleos não foi medido.
+
+Uso:
+    python 08_src/data/preprocessing_grid.py [--workers N] [--repetitions N]
+        [--scalers none,StandardScaler,RobustScaler,MinMaxScaler] [--output dir] [--no-resume]
+        [--allow-simulated]
+    python 08_src/data/preprocessing_grid.py --benchmark [--workers N]
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from clinical_fast.stage_executor import SharedArrays, attach_shared
+from data.datasets import PROJECT_ROOT, SIMULATED_OUTPUT_DIR, TARGET_COLUMN
+
+OUTPUT_DIR = PROJECT_ROOT / '04_reports' / 'preprocessing'
+REPORTS_DIR = PROJECT_ROOT / '04_reports'
+CELLS_FILE = 'teste_proporcoes_celulas.csv'
+GRANULAR_FILE = 'teste_proporcoes_granular.csv'
+SCALERS_FILE = 'comparacao_scalers.csv'
+
+# Mesma grade do notebook 02
+TEST_SIZES = [0.15, 0.18, 0.20, 0.22, 0.25, 0.28, 0.30, 0.32, 0.35]
+N_REPETITIONS = 5
+SCALERS = ['none', 'StandardScaler', 'RobustScaler', 'MinMaxScaler']
+BASE_SEED = 42
+N_ESTIMATORS = 100
+SMOTE_NEIGHBORS = 5
+
+CELL_COLUMNS = [
+    'cell', 'proporcao', 'test_size', 'repetition', 'seed', 'scaler', 'n_treino', 'n_teste',
+    'n_treino_balanceado', 'recall', 'precision', 'f2', 'fn', 'fp', 'seconds', 'signature'
+]
+
+
+def cell_seed(repetition, base_seed=BASE_SEED):
+    """Semente do notebook 02 (42 + 10 * repetição)"""
+    return base_seed + repetition * 10
+
+
+def cell_id(test_size, repetition, scaler):
+    return f'{test_size:.2f}|{repetition}|{scaler}'
+
+
+def grid_signature(X, y, n_estimators=N_ESTIMATORS):
+    """
+    Hash dos dados e da configuração das células (modelo, SMOTE, versões):
+    células gravadas com outra assinatura não são retomadas.
+    """
+    import imblearn
+    import sklearn
+
+    from clinical_fast.prediction_cache import data_hash
+
+    config = {'n_estimators': n_estimators, 'smote_neighbors': SMOTE_NEIGHBORS, 'base_seed': BASE_SEED,
+              'sklearn': sklearn.__version__, 'imblearn': imblearn.__version__}
+    digest = hashlib.sha256(f'{data_hash(X)}|{data_hash(y)}|'.encode())
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def proportion_label(test_size):
+    return f"{int(round((1 - test_size) * 100))}/{int(round(test_size * 100))}"
+
+
+def grid_cells(test_sizes=TEST_SIZES, repetitions=N_REPETITIONS, scalers=SCALERS):
+    """Células da grade: dicts com test_size, repetition, scaler e seed"""
+    return [
+        {'test_size': test_size, 'repetition': repetition, 'scaler': scaler,
+         'seed': cell_seed(repetition)}
+        for test_size, repetition, scaler in product(test_sizes, range(repetitions), scalers)
+    ]
+
+
+def make_scaler(name):
+    from sklearn.preprocessing import MinMaxScaler, RobustScaler, StandardScaler
+
+    factories = {'none': None, 'StandardScaler': StandardScaler,
+                 'RobustScaler': RobustScaler, 'MinMaxScaler': MinMaxScaler}
+    if name not in factories:
+        raise ValueError(f"Scaler desconhecido: {name} (opções: {list(factories)})")
+    return factories[name]() if factories[name] else None
+
+
+def prepare_data(df=None):
+    """X, y do notebook 02: features numéricas com imputação pela mediana"""
+    from sklearn.impute import SimpleImputer
+
+    if df is None:
+        from data.datasets import load_dataset
+        df, _ = load_dataset()
+    features = [c for c in df.columns if c != TARGET_COLUMN]
+    X = SimpleImputer(strategy='median').fit_transform(df[features])
+    return np.ascontiguousarray(X, dtype=np.float64), df[TARGET_COLUMN].to_numpy(dtype=np.int64)
+
+
+def run_cell(arrays, test_size, repetition, scaler, seed, n_estimators=N_ESTIMATORS, n_jobs=1,
+             signature=None):
+    """Divisão estratificada → scaler (treino) → SMOTE (treino) → RandomForest"""
+    from imblearn.over_sampling import SMOTE
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import fbeta_score, precision_score, recall_score
+    from sklearn.model_selection import train_test_split
+
+    start = time.perf_counter()
+    X, y = arrays['X'], arrays['y']
+    X_tr, X_te, y_tr, y_te = train_test_split(X, y, test_size=test_size, random_state=seed, stratify=y)
+
+    transform = make_scaler(scaler)
+    if transform is not None:
+        X_tr = transform.fit_transform(X_tr)
+        X_te = transform.transform(X_te)
+
+    X_bal, y_bal = SMOTE(random_state=seed, k_neighbors=SMOTE_NEIGHBORS).fit_resample(X_tr, y_tr)
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=seed,
+                                   class_weight='balanced', n_jobs=n_jobs)
+    model.fit(X_bal, y_bal)
+    y_pred = model.predict(X_te)
+
+    return {
+        'cell': cell_id(test_size, repetition, scaler),
+        'proporcao': proportion_label(test_size),
+        'test_size': test_size,
+        'repetition': repetition,
+        'seed': seed,
+        'scaler': scaler,
+        'n_treino': len(y_tr),
+        'n_teste': len(y_te),
+        'n_treino_balanceado': len(y_bal),
+        'recall': recall_score(y_te, y_pred),
+        'precision': precision_score(y_te, y_pred, zero_division=0),
+        'f2': fbeta_score(y_te, y_pred, beta=2),
+        'fn': int(((y_te == 1) & (y_pred == 0)).sum()),
+        'fp': int(((y_te == 0) & (y_pred == 1)).sum()),
+        'seconds': time.perf_counter() - start,
+        'signature': signature
+    }
+
+
+# Arrays compartilhados anexados no worker
+_WORKER_ARRAYS = {}
+
+
+def _init_worker(specs):
+    _WORKER_ARRAYS.update(attach_shared(specs))
+
+
+def _run_shared_cell(cell, n_estimators, signature):
+    return run_cell(_WORKER_ARRAYS, n_estimators=n_estimators, signature=signature, **cell)
+
+
+def read_cells(path):
+    """
+    Células gravadas no CSV, ou None se ele não existe ou tem outro
+    cabeçalho (formato anterior, sem assinatura): nesse caso é reescrito.
+    """
+    if not Path(path).exists():
+        return None
+    cells = pd.read_csv(path, dtype={'signature': str})
+    if list(cells.columns) != CELL_COLUMNS:
+        return None
+    return cells
+
+
+def completed_cells(path, signature):
+    """Ids das células já gravadas com a mesma assinatura"""
+    cells = read_cells(path)
+    if cells is None:
+        return set()
+    return set(cells.loc[cells['signature'] == signature, 'cell'])
+
+
+class CellWriter:
+    """Anexa linhas ao CSV de células, com flush a cada célula"""
+
+    def __init__(self, path, append):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_header = not (append and self.path.exists())
+        self._file = open(self.path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=CELL_COLUMNS)
+        if write_header:
+            self._writer.writeheader()
+
+    def write(self, row):
+        self._writer.writerow(row)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def run_grid(X, y, cells, output_dir=OUTPUT_DIR, max_workers=None, resume=True,
+             n_estimators=N_ESTIMATORS, on_cell=None):
+    """
+    Executa as células (paralelo se max_workers > 1) gravando cada resultado
+    no CSV de células ao terminar. Retorna {'cells', 'executed', 'skipped',
+    'failed', 'seconds', 'signature'}; 'cells' é o DataFrame das células
+    pedidas com a assinatura atual.
+    """
+    cells_path = Path(output_dir) / CELLS_FILE
+    signature = grid_signature(X, y, n_estimators)
+    resume = resume and read_cells(cells_path) is not None
+    done = completed_cells(cells_path, signature) if resume else set()
+    pending = [cell for cell in cells
+               if cell_id(cell['test_size'], cell['repetition'], cell['scaler']) not in done]
+    max_workers = max_workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    failed = {}
+    writer = CellWriter(cells_path, append=resume)
+    try:
+        if max_workers > 1 and len(pending) > 1:
+            with SharedArrays({'X': X, 'y': y}) as specs:
+                with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                         initargs=(specs,)) as pool:
+                    futures = {pool.submit(_run_shared_cell, cell, n_estimators, signature): cell
+                               for cell in pending}
+                    for future in as_completed(futures):
+                        cell = futures[future]
+                        try:
+                            row = future.result()
+                        except Exception as e:
+                            failed[cell_id(cell['test_size'], cell['repetition'], cell['scaler'])] = str(e)
+                            continue
+                        writer.write(row)
+                        if on_cell:
+                            on_cell(row)
+        else:
+            arrays = {'X': X, 'y': y}
+            for cell in pending:
+                try:
+                    row = run_cell(arrays, n_estimators=n_estimators, signature=signature, **cell)
+                except Exception as e:
+                    failed[cell_id(cell['test_size'], cell['repetition'], cell['scaler'])] = str(e)
+                    continue
+                writer.write(row)
+                if on_cell:
+                    on_cell(row)
+    finally:
+        writer.close()
+
+    wanted = {cell_id(c['test_size'], c['repetition'], c['scaler']) for c in cells}
+    results = read_cells(cells_path)
+    results = results[results['cell'].isin(wanted) & (results['signature'] == signature)]
+    results = results.drop_duplicates('cell', keep='last')
+    return {'cells': results, 'executed': len(pending) - len(failed), 'skipped': len(cells) - len(pending),
+            'failed': failed, 'seconds': time.perf_counter() - start, 'signature': signature}
+
+
+def aggregate_proportions(cells):
+    """Uma linha por (scaler, proporção), com as colunas de teste_proporcoes_granular.csv"""
+    rows = []
+    for (scaler, test_size), group in cells.groupby(['scaler', 'test_size'], sort=True):
+        # np.std com ddof=0, como no notebook
+        f2_std = float(np.std(group['f2']))
+        f2_mean = float(group['f2'].mean())
+        rows.append({
+            'proporcao': group['proporcao'].iloc[0],
+            'test_size': test_size,
+            'scaler': scaler,
+            'n_treino': int(group['n_treino'].mean()),
+            'n_teste': int(group['n_teste'].mean()),
+            'repeticoes': len(group),
+            'recall_mean': float(group['recall'].mean()),
+            'recall_std': float(np.std(group['recall'])),
+            'f2_mean': f2_mean,
+            'f2_std': f2_std,
+            'fn_mean': float(group['fn'].mean()),
+            'fn_std': float(np.std(group['fn'])),
+            'fp_mean': float(group['fp'].mean()),
+            'estabilidade_score': 1 / (1 + f2_std),
+            'score_combinado': f2_mean / (1 + f2_std)
+        })
+    return pd.DataFrame(rows)
+
+
+def aggregate_scalers(cells):
+    """Comparação dos scalers sobre todas as células (mesmas divisões para todos)"""
+    summary = cells.groupby('scaler').agg(
+        f2_mean=('f2', 'mean'), f2_std=('f2', 'std'), recall_mean=('recall', 'mean'),
+        fn_mean=('fn', 'mean'), fp_mean=('fp', 'mean'), celulas=('cell', 'count')
+    )
+    return summary.sort_values('f2_mean', ascending=False).reset_index()
+
+
+def save_summaries(cells, output_dir=OUTPUT_DIR):
+    output_dir = Path(output_dir)
+    proportions = aggregate_proportions(cells)
+    scalers = aggregate_scalers(cells)
+    proportions.to_csv(output_dir / GRANULAR_FILE, index=False)
+    scalers.to_csv(output_dir / SCALERS_FILE, index=False)
+    return proportions, scalers
+
+
+def run_benchmark(max_workers=None, test_sizes=(0.20, 0.25, 0.30), repetitions=2,
+                  scalers=('none', 'StandardScaler'), output_dir=None):
+    """Laço sequencial do notebook (RF com n_jobs=-1) vs grade no pool de processos"""
+    import tempfile
+
+    X, y = prepare_data()
+    cells = grid_cells(test_sizes, repetitions, scalers)
+    timings = {}
+
+    start = time.perf_counter()
+    baseline = [run_cell({'X': X, 'y': y}, n_jobs=-1, **cell) for cell in cells]
+    timings['sequential'] = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = run_grid(X, y, cells, output_dir or tmp, max_workers=max_workers, resume=False)
+        timings['grid'] = result['seconds']
+        grid = result['cells'].set_index('cell')
+
+    # Mesmas sementes por célula: resultados idênticos nos dois modos
+    identical = all(np.isclose(grid.loc[row['cell'], 'f2'], row['f2']) for row in baseline)
+    return {'n_cells': len(cells), 'cpu_count': os.cpu_count(),
+            'max_workers': max_workers or os.cpu_count(), 'seconds': timings,
+            'speedup': timings['sequential'] / timings['grid'], 'identical': identical}
+
+
+def output_for_source(source, output=None, allow_simulated=False):
+    """
+    Diretório de saída para a origem dos dados; None quando a execução deve
+    ser recusada (dados simulados sem --allow-simulated ou apontando para
+    04_reports).
+    """
+    if source == 'real':
+        return Path(output) if output else OUTPUT_DIR
+    if not allow_simulated:
+        return None
+    output = Path(output).resolve() if output else SIMULATED_OUTPUT_DIR / 'preprocessing'
+    if output == REPORTS_DIR or REPORTS_DIR in output.parents:
+        return None
+    return output
+
+
+def main():
+    import argparse
+
+    from data.datasets import load_dataset
+
+    parser = argparse.ArgumentParser(description="Grade de proporções treino/teste x scalers")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--repetitions', type=int, default=N_REPETITIONS)
+    parser.add_argument('--scalers', default=','.join(SCALERS))
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--no-resume', action='store_true', help="refaz todas as células")
+    parser.add_argument('--benchmark', action='store_true')
+    parser.add_argument('--allow-simulated', action='store_true',
+                        help="sem dados brutos, roda com dados simulados em logs/simulated/preprocessing")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print("🚀 BENCHMARK - GRADE DE PROPORÇÕES/SCALERS")
+        print("=" * 80)
+        result = run_benchmark(args.workers)
+        print(f"   sequencial (notebook)   {result['seconds']['sequential']:8.2f}s")
+        print(f"   grade ({result['max_workers']} workers)        {result['seconds']['grid']:8.2f}s")
+        print(f"\n📊 {result['n_cells']} células | {result['cpu_count']} CPU(s) | "
+              f"speedup {result['speedup']:.2f}x | resultados idênticos: {result['identical']}")
+        return 0
+
+    print("🧪 GRADE DE EXPERIMENTOS DO PRÉ-PROCESSAMENTO")
+    print("=" * 80)
+    df, source = load_dataset()
+    output_dir = output_for_source(source, args.output, args.allow_simulated)
+    if output_dir is None:
+        print("❌ Dados brutos não encontrados - resultados simulados não vão para 04_reports")
+        print("   Use --allow-simulated (saída em logs/simulated/preprocessing ou --output fora de 04_reports)")
+        return 1
+    if source != 'real':
+        print(f"⚠️ Dados simulados (apenas demonstração) - saída em {output_dir}")
+    X, y = prepare_data(df)
+    cells = grid_cells(TEST_SIZES, args.repetitions, args.scalers.split(','))
+    print(f"📋 {len(cells)} células: {len(TEST_SIZES)} proporções x {args.repetitions} repetições "
+          f"x {len(args.scalers.split(','))} scalers | {len(y):,} amostras")
+
+    def report(row):
+        print(f"   ✅ {row['proporcao']:>6} rep {row['repetition']} {row['scaler']:<15} "
+              f"F2={row['f2']:.4f} Recall={row['recall']:.4f} FN={row['fn']} ({row['seconds']:.1f}s)")
+
+    result = run_grid(X, y, cells, output_dir, args.workers, resume=not args.no_resume, on_cell=report)
+    for cell, error in result['failed'].items():
+        print(f"   ❌ {cell}: {error}")
+    proportions, scalers = save_summaries(result['cells'], output_dir)
+
+    best = proportions.sort_values('score_combinado', ascending=False).iloc[0]
+    print(f"\n🏆 Melhor: {best['proporcao']} com {best['scaler']} "
+          f"(F2 {best['f2_mean']:.4f} ± {best['f2_std']:.4f})")
+    print("\nScalers (F2 médio):")
+    for _, row in scalers.iterrows():
+        print(f"   {row['scaler']:<15} {row['f2_mean']:.4f} ± {row['f2_std']:.4f}")
+    print(f"\n⏱️ {result['executed']} executadas, {result['skipped']} retomadas do CSV "
+          f"em {result['seconds']:.1f}s")
+    print(f"📁 {output_dir / GRANULAR_FILE}")
+    return 1 if result['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
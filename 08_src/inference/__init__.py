@@ -0,0 +1,3 @@
+"""
+Módulos de inferência sobre os artefatos oficiais (05_artifacts)
+"""
@@ -0,0 +1,107 @@
+"""
+Acesso aos artefatos oficiais de inferência (05_artifacts/<versao>)
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from inference.fused import fuse_preprocessing
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+ARTIFACTS_DIR = PROJECT_ROOT / '05_artifacts'
+DEFAULT_VERSION = 'rf_v1'
+
+
+def get_artifact_dir(version=DEFAULT_VERSION):
+    """Diretório do bundle de uma versão de modelo (ou caminho explícito)"""
+    path = Path(version)
+    return path if path.is_dir() else ARTIFACTS_DIR / version
+
+
+def _load_json(version, name):
+    with open(get_artifact_dir(version) / name, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_metadata(version=DEFAULT_VERSION):
+    """Conteúdo de metadata.json"""
+    return _load_json(version, 'metadata.json')
+
+
+def load_features(version=DEFAULT_VERSION):
+    """Lista ordenada de features de features.json"""
+    return _load_json(version, 'features.json')['features']
+
+
+def load_thresholds(version=DEFAULT_VERSION):
+    """Thresholds clínicos por cenário (cenário -> threshold)"""
+    return {
+        scenario: float(config['threshold'])
+        for scenario, config in _load_json(version, 'thresholds.json').items()
+    }
+
+
+def _load_pickle(path):
+    import joblib
+    return joblib.load(path)
+
+
+class ArtifactBundle:
+    """Bundle de inferência: imputer -> scaler -> modelo, com features e thresholds"""
+
+    def __init__(self, version=DEFAULT_VERSION):
+        self.path = get_artifact_dir(version)
+        self.metadata = load_metadata(self.path)
+        self.model_version = self.metadata.get('model_version', self.path.name)
+        self.features = load_features(self.path)
+        self.thresholds = load_thresholds(self.path)
+
+        # Preferir os passos individuais; sem model.pkl, usar os passos do pipeline.pkl
+        if (self.path / 'model.pkl').exists():
+            self.imputer = _load_pickle(self.path / 'imputer.pkl')
+            self.scaler = _load_pickle(self.path / 'scaler.pkl')
+            self.model = _load_pickle(self.path / 'model.pkl')
+        else:
+            steps = _load_pickle(self.path / 'pipeline.pkl').named_steps
+            self.imputer = steps['imputer']
+            self.scaler = steps['scaler']
+            self.model = steps['model']
+
+        self.model_name = type(self.model).__name__
+        # Imputer + scaler pré-calculados numa transformação afim (None se não suportado)
+        self.preprocessor = fuse_preprocessing(self.imputer, self.scaler)
+
+    def as_array(self, X):
+        """Matriz float64 com as colunas na ordem de features.json"""
+        if isinstance(X, dict):
+            X = [X.get(feature, np.nan) for feature in self.features]
+        elif hasattr(X, 'columns'):
+            X = X[self.features]
+        return np.asarray(X, dtype=np.float64).reshape(-1, len(self.features))
+
+    def transform(self, X):
+        """Imputação + escalonamento"""
+        X = self.as_array(X)
+        if self.preprocessor is not None:
+            return self.preprocessor.transform(X)
+        if hasattr(self.imputer, 'feature_names_in_'):
+            X = pd.DataFrame(X, columns=self.features)
+        return self.scaler.transform(self.imputer.transform(X))
+
+    def predict_proba(self, X):
+        """Probabilidade bruta da classe positiva (risco de hipertensão)"""
+        return self.model.predict_proba(self.transform(X))[:, 1]
+
+
+_BUNDLE_CACHE = {}
+
+
+def load_bundle(version=DEFAULT_VERSION):
+    """Bundle carregado uma única vez por versão (cache em memória)"""
+    key = str(get_artifact_dir(version))
+    if key not in _BUNDLE_CACHE:
+        _BUNDLE_CACHE[key] = ArtifactBundle(version)
+    return _BUNDLE_CACHE[key]
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Log de Auditoria de Predições (assíncrono, em lotes)
+
+Cada predição (entradas, probability, risk_category, model_version e
+latência) é serializada em JSON na chamada de log (registros não
+serializáveis são recusados ali, com ValueError) e colocada num buffer
+circular em memória limitado; uma thread em background grava em lotes em
+arquivos JSON Lines comprimidos (gzip, somente append) com rotação por
+tamanho. O caminho de /predict nunca
+espera pelo disco: com o buffer cheio o logger aplica back-pressure
+imediatamente (exceção AuditBackpressureError para a API responder 503, ou
+descarte contabilizado com overflow='drop').
+
+Os registros só saem do buffer depois que o lote foi gravado: se a gravação
+falhar (disco cheio, permissão), o erro é contado em stats['errors'], o lote
+continua no buffer e é regravado no ciclo seguinte, num arquivo novo.
+
+Uso:
+    python 08_src/inference/audit.py [versao] [n_requisicoes]
+"""
+
+import atexit
+import gzip
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from inference.artifacts import DEFAULT_VERSION
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+AUDIT_DIR = PROJECT_ROOT / 'logs' / 'audit'
+
+
+class AuditBackpressureError(RuntimeError):
+    """Buffer de auditoria cheio: a predição não pode ser registrada agora"""
+
+
+def prediction_entry(inputs, result, latency_ms):
+    """Registro de auditoria de uma resposta de inference.predict"""
+    return {
+        'inputs': inputs,
+        'probability': result['probability'],
+        'prediction': result['prediction'],
+        'risk_category': result['risk_category'],
+        'threshold_profile': result['threshold_profile'],
+        'model_version': result['model_version'],
+        'latency_ms': latency_ms
+    }
+
+
+def _serialize(entry):
+    """Registro como objeto JSON (str); ValueError se não for serializável"""
+    if not isinstance(entry, dict):
+        raise ValueError(f"Registro de auditoria deve ser um dict, não {type(entry).__name__}")
+    try:
+        return json.dumps(entry, ensure_ascii=False, default=float)
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"Registro de auditoria não serializável: {error}") from error
+
+
+class AuditLogger:
+    """Buffer circular limitado + gravação em lotes numa thread de background"""
+
+    def __init__(self, directory=AUDIT_DIR, capacity=10_000, batch_size=512,
+                 flush_interval=1.0, max_file_bytes=64 * 1024 * 1024,
+                 compresslevel=6, overflow='reject'):
+        if overflow not in ('reject', 'drop'):
+            raise ValueError(f"overflow inválido: {overflow}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.compresslevel = compresslevel
+        self.overflow = overflow
+
+        self._buffer = deque()
+        # Capacidade + append atômicos; _written sinaliza registros gravados (flush)
+        self._lock = threading.Lock()
+        self._written = threading.Condition(self._lock)
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._file_index = 0
+        self._path = None
+        self.last_error = None
+        self.stats = {'enqueued': 0, 'written': 0, 'dropped': 0, 'batches': 0, 'files': 0, 'errors': 0}
+
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def pressure(self):
+        """Ocupação do buffer (0 a 1)"""
+        return len(self._buffer) / self.capacity
+
+    def log(self, entry):
+        """Enfileira um registro (dict serializável em JSON); nunca bloqueia"""
+        return self.log_many([entry])
+
+    def log_many(self, entries):
+        """
+        Enfileira vários registros de uma vez, tudo ou nada: sem espaço para
+        todos, nenhum entra no buffer (back-pressure como em log)
+        """
+        if self._stopped.is_set():
+            raise RuntimeError("AuditLogger já foi encerrado")
+        # Serializado aqui: um registro inválido travaria a thread de gravação
+        lines = [_serialize(entry) for entry in entries]
+        with self._lock:
+            full = len(self._buffer) + len(lines) > self.capacity
+            if full:
+                self.stats['dropped'] += len(lines)
+            else:
+                # O carimbo de tempo é feito aqui, a formatação da data na thread
+                now = time.time()
+                self._buffer.extend((now, line) for line in lines)
+                self.stats['enqueued'] += len(lines)
+            pending = len(self._buffer)
+        if full:
+            if self.overflow == 'reject':
+                raise AuditBackpressureError(
+                    f"Buffer de auditoria cheio ({self.capacity} registros pendentes)"
+                )
+            return False
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def log_prediction(self, inputs, result, latency_ms):
+        """Enfileira o registro de auditoria de uma resposta de inference.predict"""
+        return self.log(prediction_entry(inputs, result, latency_ms))
+
+    def _next_path(self):
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        self._file_index += 1
+        self.stats['files'] += 1
+        return self.directory / f'audit-{stamp}-{self._file_index:04d}.jsonl.gz'
+
+    def _write_batch(self, batch):
+        lines = []
+        for timestamp, line in batch:
+            ts = json.dumps(datetime.fromtimestamp(timestamp, timezone.utc).isoformat())
+            lines.append('{"ts": ' + ts + (', ' + line[1:] if line != '{}' else '}'))
+        payload = ('\n'.join(lines) + '\n').encode('utf-8')
+
+        if self._path is None or self._path.stat().st_size >= self.max_file_bytes:
+            self._path = self._next_path()
+        # Cada lote é um membro gzip completo: o arquivo continua válido após falhas
+        with open(self._path, 'ab') as f:
+            f.write(gzip.compress(payload, compresslevel=self.compresslevel))
+
+    def _write_pending(self, limit=None):
+        """Grava até limit registros do início do buffer e só então os remove"""
+        with self._lock:
+            n = len(self._buffer) if limit is None else min(limit, len(self._buffer))
+            batch = list(islice(self._buffer, n))
+        self._write_batch(batch)
+        # Única thread consumidora: os n primeiros ainda são os registros gravados
+        with self._written:
+            for _ in range(n):
+                self._buffer.popleft()
+            self.stats['written'] += n
+            self.stats['batches'] += 1
+            self._written.notify_all()
+
+    def _record_error(self, error):
+        """Falha de gravação: contabiliza e força um arquivo novo na próxima tentativa"""
+        self.stats['errors'] += 1
+        self.last_error = repr(error)
+        self._path = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                while len(self._buffer) >= self.batch_size:
+                    self._write_pending(self.batch_size)
+                if self._buffer:
+                    self._write_pending()
+            except Exception as error:
+                # O lote continua no buffer; nova tentativa após flush_interval
+                self._record_error(error)
+
+    def flush(self, timeout=10.0):
+        """Aguarda a gravação de tudo que já foi enfileirado (False se expirar)"""
+        with self._written:
+            target = self.stats['written'] + len(self._buffer)
+        self._wakeup.set()
+        with self._written:
+            return self._written.wait_for(lambda: self.stats['written'] >= target, timeout)
+
+    def close(self):
+        """Grava os registros pendentes e encerra a thread"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join()
+        if self._buffer:
+            try:
+                self._write_pending()
+            except Exception as error:
+                self._record_error(error)
+
+
+def read_audit_log(directory=AUDIT_DIR):
+    """Itera os registros gravados, em ordem de arquivo"""
+    for path in sorted(Path(directory).glob('audit-*.jsonl.gz')):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+
+def _percentiles_us(times_ns):
+    times_ns = sorted(times_ns)
+    return {
+        'p50': times_ns[len(times_ns) // 2] / 1000.0,
+        'p99': times_ns[int(len(times_ns) * 0.99)] / 1000.0
+    }
+
+
+def run_benchmark(version=DEFAULT_VERSION, n_requests=5000):
+    """Latência de /predict (inference.predict) sem log, com log síncrono e com o AuditLogger"""
+    from inference.inference import predict
+
+    patient = {
+        'sexo': 1, 'idade': 55, 'fumante_atualmente': 0, 'cigarros_por_dia': 0,
+        'medicamento_pressao': 0, 'diabetes': 0, 'colesterol_total': 220,
+        'pressao_sistolica': 140, 'pressao_diastolica': 90, 'imc': 27.5,
+        'frequencia_cardiaca': 78, 'glicose': 90
+    }
+    predict(patient, version)
+
+    def measure(log):
+        """Latência total da requisição e só da chamada de log"""
+        total, logging = [], []
+        for _ in range(n_requests):
+            start = time.perf_counter_ns()
+            result = predict(patient, version)
+            if log is not None:
+                before_log = time.perf_counter_ns()
+                log(patient, result, (before_log - start) / 1e6)
+                logging.append(time.perf_counter_ns() - before_log)
+            total.append(time.perf_counter_ns() - start)
+        return {'request': _percentiles_us(total), 'logging': _percentiles_us(logging) if logging else None}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_path = Path(tmp) / 'sync.jsonl'
+
+        def sync_log(inputs, result, latency_ms):
+            # Alternativa ingênua: uma linha JSON por requisição, durável (fsync)
+            with open(sync_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'inputs': inputs, **result, 'latency_ms': latency_ms}) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+        logger = AuditLogger(Path(tmp) / 'audit')
+        results = {
+            'off': measure(None),
+            'sync_jsonl': measure(sync_log),
+            'async_audit': measure(logger.log_prediction)
+        }
+        logger.close()
+        written = sum(1 for _ in read_audit_log(Path(tmp) / 'audit'))
+
+    return {
+        'n_requests': n_requests,
+        'latency_us': results,
+        'audit_stats': logger.stats,
+        'records_read_back': written
+    }
+
+
+def main():
+    version = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VERSION
+    n_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    print("🚀 LOG DE AUDITORIA - LATÊNCIA DE /predict")
+    print("=" * 80)
+    result = run_benchmark(version, n_requests)
+    for name, stats in result['latency_us'].items():
+        line = f"   {name:<12} requisição p50 {stats['request']['p50']:8.1f} µs | p99 {stats['request']['p99']:8.1f} µs"
+        if stats['logging']:
+            line += f" | log p50 {stats['logging']['p50']:7.1f} µs | p99 {stats['logging']['p99']:7.1f} µs"
+        print(line)
+    print(f"\n✅ Registros gravados: {result['audit_stats']['written']:,} "
+          f"({result['audit_stats']['batches']} lotes, lidos de volta: {result['records_read_back']:,}, "
+          f"erros de gravação: {result['audit_stats']['errors']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
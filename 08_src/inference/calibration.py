@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Calibração de Probabilidades por Versão de Modelo
+
+Ajusta calibradores (isotônico ou Platt) sobre scores out-of-fold do
+pipeline de cada bundle em 05_artifacts e os salva como tabela de consulta
+em grade uniforme (calibration.json, ao lado do bundle). Na inferência a
+calibração é uma interpolação O(1) na tabela, sem sklearn no caminho.
+
+Os thresholds clínicos de thresholds.json estão na escala bruta do modelo e
+a decisão continua sendo score bruto >= threshold bruto (pontos de operação
+validados). O isotônico tem platôs: um score bruto abaixo do threshold no
+mesmo platô teria a mesma probabilidade calibrada, e comparar na escala
+calibrada o tornaria positivo. Os thresholds convertidos para a escala
+calibrada são salvos junto da tabela apenas para exibição.
+
+Os scores usados no ajuste vêm de clones do pipeline re-treinados em cada
+fold (out-of-fold), enquanto a tabela é aplicada aos scores do modelo
+implantado, treinado com todos os dados. A calibração pressupõe que as duas
+distribuições de scores são equivalentes; a diferença entre elas é medida
+(estatística KS e ECE do modelo implantado calibrado) e gravada em info.
+Como o modelo implantado já viu essas amostras, os scores dele são otimistas
+e só servem como diagnóstico, não para o ajuste.
+
+Só dados reais gravam no bundle de 05_artifacts. Com dados simulados a
+execução é recusada, a menos que --allow-simulated seja passado; nesse caso
+a tabela e o diagrama vão para logs/simulated/calibration, sem tocar no
+bundle nem em metadata.json.
+
+Uso:
+    python 08_src/inference/calibration.py [versao] [isotonic|platt] [--allow-simulated]
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+CALIBRATION_FILE = 'calibration.json'
+TABLE_SIZE = 1025
+METHODS = ('isotonic', 'platt')
+
+
+class CalibrationTable:
+    """
+    Calibrador pré-computado. Sem knots, os valores estão em grade uniforme
+    sobre [0, 1] e a interpolação é O(1); com knots (ex.: isotônico), a
+    interpolação linear usa busca binária, O(log k), e é exata.
+    """
+
+    def __init__(self, values, method, knots=None, thresholds=None, info=None):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.knots = None if knots is None else np.asarray(knots, dtype=np.float64)
+        self.method = method
+        self.thresholds = dict(thresholds or {})
+        self.info = dict(info or {})
+        self._last = len(self.values) - 1
+        # Inclinações pré-computadas: apply faz um índice, uma multiplicação e uma soma
+        self._slopes = np.append(np.diff(self.values), 0.0)
+
+    def apply(self, proba):
+        """Probabilidade calibrada (escalar ou array)"""
+        proba = np.clip(np.asarray(proba, dtype=np.float64), 0.0, 1.0)
+        if self.knots is not None:
+            return np.interp(proba, self.knots, self.values)
+        position = proba * self._last
+        index = position.astype(np.intp)
+        return self.values[index] + (position - index) * self._slopes[index]
+
+    def to_dict(self):
+        return {
+            'method': self.method,
+            'grid': 'uniform' if self.knots is None else 'knots',
+            'knots': None if self.knots is None else self.knots.tolist(),
+            'values': self.values.tolist(),
+            'thresholds': self.thresholds,
+            'info': self.info
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['values'], data['method'], data.get('knots'),
+                   data.get('thresholds'), data.get('info'))
+
+
+def fit_calibrator(y_true, scores, method='isotonic'):
+    """Ajusta o calibrador (isotônico ou Platt) e retorna o estimador sklearn"""
+    y_true = np.asarray(y_true).astype(int)
+    scores = np.asarray(scores, dtype=np.float64)
+
+    if method == 'isotonic':
+        from sklearn.isotonic import IsotonicRegression
+        return IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip').fit(scores, y_true)
+    if method == 'platt':
+        from sklearn.linear_model import LogisticRegression
+        return LogisticRegression(C=1e6).fit(scores.reshape(-1, 1), y_true)
+    raise ValueError(f"Método de calibração desconhecido: {method} (use {METHODS})")
+
+
+def calibrator_predict(calibrator, scores):
+    """Probabilidade calibrada usando o estimador sklearn (referência exata)"""
+    scores = np.asarray(scores, dtype=np.float64)
+    if hasattr(calibrator, 'X_thresholds_'):
+        return calibrator.predict(scores)
+    return calibrator.predict_proba(scores.reshape(-1, 1))[:, 1]
+
+
+def build_table(calibrator, method, size=TABLE_SIZE, thresholds=None, info=None):
+    """Exporta o calibrador como tabela e converte os thresholds para a escala calibrada (exibição)"""
+    if hasattr(calibrator, 'X_thresholds_'):
+        # Isotônico é linear por partes: os próprios knots tornam a tabela exata
+        knots = np.concatenate([[0.0], calibrator.X_thresholds_, [1.0]])
+        knots = np.unique(np.clip(knots, 0.0, 1.0))
+        table = CalibrationTable(calibrator.predict(knots), method, knots=knots, info=info)
+    else:
+        grid = np.linspace(0.0, 1.0, size)
+        table = CalibrationTable(calibrator_predict(calibrator, grid), method, info=info)
+    table.thresholds = {
+        scenario: float(table.apply(threshold))
+        for scenario, threshold in (thresholds or {}).items()
+    }
+    return table
+
+
+def out_of_fold_scores(bundle, X, y, n_splits=5, random_state=42):
+    """Scores do pipeline do bundle em folds held-out (clones re-treinados)"""
+    from sklearn.base import clone
+    from sklearn.model_selection import StratifiedKFold, cross_val_predict
+    from sklearn.pipeline import Pipeline
+
+    pipeline = Pipeline([
+        ('imputer', clone(bundle.imputer)),
+        ('scaler', clone(bundle.scaler)),
+        ('model', clone(bundle.model))
+    ])
+    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    return cross_val_predict(pipeline, X[bundle.features], y, cv=cv, method='predict_proba')[:, 1]
+
+
+def reliability_curve(y_true, proba, n_bins=10):
+    """Fração de positivos vs. probabilidade média por bin (diagrama de confiabilidade)"""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    proba = np.asarray(proba, dtype=np.float64)
+    bins = np.minimum((proba * n_bins).astype(int), n_bins - 1)
+    counts = np.bincount(bins, minlength=n_bins)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_predicted = np.bincount(bins, proba, n_bins) / counts
+        fraction_positive = np.bincount(bins, y_true, n_bins) / counts
+    ece = np.nansum(np.abs(mean_predicted - fraction_positive) * counts) / max(len(proba), 1)
+    return {
+        'mean_predicted': mean_predicted.tolist(),
+        'fraction_positive': fraction_positive.tolist(),
+        'counts': counts.tolist(),
+        'ece': float(ece),
+        'brier': float(np.mean((proba - y_true) ** 2))
+    }
+
+
+def plot_reliability_diagram(curves, save_path, title='Diagrama de Confiabilidade'):
+    """Salva o diagrama de confiabilidade (curvas: rótulo -> reliability_curve)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, (ax, ax_hist) = plt.subplots(2, 1, figsize=(7, 8), sharex=True,
+                                      gridspec_kw={'height_ratios': [3, 1]})
+    ax.plot([0, 1], [0, 1], 'k--', linewidth=1, label='Calibração perfeita')
+    for label, curve in curves.items():
+        ax.plot(curve['mean_predicted'], curve['fraction_positive'], 'o-',
+                label=f"{label} (ECE={curve['ece']:.3f}, Brier={curve['brier']:.3f})")
+        n_bins = len(curve['counts'])
+        ax_hist.step(np.arange(n_bins) / n_bins, curve['counts'], where='post', label=label)
+    ax.set_ylabel('Fração de positivos')
+    ax.set_title(title)
+    ax.legend(loc='upper left')
+    ax_hist.set_xlabel('Probabilidade predita')
+    ax_hist.set_ylabel('Amostras')
+
+    save_path = Path(save_path)
+    save_path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(save_path, dpi=150, bbox_inches='tight', facecolor='white')
+    plt.close(fig)
+    return save_path
+
+
+def save_calibration(table, artifact_dir, register=True):
+    """
+    Grava calibration.json em artifact_dir. Com register=True (bundle de
+    produção) exige origem 'real' em table.info e registra o arquivo em
+    metadata.json; com register=False apenas grava a tabela.
+    """
+    artifact_dir = Path(artifact_dir)
+    if register and table.info.get('data_source') != 'real':
+        raise ValueError(
+            f"Calibração ajustada com dados '{table.info.get('data_source')}' "
+            "não pode ser registrada no bundle (apenas dados reais)"
+        )
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+    with open(artifact_dir / CALIBRATION_FILE, 'w', encoding='utf-8') as f:
+        json.dump(table.to_dict(), f, indent=2, ensure_ascii=False)
+    if not register:
+        return artifact_dir / CALIBRATION_FILE
+
+    metadata_path = artifact_dir / 'metadata.json'
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    metadata.setdefault('artifacts', {})['calibration'] = CALIBRATION_FILE
+    with open(metadata_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+    _load_calibration_file.cache_clear()
+    return artifact_dir / CALIBRATION_FILE
+
+
+@lru_cache(maxsize=None)
+def _load_calibration_file(path):
+    if not Path(path).exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return CalibrationTable.from_dict(json.load(f))
+
+
+def load_calibration(artifact_dir):
+    """Tabela de calibração do bundle (cache por versão; None se ausente)"""
+    return _load_calibration_file(str(Path(artifact_dir) / CALIBRATION_FILE))
+
+
+def score_shift(oof, deployed, y, table):
+    """Diferença entre scores OOF (ajuste) e do modelo implantado (aplicação)"""
+    from scipy.stats import ks_2samp
+
+    return {
+        'score_source': 'out_of_fold_clones',
+        'deployed_vs_oof_ks': float(ks_2samp(oof, deployed).statistic),
+        'deployed_calibrated_ece': reliability_curve(y, table.apply(deployed))['ece']
+    }
+
+
+def fit_bundle_calibration(version, X, y, method='isotonic', n_splits=5, data_source='real'):
+    """Ajusta a calibração de um bundle a partir de scores out-of-fold"""
+    from inference.artifacts import load_bundle
+
+    bundle = load_bundle(version)
+    oof = out_of_fold_scores(bundle, X, y, n_splits=n_splits)
+    calibrator = fit_calibrator(y, oof, method)
+    info = {
+        'model_version': bundle.model_version,
+        'fitted_at': datetime.now().isoformat(),
+        'data_source': data_source,
+        'n_samples': int(len(y)),
+        'n_splits': n_splits
+    }
+    table = build_table(calibrator, method, thresholds=bundle.thresholds, info=info)
+    table.info['table_size'] = len(table.values)
+    # Erro da tabela em relação ao calibrador exato, medido nos próprios scores OOF
+    exact = calibrator_predict(calibrator, oof)
+    table.info['max_table_error'] = float(np.max(np.abs(table.apply(oof) - exact)))
+    table.info.update(score_shift(oof, bundle.predict_proba(X), y, table))
+    return bundle, table, oof
+
+
+def benchmark_latency(bundle, table, X, n_calls=1000):
+    """Latência por chamada (1 paciente) com calibração desligada/ligada"""
+    rows = [X.iloc[[i % len(X)]] for i in range(n_calls)]
+
+    def timed(fn):
+        times = np.empty(n_calls)
+        for i, row in enumerate(rows):
+            start = time.perf_counter_ns()
+            fn(row)
+            times[i] = time.perf_counter_ns() - start
+        return times / 1000.0
+
+    raw = timed(lambda row: bundle.predict_proba(row))
+    calibrated = timed(lambda row: table.apply(bundle.predict_proba(row)))
+
+    scores = np.random.default_rng(0).random(n_calls)
+    start = time.perf_counter_ns()
+    for s in scores:
+        table.apply(s)
+    lookup = (time.perf_counter_ns() - start) / 1000.0 / n_calls
+
+    return {
+        'raw_median_us': float(np.median(raw)),
+        'raw_p99_us': float(np.percentile(raw, 99)),
+        'calibrated_median_us': float(np.median(calibrated)),
+        'calibrated_p99_us': float(np.percentile(calibrated, 99)),
+        'lookup_mean_us': float(lookup)
+    }
+
+
+def main():
+    """Ajusta, salva e avalia a calibração de uma versão de modelo"""
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from data.datasets import PROJECT_ROOT, SIMULATED_OUTPUT_DIR, TARGET_COLUMN, load_dataset
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    allow_simulated = '--allow-simulated' in sys.argv
+    version = args[0] if len(args) > 0 else 'rf_v1'
+    method = args[1] if len(args) > 1 else 'isotonic'
+
+    print("🚀 CALIBRAÇÃO DE PROBABILIDADES")
+    print("=" * 80)
+    df, source = load_dataset()
+    if source != 'real':
+        if not allow_simulated:
+            print("❌ Dados brutos não encontrados - calibração com dados simulados não é gravada no bundle")
+            print("   Use --allow-simulated para uma demonstração em logs/simulated/calibration")
+            return 1
+        print("⚠️ Dados brutos não encontrados - usando dados simulados (apenas demonstração)")
+    X = df.drop(columns=[TARGET_COLUMN])
+    y = df[TARGET_COLUMN].to_numpy()
+
+    bundle, table, oof = fit_bundle_calibration(version, X, y, method, data_source=source)
+    print(f"✅ {bundle.model_version} ({bundle.model_name}) calibrado com {method} "
+          f"em {len(y):,} amostras out-of-fold")
+    print(f"   Tabela: {table.info['table_size']} pontos | erro máximo: {table.info['max_table_error']:.2e}")
+    print(f"   Scores OOF vs implantado: KS {table.info['deployed_vs_oof_ks']:.3f} | "
+          f"ECE implantado calibrado {table.info['deployed_calibrated_ece']:.3f}")
+
+    if source == 'real':
+        output_dir = bundle.path
+        figure_dir = PROJECT_ROOT / '04_reports' / 'calibration'
+    else:
+        output_dir = figure_dir = SIMULATED_OUTPUT_DIR / 'calibration' / bundle.model_version
+    save_path = save_calibration(table, output_dir, register=source == 'real')
+    print(f"💾 Calibração salva: {save_path}")
+
+    print("\n⚖️ THRESHOLDS (bruto -> calibrado):")
+    for scenario, threshold in bundle.thresholds.items():
+        print(f"   {scenario}: {threshold:.3f} -> {table.thresholds[scenario]:.3f}")
+
+    curves = {
+        'Bruto (OOF)': reliability_curve(y, oof),
+        f'Calibrado ({method})': reliability_curve(y, table.apply(oof))
+    }
+    figure_path = plot_reliability_diagram(
+        curves,
+        figure_dir / f'{bundle.model_version}_reliability.png',
+        title=f'Diagrama de Confiabilidade - {bundle.model_version}'
+    )
+    print(f"💾 Diagrama de confiabilidade: {figure_path}")
+
+    latency = benchmark_latency(bundle, table, X)
+    print("\n⏱️ LATÊNCIA POR PREDIÇÃO (1 paciente):")
+    print(f"   Sem calibração: mediana {latency['raw_median_us']:.1f} µs | p99 {latency['raw_p99_us']:.1f} µs")
+    print(f"   Com calibração: mediana {latency['calibrated_median_us']:.1f} µs | p99 {latency['calibrated_p99_us']:.1f} µs")
+    print(f"   Consulta na tabela: {latency['lookup_mean_us']:.2f} µs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
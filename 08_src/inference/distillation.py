@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Destilação do Modelo em Substituto de Baixa Latência
+
+Treina um modelo compacto (GBM raso ou modelo aditivo por bins) para imitar
+o predict_proba do bundle oficial (professor) em amostras sintéticas densas
+de create_simulated_data, exporta para surrogate.npz (executado apenas com
+NumPy por inference/surrogate.py) e reporta a concordância com o professor
+em cada ponto de operação de thresholds.json, além de cold start e latência.
+
+Uso:
+    python 08_src/inference/distillation.py [versao] [tree_ensemble|binned_logistic]
+"""
+
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data.datasets import create_simulated_data
+from inference.artifacts import load_bundle
+from inference.surrogate import Surrogate
+from inference.validation import RANGES
+
+SURROGATE_FILE = 'surrogate.npz'
+
+BINARY_FEATURES = ['sexo', 'fumante_atualmente', 'medicamento_pressao', 'diabetes']
+
+EPS = 1e-6
+
+
+def synthetic_samples(features, n_samples=200_000, uniform_fraction=0.3, seed=42):
+    """Amostras densas: create_simulated_data + cobertura uniforme das faixas clínicas"""
+    n_uniform = int(n_samples * uniform_fraction)
+    n_simulated = n_samples - n_uniform
+
+    # Vários blocos com seeds distintas (create_simulated_data usa seed fixa por chamada)
+    block = 50_000
+    frames = [
+        create_simulated_data(min(block, n_simulated - start), random_state=seed + i)
+        for i, start in enumerate(range(0, n_simulated, block))
+    ]
+    X = np.vstack([frame[features].to_numpy(dtype=np.float64) for frame in frames])
+
+    rng = np.random.default_rng(seed)
+    uniform = np.empty((n_uniform, len(features)))
+    for j, feature in enumerate(features):
+        if feature in BINARY_FEATURES:
+            uniform[:, j] = rng.integers(0, 2, n_uniform)
+        else:
+            low, high = RANGES.get(feature, (np.nanmin(X[:, j]), np.nanmax(X[:, j])))
+            uniform[:, j] = rng.uniform(low, high, n_uniform)
+    return np.vstack([X, uniform])
+
+
+def _logit(p):
+    p = np.clip(p, EPS, 1 - EPS)
+    return np.log(p / (1 - p))
+
+
+def fit_tree_ensemble(X, target_logit, n_estimators=150, max_depth=3, learning_rate=0.1):
+    """
+    GBM raso (regressão no logit do professor) exportado em arrays achatados;
+    retorna (arrays, logit do estudante sklearn) - o segundo é a referência do runtime
+    """
+    from sklearn.ensemble import GradientBoostingRegressor
+
+    student = GradientBoostingRegressor(
+        n_estimators=n_estimators, max_depth=max_depth,
+        learning_rate=learning_rate, random_state=42
+    ).fit(X, target_logit)
+
+    roots, feature, threshold, left, right, value = [], [], [], [], [], []
+    offset = 0
+    for estimator in student.estimators_[:, 0]:
+        tree = estimator.tree_
+        leaf = tree.children_left == -1
+        own = np.arange(tree.node_count) + offset
+        roots.append(offset)
+        # Folhas apontam para si mesmas: iterações extras não as movem
+        feature.append(np.where(leaf, 0, tree.feature))
+        threshold.append(np.where(leaf, 0.0, tree.threshold))
+        left.append(np.where(leaf, own, tree.children_left + offset))
+        right.append(np.where(leaf, own, tree.children_right + offset))
+        value.append(tree.value[:, 0, 0])
+        offset += tree.node_count
+
+    return {
+        'kind': np.array('tree_ensemble'),
+        'intercept': np.array(float(np.ravel(student.init_.constant_)[0])),
+        'learning_rate': np.array(learning_rate),
+        'depth': np.array(max_depth),
+        'roots': np.array(roots, dtype=np.int32),
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'value': np.concatenate(value).astype(np.float64)
+    }, student.predict
+
+
+def _one_hot_bins(X, edges):
+    """Matriz esparsa com um indicador de bin por feature (entrada do ridge)"""
+    from scipy import sparse
+
+    blocks = []
+    for j, feature_edges in enumerate(edges):
+        bins = np.searchsorted(feature_edges, X[:, j], side='right')
+        blocks.append(sparse.csr_matrix(
+            (np.ones(len(X)), (np.arange(len(X)), bins)), shape=(len(X), len(feature_edges) + 1)
+        ))
+    return sparse.hstack(blocks).tocsr()
+
+
+def fit_binned_logistic(X, target_logit, n_bins=32, alpha=1.0):
+    """
+    Modelo aditivo por bins: uma tabela de logit por feature (ridge no logit do
+    professor); retorna (arrays, logit do estudante sklearn)
+    """
+    from sklearn.linear_model import Ridge
+
+    arrays = {'kind': np.array('binned_logistic')}
+    quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+    edges = [np.unique(np.quantile(X[:, j], quantiles)) for j in range(X.shape[1])]
+    ridge = Ridge(alpha=alpha).fit(_one_hot_bins(X, edges), target_logit)
+    arrays['intercept'] = np.array(float(ridge.intercept_))
+    start = 0
+    for j, feature_edges in enumerate(edges):
+        size = len(feature_edges) + 1
+        arrays[f'edges_{j}'] = feature_edges
+        arrays[f'table_{j}'] = ridge.coef_[start:start + size].astype(np.float64)
+        start += size
+    return arrays, lambda X_new: ridge.predict(_one_hot_bins(np.asarray(X_new, dtype=np.float64), edges))
+
+
+STUDENTS = {
+    'tree_ensemble': fit_tree_ensemble,
+    'binned_logistic': fit_binned_logistic
+}
+
+
+def distill(version='rf_v1', kind='tree_ensemble', n_samples=200_000, seed=42):
+    """Treina o substituto e salva surrogate.npz no bundle do professor"""
+    teacher = load_bundle(version)
+    X = synthetic_samples(teacher.features, n_samples, seed=seed)
+    teacher_proba = teacher.predict_proba(X)
+
+    # O substituto recebe features brutas: imputação com as medianas do professor
+    impute_values = np.asarray(teacher.imputer.statistics_, dtype=np.float64)
+    X_imputed = np.where(np.isnan(X), impute_values, X)
+
+    arrays, _ = STUDENTS[kind](X_imputed, _logit(teacher_proba))
+    arrays['features'] = np.array(teacher.features)
+    arrays['impute_values'] = impute_values
+
+    path = teacher.path / SURROGATE_FILE
+    np.savez(path, **arrays)
+
+    metadata_path = teacher.path / 'metadata.json'
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    metadata.setdefault('artifacts', {})['surrogate'] = SURROGATE_FILE
+    with open(metadata_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    return teacher, path
+
+
+def agreement_report(teacher, surrogate, n_samples=50_000, seed=2024):
+    """Concordância professor vs substituto em amostras novas, por threshold clínico"""
+    X = synthetic_samples(teacher.features, n_samples, seed=seed)
+    p_teacher = teacher.predict_proba(X)
+    p_student = surrogate.predict_proba(X)
+
+    report = {
+        'n_samples': int(n_samples),
+        'mean_abs_error': float(np.mean(np.abs(p_teacher - p_student))),
+        'max_abs_error': float(np.max(np.abs(p_teacher - p_student))),
+        'thresholds': {}
+    }
+    for scenario, threshold in teacher.thresholds.items():
+        t_pos = p_teacher >= threshold
+        s_pos = p_student >= threshold
+        report['thresholds'][scenario] = {
+            'threshold': threshold,
+            'agreement': float(np.mean(t_pos == s_pos)),
+            'recall_vs_teacher': float(s_pos[t_pos].mean()) if t_pos.any() else None,
+            'specificity_vs_teacher': float((~s_pos)[~t_pos].mean()) if (~t_pos).any() else None
+        }
+    return report
+
+
+def format_rate(value):
+    """Percentual para o relatório; 'n/d' quando o professor não tem casos na classe"""
+    return 'n/d' if value is None else f"{value:.2%}"
+
+
+COLD_START_SNIPPETS = {
+    'teacher': (
+        "import sys; sys.path.insert(0, {src!r})\n"
+        "from inference.artifacts import ArtifactBundle\n"
+        "b = ArtifactBundle({version!r}); b.predict_proba({patient!r})\n"
+    ),
+    'surrogate': (
+        "import sys; sys.path.insert(0, {src!r})\n"
+        "from inference.surrogate import Surrogate\n"
+        "s = Surrogate.load({path!r}); s.predict_proba({patient!r})\n"
+    )
+}
+
+
+def cold_start_seconds(snippet, repeats=3):
+    """Tempo de um processo novo até a primeira predição (mediana)"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-W', 'ignore', '-c', snippet], check=True)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def per_call_microseconds(fn, patient, n_calls=1000):
+    """Latência mediana por chamada com um paciente"""
+    times = np.empty(n_calls)
+    for i in range(n_calls):
+        start = time.perf_counter_ns()
+        fn(patient)
+        times[i] = time.perf_counter_ns() - start
+    return float(np.median(times) / 1000.0)
+
+
+def main():
+    version = sys.argv[1] if len(sys.argv) > 1 else 'rf_v1'
+    kind = sys.argv[2] if len(sys.argv) > 2 else 'tree_ensemble'
+
+    print("🚀 DESTILAÇÃO DO MODELO EM SUBSTITUTO DE BAIXA LATÊNCIA")
+    print("=" * 80)
+    teacher, path = distill(version, kind)
+    surrogate = Surrogate.load(path)
+    print(f"✅ Professor: {teacher.model_version} ({teacher.model_name})")
+    print(f"✅ Substituto ({kind}) salvo: {path} ({path.stat().st_size / 1024:.1f} KB)")
+
+    report = agreement_report(teacher, surrogate)
+    print(f"\n📊 CONCORDÂNCIA COM O PROFESSOR ({report['n_samples']:,} amostras novas):")
+    print(f"   Erro absoluto médio da probabilidade: {report['mean_abs_error']:.4f}")
+    for scenario, stats in report['thresholds'].items():
+        print(f"   {scenario} (t={stats['threshold']:.3f}): concordância {stats['agreement']:.2%} | "
+              f"recall {format_rate(stats['recall_vs_teacher'])} | "
+              f"especificidade {format_rate(stats['specificity_vs_teacher'])}")
+
+    patient = {
+        'sexo': 1, 'idade': 55, 'fumante_atualmente': 0, 'cigarros_por_dia': 0,
+        'medicamento_pressao': 0, 'diabetes': 0, 'colesterol_total': 220,
+        'pressao_sistolica': 140, 'pressao_diastolica': 90, 'imc': 27.5,
+        'frequencia_cardiaca': 78, 'glicose': 90
+    }
+    src = str(Path(__file__).resolve().parents[1])
+    latency = {
+        'teacher': {
+            'cold_start_s': cold_start_seconds(COLD_START_SNIPPETS['teacher'].format(
+                src=src, version=str(teacher.path), patient=patient)),
+            'per_call_us': per_call_microseconds(teacher.predict_proba, patient)
+        },
+        'surrogate': {
+            'cold_start_s': cold_start_seconds(COLD_START_SNIPPETS['surrogate'].format(
+                src=src, path=str(path), patient=patient)),
+            'per_call_us': per_call_microseconds(surrogate.predict_proba, patient)
+        }
+    }
+    report['latency'] = latency
+    print("\n⏱️ LATÊNCIA:")
+    for name, stats in latency.items():
+        print(f"   {name}: cold start {stats['cold_start_s']:.2f}s | por chamada {stats['per_call_us']:.1f} µs")
+
+    with open(teacher.path / 'surrogate_report.json', 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
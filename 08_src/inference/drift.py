@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Monitor de Drift dos Dados em Produção
+
+Compara o tráfego de /predict com a distribuição de treino (partição de treino)
+usando memória constante: para cada feature de features.json e para a
+probabilidade de saída, um histograma com as bordas dos percentis 1..99 do
+treino (mais um bin de ausentes). A partir dos histogramas:
+
+- PSI em grupos de decis do baseline (< 0.1 estável, < 0.25 moderado);
+- KS entre as CDFs em resolução de percentil, com valor crítico a 5%;
+- taxa de ausentes e quantis aproximados do tráfego.
+
+O baseline é criado num passo explícito (build), somente com a partição de
+treino dos dados reais (mesmo train_test_split estratificado do treino, com
+o test_size de metadata.json), e salvo com o artefato (drift_baseline.json).
+A atualização por requisição usa apenas bisect em listas Python (poucos µs);
+valores não numéricos são ignorados e contados em n_invalid.
+
+Uso:
+    python 08_src/inference/drift.py build [versao] [test_size]
+    python 08_src/inference/drift.py [versao] [n_requisicoes]
+"""
+
+import json
+import sys
+import threading
+import time
+from bisect import bisect_right
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from inference.artifacts import DEFAULT_VERSION, get_artifact_dir, load_bundle
+from inference.metrics_endpoint import format_metric
+
+BASELINE_FILE = 'drift_baseline.json'
+PROBABILITY = 'probability'
+PERCENTILES = np.arange(1, 100) / 100
+N_PSI_GROUPS = 10
+PSI_STABLE = 0.1
+PSI_MODERATE = 0.25
+EPS = 1e-4
+RANDOM_STATE = 42
+
+
+def _histogram(values, edges):
+    """Contagens [ausentes, bin_0, ..., bin_k] com bin = bisect_right(edges, v)"""
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    bins = np.searchsorted(edges, values[~missing], side='right') + 1
+    counts = np.bincount(bins, minlength=len(edges) + 2)
+    counts[0] = missing.sum()
+    return counts
+
+
+def training_partition(df, test_size, random_state=RANDOM_STATE):
+    """Linhas de treino do split estratificado usado no treinamento do bundle"""
+    from data.datasets import TARGET_COLUMN
+    from sklearn.model_selection import train_test_split
+
+    train, _ = train_test_split(df, test_size=test_size, stratify=df[TARGET_COLUMN],
+                                random_state=random_state)
+    return train
+
+
+def build_baseline(train_df, version=DEFAULT_VERSION, source='real'):
+    """Histogramas de referência a partir dos dados de treino e das predições do bundle"""
+    bundle = load_bundle(version)
+    columns = {feature: train_df[feature].to_numpy(dtype=np.float64) for feature in bundle.features}
+    columns[PROBABILITY] = bundle.predict_proba(train_df)
+
+    baseline = {'model_version': bundle.model_version, 'source': source, 'n_rows': int(len(train_df)),
+                'columns': {}}
+    for name, values in columns.items():
+        observed = values[~np.isnan(values)]
+        if name == PROBABILITY:
+            edges = np.linspace(0.0, 1.0, 101)[1:-1]
+        else:
+            edges = np.unique(np.quantile(observed, PERCENTILES))
+        baseline['columns'][name] = {
+            'edges': edges.tolist(),
+            'counts': _histogram(values, edges).tolist(),
+            'low': float(observed.min()),
+            'high': float(observed.max())
+        }
+    return baseline
+
+
+def save_baseline(baseline, artifact_dir):
+    """Grava drift_baseline.json no bundle e registra o arquivo em metadata.json"""
+    if baseline.get('source') != 'real':
+        raise ValueError(f"Baseline com dados '{baseline.get('source')}' não pode ser salvo no bundle")
+    artifact_dir = Path(artifact_dir)
+    with open(artifact_dir / BASELINE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False)
+
+    metadata_path = artifact_dir / 'metadata.json'
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    metadata.setdefault('artifacts', {})['drift_baseline'] = BASELINE_FILE
+    with open(metadata_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    return artifact_dir / BASELINE_FILE
+
+
+def load_baseline(version=DEFAULT_VERSION):
+    """Baseline salvo com o artefato (criado antes com o passo build)"""
+    path = get_artifact_dir(version) / BASELINE_FILE
+    if not path.exists():
+        raise FileNotFoundError(
+            f"{path} não existe - crie o baseline com: python 08_src/inference/drift.py build {version}"
+        )
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def psi(expected, actual, groups):
+    """Population Stability Index entre proporções agrupadas (sem ausentes)"""
+    n_groups = groups.max() + 1
+    e = np.bincount(groups, weights=expected, minlength=n_groups)
+    a = np.bincount(groups, weights=actual, minlength=n_groups)
+    e = e / max(e.sum(), 1)
+    a = a / max(a.sum(), 1)
+    keep = (e > 0) | (a > 0)
+    e, a = np.maximum(e[keep], EPS), np.maximum(a[keep], EPS)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def psi_status(value):
+    if value < PSI_STABLE:
+        return 'stable'
+    if value < PSI_MODERATE:
+        return 'moderate'
+    return 'significant'
+
+
+class DriftMonitor:
+    """Histogramas de tráfego (memória constante) comparados com o baseline"""
+
+    def __init__(self, baseline):
+        self.baseline = baseline
+        self.columns = list(baseline['columns'])
+        self.features = [c for c in self.columns if c != PROBABILITY]
+        self.edges = [baseline['columns'][c]['edges'] for c in self.columns]
+        self.baseline_counts = [np.asarray(baseline['columns'][c]['counts'], dtype=np.float64)
+                                for c in self.columns]
+        # Grupos de decis do baseline para o PSI (bins finos -> ~10 grupos)
+        self.groups = []
+        for counts in self.baseline_counts:
+            observed = counts[1:]
+            before = (np.cumsum(observed) - observed) / max(observed.sum(), 1)
+            self.groups.append(np.minimum((before * N_PSI_GROUPS).astype(np.int64), N_PSI_GROUPS - 1))
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def for_version(cls, version=DEFAULT_VERSION):
+        return cls(load_baseline(version))
+
+    def reset(self):
+        with self._lock:
+            self.counts = [[0] * (len(edges) + 2) for edges in self.edges]
+            self.n_requests = 0
+            self.n_invalid = 0
+
+    def update(self, record, probability):
+        """Registra uma requisição (dict feature -> valor) e sua probabilidade"""
+        with self._lock:
+            self.n_requests += 1
+            for counts, edges, feature in zip(self.counts, self.edges, self.features):
+                value = record.get(feature)
+                if value is None:
+                    counts[0] += 1
+                    continue
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    # Valor não numérico: fora do histograma, só contado
+                    self.n_invalid += 1
+                    continue
+                if value != value:
+                    counts[0] += 1
+                else:
+                    counts[bisect_right(edges, value) + 1] += 1
+            self.counts[-1][bisect_right(self.edges[-1], probability) + 1] += 1
+
+    def update_batch(self, X, probabilities):
+        """Registra um lote (matriz n x p na ordem das features) de uma vez"""
+        X = np.asarray(X, dtype=np.float64)
+        histograms = [_histogram(X[:, j], np.asarray(edges)) for j, edges in enumerate(self.edges[:-1])]
+        histograms.append(_histogram(probabilities, np.asarray(self.edges[-1])))
+        with self._lock:
+            self.n_requests += len(X)
+            for counts, histogram in zip(self.counts, histograms):
+                for i, value in enumerate(histogram.tolist()):
+                    counts[i] += value
+
+    def merge(self, other):
+        """Soma o estado de outro monitor com o mesmo baseline"""
+        with self._lock:
+            self.n_requests += other.n_requests
+            self.n_invalid += other.n_invalid
+            for counts, other_counts in zip(self.counts, other.counts):
+                for i, value in enumerate(other_counts):
+                    counts[i] += value
+        return self
+
+    def _quantiles(self, name, counts, probs=(0.05, 0.5, 0.95)):
+        """Quantis aproximados por interpolação linear dentro do bin"""
+        column = self.baseline['columns'][name]
+        bounds = np.concatenate([[column['low']], column['edges'], [column['high']]])
+        observed = counts[1:]
+        if observed.sum() == 0:
+            return {f'p{int(p * 100):02d}': None for p in probs}
+        cdf = np.cumsum(observed) / observed.sum()
+        result = {}
+        for p in probs:
+            i = int(np.searchsorted(cdf, p))
+            before = cdf[i - 1] if i > 0 else 0.0
+            fraction = (p - before) / (cdf[i] - before) if cdf[i] > before else 0.0
+            result[f'p{int(p * 100):02d}'] = float(bounds[i] + fraction * (bounds[i + 1] - bounds[i]))
+        return result
+
+    def report(self):
+        """PSI, KS, ausentes e quantis por coluna (serializável em JSON)"""
+        with self._lock:
+            snapshot = [np.asarray(counts, dtype=np.float64) for counts in self.counts]
+            n_requests, n_invalid = self.n_requests, self.n_invalid
+
+        columns = {}
+        for name, current, expected, groups in zip(self.columns, snapshot, self.baseline_counts, self.groups):
+            n_current, n_expected = current[1:].sum(), expected[1:].sum()
+            if n_current > 0:
+                ks = float(np.max(np.abs(np.cumsum(current[1:]) / n_current
+                                         - np.cumsum(expected[1:]) / n_expected)))
+                ks_critical = float(1.36 * np.sqrt((n_current + n_expected) / (n_current * n_expected)))
+                psi_value = psi(expected[1:], current[1:], groups)
+            else:
+                ks = ks_critical = psi_value = float('nan')
+            columns[name] = {
+                'n': int(current.sum()),
+                'psi': psi_value,
+                'status': psi_status(psi_value) if n_current > 0 else 'no_data',
+                'ks': ks,
+                'ks_critical_05': ks_critical,
+                'missing_rate': float(current[0] / current.sum()) if current.sum() else float('nan'),
+                'baseline_missing_rate': float(expected[0] / expected.sum()),
+                'quantiles': self._quantiles(name, current)
+            }
+        return {'n_requests': n_requests, 'n_invalid': n_invalid, 'baseline_rows': self.baseline['n_rows'],
+                'baseline_source': self.baseline.get('source'), 'columns': columns}
+
+    def prometheus(self):
+        """Gauges de drift no formato de exposição do Prometheus"""
+        report = self.report()
+        lines = [
+            '# HELP hypertension_drift_requests_total Requisicoes observadas pelo monitor de drift\n',
+            '# TYPE hypertension_drift_requests_total counter\n',
+            format_metric('hypertension_drift_requests_total', report['n_requests'])
+        ]
+        for metric, key in (('psi', 'psi'), ('ks', 'ks'), ('missing_rate', 'missing_rate')):
+            name = f'hypertension_drift_{metric}'
+            lines.append(f'# TYPE {name} gauge\n')
+            for column, stats in report['columns'].items():
+                lines.append(format_metric(name, stats[key], {'feature': column}))
+        return ''.join(lines)
+
+
+def run_benchmark(version=DEFAULT_VERSION, n_requests=10_000_000, chunk_size=200_000, n_single=100_000):
+    """Replay de tráfego sintético: custo por requisição e detecção de drift"""
+    from data.datasets import create_simulated_data
+
+    bundle = load_bundle(version)
+    try:
+        monitor = DriftMonitor.for_version(version)
+    except FileNotFoundError:
+        # Sem baseline salvo: baseline simulado só em memória (o bundle não é alterado)
+        monitor = DriftMonitor(build_baseline(create_simulated_data(4240), version, source='simulated'))
+
+    # Custo por requisição no caminho síncrono de /predict
+    sample = create_simulated_data(n_single, random_state=11)
+    records = sample[bundle.features].to_dict('records')
+    probabilities = bundle.predict_proba(sample).tolist()
+    start = time.perf_counter()
+    for record, probability in zip(records, probabilities):
+        monitor.update(record, probability)
+    per_request_us = (time.perf_counter() - start) / n_single * 1e6
+
+    # Replay em lotes; a segunda metade tem pressão sistólica deslocada (+12 mmHg)
+    monitor.reset()
+    start = time.perf_counter()
+    halves = {}
+    j_sys = bundle.features.index('pressao_sistolica')
+    for i, offset in enumerate(range(0, n_requests, chunk_size)):
+        chunk = create_simulated_data(min(chunk_size, n_requests - offset), random_state=100 + i)
+        X = chunk[bundle.features].to_numpy(dtype=np.float64)
+        if offset >= n_requests // 2:
+            X[:, j_sys] += 12
+        monitor.update_batch(X, bundle.predict_proba(X))
+        if offset + chunk_size >= n_requests // 2 and 'first_half' not in halves:
+            halves['first_half'] = monitor.report()
+    replay_seconds = time.perf_counter() - start
+    halves['full'] = monitor.report()
+
+    return {
+        'n_requests': int(n_requests),
+        'per_request_us': per_request_us,
+        'replay_seconds': replay_seconds,
+        'first_half': halves['first_half'],
+        'full': halves['full']
+    }
+
+
+def build_main(args):
+    """Passo explícito: baseline da partição de treino dos dados reais"""
+    from data.datasets import load_raw_dataset
+
+    version = args[0] if len(args) > 0 else DEFAULT_VERSION
+    print("🚀 MONITOR DE DRIFT - CRIAÇÃO DO BASELINE")
+    print("=" * 80)
+    df = load_raw_dataset()
+    if df is None:
+        print("❌ Dados brutos não encontrados - o baseline exige os dados reais de treino")
+        return 1
+    bundle = load_bundle(version)
+    test_size = float(args[1]) if len(args) > 1 else bundle.metadata.get('data', {}).get('test_size')
+    if test_size is None:
+        print(f"❌ metadata.json de {bundle.model_version} não registra test_size - informe-o: "
+              f"build {version} <test_size>")
+        return 1
+    train = training_partition(df, test_size)
+    path = save_baseline(build_baseline(train, version), bundle.path)
+    print(f"✅ Baseline de {len(train):,} linhas de treino (test_size={test_size}) salvo: {path}")
+    return 0
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'build':
+        return build_main(sys.argv[2:])
+    version = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VERSION
+    n_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000_000
+
+    print("🚀 MONITOR DE DRIFT - REPLAY DE TRÁFEGO SINTÉTICO")
+    print("=" * 80)
+    result = run_benchmark(version, n_requests)
+    if result['full'].get('baseline_source', 'real') != 'real':
+        print("⚠️ Sem drift_baseline.json - baseline simulado em memória (apenas demonstração)")
+    print(f"✅ Custo por requisição (update síncrono): {result['per_request_us']:.1f} µs")
+    print(f"✅ Replay de {result['n_requests']:,} requisições em {result['replay_seconds']:.1f}s")
+    for label in ('first_half', 'full'):
+        print(f"\n📊 DRIFT ({label}):")
+        for column, stats in result[label]['columns'].items():
+            print(f"   {column:<22} PSI {stats['psi']:.4f} ({stats['status']}) | KS {stats['ks']:.4f} "
+                  f"(crítico {stats['ks_critical_05']:.4f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
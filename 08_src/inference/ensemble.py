@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Serving de Ensembles com Modelos Base Compartilhados
+
+A comparação de data/metrics.json serve Gradient Boosting, Random Forest e
+Regressão Logística isolados e também dentro do Voting e do Stacking.
+Pontuar cada modelo de forma independente repete os mesmos modelos base:
+GB, RF e LR rodam uma vez sozinhos, outra no Voting e outra no Stacking.
+
+SharedBaseScorer decompõe cada VotingClassifier (soft) e StackingClassifier
+ajustado em seus estimators_ e deduplica os modelos base por conteúdo
+(hash do pickle): clones ajustados com os mesmos dados e random_state são
+o mesmo modelo. Em cada lote, cada (modelo base, método) distinto é
+avaliado uma única vez e suas saídas alimentam a resposta isolada, a média
+do Voting e as meta-features do Stacking, reproduzindo exatamente o
+predict_proba do sklearn.
+
+Uso:
+    python 08_src/inference/ensemble.py [versao] [n_amostras] [n_treino]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from clinical_fast.prediction_cache import object_hash
+from inference.artifacts import DEFAULT_VERSION, load_bundle
+from inference.inference import risk_category
+from training.oof_store import comparison_models, stacking_features
+
+DEFAULT_THRESHOLD = 0.5
+
+
+def _is_drop(estimator):
+    return isinstance(estimator, str) and estimator == 'drop'
+
+
+class SharedBaseScorer:
+    """Pontua vários modelos (isolados e ensembles) avaliando cada base uma vez por lote"""
+
+    def __init__(self, models):
+        self.models = dict(models)
+        self.bases = []          # [(estimador, método)] distintos
+        self._index = {}         # (hash, método) -> índice em self.bases
+        self._hashes = {}        # id(estimador) -> hash do pickle
+        self.plans = {name: self._plan(model) for name, model in self.models.items()}
+
+    @property
+    def n_bases(self):
+        return len(self.bases)
+
+    def _register(self, estimator, method):
+        key = id(estimator)
+        if key not in self._hashes:
+            self._hashes[key] = object_hash(estimator)
+        key = (self._hashes[key], method)
+        if key not in self._index:
+            self._index[key] = len(self.bases)
+            self.bases.append((estimator, method))
+        return ('base', self._index[key])
+
+    def _plan(self, estimator, method='predict_proba'):
+        """Árvore de avaliação: ('base', i) | ('voting', est, filhos) | ('stacking', est, filhos)"""
+        from sklearn.ensemble import StackingClassifier, VotingClassifier
+
+        if method == 'predict_proba' and isinstance(estimator, VotingClassifier):
+            if estimator.voting != 'soft':
+                raise ValueError("VotingClassifier com voting='hard' não tem predict_proba")
+            return ('voting', estimator, [self._plan(child) for child in estimator.estimators_])
+        if method == 'predict_proba' and isinstance(estimator, StackingClassifier):
+            children = [
+                self._plan(child, child_method)
+                for child, child_method in zip(estimator.estimators_, estimator.stack_method_)
+                if not _is_drop(child)
+            ]
+            return ('stacking', estimator, children)
+        return self._register(estimator, method)
+
+    def base_outputs(self, X):
+        """Uma passada por (modelo base, método) distinto"""
+        return [getattr(estimator, method)(X) for estimator, method in self.bases]
+
+    def _evaluate(self, plan, X, outputs):
+        if plan[0] == 'base':
+            return outputs[plan[1]]
+        _, estimator, children = plan
+        predictions = [self._evaluate(child, X, outputs) for child in children]
+
+        if plan[0] == 'voting':
+            # Mesmos pesos de VotingClassifier._weights_not_none
+            weights = estimator.weights
+            if weights is not None:
+                weights = [w for (_, est), w in zip(estimator.estimators, weights) if not _is_drop(est)]
+            return np.average(np.asarray(predictions), axis=0, weights=weights)
+
+        # Stacking: mesmas meta-features de _BaseStacking._concatenate_predictions
+        methods = [m for est, m in zip(estimator.estimators_, estimator.stack_method_) if not _is_drop(est)]
+        meta = stacking_features(
+            predictions, methods, len(estimator.classes_), X if estimator.passthrough else None
+        )
+        return estimator.final_estimator_.predict_proba(meta)
+
+    def predict_proba_all(self, X):
+        """Probabilidades (n, n_classes) de todos os modelos, com bases compartilhadas"""
+        outputs = self.base_outputs(X)
+        return {name: self._evaluate(plan, X, outputs) for name, plan in self.plans.items()}
+
+    def predict_proba(self, X):
+        """Probabilidade da classe positiva por modelo"""
+        return {name: proba[:, 1] for name, proba in self.predict_proba_all(X).items()}
+
+
+def independent_predict_proba(models, X):
+    """Referência: cada modelo pontuado isoladamente (bases repetidas nos ensembles)"""
+    return {name: model.predict_proba(X)[:, 1] for name, model in models.items()}
+
+
+class EnsembleService:
+    """Resposta de comparação multi-modelo sobre as features do bundle oficial"""
+
+    def __init__(self, models, version=DEFAULT_VERSION, thresholds=None):
+        self.bundle = load_bundle(version)
+        self.scorer = SharedBaseScorer(models)
+        self.thresholds = dict(thresholds or {})
+
+    def compare_batch(self, X):
+        """Probabilidades por modelo para um lote (dict, DataFrame ou matriz crua)"""
+        return self.scorer.predict_proba(self.bundle.transform(X))
+
+    def compare(self, record):
+        """Predição de um paciente por todos os modelos (formato de /predict por modelo)"""
+        models = {}
+        for name, probabilities in self.compare_batch(record).items():
+            probability = float(probabilities[0])
+            threshold = self.thresholds.get(name, DEFAULT_THRESHOLD)
+            models[name] = {
+                'probability': probability,
+                'threshold': threshold,
+                'prediction': int(probability >= threshold),
+                'risk_category': risk_category(probability)
+            }
+        return {
+            'models': models,
+            'model_version': self.bundle.model_version,
+            'n_base_models': self.scorer.n_bases
+        }
+
+
+def train_reference_models(X, y, random_state=42):
+    """Os cinco modelos de data/metrics.json ajustados em (X, y)"""
+    return {name: model.fit(X, y) for name, model in comparison_models(random_state).items()}
+
+
+def _best_time(fn, repeats=3):
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(version=DEFAULT_VERSION, n_samples=100_000, n_train=20_000):
+    """Pontuação independente vs bases compartilhadas (mesmo lote, mesmos modelos)"""
+    from data.datasets import TARGET_COLUMN, create_simulated_data
+
+    bundle = load_bundle(version)
+    train = create_simulated_data(n_train, random_state=11)
+    models = train_reference_models(bundle.transform(train), train[TARGET_COLUMN].to_numpy())
+    scorer = SharedBaseScorer(models)
+    X = bundle.transform(create_simulated_data(n_samples, random_state=7))
+
+    independent = independent_predict_proba(models, X)
+    shared = scorer.predict_proba(X)
+    # Passadas de base na pontuação independente: uma por modelo isolado + uma por membro de ensemble
+    independent_passes = sum(
+        1 if plan[0] == 'base' else len(plan[2]) for plan in scorer.plans.values()
+    )
+
+    independent_time = _best_time(lambda: independent_predict_proba(models, X))
+    shared_time = _best_time(lambda: scorer.predict_proba(X))
+    return {
+        'n_samples': int(n_samples),
+        'models': list(models),
+        'base_passes': {'independent': int(independent_passes), 'shared': scorer.n_bases},
+        'max_abs_diff': {
+            name: float(np.max(np.abs(independent[name] - shared[name]))) for name in models
+        },
+        'seconds': {'independent': independent_time, 'shared': shared_time},
+        'speedup': independent_time / shared_time
+    }
+
+
+def main():
+    version = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VERSION
+    n_samples = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    n_train = int(sys.argv[3]) if len(sys.argv) > 3 else 20_000
+
+    print("🚀 ENSEMBLES COM BASES COMPARTILHADAS - BENCHMARK")
+    print("=" * 80)
+    result = run_benchmark(version, n_samples, n_train)
+    print(f"✅ Modelos: {', '.join(result['models'])}")
+    print(f"✅ Passadas de modelos base por lote: {result['base_passes']['independent']} "
+          f"(independente) -> {result['base_passes']['shared']} (compartilhado)")
+    print(f"✅ Diferença máxima vs sklearn: {max(result['max_abs_diff'].values()):.2e}")
+    print(f"\n⏱️ TEMPO ({result['n_samples']:,} linhas):")
+    print(f"   independente: {result['seconds']['independent']:.2f}s")
+    print(f"   compartilhado: {result['seconds']['shared']:.2f}s ({result['speedup']:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Imputer + Scaler Fundidos numa Transformação Afim Pré-calculada
+
+O bundle de 05_artifacts guarda SimpleImputer (imputer.pkl) e StandardScaler
+(scaler.pkl) separados; cada chamada passa pela validação do sklearn dos dois
+passos (com DataFrame para os nomes de features do imputer) e aloca um array
+novo por passo. FusedPreprocessor extrai de uma vez os valores de
+preenchimento (statistics_), a média e a escala e aplica
+
+    x = preenchimento onde x é NaN;  x -= média;  x /= escala
+
+in-place numa única cópia float64 da entrada. São as mesmas operações, na
+mesma ordem, de SimpleImputer.transform e StandardScaler.transform, portanto
+a saída é idêntica bit a bit.
+
+Dobrar o escalonamento nos thresholds das árvores não é feito: as árvores do
+sklearn convertem a entrada já escalonada para float32 antes de comparar, e
+desfazer essa conversão nos thresholds não garante a mesma decisão em todos
+os nós.
+
+Uso:
+    python 08_src/inference/fused.py [versao] [n_repeticoes]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+BATCH_SIZES = (1, 10_000)
+
+
+class FusedPreprocessor:
+    """Imputação + padronização como vetores (preenchimento, média, escala) aplicados in-place"""
+
+    def __init__(self, fill, mean=None, scale=None):
+        self.fill = np.asarray(fill, dtype=np.float64)
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+        self.n_features = len(self.fill)
+
+    @classmethod
+    def from_steps(cls, imputer, scaler):
+        """Funde os passos ajustados; None se a combinação não for suportada"""
+        from sklearn.impute import SimpleImputer
+        from sklearn.preprocessing import StandardScaler
+
+        if type(imputer) is not SimpleImputer or type(scaler) is not StandardScaler:
+            return None
+        missing_values = imputer.missing_values
+        if not (isinstance(missing_values, float) and np.isnan(missing_values)):
+            return None
+        # Indicadores de ausência ou colunas descartadas mudam o formato da saída
+        if imputer.add_indicator or np.isnan(imputer.statistics_).any():
+            return None
+        # Com with_mean=False o mean_ continua ajustado mas não é subtraído no transform
+        if not (scaler.with_mean and scaler.with_std):
+            return None
+        return cls(imputer.statistics_, scaler.mean_, scaler.scale_)
+
+    def impute(self, X, copy=True):
+        """Cópia float64 (n, n_features) com os NaN preenchidos"""
+        X = np.array(X, dtype=np.float64) if copy else np.asarray(X, dtype=np.float64)
+        X = X.reshape(-1, self.n_features)
+        missing = np.isnan(X)
+        if missing.any():
+            np.copyto(X, self.fill, where=missing)
+        return X
+
+    def standardize(self, X):
+        """Padronização in-place (X já imputado, float64)"""
+        if self.mean is not None:
+            X -= self.mean
+        if self.scale is not None:
+            X /= self.scale
+        return X
+
+    def transform(self, X, copy=True):
+        return self.standardize(self.impute(X, copy))
+
+
+def fuse_preprocessing(imputer, scaler):
+    """FusedPreprocessor para o par imputer/scaler do bundle (ou None)"""
+    return FusedPreprocessor.from_steps(imputer, scaler)
+
+
+def _sklearn_transform(bundle, X):
+    """Caminho original: passos do sklearn, com DataFrame quando o imputer tem nomes"""
+    import pandas as pd
+
+    if hasattr(bundle.imputer, 'feature_names_in_'):
+        X = pd.DataFrame(X, columns=bundle.features)
+    return bundle.scaler.transform(bundle.imputer.transform(X))
+
+
+def _mean_time(fn, repeats):
+    best = np.inf
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeats)
+    return best
+
+
+def run_benchmark(version=None, repeats=2000):
+    """Passos do sklearn vs transformação fundida (lotes de 1 e 10k linhas)"""
+    from data.datasets import create_simulated_data
+    from inference.artifacts import DEFAULT_VERSION, load_bundle
+
+    bundle = load_bundle(version or DEFAULT_VERSION)
+    fused = fuse_preprocessing(bundle.imputer, bundle.scaler)
+    if fused is None:
+        raise ValueError(f"Imputer/scaler de {bundle.model_version} não suportados pela fusão")
+
+    results = {}
+    for batch_size in BATCH_SIZES:
+        # Com NaN (create_simulated_data gera valores ausentes) para exercitar a imputação
+        X = bundle.as_array(create_simulated_data(max(batch_size, 100), random_state=5)[bundle.features])
+        X = X[:batch_size]
+        reference = _sklearn_transform(bundle, X)
+        output = fused.transform(X)
+        n_calls = max(repeats // batch_size, 20)
+        sklearn_time = _mean_time(lambda: _sklearn_transform(bundle, X), n_calls)
+        fused_time = _mean_time(lambda: fused.transform(X), n_calls)
+        results[batch_size] = {
+            'missing_values': int(np.isnan(X).sum()),
+            'identical': bool(np.array_equal(reference, output)),
+            'identical_proba': bool(np.array_equal(
+                bundle.model.predict_proba(reference), bundle.model.predict_proba(output)
+            )),
+            'sklearn_us': sklearn_time * 1e6,
+            'fused_us': fused_time * 1e6,
+            'saved_us': (sklearn_time - fused_time) * 1e6,
+            'speedup': sklearn_time / fused_time
+        }
+    return {'version': bundle.model_version, 'batches': results}
+
+
+def main():
+    version = sys.argv[1] if len(sys.argv) > 1 else None
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    print("🚀 IMPUTER + SCALER FUNDIDOS - BENCHMARK")
+    print("=" * 80)
+    result = run_benchmark(version, repeats)
+    print(f"✅ Bundle: {result['version']}")
+    for batch_size, stats in result['batches'].items():
+        print(f"\n⏱️ LOTE DE {batch_size:,} ({stats['missing_values']} valores ausentes):")
+        print(f"   saída idêntica: {stats['identical']} | predições idênticas: {stats['identical_proba']}")
+        print(f"   sklearn: {stats['sklearn_us']:10.1f} µs | fundido: {stats['fused_us']:8.1f} µs | "
+              f"economia: {stats['saved_us']:.1f} µs por chamada ({stats['speedup']:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Inferência local com os artefatos oficiais (05_artifacts)
+
+Uso:
+    python 08_src/inference/inference.py [versao] [threshold_key]
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from inference.artifacts import DEFAULT_VERSION, load_bundle
+from inference.calibration import load_calibration
+
+# Mesmas faixas de getRiskCategory (js/api-integration.js)
+RISK_CATEGORIES = ((0.3, 'low'), (0.7, 'medium'))
+
+
+def risk_category(probability):
+    """Categoria de risco a partir da probabilidade"""
+    for upper, category in RISK_CATEGORIES:
+        if probability < upper:
+            return category
+    return 'high'
+
+
+def prediction_result(score, threshold_key, bundle, table=None, probability=None):
+    """
+    Resposta de /predict a partir do score bruto do modelo. A decisão é
+    sempre score bruto >= threshold bruto (platôs do isotônico não movem o
+    ponto de operação); com calibração, probability e threshold são
+    reportados na escala calibrada (probability já calibrada pode ser passada).
+    """
+    threshold = bundle.thresholds[threshold_key]
+    if table is None:
+        probability = score
+    else:
+        if probability is None:
+            probability = float(table.apply(score))
+        threshold = table.thresholds.get(threshold_key, float(table.apply(threshold)))
+    return {
+        'probability': probability,
+        'threshold': threshold,
+        'prediction': int(score >= bundle.thresholds[threshold_key]),
+        'threshold_profile': threshold_key,
+        'risk_category': risk_category(probability),
+        'model': bundle.model_name,
+        'model_version': bundle.model_version,
+        'calibrated': table is not None
+    }
+
+
+def predict(record, version=DEFAULT_VERSION, threshold_key='balanced', calibrated=True):
+    """Predição de um paciente (dict feature -> valor) no formato da resposta de /predict"""
+    bundle = load_bundle(version)
+    table = load_calibration(bundle.path) if calibrated else None
+    return prediction_result(float(bundle.predict_proba(record)[0]), threshold_key, bundle, table)
+
+
+if __name__ == "__main__":
+    patient = {
+        'sexo': 1, 'idade': 55, 'fumante_atualmente': 0, 'cigarros_por_dia': 0,
+        'medicamento_pressao': 0, 'diabetes': 0, 'colesterol_total': 220,
+        'pressao_sistolica': 140, 'pressao_diastolica': 90, 'imc': 27.5,
+        'frequencia_cardiaca': 78, 'glicose': 90
+    }
+    version = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VERSION
+    threshold_key = sys.argv[2] if len(sys.argv) > 2 else 'balanced'
+    print("Result:", predict(patient, version, threshold_key))
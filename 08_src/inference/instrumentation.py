@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Instrumentação do Caminho de Inferência e Profiler sob Demanda
+
+- Timers por etapa (perf_counter_ns) em torno do scoring sobre o bundle de
+  05_artifacts: parse do JSON, validação, imputação, escalonamento, modelo
+  e serialização, além do total.
+- Histogramas de latência estilo HDR (log-linear: 16 sub-buckets por
+  potência de 2, erro relativo <= 6.25%) com memória fixa, exportados em
+  formato Prometheus (histogram + quantis).
+- Profiler por amostragem (sys._current_frames) disparado sob demanda por N
+  segundos, gerando pilhas no formato "folded" e um flamegraph SVG.
+
+Uso:
+    python 08_src/inference/instrumentation.py [versao] [n_requisicoes]
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from html import escape
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from inference.artifacts import DEFAULT_VERSION, load_bundle
+from inference.audit import AuditBackpressureError, prediction_entry
+from inference.calibration import load_calibration
+from inference.inference import prediction_result
+from inference.metrics_endpoint import format_metric
+from inference.validation import load_schema
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+PROFILES_DIR = PROJECT_ROOT / 'logs' / 'profiles'
+
+STAGES = ('parse', 'validation', 'imputation', 'scaling', 'model', 'serialization', 'total')
+
+SUB_BITS = 4
+SUB_BUCKETS = 1 << SUB_BITS
+MAX_EXPONENT = 40  # ~18 minutos em ns
+BAD_REQUEST = json.dumps({'error': 'bad_request'}).encode('utf-8')
+AUDIT_UNAVAILABLE = json.dumps({'error': 'audit_unavailable'}).encode('utf-8')
+# Bordas do histograma Prometheus: potências de 2 de ~1 µs a ~17 s (coincidem com buckets HDR)
+PROMETHEUS_EXPONENTS = range(10, 35)
+
+
+class LatencyHistogram:
+    """Histograma log-linear de latências em nanossegundos (memória fixa)"""
+
+    def __init__(self):
+        self.counts = [0] * (SUB_BUCKETS * (MAX_EXPONENT + 1))
+        self.count = 0
+        self.total_ns = 0
+
+    def record(self, value_ns):
+        # Incrementos sem lock: com GIL, perdas só em corridas raras entre threads
+        if value_ns < SUB_BUCKETS:
+            index = max(value_ns, 0)
+        else:
+            shift = value_ns.bit_length() - SUB_BITS - 1
+            index = min((shift + 1) * SUB_BUCKETS + (value_ns >> shift) - SUB_BUCKETS, len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ns += value_ns
+
+    @staticmethod
+    def bucket_bounds(index):
+        """Intervalo [low, high) em ns coberto por um bucket"""
+        if index < SUB_BUCKETS:
+            return index, index + 1
+        shift = index // SUB_BUCKETS - 1
+        mantissa = index % SUB_BUCKETS + SUB_BUCKETS
+        return mantissa << shift, (mantissa + 1) << shift
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total_ns += other.total_ns
+        return self
+
+    def percentile(self, q):
+        """Quantil aproximado (ponto médio do bucket) em ns"""
+        if self.count == 0:
+            return float('nan')
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                low, high = self.bucket_bounds(index)
+                return (low + high) / 2
+        return float('nan')
+
+    def cumulative_at(self, limit_ns):
+        """Número de amostras com valor < limit_ns (limite deve ser borda de bucket)"""
+        total = 0
+        for index, count in enumerate(self.counts):
+            if count and self.bucket_bounds(index)[1] <= limit_ns:
+                total += count
+        return total
+
+    def summary(self):
+        """Contagem, média e quantis em µs"""
+        return {
+            'count': self.count,
+            'mean_us': self.total_ns / self.count / 1000 if self.count else float('nan'),
+            **{f'p{label}_us': self.percentile(q) / 1000
+               for label, q in (('50', 0.5), ('90', 0.9), ('99', 0.99), ('999', 0.999))}
+        }
+
+
+class Instrumentation:
+    """Histogramas por etapa; lap(etapa, início) registra e retorna o novo início"""
+
+    def __init__(self, stages=STAGES, enabled=True):
+        self.enabled = enabled
+        self.histograms = {stage: LatencyHistogram() for stage in stages}
+
+    def lap(self, stage, start_ns):
+        now = time.perf_counter_ns()
+        if self.enabled:
+            self.histograms[stage].record(now - start_ns)
+        return now
+
+    def summary(self):
+        return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+
+    def prometheus(self):
+        """Histograma + quantis por etapa no formato de exposição do Prometheus"""
+        name = 'hypertension_inference_stage_seconds'
+        lines = [
+            f'# HELP {name} Latencia por etapa do caminho de inferencia\n',
+            f'# TYPE {name} histogram\n'
+        ]
+        for stage, histogram in self.histograms.items():
+            for exponent in PROMETHEUS_EXPONENTS:
+                limit = 1 << exponent
+                lines.append(format_metric(f'{name}_bucket', histogram.cumulative_at(limit),
+                                           {'stage': stage, 'le': f'{limit / 1e9:.9g}'}))
+            lines.append(format_metric(f'{name}_bucket', histogram.count, {'stage': stage, 'le': '+Inf'}))
+            lines.append(format_metric(f'{name}_sum', histogram.total_ns / 1e9, {'stage': stage}))
+            lines.append(format_metric(f'{name}_count', histogram.count, {'stage': stage}))
+
+        quantile_name = 'hypertension_inference_stage_quantile_seconds'
+        lines.append(f'# TYPE {quantile_name} gauge\n')
+        for stage, histogram in self.histograms.items():
+            for q in (0.5, 0.9, 0.99, 0.999):
+                lines.append(format_metric(quantile_name, histogram.percentile(q) / 1e9,
+                                           {'stage': stage, 'quantile': str(q)}))
+        return ''.join(lines)
+
+
+def parse_object(body):
+    """Corpo JSON como dict; None se não for JSON válido ou não for um objeto"""
+    try:
+        record = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return record if isinstance(record, dict) else None
+
+
+class ScoringService:
+    """
+    Caminho de /predict (JSON -> JSON) com timers por etapa. audit
+    (AuditLogger) e drift (DriftMonitor) opcionais recebem as predições
+    válidas de handle e handle_batch; o drift recebe o score bruto do modelo,
+    a mesma escala do baseline (drift_baseline.json), mesmo com calibração.
+    """
+
+    def __init__(self, version=DEFAULT_VERSION, instrumentation=None, threshold_key='balanced',
+                 audit=None, drift=None):
+        self.bundle = load_bundle(version)
+        self.schema = load_schema(version)
+        self.calibration = load_calibration(self.bundle.path)
+        self.instrumentation = instrumentation
+        self.threshold_key = threshold_key
+        self.audit = audit
+        self.drift = drift
+
+    def _preprocess(self, X, t):
+        """Imputação e escalonamento com laps; retorna (X, novo início)"""
+        timer = self.instrumentation
+        bundle = self.bundle
+        preprocessor = bundle.preprocessor
+        if preprocessor is not None:
+            X = preprocessor.impute(X)
+        else:
+            if hasattr(bundle.imputer, 'feature_names_in_'):
+                X = pd.DataFrame(X, columns=bundle.features)
+            X = bundle.imputer.transform(X)
+        if timer:
+            t = timer.lap('imputation', t)
+
+        X = preprocessor.standardize(X) if preprocessor is not None else bundle.scaler.transform(X)
+        if timer:
+            t = timer.lap('scaling', t)
+        return X, t
+
+    def handle(self, body):
+        """Processa o corpo da requisição; retorna (status HTTP, corpo JSON em bytes)"""
+        timer = self.instrumentation
+        bundle = self.bundle
+        start = t = time.perf_counter_ns()
+
+        record = parse_object(body)
+        if timer:
+            t = timer.lap('parse', t)
+        if record is None:
+            return 400, BAD_REQUEST
+
+        # Validação e empacotamento na ordem de features.json numa única passada
+        X, errors = self.schema.pack(record)
+        if timer:
+            t = timer.lap('validation', t)
+        if errors:
+            return 422, json.dumps({'error': 'invalid_input', 'errors': errors}).encode('utf-8')
+
+        X, t = self._preprocess(X, t)
+        raw = float(bundle.model.predict_proba(X)[0, 1])
+        result = prediction_result(raw, self.threshold_key, bundle, self.calibration)
+        if timer:
+            t = timer.lap('model', t)
+
+        if self.audit is not None:
+            try:
+                self.audit.log_prediction(record, result, (time.perf_counter_ns() - start) / 1e6)
+            except AuditBackpressureError:
+                return 503, AUDIT_UNAVAILABLE
+        if self.drift is not None:
+            self.drift.update(record, raw)
+
+        response = json.dumps(result).encode('utf-8')
+        if timer:
+            timer.lap('serialization', t)
+            timer.lap('total', start)
+        return 200, response
+
+    def handle_batch(self, body):
+        """
+        Lote {'patients': [...]} -> {'predictions': [...]}, na ordem recebida;
+        pacientes inválidos recebem {'error', 'errors'} sem derrubar o lote
+        """
+        timer = self.instrumentation
+        bundle = self.bundle
+        start = t = time.perf_counter_ns()
+
+        request = parse_object(body)
+        patients = request.get('patients') if request is not None else None
+        if timer:
+            t = timer.lap('parse', t)
+        if not isinstance(patients, list) or not all(isinstance(p, dict) for p in patients):
+            return 400, BAD_REQUEST
+
+        X, valid, errors = self.schema.validate_batch(patients)
+        if timer:
+            t = timer.lap('validation', t)
+
+        raw = np.empty(0)
+        calibrated = None
+        if valid.any():
+            X_valid, t = self._preprocess(X[valid], t)
+            raw = bundle.model.predict_proba(X_valid)[:, 1]
+            if self.calibration is not None:
+                calibrated = self.calibration.apply(raw).tolist()
+        if timer:
+            t = timer.lap('model', t)
+
+        scores = iter(raw.tolist())
+        probabilities = iter(calibrated or ())
+        predictions = [
+            prediction_result(next(scores), self.threshold_key, bundle, self.calibration,
+                              next(probabilities, None))
+            if is_valid else {'error': 'invalid_input', 'errors': errors[i]}
+            for i, is_valid in enumerate(valid)
+        ]
+        if self.audit is not None:
+            latency_ms = (time.perf_counter_ns() - start) / 1e6
+            try:
+                # Tudo ou nada: a retentativa de um 503 não duplica pacientes no log
+                self.audit.log_many([
+                    prediction_entry(patient, result, latency_ms)
+                    for patient, result in zip(patients, predictions) if 'error' not in result
+                ])
+            except AuditBackpressureError:
+                return 503, AUDIT_UNAVAILABLE
+        if self.drift is not None and len(raw):
+            self.drift.update_batch(X[valid], raw)
+
+        response = json.dumps({'predictions': predictions}).encode('utf-8')
+        if timer:
+            timer.lap('serialization', t)
+            timer.lap('total', start)
+        return 200, response
+
+
+class SamplingProfiler:
+    """Amostragem periódica das pilhas de todas as threads (formato folded)"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fold(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f'{Path(code.co_filename).stem}:{code.co_name}')
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def profile(self, seconds):
+        """Amostra por `seconds` segundos; retorna Counter pilha -> amostras"""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("Já existe um profiling em andamento")
+        try:
+            own = threading.get_ident()
+            stacks = Counter()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id != own:
+                        stacks[self._fold(frame)] += 1
+                time.sleep(self.interval)
+            return stacks
+        finally:
+            self._lock.release()
+
+    def profile_in_background(self, seconds, output_dir=PROFILES_DIR):
+        """Dispara o profiling numa thread e grava .folded e .svg ao final"""
+        def run():
+            save_profile(self.profile(seconds), output_dir)
+        thread = threading.Thread(target=run, name='sampling-profiler', daemon=True)
+        thread.start()
+        return thread
+
+    def http_route(self, max_seconds=60):
+        """
+        Handler para metrics_endpoint: /debug/profile?seconds=N devolve o
+        flamegraph SVG. Sem autenticação: start_metrics_server só o serve em
+        loopback, salvo allow_remote_routes=True.
+        """
+        def handler(query):
+            seconds = min(float(query.get('seconds', ['10'])[0]), max_seconds)
+            return 'image/svg+xml', render_flamegraph(self.profile(seconds)).encode('utf-8')
+        return handler
+
+
+def to_folded(stacks):
+    """Texto no formato de flamegraph.pl / speedscope: pilha contagem"""
+    return ''.join(f'{stack} {count}\n' for stack, count in sorted(stacks.items()))
+
+
+def render_flamegraph(stacks, width=1200, row_height=16):
+    """Flamegraph SVG simples (raiz embaixo, largura proporcional às amostras)"""
+    tree = {'children': {}, 'value': 0}
+    for stack, count in stacks.items():
+        node = tree
+        node['value'] += count
+        for name in stack.split(';'):
+            node = node['children'].setdefault(name, {'children': {}, 'value': 0})
+            node['value'] += count
+
+    def depth(node):
+        return 1 + max((depth(child) for child in node['children'].values()), default=0)
+
+    total = max(tree['value'], 1)
+    height = (depth(tree) + 1) * row_height
+    rects = []
+
+    def draw(node, name, x, level):
+        w = node['value'] / total * width
+        y = height - (level + 1) * row_height
+        hue = 20 + hash(name) % 40
+        label = f'{name} ({node["value"]} amostras, {node["value"] / total:.1%})'
+        rects.append(
+            f'<g><title>{escape(label)}</title>'
+            f'<rect x="{x:.2f}" y="{y}" width="{w:.2f}" height="{row_height - 1}" fill="hsl({hue},90%,60%)"/>'
+            + (f'<text x="{x + 2:.2f}" y="{y + row_height - 4}" font-size="11">{escape(name[:int(w / 7)])}</text>'
+               if w > 20 else '')
+            + '</g>'
+        )
+        for child_name, child in sorted(node['children'].items()):
+            draw(child, child_name, x, level + 1)
+            x += child['value'] / total * width
+
+    draw(tree, 'all', 0.0, 0)
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'font-family="monospace">{"".join(rects)}</svg>\n')
+
+
+def save_profile(stacks, output_dir=PROFILES_DIR):
+    """Grava profile-<timestamp>.folded e .svg; retorna os caminhos"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = output_dir / time.strftime('profile-%Y%m%dT%H%M%S')
+    folded, svg = stem.with_suffix('.folded'), stem.with_suffix('.svg')
+    folded.write_text(to_folded(stacks), encoding='utf-8')
+    svg.write_text(render_flamegraph(stacks), encoding='utf-8')
+    return folded, svg
+
+
+def run_benchmark(version=DEFAULT_VERSION, n_requests=5000):
+    """Overhead da instrumentação: mesmo caminho com e sem timers"""
+    body = json.dumps({
+        'sexo': 1, 'idade': 55, 'fumante_atualmente': 0, 'cigarros_por_dia': 0,
+        'medicamento_pressao': 0, 'diabetes': 0, 'colesterol_total': 220,
+        'pressao_sistolica': 140, 'pressao_diastolica': 90, 'imc': 27.5,
+        'frequencia_cardiaca': 78, 'glicose': 90
+    })
+    plain = ScoringService(version)
+    instrumented = ScoringService(version, Instrumentation())
+    plain.handle(body)
+
+    # Alternado em blocos para diluir ruído de CPU entre as duas variantes
+    times = {'off': LatencyHistogram(), 'on': LatencyHistogram()}
+    for _ in range(n_requests // 100):
+        for name, service in (('off', plain), ('on', instrumented)):
+            for _ in range(100):
+                start = time.perf_counter_ns()
+                service.handle(body)
+                times[name].record(time.perf_counter_ns() - start)
+
+    # Custo isolado de um lap (perf_counter_ns + registro no histograma)
+    timer = Instrumentation()
+    n_laps = 200_000
+    start = time.perf_counter_ns()
+    t = start
+    for _ in range(n_laps):
+        t = timer.lap('total', t)
+    lap_ns = (time.perf_counter_ns() - start) / n_laps
+
+    off, on = times['off'].summary(), times['on'].summary()
+    return {
+        'n_requests': n_requests,
+        'request_us': {'off': off, 'on': on},
+        'lap_ns': lap_ns,
+        'overhead_us_per_request': lap_ns * len(STAGES) / 1000,
+        'stages': instrumented.instrumentation.summary()
+    }
+
+
+def main():
+    version = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VERSION
+    n_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    print("🚀 INSTRUMENTAÇÃO DO CAMINHO DE INFERÊNCIA")
+    print("=" * 80)
+    result = run_benchmark(version, n_requests)
+    print(f"✅ Custo de um lap: {result['lap_ns']:.0f} ns | "
+          f"overhead estimado por requisição ({len(STAGES)} laps): {result['overhead_us_per_request']:.1f} µs")
+    for name, stats in result['request_us'].items():
+        print(f"   timers {name:<3}: média {stats['mean_us']:8.1f} µs | p50 {stats['p50_us']:8.1f} µs | "
+              f"p99 {stats['p99_us']:8.1f} µs")
+
+    print("\n📊 LATÊNCIA POR ETAPA (p50 / p99):")
+    for stage, stats in result['stages'].items():
+        print(f"   {stage:<14} {stats['p50_us']:8.1f} µs / {stats['p99_us']:8.1f} µs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
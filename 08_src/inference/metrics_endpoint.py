@@ -0,0 +1,81 @@
+"""
+Endpoint de Métricas no Formato Prometheus
+
+Servidor HTTP mínimo (biblioteca padrão) em thread daemon que expõe em
+/metrics o texto de um ou mais provedores (callables que retornam linhas no
+formato de exposição do Prometheus). A API de predição pode montar os mesmos
+provedores na sua própria rota /metrics. Rotas extras (ex.: disparo do
+profiler) podem ser registradas como path -> handler(query); como não há
+autenticação, elas só são servidas em endereço de loopback, a menos que
+allow_remote_routes=True seja passado explicitamente.
+"""
+
+import ipaddress
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def render_metrics(providers):
+    """Concatena o texto de todos os provedores"""
+    return ''.join(provider() for provider in providers)
+
+
+def format_metric(name, value, labels=None):
+    """Uma linha de amostra: nome{label="valor"} valor"""
+    if isinstance(value, float) and value != value:
+        value = 'NaN'
+    if labels:
+        label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+        return f'{name}{{{label_text}}} {value}\n'
+    return f'{name} {value}\n'
+
+
+def is_loopback(host):
+    """True se host só aceita conexões da própria máquina"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def start_metrics_server(providers, host='0.0.0.0', port=9100, routes=None, allow_remote_routes=False):
+    """
+    Inicia o servidor /metrics em background e retorna o HTTPServer.
+    routes: dict path -> handler(query) que retorna (content_type, corpo em bytes);
+    sem autenticação, exigem host de loopback ou allow_remote_routes=True
+    """
+    providers = list(providers)
+    routes = dict(routes or {})
+    if routes and not allow_remote_routes and not is_loopback(host):
+        raise ValueError(
+            f"Rotas {sorted(routes)} não têm autenticação e não podem ser expostas em {host}: "
+            "use host='127.0.0.1' ou allow_remote_routes=True"
+        )
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == '/metrics':
+                content_type, body = CONTENT_TYPE, render_metrics(providers).encode('utf-8')
+            elif url.path in routes:
+                content_type, body = routes[url.path](parse_qs(url.query))
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Inferência Quantizada (estilo histograma) para Ensembles de Árvores
+
+Pré-calcula, a partir do modelo de 05_artifacts, a tabela ordenada de pontos
+de corte de cada feature. Cada entrada é mapeada uma única vez para índices
+de bin uint8/uint16 e as árvores são percorridas com comparações inteiras
+numa tabela de nós compacta, em vez de comparar float64 em todos os nós.
+
+Equivalência: com cortes ordenados t_0 < ... < t_m e bin(x) = #{t_i < x},
+x <= t_k  <=>  bin(x) <= k. A entrada é convertida para float32 antes do
+bin, como as árvores do sklearn, portanto as predições são idênticas.
+
+Com bins finitos, cada (feature, bin) determina de antemão quais folhas de
+cada árvore ficam excluídas (nós "falsos", estilo QuickScorer). Para árvores
+com até 64 folhas a predição vira um AND de máscaras pré-calculadas por
+feature seguido da folha mais à esquerda sobrevivente; árvores maiores usam
+a travessia nível a nível na tabela de nós.
+
+Uso:
+    python 08_src/inference/quantized.py [versao] [n_amostras]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from inference.artifacts import DEFAULT_VERSION, get_artifact_dir, load_bundle
+
+BLOCK_SIZE = 4096
+
+
+def code_dtype(n_edges):
+    """Menor inteiro sem sinal que guarda os bins 0..n_edges de uma feature"""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if n_edges <= np.iinfo(dtype).max:
+            return dtype
+    raise ValueError(f"{n_edges} pontos de corte numa feature: excede uint32")
+
+
+def boosting_baseline(model, n_features):
+    """
+    Logit inicial do GradientBoosting (antes das árvores). _raw_predict_init é
+    privado, mas é o mesmo cálculo de decision_function e portanto exato; se
+    não existir (outra versão do sklearn), deriva-se pela API pública:
+    decision_function(x) - learning_rate * soma das folhas em x.
+    """
+    x = np.zeros((1, n_features))
+    if hasattr(model, '_raw_predict_init'):
+        return float(model._raw_predict_init(x)[0, 0])
+    leaves = sum(float(tree.predict(x)[0]) for tree in np.ravel(model.estimators_))
+    return float(model.decision_function(x)[0]) - float(model.learning_rate) * leaves
+
+
+class QuantizedEnsemble:
+    """Ensemble de árvores (GradientBoosting/RandomForest) com nós em índices de bin"""
+
+    def __init__(self, model, n_features):
+        self.model_name = type(model).__name__
+        self.n_features = n_features
+        trees = [estimator.tree_ for estimator in np.ravel(model.estimators_)]
+
+        if hasattr(model, 'learning_rate'):
+            # Boosting: logit = init + lr * soma das folhas
+            self.boosting = True
+            self.scale = float(model.learning_rate)
+            self.baseline = boosting_baseline(model, n_features)
+            leaf_values = [tree.value[:, 0, 0] for tree in trees]
+        else:
+            # Floresta: probabilidade = média das frações da classe positiva
+            self.boosting = False
+            self.scale = 1.0 / len(trees)
+            self.baseline = 0.0
+            leaf_values = [tree.value[:, 0, 1] / tree.value[:, 0, :].sum(axis=1) for tree in trees]
+
+        # Tabela ordenada de cortes por feature
+        features = np.concatenate([tree.feature for tree in trees])
+        thresholds = np.concatenate([tree.threshold for tree in trees])
+        self.edges = [np.unique(thresholds[features == j]) for j in range(n_features)]
+        self.code_dtype = code_dtype(max(len(edges) for edges in self.edges))
+
+        roots, feature, split, children, value = [], [], [], [], []
+        offset = 0
+        for tree, leaf_value in zip(trees, leaf_values):
+            leaf = tree.children_left == -1
+            own = np.arange(tree.node_count) + offset
+            node_feature = np.where(leaf, 0, tree.feature)
+            # Índice do corte na tabela da feature (x <= t_k <=> bin(x) <= k)
+            node_split = np.zeros(tree.node_count, dtype=np.int64)
+            for j in np.unique(node_feature[~leaf]):
+                mask = ~leaf & (node_feature == j)
+                node_split[mask] = np.searchsorted(self.edges[j], tree.threshold[mask])
+            roots.append(offset)
+            feature.append(node_feature)
+            split.append(node_split)
+            # Folhas apontam para si mesmas: níveis extras não as movem
+            children.append(np.column_stack([
+                np.where(leaf, own, tree.children_left + offset),
+                np.where(leaf, own, tree.children_right + offset)
+            ]))
+            value.append(leaf_value)
+            offset += tree.node_count
+
+        self.roots = np.array(roots, dtype=np.int32)
+        self.feature = np.concatenate(feature).astype(np.uint8 if n_features <= 255 else np.uint16)
+        self.split = np.concatenate(split).astype(self.code_dtype)
+        self.children = np.concatenate(children).astype(np.int32)
+        self.value = np.concatenate(value).astype(np.float64)
+        self.depth = max(tree.max_depth for tree in trees)
+
+        # Cortes em float64 por nó: referência para a travessia em ponto flutuante
+        self.threshold = np.array([
+            self.edges[f][s] if len(self.edges[f]) else 0.0
+            for f, s in zip(self.feature, self.split)
+        ])
+
+        n_leaves = max(tree.n_leaves for tree in trees)
+        self.leaf_masks = self._build_leaf_masks(trees, leaf_values) if n_leaves <= 64 else None
+
+    def _build_leaf_masks(self, trees, leaf_values):
+        """Máscaras de folhas sobreviventes por (feature, bin) e valores por folha"""
+        n_leaves = max(tree.n_leaves for tree in trees)
+        mask_dtype = next(d for d in (np.uint8, np.uint16, np.uint32, np.uint64)
+                          if np.iinfo(d).bits >= n_leaves)
+        full = int(np.iinfo(mask_dtype).max)
+        masks = [np.full((len(edges) + 1, len(trees)), full, dtype=mask_dtype) for edges in self.edges]
+        self.leaf_table = np.zeros((len(trees), n_leaves))
+
+        for t, (tree, leaf_value) in enumerate(zip(trees, leaf_values)):
+            # Folhas numeradas da esquerda para a direita; cada nó cobre [lo, hi)
+            span = {}
+            stack, rank, order = [0], 0, []
+            while stack:
+                node = stack.pop()
+                if tree.children_left[node] == -1:
+                    self.leaf_table[t, rank] = leaf_value[node]
+                    span[node] = (rank, rank + 1)
+                    rank += 1
+                else:
+                    order.append(node)
+                    stack.extend([tree.children_right[node], tree.children_left[node]])
+            for node in reversed(order):
+                span[node] = (span[tree.children_left[node]][0], span[tree.children_right[node]][1])
+
+            for node in order:
+                lo, hi = span[tree.children_left[node]]
+                false_mask = full ^ (((1 << hi) - 1) ^ ((1 << lo) - 1))
+                j, k = tree.feature[node], np.searchsorted(self.edges[tree.feature[node]], tree.threshold[node])
+                # bin > k -> vai para a direita: folhas da subárvore esquerda saem
+                masks[j][k + 1:, t] &= mask_dtype(false_mask)
+
+        # Sem nenhum split (só folhas), a máscara da feature 0 mantém todas as folhas
+        self.mask_features = [j for j, mask in enumerate(masks) if (mask != full).any()] or [0]
+        self.leaf_offsets = np.arange(len(trees)) * n_leaves
+        self.lowest_bit = np.array([(b & -b).bit_length() - 1 for b in range(256)], dtype=np.intp)
+        return masks
+
+    def quantize(self, X):
+        """Índices de bin (n x p) em uint8/uint16"""
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        codes = np.empty(X.shape, dtype=self.code_dtype)
+        for j, edges in enumerate(self.edges):
+            codes[:, j] = np.searchsorted(edges, X[:, j], side='left')
+        return codes
+
+    def _traverse(self, values, cuts):
+        """Soma das folhas percorrendo todas as árvores em paralelo, um nível por vez"""
+        total = np.empty(len(values))
+        n_trees = len(self.roots)
+        for start in range(0, len(values), BLOCK_SIZE):
+            block = values[start:start + BLOCK_SIZE]
+            rows = np.arange(len(block))[:, None]
+            node = np.broadcast_to(self.roots, (len(block), n_trees)).copy()
+            for _ in range(self.depth):
+                go_right = block[rows, self.feature[node]] > cuts[node]
+                node = self.children[node, go_right.view(np.uint8)]
+            total[start:start + BLOCK_SIZE] = self.value[node].sum(axis=1)
+        return total
+
+    def _to_proba(self, total):
+        raw = self.baseline + self.scale * total
+        return 1.0 / (1.0 + np.exp(-raw)) if self.boosting else raw
+
+    def _exit_leaves(self, codes):
+        """Soma das folhas de saída via AND das máscaras por feature"""
+        total = np.empty(len(codes))
+        flat_values = self.leaf_table.ravel()
+        for start in range(0, len(codes), BLOCK_SIZE):
+            block = codes[start:start + BLOCK_SIZE]
+            alive = self.leaf_masks[self.mask_features[0]][block[:, self.mask_features[0]]]
+            for j in self.mask_features[1:]:
+                alive &= self.leaf_masks[j][block[:, j]]
+            # Folha de saída = bit menos significativo sobrevivente
+            if alive.dtype == np.uint8:
+                leaf = self.lowest_bit[alive]
+            else:
+                leaf = np.log2(alive & (~alive + 1)).astype(np.intp)
+            total[start:start + BLOCK_SIZE] = flat_values[self.leaf_offsets + leaf].sum(axis=1)
+        return total
+
+    def predict_proba_codes(self, codes):
+        """Probabilidade da classe positiva a partir de entradas já quantizadas"""
+        if self.leaf_masks is not None:
+            return self._to_proba(self._exit_leaves(codes))
+        return self._to_proba(self._traverse(codes, self.split))
+
+    def predict_proba(self, X):
+        """Probabilidade da classe positiva (X já imputado e escalonado)"""
+        return self.predict_proba_codes(self.quantize(X))
+
+    def predict_proba_float(self, X):
+        """Mesma travessia com comparações float64 (referência do benchmark)"""
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        return self._to_proba(self._traverse(X, self.threshold))
+
+
+_QUANTIZED_CACHE = {}
+
+
+def load_quantized(version=DEFAULT_VERSION):
+    """Ensemble quantizado do bundle (construído uma única vez por versão)"""
+    key = str(get_artifact_dir(version))
+    if key not in _QUANTIZED_CACHE:
+        bundle = load_bundle(version)
+        _QUANTIZED_CACHE[key] = QuantizedEnsemble(bundle.model, len(bundle.features))
+    return _QUANTIZED_CACHE[key]
+
+
+def predict_proba_quantized(X, version=DEFAULT_VERSION):
+    """Equivalente a ArtifactBundle.predict_proba com travessia quantizada"""
+    return load_quantized(version).predict_proba(load_bundle(version).transform(X))
+
+
+def _throughput(fn, X, repeats=3):
+    """Melhor tempo de várias execuções -> linhas por segundo"""
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        best = min(best, time.perf_counter() - start)
+    return len(X) / best
+
+
+def run_benchmark(version=DEFAULT_VERSION, n_samples=200_000):
+    """Compara sklearn, travessia float64 e travessia quantizada"""
+    from data.datasets import create_simulated_data
+
+    bundle = load_bundle(version)
+    ensemble = load_quantized(version)
+    X = bundle.transform(create_simulated_data(n_samples, random_state=7))
+
+    reference = bundle.model.predict_proba(X)[:, 1]
+    quantized = ensemble.predict_proba(X)
+    codes = ensemble.quantize(X)
+
+    return {
+        'n_samples': int(n_samples),
+        'n_nodes': int(len(ensemble.value)),
+        'code_dtype': np.dtype(ensemble.code_dtype).name,
+        'max_abs_diff': float(np.max(np.abs(reference - quantized))),
+        'identical_predictions': all(
+            np.array_equal(reference >= t, quantized >= t) for t in bundle.thresholds.values()
+        ),
+        'input_bytes': {'float64': int(X.nbytes), 'codes': int(codes.nbytes)},
+        'rows_per_second': {
+            'sklearn': _throughput(lambda A: bundle.model.predict_proba(A), X),
+            'float_traversal': _throughput(ensemble.predict_proba_float, X),
+            'quantized_traversal': _throughput(lambda A: ensemble._to_proba(ensemble._traverse(A, ensemble.split)), codes),
+            'quantized_leaf_masks': _throughput(ensemble.predict_proba_codes, codes),
+            'quantized_with_binning': _throughput(ensemble.predict_proba, X)
+        }
+    }
+
+
+def main():
+    version = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VERSION
+    n_samples = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+
+    print("🚀 INFERÊNCIA QUANTIZADA - BENCHMARK")
+    print("=" * 80)
+    result = run_benchmark(version, n_samples)
+    print(f"✅ {result['n_nodes']} nós | bins em {result['code_dtype']}")
+    print(f"✅ Diferença máxima vs sklearn: {result['max_abs_diff']:.2e} | "
+          f"decisões idênticas nos thresholds: {result['identical_predictions']}")
+    print(f"✅ Entrada: {result['input_bytes']['float64'] / 1e6:.1f} MB (float64) -> "
+          f"{result['input_bytes']['codes'] / 1e6:.1f} MB (bins)")
+    print(f"\n⏱️ THROUGHPUT ({result['n_samples']:,} linhas):")
+    for name, rate in result['rows_per_second'].items():
+        print(f"   {name}: {rate:,.0f} linhas/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
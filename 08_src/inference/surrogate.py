@@ -0,0 +1,79 @@
+"""
+Runtime do Modelo Substituto (surrogate) - apenas NumPy
+
+Carrega e executa o modelo destilado salvo em surrogate.npz, sem sklearn,
+pandas ou joblib, para reduzir o cold start em Lambda/edge. Dois formatos:
+
+- tree_ensemble: árvores rasas de boosting achatadas em arrays; todas as
+  árvores são percorridas em paralelo, um nível por iteração.
+- binned_logistic: modelo aditivo por bins (uma tabela de logit por feature).
+
+As entradas são as 12 features brutas na ordem de features.json; valores
+ausentes (NaN) são substituídos pelas medianas do imputer do professor.
+"""
+
+import numpy as np
+
+
+class Surrogate:
+    """Modelo substituto carregado de um arquivo .npz"""
+
+    def __init__(self, arrays):
+        self.kind = str(arrays['kind'])
+        self.features = [str(f) for f in arrays['features']]
+        self.impute_values = arrays['impute_values'].astype(np.float64)
+        self.intercept = float(arrays['intercept'])
+
+        if self.kind == 'tree_ensemble':
+            self.learning_rate = float(arrays['learning_rate'])
+            self.roots = arrays['roots']
+            self.feature = arrays['feature']
+            self.threshold = arrays['threshold']
+            self.left = arrays['left']
+            self.right = arrays['right']
+            self.value = arrays['value']
+            self.depth = int(arrays['depth'])
+        elif self.kind == 'binned_logistic':
+            self.edges = [arrays[f'edges_{j}'] for j in range(len(self.features))]
+            self.tables = [arrays[f'table_{j}'] for j in range(len(self.features))]
+        else:
+            raise ValueError(f"Tipo de surrogate desconhecido: {self.kind}")
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def as_array(self, X):
+        """Matriz (n x p) a partir de dict, lista de dicts ou array"""
+        if isinstance(X, dict):
+            X = [[X.get(f, np.nan) for f in self.features]]
+        elif isinstance(X, (list, tuple)) and X and isinstance(X[0], dict):
+            X = [[row.get(f, np.nan) for f in self.features] for row in X]
+        X = np.array(X, dtype=np.float64).reshape(-1, len(self.features))
+        missing = np.isnan(X)
+        if missing.any():
+            X[missing] = np.broadcast_to(self.impute_values, X.shape)[missing]
+        return X
+
+    def decision_function(self, X):
+        """Logit predito"""
+        X = self.as_array(X)
+        if self.kind == 'binned_logistic':
+            logit = np.full(len(X), self.intercept)
+            for j, (edges, table) in enumerate(zip(self.edges, self.tables)):
+                logit += table[np.searchsorted(edges, X[:, j], side='right')]
+            return logit
+
+        # Mesma convenção das árvores sklearn: comparação em float32 promovido
+        X = X.astype(np.float32).astype(np.float64)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.intercept + self.learning_rate * self.value[node].sum(axis=1)
+
+    def predict_proba(self, X):
+        """Probabilidade da classe positiva (aproxima o predict_proba do professor)"""
+        return 1.0 / (1.0 + np.exp(-self.decision_function(X)))
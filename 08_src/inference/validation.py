@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Validação dos dados do paciente (mesmas regras de validatePatientData em js/api-integration.js)
+
+validate_patient é a versão direta das regras do JS. CompiledSchema compila
+as mesmas regras para a ordem de features.json do bundle (faixa clínica,
+flag binária e posição de cada feature) e, numa única passada, valida o
+corpo da requisição e o empacota numa linha float32 pré-alocada, pronta
+para o imputer/scaler. validate_batch aplica as regras de forma vetorizada
+a um lote de pacientes.
+
+Uso:
+    python 08_src/inference/validation.py [versao] [n_requisicoes] [n_lote]
+"""
+
+import math
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from inference.artifacts import DEFAULT_VERSION, get_artifact_dir, load_features
+
+REQUIRED_FIELDS = [
+    'sexo', 'idade', 'fumante_atualmente', 'cigarros_por_dia',
+    'medicamento_pressao', 'diabetes', 'colesterol_total',
+    'pressao_sistolica', 'pressao_diastolica', 'imc',
+    'frequencia_cardiaca', 'glicose'
+]
+
+RANGES = {
+    'idade': (18, 100),
+    'pressao_sistolica': (80, 220),
+    'pressao_diastolica': (50, 150),
+    'imc': (15, 50),
+    'colesterol_total': (100, 400),
+    'glicose': (50, 300),
+    'frequencia_cardiaca': (40, 150),
+    'cigarros_por_dia': (0, 60)
+}
+
+BINARY_FIELDS = ('sexo', 'fumante_atualmente', 'medicamento_pressao', 'diabetes')
+
+
+def validate_patient(data):
+    """Campos obrigatórios e faixas clínicas; retorna {'is_valid', 'errors'}"""
+    errors = []
+    for field in REQUIRED_FIELDS:
+        if data.get(field) is None or data.get(field) == '':
+            errors.append(f"Campo obrigatório: {field}")
+
+    for field, (low, high) in RANGES.items():
+        value = data.get(field)
+        if value is not None and value != '' and (value < low or value > high):
+            errors.append(f"{field} deve estar entre {low} e {high}")
+
+    return {'is_valid': not errors, 'errors': errors}
+
+
+class CompiledSchema:
+    """
+    Regras de validação compiladas para a ordem das features do bundle.
+
+    Além das regras de validate_patient: valores não numéricos ou infinitos
+    são rejeitados, NaN conta como campo ausente e as flags binárias só
+    aceitam 0 ou 1. As mensagens saem na mesma ordem de validate_patient
+    (ausentes, depois faixas, depois tipo/flag).
+    """
+
+    def __init__(self, features, dtype=np.float32):
+        self.features = list(features)
+        self.dtype = dtype
+        range_order = {field: rank for rank, field in enumerate(RANGES)}
+        # (coluna, campo, mínimo, máximo, binária, ordem da mensagem de faixa)
+        self.rules = tuple(
+            (j, field, *RANGES.get(field, (None, None)), field in BINARY_FIELDS,
+             range_order.get(field, len(RANGES) + j))
+            for j, field in enumerate(self.features)
+        )
+        self._ranges = tuple((j, low, high) for j, _, low, high, _, _ in self.rules if low is not None)
+        self._binary = tuple(j for j, _, _, _, binary, _ in self.rules if binary)
+        self._local = threading.local()
+
+    @property
+    def n_features(self):
+        return len(self.features)
+
+    def _row(self):
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = self._local.row = np.empty((1, self.n_features), dtype=self.dtype)
+        return row
+
+    @staticmethod
+    def _messages(errors):
+        return [message for _, message in sorted(errors)]
+
+    def _valid_values(self, record):
+        """Caminho rápido: todos os campos numéricos, finitos e dentro das regras (ou None)"""
+        try:
+            values = [float(record[field]) for field in self.features]
+        except (KeyError, TypeError, ValueError):
+            return None
+        # inf/NaN em qualquer campo tornam a soma não finita
+        if not math.isfinite(sum(values)):
+            return None
+        for j, low, high in self._ranges:
+            if not low <= values[j] <= high:
+                return None
+        for j in self._binary:
+            if values[j] != 0.0 and values[j] != 1.0:
+                return None
+        return values
+
+    def check(self, record):
+        """Valores na ordem das features e lista de erros (passada completa, com mensagens)"""
+        values = [0.0] * self.n_features
+        errors = []
+        for j, field, low, high, binary, rank in self.rules:
+            value = record.get(field)
+            if value is None or value == '':
+                errors.append(((0, j), f"Campo obrigatório: {field}"))
+                continue
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                errors.append(((2, j), f"{field} deve ser numérico"))
+                continue
+            if value != value:
+                errors.append(((0, j), f"Campo obrigatório: {field}"))
+            elif not math.isfinite(value):
+                errors.append(((2, j), f"{field} deve ser numérico"))
+            elif low is not None and (value < low or value > high):
+                errors.append(((1, rank), f"{field} deve estar entre {low} e {high}"))
+            elif binary and value != 0.0 and value != 1.0:
+                errors.append(((2, j), f"{field} deve ser 0 ou 1"))
+            values[j] = value
+        return values, self._messages(errors)
+
+    def pack(self, record):
+        """
+        Valida um paciente (dict) e preenche a linha (1, n_features) da thread.
+        Retorna (linha, []) ou (None, erros). A linha é reutilizada na próxima
+        chamada da mesma thread: consumir (imputer/modelo) antes de reempacotar.
+        """
+        values = self._valid_values(record)
+        if values is None:
+            values, errors = self.check(record)
+            if errors:
+                return None, errors
+        row = self._row()
+        row[0] = values
+        return row, []
+
+    def validate(self, record):
+        """Mesmo formato de validate_patient: {'is_valid', 'errors'}"""
+        _, errors = self.pack(record)
+        return {'is_valid': not errors, 'errors': errors}
+
+    def validate_batch(self, records):
+        """
+        Validação vetorizada de um lote (lista de dicts ou DataFrame).
+        Retorna (X (n, n_features) no dtype do schema, máscara de válidos,
+        {linha: erros} só das linhas inválidas).
+        """
+        if hasattr(records, 'columns'):
+            frame = records.reindex(columns=self.features)
+        else:
+            frame = pd.DataFrame.from_records(list(records), columns=self.features)
+
+        n = len(frame)
+        X = np.empty((n, self.n_features), dtype=self.dtype)
+        failures = []  # (máscara, ordem, mensagem)
+        for j, field, low, high, binary, rank in self.rules:
+            column = frame[field]
+            if column.dtype.kind in 'biuf':
+                values = column.to_numpy(dtype=np.float64)
+                missing = np.isnan(values)
+                wrong_type = np.isinf(values)
+            else:
+                raw = column.to_numpy(dtype=object)
+                values = pd.to_numeric(column, errors='coerce').to_numpy(dtype=np.float64)
+                missing = pd.isna(raw) | (raw == '')
+                wrong_type = ~missing & ~np.isfinite(values)
+                missing |= np.isnan(values) & ~wrong_type
+            present = ~missing & ~wrong_type
+
+            failures.append((missing, (0, j), f"Campo obrigatório: {field}"))
+            if low is not None:
+                out_of_range = present & ((values < low) | (values > high))
+                failures.append((out_of_range, (1, rank), f"{field} deve estar entre {low} e {high}"))
+            failures.append((wrong_type, (2, j), f"{field} deve ser numérico"))
+            if binary:
+                not_binary = present & (values != 0.0) & (values != 1.0)
+                failures.append((not_binary, (2, j), f"{field} deve ser 0 ou 1"))
+            X[:, j] = values
+
+        invalid = np.zeros(n, dtype=bool)
+        for mask, _, _ in failures:
+            invalid |= mask
+
+        errors = {}
+        if invalid.any():
+            for mask, order, message in failures:
+                for i in np.flatnonzero(mask):
+                    errors.setdefault(int(i), []).append((order, message))
+            errors = {i: self._messages(row_errors) for i, row_errors in sorted(errors.items())}
+        return X, ~invalid, errors
+
+
+def compile_schema(features, dtype=np.float32):
+    """Schema compilado para uma lista de features (ordem de features.json)"""
+    return CompiledSchema(features, dtype)
+
+
+_SCHEMA_CACHE = {}
+
+
+def load_schema(version=DEFAULT_VERSION):
+    """Schema compilado de features.json de uma versão (cache em memória)"""
+    path = get_artifact_dir(version)
+    key = str(path)
+    if key not in _SCHEMA_CACHE:
+        _SCHEMA_CACHE[key] = compile_schema(load_features(path))
+    return _SCHEMA_CACHE[key]
+
+
+def _best_time(fn, repeats=3):
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(version=DEFAULT_VERSION, n_requests=20_000, n_batch=10_000):
+    """validate_patient + as_array vs schema compilado (por requisição e em lote)"""
+    from data.datasets import create_simulated_data
+    from inference.artifacts import load_bundle
+
+    bundle = load_bundle(version)
+    schema = load_schema(version)
+    # Corpos de requisição como chegam do JS: sem NaN, com parte fora das faixas clínicas
+    frame = create_simulated_data(n_batch, random_state=3)[bundle.features].dropna()
+    records = frame.to_dict('records')
+    record = next(r for r in records if validate_patient(r)['is_valid'])
+
+    def legacy_request():
+        for _ in range(n_requests):
+            if validate_patient(record)['is_valid']:
+                bundle.as_array(record)
+
+    def compiled_request():
+        for _ in range(n_requests):
+            schema.pack(record)
+
+    def legacy_batch():
+        results = [validate_patient(r) for r in records]
+        return np.vstack([bundle.as_array(r) for r, v in zip(records, results) if v['is_valid']])
+
+    legacy_valid = np.array([validate_patient(r)['is_valid'] for r in records])
+    X, valid, errors = schema.validate_batch(records)
+    legacy_X = bundle.as_array(frame)
+
+    # Predições: linha float32 empacotada vs caminho float64 original
+    valid_frame = frame[valid]
+    packed = np.vstack([schema.pack(r)[0].copy() for r in valid_frame.to_dict('records')])
+    proba_legacy = bundle.predict_proba(valid_frame)
+    proba_packed = bundle.predict_proba(packed)
+
+    request_times = {
+        'validate_patient': _best_time(legacy_request) / n_requests * 1e6,
+        'compiled': _best_time(compiled_request) / n_requests * 1e6
+    }
+    batch_times = {
+        'validate_patient': _best_time(legacy_batch),
+        'compiled_records': _best_time(lambda: schema.validate_batch(records)),
+        'compiled_dataframe': _best_time(lambda: schema.validate_batch(frame))
+    }
+    return {
+        'version': bundle.model_version,
+        'n_requests': int(n_requests),
+        'n_batch': len(records),
+        'n_invalid': int((~valid).sum()),
+        'same_validity': bool(np.array_equal(legacy_valid, valid)),
+        'same_values': bool(np.array_equal(X[valid], legacy_X[valid].astype(schema.dtype))),
+        'max_abs_proba_diff': float(np.max(np.abs(proba_legacy - proba_packed))),
+        'example_errors': next(iter(errors.values()), []),
+        'request_us': request_times,
+        'batch_seconds': batch_times
+    }
+
+
+def main():
+    version = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VERSION
+    n_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    n_batch = int(sys.argv[3]) if len(sys.argv) > 3 else 10_000
+
+    print("🚀 VALIDAÇÃO COMPILADA DE REQUISIÇÕES - BENCHMARK")
+    print("=" * 80)
+    result = run_benchmark(version, n_requests, n_batch)
+    print(f"✅ Mesma decisão de validade que validate_patient: {result['same_validity']} "
+          f"({result['n_invalid']:,} de {result['n_batch']:,} inválidos)")
+    print(f"✅ Mesmos valores empacotados: {result['same_values']} | "
+          f"diferença máxima de probabilidade (float32): {result['max_abs_proba_diff']:.2e}")
+    print(f"   Exemplo de erros: {result['example_errors']}")
+
+    request_us = result['request_us']
+    print(f"\n⏱️ POR REQUISIÇÃO ({result['n_requests']:,} chamadas):")
+    print(f"   validate_patient + as_array: {request_us['validate_patient']:.2f} µs")
+    print(f"   schema compilado (pack):     {request_us['compiled']:.2f} µs "
+          f"({request_us['validate_patient'] / request_us['compiled']:.1f}x)")
+
+    batch = result['batch_seconds']
+    print(f"\n⏱️ LOTE ({result['n_batch']:,} pacientes):")
+    print(f"   validate_patient por paciente: {batch['validate_patient'] * 1000:.1f} ms")
+    for name in ('compiled_records', 'compiled_dataframe'):
+        print(f"   {name:<30} {batch[name] * 1000:.1f} ms "
+              f"({batch['validate_patient'] / batch[name]:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+Execução headless dos notebooks 01–06 com cache por estágio
+"""
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Runner do Pipeline de Notebooks (01 EDA → 06 métricas)
+
+Executa os estágios de pipeline.stages sem Jupyter:
+- a chave de cada estágio é o hash do código (células de código do notebook
+  ou fonte da action) mais o hash de cada arquivo de entrada;
+- um estágio é pulado quando a chave é igual à do manifesto
+  (.cache/pipeline/manifest.json) e as saídas continuam iguais às gravadas;
+- estágios cujas dependências já terminaram rodam em paralelo (um notebook
+  por subprocesso, com backend Agg); a chave é calculada só quando o
+  estágio fica pronto, então um upstream que regrava saídas idênticas não
+  força a reexecução dos seguintes;
+- falha num estágio bloqueia apenas os que dependem dele.
+
+Os hashes de arquivos ficam no manifesto junto com tamanho e mtime, de modo
+que arquivos não modificados não são relidos.
+
+Uso:
+    python 08_src/pipeline/runner.py [estagios...] [--workers N] [--force] [--dry-run]
+"""
+
+import fnmatch
+import hashlib
+import inspect
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from clinical_fast.prediction_cache import file_hash
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+MANIFEST_PATH = Path('.cache') / 'pipeline' / 'manifest.json'
+LOG_DIR = Path('logs') / 'pipeline'
+NOTEBOOK_TIMEOUT = 4 * 3600
+
+
+def _patterns_overlap(a, b):
+    return a == b or fnmatch.fnmatch(a, b) or fnmatch.fnmatch(b, a)
+
+
+def stage_graph(stages):
+    """{estágio: [dependências]} derivado das entradas/saídas declaradas"""
+    names = [stage['name'] for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError("Nomes de estágios duplicados")
+
+    graph = {}
+    for stage in stages:
+        graph[stage['name']] = [
+            other['name'] for other in stages
+            if other is not stage and any(
+                _patterns_overlap(pattern, output)
+                for pattern in stage['inputs'] for output in other['outputs']
+            )
+        ]
+    topological_order(graph)
+    return graph
+
+
+def topological_order(graph):
+    """Ordem de execução; ValueError se houver ciclo"""
+    order, state = [], {}
+
+    def visit(name, path):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Ciclo entre estágios: {' → '.join(path + [name])}")
+        state[name] = 'visiting'
+        for dependency in graph[name]:
+            visit(dependency, path + [name])
+        state[name] = 'done'
+        order.append(name)
+
+    for name in graph:
+        visit(name, [])
+    return order
+
+
+def select_stages(graph, targets=None):
+    """Estágios pedidos mais todos os seus upstreams"""
+    if not targets:
+        return set(graph)
+    unknown = set(targets) - set(graph)
+    if unknown:
+        raise ValueError(f"Estágios desconhecidos: {sorted(unknown)}")
+    selected, stack = set(), list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in selected:
+            selected.add(name)
+            stack.extend(graph[name])
+    return selected
+
+
+def notebook_code(path):
+    """Células de código do notebook (outputs e metadados não entram no hash)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        notebook = json.load(f)
+    return [''.join(cell['source']) for cell in notebook['cells'] if cell['cell_type'] == 'code']
+
+
+def notebook_script(cells):
+    """Script Python equivalente; magics (!, %) viram pass com a mesma indentação"""
+    lines = ["from IPython.display import display", ""]
+    for index, source in enumerate(cells, 1):
+        lines.append(f"# %% célula {index}")
+        for line in source.splitlines():
+            stripped = line.lstrip()
+            if stripped.startswith(('!', '%')):
+                line = f"{line[:len(line) - len(stripped)]}pass  # {stripped}"
+            lines.append(line)
+        lines.append("")
+    return '\n'.join(lines)
+
+
+class FileHasher:
+    """file_hash com cache por (tamanho, mtime_ns) persistido no manifesto"""
+
+    def __init__(self, root, entries=None):
+        self.root = Path(root)
+        self.entries = entries if entries is not None else {}
+
+    def expand(self, pattern):
+        return sorted(p for p in self.root.glob(pattern) if p.is_file())
+
+    def hash(self, path):
+        stat = path.stat()
+        relative = str(path.relative_to(self.root))
+        cached = self.entries.get(relative)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = file_hash(path)
+        self.entries[relative] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def snapshot(self, patterns):
+        """{caminho relativo: hash} de todos os arquivos que casam com os globs"""
+        return {
+            str(path.relative_to(self.root)): self.hash(path)
+            for pattern in patterns for path in self.expand(pattern)
+        }
+
+
+def stage_code_hash(stage, root):
+    if stage['notebook'] is not None:
+        source = '\n'.join(notebook_code(Path(root) / stage['notebook']))
+    else:
+        source = inspect.getsource(stage['action'])
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def stage_key(stage, root, hasher):
+    digest = hashlib.sha256(stage_code_hash(stage, root).encode())
+    for pattern in stage['inputs']:
+        digest.update(f'\n{pattern}'.encode())
+        files = hasher.snapshot([pattern])
+        for relative in sorted(files):
+            digest.update(f'\n{relative}={files[relative]}'.encode())
+    return digest.hexdigest()[:32]
+
+
+def load_manifest(path):
+    if not path.exists():
+        return {'stages': {}, 'files': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def run_reason(stage, key, record, hasher):
+    """Motivo para executar o estágio, ou None se ele pode ser pulado"""
+    if record is None:
+        return 'sem execução anterior'
+    if record['key'] != key:
+        return 'código ou entradas alterados'
+    if any(not hasher.expand(pattern) for pattern in stage['outputs']):
+        return 'saídas ausentes'
+    if hasher.snapshot(stage['outputs']) != record['outputs']:
+        return 'saídas modificadas'
+    return None
+
+
+def execute_stage(stage, root, log_dir):
+    """Executa um estágio (notebook em subprocesso ou action) e retorna segundos"""
+    start = time.perf_counter()
+    if stage['action'] is not None:
+        stage['action'](root)
+        return time.perf_counter() - start
+
+    log_dir.mkdir(parents=True, exist_ok=True)
+    script_path = log_dir / f"{stage['name']}.py"
+    log_path = log_dir / f"{stage['name']}.log"
+    script_path.write_text(notebook_script(notebook_code(Path(root) / stage['notebook'])),
+                           encoding='utf-8')
+    env = {**os.environ, 'MPLBACKEND': 'Agg', 'PYTHONUNBUFFERED': '1'}
+    with open(log_path, 'w', encoding='utf-8') as log:
+        process = subprocess.run([sys.executable, str(script_path)], cwd=root, env=env,
+                                 stdout=log, stderr=subprocess.STDOUT, timeout=NOTEBOOK_TIMEOUT)
+    if process.returncode != 0:
+        tail = log_path.read_text(encoding='utf-8', errors='replace').strip().splitlines()[-5:]
+        raise RuntimeError(f"código de saída {process.returncode} (log: {log_path}): "
+                           + ' | '.join(tail))
+    return time.perf_counter() - start
+
+
+def run_pipeline(stages=None, root=PROJECT_ROOT, targets=None, max_workers=None,
+                 force=False, dry_run=False):
+    """
+    Executa os estágios selecionados respeitando as dependências. Retorna
+    {'stages': {nome: {'status', 'seconds', 'reason'}}, 'order', 'seconds'}
+    com status executed / skipped / failed / blocked (ou would_run no dry-run).
+    """
+    if stages is None:
+        from pipeline.stages import STAGES
+        stages = STAGES
+    root = Path(root)
+    by_name = {stage['name']: stage for stage in stages}
+    graph = stage_graph(stages)
+    selected = select_stages(graph, targets)
+    order = [name for name in topological_order(graph) if name in selected]
+
+    manifest_path = root / MANIFEST_PATH
+    log_dir = root / LOG_DIR
+    manifest = load_manifest(manifest_path)
+    hasher = FileHasher(root, manifest.setdefault('files', {}))
+    records = manifest.setdefault('stages', {})
+
+    report = {name: {'status': None, 'seconds': 0.0, 'reason': None} for name in order}
+    start = time.perf_counter()
+
+    def finished(name):
+        return report[name]['status'] in ('executed', 'skipped')
+
+    def dispatch(name):
+        """Decide entre pular e executar; retorna True se precisa executar"""
+        stage = by_name[name]
+        upstream_ran = [d for d in graph[name] if d in selected
+                        and report[d]['status'] == 'would_run']
+        key = stage_key(stage, root, hasher)
+        reason = 'forçado' if force else run_reason(stage, key, records.get(name), hasher)
+        if dry_run:
+            if reason is None and upstream_ran:
+                reason = f"depende de {', '.join(upstream_ran)}"
+            report[name].update(status='would_run' if reason else 'skipped',
+                                reason=reason or 'entradas inalteradas')
+            return False
+        if reason is None:
+            report[name].update(status='skipped', reason='entradas inalteradas')
+            return False
+        report[name].update(reason=reason, key=key)
+        return True
+
+    if dry_run:
+        for name in order:
+            dispatch(name)
+        return {'stages': report, 'order': order, 'seconds': time.perf_counter() - start}
+
+    max_workers = max_workers or os.cpu_count() or 1
+    pending, running = list(order), {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            progressed = True
+            while progressed:
+                progressed = False
+                for name in list(pending):
+                    dependencies = [d for d in graph[name] if d in selected]
+                    if any(report[d]['status'] in ('failed', 'blocked') for d in dependencies):
+                        pending.remove(name)
+                        report[name].update(status='blocked', reason='dependência falhou')
+                        progressed = True
+                    elif all(finished(d) for d in dependencies) and len(running) < max_workers:
+                        pending.remove(name)
+                        progressed = True
+                        if dispatch(name):
+                            future = pool.submit(execute_stage, by_name[name], root, log_dir)
+                            running[future] = name
+
+            if not running:
+                if pending:
+                    raise RuntimeError(f"Estágios sem como prosseguir: {pending}")
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    report[name]['seconds'] = future.result()
+                    report[name]['status'] = 'executed'
+                    records[name] = {
+                        'key': report[name].pop('key'),
+                        'outputs': hasher.snapshot(by_name[name]['outputs']),
+                        'executed_at': datetime.now().isoformat(),
+                        'seconds': report[name]['seconds']
+                    }
+                except Exception as e:
+                    report[name].pop('key', None)
+                    report[name].update(status='failed', reason=str(e))
+                    records.pop(name, None)
+                save_manifest(manifest, manifest_path)
+
+    save_manifest(manifest, manifest_path)
+    return {'stages': report, 'order': order, 'seconds': time.perf_counter() - start}
+
+
+STATUS_ICONS = {'executed': '✅', 'skipped': '⏭️', 'failed': '❌', 'blocked': '⛔', 'would_run': '▶️'}
+
+
+def print_timing_report(result):
+    print(f"\n{'Estágio':<22} {'Status':<12} {'Tempo':>9}  Motivo")
+    print("-" * 80)
+    for name in result['order']:
+        entry = result['stages'][name]
+        print(f"{STATUS_ICONS[entry['status']]} {name:<20} {entry['status']:<12} "
+              f"{entry['seconds']:8.1f}s  {entry['reason']}")
+
+    counts = {}
+    for entry in result['stages'].values():
+        counts[entry['status']] = counts.get(entry['status'], 0) + 1
+    stage_seconds = sum(entry['seconds'] for entry in result['stages'].values())
+    print("-" * 80)
+    print(f"📊 {', '.join(f'{n} {status}' for status, n in sorted(counts.items()))}")
+    print(f"⏱️ Soma dos estágios {stage_seconds:.1f}s | tempo total {result['seconds']:.1f}s")
+
+
+def save_timing_report(result, root=PROJECT_ROOT):
+    output = Path(root) / LOG_DIR / f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    return output
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pipeline headless dos notebooks 01–06")
+    parser.add_argument('targets', nargs='*', help="estágios a executar (com seus upstreams)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="ignora o cache")
+    parser.add_argument('--dry-run', action='store_true', help="mostra o plano sem executar")
+    args = parser.parse_args()
+
+    print("🚀 PIPELINE DE NOTEBOOKS (01–06)")
+    print("=" * 80)
+    result = run_pipeline(targets=args.targets, max_workers=args.workers,
+                          force=args.force, dry_run=args.dry_run)
+    print_timing_report(result)
+    if not args.dry_run:
+        print(f"📁 Relatório de tempos: {save_timing_report(result)}")
+    failed = any(entry['status'] in ('failed', 'blocked') for entry in result['stages'].values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Estágios do Pipeline (02_notebooks)
+
+Cada estágio declara as entradas e saídas que lê/grava (globs relativos à
+raiz do projeto). As dependências entre estágios saem dessas declarações:
+um estágio depende de outro quando alguma de suas entradas casa com uma
+saída do outro. O estágio 06 não tem notebook; é uma ação Python que
+publica as métricas de 04_reports/modeling em 6_analysis_metrics.
+
+As entradas listam todo arquivo que o notebook lê, inclusive os caminhos
+alternativos que ele tenta em sequência: um arquivo lido e não declarado
+não entra na chave, e o estágio seria pulado com a entrada alterada.
+"""
+
+import shutil
+from pathlib import Path
+
+NOTEBOOKS_DIR = '02_notebooks'
+PROCESSED_DIR = '00_data/processed'
+MODEL_METRICS_DIR = f'{NOTEBOOKS_DIR}/06_model_metrics/6_analysis_metrics'
+MODEL_METRICS_FILES = (
+    'cross_validation_results.csv', 'final_model_results.csv',
+    'model_training_report.md', 'model_training_summary.json'
+)
+
+
+def pipeline_stage(name, inputs, outputs, notebook=None, action=None):
+    """Spec de um estágio: notebook (caminho relativo) ou action(root)"""
+    if (notebook is None) == (action is None):
+        raise ValueError(f"Estágio {name}: informe notebook ou action (apenas um)")
+    return {
+        'name': name, 'inputs': list(inputs), 'outputs': list(outputs),
+        'notebook': notebook, 'action': action
+    }
+
+
+def publish_model_metrics(root):
+    """Copia as métricas de treino (04_reports/modeling) para 06_model_metrics"""
+    source_dir = Path(root) / '04_reports' / 'modeling'
+    target_dir = Path(root) / MODEL_METRICS_DIR
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for name in MODEL_METRICS_FILES:
+        shutil.copy2(source_dir / name, target_dir / name)
+
+
+STAGES = [
+    pipeline_stage(
+        '01_eda',
+        notebook=f'{NOTEBOOKS_DIR}/01_exploratory_analysis/01_exploratory_analysis_improved.ipynb',
+        inputs=['00_data/raw/*.csv'],
+        outputs=['04_reports/eda/*.png']
+    ),
+    pipeline_stage(
+        '02_preprocessing',
+        notebook=f'{NOTEBOOKS_DIR}/02_data_preprocessing/02_data_preprocessing_improved.ipynb',
+        inputs=['00_data/raw/*.csv'],
+        outputs=[f'{PROCESSED_DIR}/*.npy', f'{PROCESSED_DIR}/metadata.json',
+                 '04_reports/analises/*.csv', '04_reports/validation/*.json']
+    ),
+    pipeline_stage(
+        '03_training',
+        notebook=f'{NOTEBOOKS_DIR}/03_model_training/03_model_training_imrpoved.ipynb',
+        inputs=[f'{PROCESSED_DIR}/X_train.npy', f'{PROCESSED_DIR}/X_test.npy',
+                f'{PROCESSED_DIR}/y_train.npy', f'{PROCESSED_DIR}/y_test.npy',
+                f'{PROCESSED_DIR}/metadata.json'],
+        outputs=['03_models/trained/*.pkl', '04_reports/modeling/*',
+                 '04_reports/model_comparison/*']
+    ),
+    pipeline_stage(
+        '04_optimization',
+        notebook=f'{NOTEBOOKS_DIR}/04_analysis_optimization/04_analysis_optimization_improved.ipynb',
+        inputs=[f'{PROCESSED_DIR}/*.npy', '03_models/trained/best_model.pkl',
+                '04_reports/modeling/final_model_results.csv',
+                '04_reports/model_comparison/model_results.csv'],
+        outputs=['03_models/final/*.pkl', '04_reports/executive_report/*',
+                 '04_reports/visualizations/*']
+    ),
+    pipeline_stage(
+        '05_interpretability',
+        notebook=f'{NOTEBOOKS_DIR}/05_interpretability_reports/05_interpretability_reports_improved.ipynb',
+        inputs=['00_data/raw/*.csv', '00_data/processed_data_full.csv',
+                '04_reports/legacy_results/results/results/data/processed_data_full.csv',
+                f'{PROCESSED_DIR}/X_*.npy', f'{PROCESSED_DIR}/y_*.npy',
+                '03_models/final/*.pkl', '03_models/trained/*.pkl',
+                # get_results_path('models'): resumo do treino, scaler e modelo por nome
+                '04_reports/models/*', '05_artifacts/gb_v1/*.pkl'],
+        outputs=['04_reports/final_reports/*', '04_reports/figures/*.png']
+    ),
+    pipeline_stage(
+        '06_model_metrics',
+        action=publish_model_metrics,
+        inputs=[f'04_reports/modeling/{name}' for name in MODEL_METRICS_FILES],
+        outputs=[f'{MODEL_METRICS_DIR}/{name}' for name in MODEL_METRICS_FILES]
+    ),
+]
@@ -0,0 +1,3 @@
+"""
+Geração das figuras dos relatórios (04_reports)
+"""
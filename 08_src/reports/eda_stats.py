@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+"""
+Estatísticas Incrementais da EDA (correlações, VIF, effect sizes)
+
+Mantém estatísticas suficientes mergeáveis em vez de refazer as contas
+sobre a base inteira a cada execução:
+
+- matriz de correlação (pares completos, como DataFrame.corr): contagens,
+  somas e produtos cruzados por par de colunas;
+- VIF de todas as features com uma única inversão: diagonal da inversa da
+  matriz de correlação das linhas completas (VIF centrado, equivalente a
+  uma regressão com intercepto por feature) ou, com centered=False, a forma
+  sem intercepto de variance_inflation_factor usada no notebook 01;
+- Cohen's d por classe a partir de contagens, somas e somas de quadrados;
+- Mann-Whitney U e χ² a partir de contagens de valores por classe. São
+  exatas enquanto uma feature tem até max_distinct valores distintos;
+  acima disso os valores são agrupados em bins por quantil (erro limitado
+  pelos empates artificiais, informado em u_error_bound).
+
+O estado é atualizado por chunk (update), combinado entre workers (merge)
+e persistido (save/load), de modo que linhas novas entram sem reprocessar
+as antigas e arquivos maiores que a memória são lidos em chunks.
+
+Uso:
+    python 08_src/reports/eda_stats.py <arquivo.csv|diretorio_coorte> [chunk] [--state estado.npz]
+    python 08_src/reports/eda_stats.py benchmark [n_linhas]
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data.datasets import TARGET_COLUMN
+
+DEFAULT_MAX_DISTINCT = 1 << 16
+DEFAULT_CHUNK_SIZE = 1_000_000
+SIGNIFICANCE_LEVEL = 0.05
+
+
+def effect_size_label(d):
+    """Classificação do notebook 01 para |Cohen's d|"""
+    d = abs(d)
+    if d < 0.2:
+        return 'Desprezível'
+    if d < 0.5:
+        return 'Pequeno'
+    if d < 0.8:
+        return 'Médio'
+    return 'Grande'
+
+
+def vif_level(vif):
+    if pd.isna(vif):
+        return 'Erro'
+    if vif < 5:
+        return 'Aceitável'
+    if vif < 10:
+        return 'Moderado'
+    return 'Alto'
+
+
+class ValueCounts:
+    """Contagens por classe (2 x k) de valores distintos ordenados, mergeáveis"""
+
+    def __init__(self, max_distinct=DEFAULT_MAX_DISTINCT):
+        self.max_distinct = max_distinct
+        self.values = np.zeros(0)
+        self.counts = np.zeros((2, 0), dtype=np.int64)
+        # Após agrupar, values guarda a borda superior de cada bin (o último é +inf)
+        self.exact = True
+
+    def _add(self, values, counts):
+        if not self.exact:
+            bins = np.searchsorted(self.values, values, side='left')
+            for k in range(2):
+                self.counts[k] += np.bincount(bins, weights=counts[k],
+                                              minlength=len(self.values)).astype(np.int64)
+            return
+        merged, inverse = np.unique(np.concatenate([self.values, values]), return_inverse=True)
+        new_counts = np.zeros((2, len(merged)), dtype=np.int64)
+        for k in range(2):
+            np.add.at(new_counts[k], inverse, np.concatenate([self.counts[k], counts[k]]))
+        self.values, self.counts = merged, new_counts
+        if len(self.values) > self.max_distinct:
+            self._coarsen()
+
+    def _coarsen(self):
+        """Agrupa os valores em max_distinct / 2 bins de contagem aproximadamente igual"""
+        total = self.counts.sum(axis=0)
+        cumulative = np.cumsum(total)
+        n_bins = self.max_distinct // 2
+        bucket = np.minimum((cumulative - total) * n_bins // max(cumulative[-1], 1), n_bins - 1)
+        last = np.r_[np.flatnonzero(np.diff(bucket)), len(bucket) - 1]
+        counts = np.zeros((2, len(last)), dtype=np.int64)
+        for k in range(2):
+            counts[k] = np.add.reduceat(self.counts[k], np.r_[0, last[:-1] + 1])
+        self.values = np.r_[self.values[last[:-1]], np.inf]
+        self.counts = counts
+        self.exact = False
+
+    def update(self, x, y):
+        """x: valores válidos da feature; y: classe (0/1) de cada valor"""
+        if len(x) == 0:
+            return self
+        values, inverse = np.unique(x, return_inverse=True)
+        counts = np.bincount(np.asarray(y, dtype=np.intp) * len(values) + inverse,
+                             minlength=2 * len(values)).reshape(2, len(values))
+        self._add(values, counts)
+        return self
+
+    def merge(self, other):
+        if self.exact and not other.exact:
+            # Valores exatos entram nos bins do outro lado
+            values, counts = self.values, self.counts
+            self.values, self.counts, self.exact = other.values.copy(), other.counts.copy(), False
+            self._add(values, counts)
+        else:
+            # Bordas superiores do outro (a última é +inf) caem no bin correspondente
+            self._add(other.values, other.counts)
+        return self
+
+    def mann_whitney(self):
+        """
+        U da classe 0 e p-valor bilateral (aproximação normal com correção de
+        empates e de continuidade, como scipy.stats.mannwhitneyu assintótico)
+        """
+        from scipy.special import ndtr
+
+        low, high = self.counts.astype(np.float64)
+        n1, n2 = low.sum(), high.sum()
+        if n1 == 0 or n2 == 0:
+            return {'u': float('nan'), 'p_value': float('nan'), 'u_error_bound': float('nan')}
+        high_below = np.cumsum(high) - high
+        u1 = float((low * (high_below + 0.5 * high)).sum())
+        ties = low + high
+        n = n1 + n2
+        s = np.sqrt(n1 * n2 / 12 * ((n + 1) - (ties ** 3 - ties).sum() / (n * (n - 1))))
+        u = max(u1, n1 * n2 - u1)
+        p_value = float(np.clip(2 * ndtr(-(u - n1 * n2 / 2 - 0.5) / s), 0.0, 1.0)) if s > 0 else 1.0
+        # Pares de classes diferentes no mesmo bin são os únicos de ordem incerta
+        bound = 0.0 if self.exact else float(0.5 * (low * high).sum())
+        return {'u': u1, 'p_value': p_value, 'u_error_bound': bound}
+
+    def contingency(self):
+        """Tabela valores x classes (equivalente a pd.crosstab(feature, alvo))"""
+        return pd.DataFrame(self.counts.T, index=self.values, columns=[0, 1])
+
+
+class EDAStatsAccumulator:
+    """Estatísticas suficientes mergeáveis para a EDA de colunas numéricas"""
+
+    def __init__(self, columns, target=TARGET_COLUMN, max_distinct=DEFAULT_MAX_DISTINCT):
+        self.columns = list(columns)
+        self.target = target
+        if target not in self.columns:
+            raise ValueError(f"Coluna alvo '{target}' ausente de columns")
+        self.features = [c for c in self.columns if c != target]
+        self.max_distinct = max_distinct
+        p, q = len(self.columns), len(self.features)
+
+        # Deslocamento (média do primeiro chunk) evita cancelamento nas somas
+        self.shift = None
+        self.n_rows = 0
+        # Pares completos (i, j): contagem, soma de x_i, soma de x_i², soma de x_i x_j
+        self.pair_n = np.zeros((p, p))
+        self.pair_sx = np.zeros((p, p))
+        self.pair_sxx = np.zeros((p, p))
+        self.pair_sxy = np.zeros((p, p))
+        # Linhas completas nas features (base do VIF, como df[features].dropna())
+        self.complete_n = 0.0
+        self.complete_s = np.zeros(q)
+        self.complete_ss = np.zeros((q, q))
+        # Momentos por classe (2 x q)
+        self.class_n = np.zeros((2, q))
+        self.class_s = np.zeros((2, q))
+        self.class_ss = np.zeros((2, q))
+        self.value_counts = {f: ValueCounts(max_distinct) for f in self.features}
+
+    @classmethod
+    def from_frame(cls, df, target=TARGET_COLUMN, **kwargs):
+        """Acumulador das colunas numéricas de df, já atualizado com df"""
+        columns = df.select_dtypes(include=[np.number]).columns
+        return cls(columns, target, **kwargs).update(df)
+
+    def update(self, frame):
+        """Acumula um chunk (DataFrame com as colunas do acumulador)"""
+        X = frame[self.columns].to_numpy(dtype=np.float64)
+        if len(X) == 0:
+            return self
+        if self.shift is None:
+            self.shift = np.nan_to_num(np.nanmean(X, axis=0))
+        self.n_rows += len(X)
+
+        Xs = X - self.shift
+        valid = ~np.isnan(Xs)
+        M = valid.astype(np.float64)
+        X0 = np.where(valid, Xs, 0.0)
+        self.pair_n += M.T @ M
+        self.pair_sx += X0.T @ M
+        self.pair_sxx += (X0 * X0).T @ M
+        self.pair_sxy += X0.T @ X0
+
+        t = self.columns.index(self.target)
+        feature_index = [self.columns.index(f) for f in self.features]
+        F0, FM = X0[:, feature_index], M[:, feature_index]
+        complete = FM.all(axis=1)
+        Fc = F0[complete]
+        self.complete_n += len(Fc)
+        self.complete_s += Fc.sum(axis=0)
+        self.complete_ss += Fc.T @ Fc
+
+        y = X[:, t]
+        for k in (0, 1):
+            rows = y == k
+            self.class_n[k] += FM[rows].sum(axis=0)
+            self.class_s[k] += F0[rows].sum(axis=0)
+            self.class_ss[k] += (F0[rows] ** 2).sum(axis=0)
+
+        labelled = ~np.isnan(y)
+        for j, feature in zip(feature_index, self.features):
+            rows = valid[:, j] & labelled
+            self.value_counts[feature].update(X[rows, j], y[rows])
+        return self
+
+    def _reshift(self, shift):
+        """Reexpressa as somas em relação a um novo deslocamento"""
+        d = shift - self.shift
+        n, sx = self.pair_n, self.pair_sx
+        sx_t = sx.T
+        self.pair_sxy = self.pair_sxy - d[None, :] * sx - d[:, None] * sx_t + n * np.outer(d, d)
+        self.pair_sxx = self.pair_sxx - 2 * d[:, None] * sx + n * (d ** 2)[:, None]
+        self.pair_sx = sx - n * d[:, None]
+
+        feature_index = [self.columns.index(f) for f in self.features]
+        df = d[feature_index]
+        s = self.complete_s
+        self.complete_ss = (self.complete_ss - np.outer(s, df) - np.outer(df, s)
+                            + self.complete_n * np.outer(df, df))
+        self.complete_s = s - self.complete_n * df
+        self.class_ss = self.class_ss - 2 * df * self.class_s + self.class_n * df ** 2
+        self.class_s = self.class_s - self.class_n * df
+        self.shift = shift
+
+    def merge(self, other):
+        """Mescla o estado de outro acumulador (outro chunk, worker ou lote de linhas)"""
+        if other.columns != self.columns or other.target != self.target:
+            raise ValueError("Acumuladores com colunas diferentes")
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+        other = other.copy()
+        other._reshift(self.shift)
+        for attr in ('n_rows', 'pair_n', 'pair_sx', 'pair_sxx', 'pair_sxy', 'complete_n',
+                     'complete_s', 'complete_ss', 'class_n', 'class_s', 'class_ss'):
+            setattr(self, attr, getattr(self, attr) + getattr(other, attr))
+        for feature in self.features:
+            self.value_counts[feature].merge(other.value_counts[feature])
+        return self
+
+    def copy(self):
+        clone = EDAStatsAccumulator(self.columns, self.target, self.max_distinct)
+        clone._set_state(self._state())
+        return clone
+
+    # ----------------------------------------
+    # Resultados
+    # ----------------------------------------
+
+    def correlation(self, min_periods=1):
+        """Matriz de correlação de Pearson com pares completos (DataFrame.corr)"""
+        n = self.pair_n
+        sx, sy = self.pair_sx, self.pair_sx.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = self.pair_sxy - sx * sy / n
+            var_x = self.pair_sxx - sx ** 2 / n
+            var_y = self.pair_sxx.T - sy ** 2 / n
+            r = cov / np.sqrt(var_x * var_y)
+        r[(n < max(min_periods, 2)) | ~np.isfinite(r)] = np.nan
+        r = np.clip(r, -1.0, 1.0)
+        np.fill_diagonal(r, np.where(np.diag(n) >= 2, 1.0, np.nan))
+        return pd.DataFrame(r, index=self.columns, columns=self.columns)
+
+    def vif(self, features=None, centered=True):
+        """
+        VIF de todas as features com uma inversão: centered=True usa a
+        inversa da matriz de correlação (regressões com intercepto);
+        centered=False usa a matriz de produtos cruzados sem centrar
+        (statsmodels variance_inflation_factor sem constante, notebook 01).
+        A base são as linhas completas em todas as features do acumulador.
+        """
+        features = list(features or self.features)
+        index = [self.features.index(f) for f in features]
+        n, s, ss = self.complete_n, self.complete_s[index], self.complete_ss[np.ix_(index, index)]
+        if centered:
+            matrix = ss - np.outer(s, s) / n
+            scale = np.sqrt(np.diag(matrix))
+            matrix = matrix / np.outer(scale, scale)
+        else:
+            shift = self.shift[[self.columns.index(f) for f in features]]
+            matrix = ss + np.outer(s, shift) + np.outer(shift, s) + n * np.outer(shift, shift)
+        try:
+            inverse = np.linalg.inv(matrix)
+        except np.linalg.LinAlgError:
+            inverse = np.linalg.pinv(matrix)
+        values = np.diag(inverse) if centered else np.diag(matrix) * np.diag(inverse)
+        vif = pd.DataFrame({'Feature': features, 'VIF': values})
+        vif['Nível'] = vif['VIF'].apply(vif_level)
+        return vif.sort_values('VIF', ascending=False).reset_index(drop=True)
+
+    def group_stats(self, features=None):
+        """Tabela de analise_estatistica_completa (notebook 01): médias, Cohen's d e Mann-Whitney"""
+        rows = []
+        for feature in features or self.features:
+            j = self.features.index(feature)
+            n0, n1 = self.class_n[:, j]
+            if n0 < 2 or n1 < 2:
+                continue
+            shift = self.shift[self.columns.index(feature)]
+            mean0, mean1 = self.class_s[:, j] / self.class_n[:, j]
+            var0, var1 = (self.class_ss[:, j] - self.class_n[:, j] * np.array([mean0, mean1]) ** 2) / (
+                self.class_n[:, j] - 1)
+            pooled = np.sqrt(((n0 - 1) * var0 + (n1 - 1) * var1) / (n0 + n1 - 2))
+            cohens_d = (mean1 - mean0) / pooled if pooled > 0 else 0.0
+            test = self.value_counts[feature].mann_whitney()
+            mean0, mean1 = mean0 + shift, mean1 + shift
+            rows.append({
+                'variavel': feature,
+                'media_sem_risco': mean0,
+                'desvio_sem_risco': np.sqrt(var0),
+                'media_com_risco': mean1,
+                'desvio_com_risco': np.sqrt(var1),
+                'diferenca_media': mean1 - mean0,
+                'diferenca_percentual': (mean1 - mean0) / abs(mean0) * 100 if mean0 != 0 else 0,
+                'p_value': test['p_value'],
+                'significativo': 'Sim' if test['p_value'] < SIGNIFICANCE_LEVEL else 'Não',
+                'cohens_d': cohens_d,
+                'effect_size': effect_size_label(cohens_d),
+                'n_sem_risco': int(n0),
+                'n_com_risco': int(n1),
+                'exato': self.value_counts[feature].exact
+            })
+        stats = pd.DataFrame(rows)
+        if stats.empty:
+            return stats
+        return stats.sort_values('cohens_d', key=abs, ascending=False).reset_index(drop=True)
+
+    def chi_square(self, features):
+        """χ² de independência feature x alvo (chi2_contingency, como no notebook 01)"""
+        from scipy.stats import chi2_contingency
+
+        rows = []
+        for feature in features:
+            table = self.value_counts[feature].contingency()
+            table = table[table.sum(axis=1) > 0]
+            chi2, p_value = chi2_contingency(table.to_numpy())[:2]
+            rows.append({'variavel': feature, 'chi2': chi2, 'p_value': p_value,
+                         'significativo': 'Sim' if p_value < SIGNIFICANCE_LEVEL else 'Não'})
+        return pd.DataFrame(rows)
+
+    # ----------------------------------------
+    # Persistência
+    # ----------------------------------------
+
+    _ARRAYS = ('pair_n', 'pair_sx', 'pair_sxx', 'pair_sxy', 'complete_s', 'complete_ss',
+               'class_n', 'class_s', 'class_ss')
+
+    def _state(self):
+        state = {attr: getattr(self, attr).copy() for attr in self._ARRAYS}
+        state['shift'] = None if self.shift is None else self.shift.copy()
+        state['n_rows'], state['complete_n'] = self.n_rows, self.complete_n
+        state['value_counts'] = {
+            f: (vc.values.copy(), vc.counts.copy(), vc.exact) for f, vc in self.value_counts.items()
+        }
+        return state
+
+    def _set_state(self, state):
+        for attr in self._ARRAYS:
+            setattr(self, attr, state[attr])
+        self.shift, self.n_rows, self.complete_n = state['shift'], state['n_rows'], state['complete_n']
+        for feature, (values, counts, exact) in state['value_counts'].items():
+            vc = self.value_counts[feature]
+            vc.values, vc.counts, vc.exact = values, counts, exact
+
+    def save(self, path):
+        """Grava o estado em .npz (linhas novas depois entram com load + update)"""
+        state = self._state()
+        arrays = {attr: state[attr] for attr in self._ARRAYS}
+        for i, feature in enumerate(self.features):
+            values, counts, _ = state['value_counts'][feature]
+            arrays[f'values_{i}'], arrays[f'counts_{i}'] = values, counts
+        meta = {
+            'columns': self.columns, 'target': self.target, 'max_distinct': self.max_distinct,
+            'n_rows': self.n_rows, 'complete_n': self.complete_n,
+            'shift': None if self.shift is None else self.shift.tolist(),
+            'exact': [self.value_counts[f].exact for f in self.features]
+        }
+        np.savez(path, meta=np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            acc = cls(meta['columns'], meta['target'], meta['max_distinct'])
+            state = {attr: data[attr] for attr in cls._ARRAYS}
+            state['shift'] = None if meta['shift'] is None else np.array(meta['shift'])
+            state['n_rows'], state['complete_n'] = meta['n_rows'], meta['complete_n']
+            state['value_counts'] = {
+                f: (data[f'values_{i}'], data[f'counts_{i}'], meta['exact'][i])
+                for i, f in enumerate(acc.features)
+            }
+        acc._set_state(state)
+        return acc
+
+
+def eda_statistics(source, chunk_size=DEFAULT_CHUNK_SIZE, target=None, state=None):
+    """
+    Acumulador atualizado com um DataFrame, um CSV ou um diretório de coorte
+    (lidos em chunks). state: acumulador anterior ao qual as linhas são somadas.
+    """
+    if isinstance(source, pd.DataFrame):
+        chunks = [source]
+    else:
+        from clinical_fast.chunked_validation import chunk_source
+        chunks = chunk_source(source, chunk_size)()
+
+    acc = state
+    for frame in chunks:
+        if acc is None:
+            if target is None:
+                from clinical_fast.chunked_validation import find_target_column
+                target = find_target_column(list(frame.columns))
+            columns = frame.select_dtypes(include=[np.number]).columns
+            acc = EDAStatsAccumulator(columns, target)
+        acc.update(frame)
+    if acc is None:
+        raise ValueError(f"Nenhuma linha em {source}")
+    return acc
+
+
+# ========================================
+# BENCHMARK
+# ========================================
+
+def per_feature_statistics(df, target=TARGET_COLUMN):
+    """
+    Abordagem do notebook 01: DataFrame.corr, uma regressão por feature
+    para o VIF (com e sem intercepto) e testes por variável com scipy.
+    """
+    from scipy.stats import mannwhitneyu
+
+    correlation = df.corr()
+    features = [c for c in df.columns if c != target]
+    X = df[features].dropna().to_numpy()
+    vif = {}
+    for centered in (True, False):
+        values = []
+        for i in range(X.shape[1]):
+            others = np.delete(X, i, axis=1)
+            if centered:
+                others = np.column_stack([np.ones(len(X)), others])
+            coef = np.linalg.lstsq(others, X[:, i], rcond=None)[0]
+            rss = ((X[:, i] - others @ coef) ** 2).sum()
+            tss = ((X[:, i] - X[:, i].mean()) ** 2).sum() if centered else (X[:, i] ** 2).sum()
+            values.append(tss / rss)
+        vif[centered] = np.array(values)
+
+    rows = []
+    for var in features:
+        low = df.loc[df[target] == 0, var].dropna()
+        high = df.loc[df[target] == 1, var].dropna()
+        pooled = np.sqrt(((len(low) - 1) * low.var() + (len(high) - 1) * high.var())
+                         / (len(low) + len(high) - 2))
+        rows.append({'variavel': var, 'cohens_d': (high.mean() - low.mean()) / pooled,
+                     'p_value': mannwhitneyu(low, high, alternative='two-sided').pvalue})
+    return correlation, vif, pd.DataFrame(rows).set_index('variavel')
+
+
+def run_benchmark(n_rows=1_000_000, chunk_size=250_000, new_rows=50_000):
+    """Abordagem por feature vs acumulador (uma passada, em chunks e incremental)"""
+    from data.cohort import COLUMNS, FEATURES, chunk_rng, generate_chunk
+
+    chunk = generate_chunk(chunk_rng(42, 0), n_rows + new_rows, dtype=np.float64)
+    df = pd.DataFrame({c: chunk[c] for c in COLUMNS})
+    base, extra = df.iloc[:n_rows], df.iloc[n_rows:]
+    timings = {}
+
+    start = time.perf_counter()
+    correlation, vif, tests = per_feature_statistics(base)
+    timings['per_feature'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    acc = EDAStatsAccumulator(COLUMNS)
+    for offset in range(0, n_rows, chunk_size):
+        acc.update(base.iloc[offset:offset + chunk_size])
+    stats = acc.group_stats().set_index('variavel')
+    centered = acc.vif(centered=True).set_index('Feature')['VIF']
+    uncentered = acc.vif(centered=False).set_index('Feature')['VIF']
+    acc_correlation = acc.correlation()
+    timings['accumulator'] = time.perf_counter() - start
+
+    # Linhas novas: só o lote novo é processado
+    start = time.perf_counter()
+    acc.update(extra)
+    acc.vif()
+    acc.group_stats()
+    timings['incremental_update'] = time.perf_counter() - start
+    start = time.perf_counter()
+    per_feature_statistics(df)
+    timings['per_feature_recompute'] = time.perf_counter() - start
+
+    differences = {
+        'correlation': float(np.nanmax(np.abs(acc_correlation.to_numpy() - correlation.to_numpy()))),
+        'vif_centered': float(np.max(np.abs(centered[FEATURES].to_numpy() / vif[True] - 1))),
+        'vif_uncentered': float(np.max(np.abs(uncentered[FEATURES].to_numpy() / vif[False] - 1))),
+        'cohens_d': float(np.max(np.abs(stats.loc[FEATURES, 'cohens_d'] - tests.loc[FEATURES, 'cohens_d']))),
+        'p_value': float(np.max(np.abs(stats.loc[FEATURES, 'p_value'] - tests.loc[FEATURES, 'p_value'])))
+    }
+    return {'n_rows': n_rows, 'new_rows': new_rows, 'seconds': timings, 'max_difference': differences}
+
+
+def main(argv):
+    if not argv:
+        print(__doc__)
+        return 1
+
+    if argv[0] == 'benchmark':
+        rows = int(argv[1]) if len(argv) > 1 else 1_000_000
+        print("🚀 BENCHMARK - ESTATÍSTICAS DA EDA")
+        print("=" * 80)
+        result = run_benchmark(rows)
+        labels = {
+            'per_feature': 'por feature (notebook 01)',
+            'accumulator': 'acumulador em chunks',
+            'incremental_update': f"+{result['new_rows']:,} linhas (incremental)",
+            'per_feature_recompute': f"+{result['new_rows']:,} linhas (recálculo)"
+        }
+        for name, seconds in result['seconds'].items():
+            print(f"   {labels[name]:<36} {seconds:8.2f}s")
+        print(f"\n📊 {rows:,} linhas | diferença máxima vs abordagem por feature:")
+        for name, value in result['max_difference'].items():
+            print(f"   {name:<16} {value:.2e}")
+        return 0
+
+    state_path = None
+    if '--state' in argv:
+        i = argv.index('--state')
+        state_path = Path(argv[i + 1])
+        argv = argv[:i] + argv[i + 2:]
+    chunk_size = int(argv[1]) if len(argv) > 1 else DEFAULT_CHUNK_SIZE
+
+    print("📊 ESTATÍSTICAS DA EDA")
+    print("=" * 80)
+    state = EDAStatsAccumulator.load(state_path) if state_path and state_path.exists() else None
+    previous_rows = state.n_rows if state is not None else 0
+    acc = eda_statistics(argv[0], chunk_size, state=state)
+    print(f"Linhas: {acc.n_rows:,} ({acc.n_rows - previous_rows:,} novas)")
+    print("\nVIF (centrado):")
+    for _, row in acc.vif().iterrows():
+        print(f"   {row['Feature']:<24} {row['VIF']:8.2f}  {row['Nível']}")
+    print("\nCohen's d / Mann-Whitney:")
+    for _, row in acc.group_stats().iterrows():
+        print(f"   {row['variavel']:<24} d={row['cohens_d']:+.3f} ({row['effect_size']}) "
+              f"p={row['p_value']:.2e}")
+    if state_path:
+        acc.save(state_path)
+        print(f"\n💾 Estado salvo em {state_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
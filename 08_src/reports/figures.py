@@ -0,0 +1,388 @@
+"""
+Figuras padrão dos relatórios (mesmos gráficos de 01_exploratory_analysis e
+da comparação de modelos), no formato de spec de reports.rendering.
+
+As funções de desenho são de nível de módulo (serializáveis para o pool de
+processos) e recebem apenas os dados de que precisam, que entram no hash do
+cache: uma figura só é redesenhada quando os seus dados mudam.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data.datasets import TARGET_COLUMN
+from reports.eda_stats import EDAStatsAccumulator
+from reports.rendering import figure_spec
+
+CONTINUOUS_FEATURES = [
+    'idade', 'cigarros_por_dia', 'colesterol_total', 'pressao_sistolica',
+    'pressao_diastolica', 'imc', 'frequencia_cardiaca', 'glicose'
+]
+CATEGORICAL_FEATURES = ['sexo', 'fumante_atualmente', 'medicamento_pressao', 'diabetes']
+RISK_COLORS = ['#4CAF50', '#F44336']
+RISK_LABELS = ['Baixo Risco', 'Alto Risco']
+
+
+def _plt():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _title(name):
+    return name.replace('_', ' ').title()
+
+
+# ========================================
+# EDA
+# ========================================
+
+def render_target_distribution(inputs):
+    plt = _plt()
+    counts = pd.Series(inputs['target']).value_counts().sort_index()
+    percentages = counts / counts.sum() * 100
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 10))
+    bars = ax1.bar(range(len(counts)), counts.values, color=RISK_COLORS, alpha=0.8, edgecolor='black')
+    ax1.set_xticks(range(len(counts)))
+    ax1.set_xticklabels(RISK_LABELS)
+    ax1.set_ylabel('Número de Pacientes')
+    ax1.set_title('Distribuição de Classes - Risco de Hipertensão', fontweight='bold')
+    ax1.grid(axis='y', alpha=0.3)
+    for bar, count, pct in zip(bars, counts.values, percentages.values):
+        ax1.text(bar.get_x() + bar.get_width() / 2., bar.get_height() + counts.max() * 0.01,
+                 f'{count:,}\n({pct:.1f}%)', ha='center', va='bottom', fontweight='bold')
+
+    _, _, autotexts = ax2.pie(counts.values, labels=RISK_LABELS, colors=RISK_COLORS,
+                              autopct='%1.1f%%', startangle=90, explode=(0.05, 0.05))
+    ax2.set_title('Proporção de Classes', fontweight='bold')
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+        autotext.set_fontsize(12)
+    fig.tight_layout()
+    return fig
+
+
+def render_missing_values(inputs):
+    plt = _plt()
+    missing = pd.Series(inputs['missing_percent'])
+    missing = missing[missing > 0].sort_values()
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.barh(missing.index, missing.values, color='#FF7043', alpha=0.8, edgecolor='black')
+    ax.set_xlabel('Percentual de Valores Ausentes (%)')
+    ax.set_title('Distribuição de Valores Ausentes (Ordem Crescente)', fontweight='bold', pad=20)
+    ax.grid(axis='x', alpha=0.3)
+    for i, value in enumerate(missing.values):
+        ax.text(value + 0.5, i, f'{value:.1f}%', va='center', fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+def render_continuous(inputs, kind='hist'):
+    """Grade 2x4 das variáveis contínuas por risco (histogramas ou boxplots)"""
+    plt = _plt()
+    df = inputs['data']
+    target = df[TARGET_COLUMN]
+
+    fig, axes = plt.subplots(2, 4, figsize=(20, 12))
+    title = 'Distribuições' if kind == 'hist' else 'Boxplots'
+    fig.suptitle(f'{title} das Variáveis Contínuas por Risco de Hipertensão',
+                 fontsize=16, fontweight='bold', y=0.98)
+    for ax, var in zip(axes.ravel(), CONTINUOUS_FEATURES):
+        groups = [df.loc[target == value, var].dropna() for value in (0, 1)]
+        if kind == 'hist':
+            for values, color, label in zip(groups, RISK_COLORS, RISK_LABELS):
+                ax.hist(values, bins=30, alpha=0.7, color=color, label=label, density=True,
+                        edgecolor='black', linewidth=0.5)
+                ax.axvline(values.mean(), color=color, linestyle='--', linewidth=2)
+            ax.set_ylabel('Densidade', fontweight='bold')
+            ax.legend(loc='upper right')
+        else:
+            box = ax.boxplot(groups, patch_artist=True, widths=0.6)
+            ax.set_xticks([1, 2])
+            ax.set_xticklabels(RISK_LABELS)
+            for patch, color in zip(box['boxes'], RISK_COLORS):
+                patch.set_facecolor(color)
+                patch.set_alpha(0.7)
+        ax.set_title(_title(var), fontweight='bold', fontsize=12)
+        ax.grid(axis='y', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def render_categorical(inputs):
+    plt = _plt()
+    df = inputs['data']
+
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('Distribuições das Variáveis Categóricas por Risco de Hipertensão',
+                 fontsize=16, fontweight='bold', y=0.98)
+    for ax, var in zip(axes.ravel(), CATEGORICAL_FEATURES):
+        crosstab = pd.crosstab(df[var], df[TARGET_COLUMN], normalize='columns') * 100
+        crosstab.plot(kind='bar', ax=ax, color=RISK_COLORS, alpha=0.8, edgecolor='black', linewidth=1)
+        ax.set_title(_title(var), fontweight='bold', fontsize=12)
+        ax.set_xlabel('')
+        ax.set_ylabel('Percentual (%)', fontweight='bold')
+        ax.legend(RISK_LABELS, loc='upper right')
+        ax.tick_params(axis='x', rotation=45)
+        ax.grid(axis='y', alpha=0.3)
+        for container in ax.containers:
+            ax.bar_label(container, fmt='%.1f%%', fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+def render_correlation_matrix(inputs):
+    plt = _plt()
+    import seaborn as sns
+
+    correlation_matrix = inputs['correlation']
+    fig, ax = plt.subplots(figsize=(12, 10))
+    mask = np.triu(np.ones_like(correlation_matrix, dtype=bool))
+    sns.heatmap(correlation_matrix, mask=mask, annot=True, cmap='RdBu_r', center=0, square=True,
+                linewidths=0.5, cbar_kws={"shrink": .8}, fmt='.2f', ax=ax)
+    ax.set_title('Matriz de Correlação - Variáveis Numéricas', fontweight='bold', pad=20)
+    fig.tight_layout()
+    return fig
+
+
+def render_statistical_tests(inputs):
+    plt = _plt()
+    stats = inputs['stats']
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 6))
+    colors = ['#d32f2f' if x < 0 else '#1976d2' for x in stats['cohens_d']]
+    ax1.barh(range(len(stats)), stats['cohens_d'], color=colors, alpha=0.8, edgecolor='black')
+    ax1.set_yticks(range(len(stats)))
+    ax1.set_yticklabels([_title(v) for v in stats['variavel']])
+    ax1.set_xlabel("Cohen's d (Effect Size)", fontweight='bold')
+    ax1.set_title('Effect Size das Variáveis Mais Discriminantes', fontweight='bold', pad=15)
+    for value, color, label in ((0.2, 'gray', 'Pequeno'), (0.5, 'orange', 'Médio'), (0.8, 'red', 'Grande')):
+        ax1.axvline(x=value, color=color, linestyle='--', alpha=0.3, label=label)
+        ax1.axvline(x=-value, color=color, linestyle='--', alpha=0.3)
+    ax1.legend(loc='lower right')
+    ax1.grid(axis='x', alpha=0.3)
+
+    log_p = -np.log10(np.maximum(stats['p_value'].to_numpy(), 1e-300))
+    ax2.barh(range(len(stats)), log_p, color='#7E57C2', alpha=0.8, edgecolor='black')
+    ax2.set_yticks(range(len(stats)))
+    ax2.set_yticklabels([_title(v) for v in stats['variavel']])
+    ax2.axvline(x=-np.log10(0.05), color='red', linestyle='--', alpha=0.7, label='p = 0.05')
+    ax2.set_xlabel('-log10(p-valor) - Mann-Whitney U', fontweight='bold')
+    ax2.set_title('Significância Estatística', fontweight='bold', pad=15)
+    ax2.legend(loc='lower right')
+    ax2.grid(axis='x', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def render_vif(inputs):
+    plt = _plt()
+    from matplotlib.patches import Rectangle
+
+    vif = inputs['vif'].sort_values('VIF')
+    colors = ['gray' if pd.isna(v) else '#4CAF50' if v < 5 else '#FF9800' if v < 10 else '#F44336'
+              for v in vif['VIF']]
+    fig, ax = plt.subplots(figsize=(12, 8))
+    ax.barh(range(len(vif)), vif['VIF'], color=colors, alpha=0.8, edgecolor='black')
+    ax.set_yticks(range(len(vif)))
+    ax.set_yticklabels([_title(f) for f in vif['Feature']])
+    ax.set_xlabel('VIF (Variance Inflation Factor)', fontweight='bold', fontsize=12)
+    ax.set_title('Análise de Multicolinearidade (VIF)', fontweight='bold', fontsize=14, pad=20)
+    ax.axvline(x=5, color='orange', linestyle='--', alpha=0.7, linewidth=2, label='VIF = 5 (Limite aceitável)')
+    ax.axvline(x=10, color='red', linestyle='--', alpha=0.7, linewidth=2, label='VIF = 10 (Limite crítico)')
+    for i, value in enumerate(vif['VIF']):
+        if not pd.isna(value):
+            ax.text(value + 0.5, i, f'{value:.2f}', va='center', ha='left', fontweight='bold')
+    handles = ax.get_legend_handles_labels()[0] + [
+        Rectangle((0, 0), 1, 1, fc=color, alpha=0.8, edgecolor='black', label=label)
+        for color, label in (('#4CAF50', 'Aceitável (< 5)'), ('#FF9800', 'Moderado (5-10)'),
+                             ('#F44336', 'Alto (> 10)'))
+    ]
+    ax.legend(handles=handles, loc='lower right', fontsize=10)
+    ax.grid(axis='x', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+# ========================================
+# MODELOS (05_artifacts)
+# ========================================
+
+def render_confusion_matrices(inputs, model_name):
+    """Matrizes de confusão nos thresholds clínicos de um modelo"""
+    plt = _plt()
+    y, y_proba, thresholds = inputs['y'], inputs['y_proba'], inputs['thresholds']
+
+    fig, axes = plt.subplots(1, len(thresholds), figsize=(6 * len(thresholds), 5), squeeze=False)
+    for ax, (scenario, threshold) in zip(axes[0], thresholds.items()):
+        y_pred = (y_proba >= threshold).astype(int)
+        matrix = np.array([[np.sum((y == t) & (y_pred == p)) for p in (0, 1)] for t in (0, 1)])
+        ax.imshow(matrix, cmap='Blues')
+        for (i, j), value in np.ndenumerate(matrix):
+            ax.text(j, i, f'{value:,}', ha='center', va='center', fontweight='bold',
+                    color='white' if value > matrix.max() / 2 else 'black')
+        ax.set_xticks([0, 1])
+        ax.set_xticklabels(RISK_LABELS)
+        ax.set_yticks([0, 1])
+        ax.set_yticklabels(RISK_LABELS)
+        ax.set_xlabel('Predito')
+        ax.set_ylabel('Real')
+        ax.set_title(f'{_title(scenario)} (threshold {threshold:.3f})', fontweight='bold')
+    fig.suptitle(f'Matrizes de Confusão - {model_name}', fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+def _curves(y, y_proba):
+    from sklearn.metrics import precision_recall_curve, roc_auc_score, roc_curve, average_precision_score
+
+    fpr, tpr, _ = roc_curve(y, y_proba)
+    precision, recall, _ = precision_recall_curve(y, y_proba)
+    return {'roc': (fpr, tpr, roc_auc_score(y, y_proba)),
+            'pr': (recall, precision, average_precision_score(y, y_proba))}
+
+
+def render_roc_comparison(inputs):
+    plt = _plt()
+    fig, ax = plt.subplots(figsize=(10, 8))
+    for version, scores in inputs['scores'].items():
+        fpr, tpr, auc = _curves(inputs['y'], scores)['roc']
+        ax.plot(fpr, tpr, linewidth=2, label=f'{version} (AUC = {auc:.3f})')
+    ax.plot([0, 1], [0, 1], 'k--', alpha=0.5)
+    ax.set_xlabel('Taxa de Falsos Positivos (1 - Especificidade)', fontweight='bold')
+    ax.set_ylabel('Sensibilidade', fontweight='bold')
+    ax.set_title('Curvas ROC - Comparação de Modelos', fontweight='bold', pad=15)
+    ax.legend(loc='lower right')
+    ax.grid(alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def render_pr_comparison(inputs):
+    plt = _plt()
+    fig, ax = plt.subplots(figsize=(10, 8))
+    for version, scores in inputs['scores'].items():
+        recall, precision, ap = _curves(inputs['y'], scores)['pr']
+        ax.plot(recall, precision, linewidth=2, label=f'{version} (AP = {ap:.3f})')
+    ax.axhline(np.mean(inputs['y']), color='gray', linestyle='--', alpha=0.7, label='Prevalência')
+    ax.set_xlabel('Recall (Sensibilidade)', fontweight='bold')
+    ax.set_ylabel('Precisão', fontweight='bold')
+    ax.set_title('Curvas Precision-Recall - Comparação de Modelos', fontweight='bold', pad=15)
+    ax.legend(loc='upper right')
+    ax.grid(alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def render_threshold_metrics(inputs, model_name):
+    """Sensibilidade, especificidade, precisão e F2 em função do threshold"""
+    plt = _plt()
+    y, y_proba = inputs['y'], inputs['y_proba']
+    grid = np.linspace(0.01, 0.99, 99)
+    predictions = y_proba[None, :] >= grid[:, None]
+    tp = (predictions & (y == 1)).sum(axis=1)
+    fp = (predictions & (y == 0)).sum(axis=1)
+    n_pos, n_neg = (y == 1).sum(), (y == 0).sum()
+    sensitivity = tp / n_pos
+    specificity = 1 - fp / n_neg
+    precision = np.divide(tp, tp + fp, out=np.zeros(len(grid)), where=(tp + fp) > 0)
+    f2 = np.divide(5 * precision * sensitivity, 4 * precision + sensitivity,
+                   out=np.zeros(len(grid)), where=(4 * precision + sensitivity) > 0)
+
+    fig, ax = plt.subplots(figsize=(12, 7))
+    for values, label, color in ((sensitivity, 'Sensibilidade', '#F44336'),
+                                 (specificity, 'Especificidade', '#4CAF50'),
+                                 (precision, 'Precisão', '#1976D2'), (f2, 'F2', '#7E57C2')):
+        ax.plot(grid, values, linewidth=2, label=label, color=color)
+    # Cenários com o mesmo threshold compartilham a linha e o rótulo
+    scenarios_by_threshold = {}
+    for scenario, threshold in inputs['thresholds'].items():
+        scenarios_by_threshold.setdefault(round(threshold, 6), []).append(scenario)
+    for threshold, scenarios in scenarios_by_threshold.items():
+        ax.axvline(threshold, color='black', linestyle=':', alpha=0.6)
+        ax.text(threshold, 1.02, ' / '.join(scenarios), va='bottom', ha='center', fontsize=8)
+    ax.set_xlabel('Threshold', fontweight='bold')
+    ax.set_ylabel('Métrica', fontweight='bold')
+    ax.set_title(f'Métricas por Threshold - {model_name}', fontweight='bold', pad=15)
+    ax.set_ylim(0, 1.1)
+    ax.legend(loc='center right')
+    ax.grid(alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def render_feature_importance(inputs, model_name):
+    plt = _plt()
+    importance = pd.Series(inputs['importance'], index=inputs['features']).sort_values()
+    fig, ax = plt.subplots(figsize=(10, 7))
+    ax.barh([_title(f) for f in importance.index], importance.values, color='#1976D2',
+            alpha=0.8, edgecolor='black')
+    ax.set_xlabel('Importância', fontweight='bold')
+    ax.set_title(f'Importância das Features - {model_name}', fontweight='bold', pad=15)
+    ax.grid(axis='x', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+# ========================================
+# CATÁLOGO
+# ========================================
+
+def eda_specs(df):
+    # Correlações, Cohen's d, Mann-Whitney e VIF saem de uma passada sobre os dados
+    stats = EDAStatsAccumulator.from_frame(df)
+    return [
+        figure_spec('target_distribution', render_target_distribution, {'target': df[TARGET_COLUMN]}),
+        figure_spec('missing_values_analysis', render_missing_values,
+                    {'missing_percent': (df.isnull().mean() * 100).round(6).to_dict()}),
+        figure_spec('continuous_distributions', render_continuous,
+                    {'data': df[CONTINUOUS_FEATURES + [TARGET_COLUMN]]}, {'kind': 'hist'}),
+        figure_spec('continuous_boxplots', render_continuous,
+                    {'data': df[CONTINUOUS_FEATURES + [TARGET_COLUMN]]}, {'kind': 'box'}),
+        figure_spec('categorical_distributions', render_categorical,
+                    {'data': df[CATEGORICAL_FEATURES + [TARGET_COLUMN]]}),
+        figure_spec('correlation_matrix', render_correlation_matrix, {'correlation': stats.correlation()}),
+        figure_spec('statistical_tests_results', render_statistical_tests,
+                    {'stats': stats.group_stats(CONTINUOUS_FEATURES)[['variavel', 'cohens_d', 'p_value']]}),
+        figure_spec('vif_analysis', render_vif, {'vif': stats.vif()[['Feature', 'VIF']]})
+    ]
+
+
+def model_specs(df, versions=None):
+    """Figuras de cada bundle de 05_artifacts e das comparações entre eles"""
+    from inference.artifacts import ARTIFACTS_DIR, load_bundle
+
+    versions = versions or sorted(p.name for p in ARTIFACTS_DIR.iterdir() if (p / 'metadata.json').exists())
+    y = df[TARGET_COLUMN].to_numpy()
+    scores, specs = {}, []
+    for version in versions:
+        bundle = load_bundle(version)
+        scores[version] = bundle.predict_proba(df)
+        inputs = {'y': y, 'y_proba': scores[version], 'thresholds': bundle.thresholds}
+        label = f'{bundle.model_name} ({version})'
+        specs.append(figure_spec(f'{version}_confusion_matrices', render_confusion_matrices, inputs,
+                                 {'model_name': label}, subfolder='model_comparison'))
+        specs.append(figure_spec(f'{version}_threshold_metrics', render_threshold_metrics, inputs,
+                                 {'model_name': label}, subfolder='model_comparison'))
+        if hasattr(bundle.model, 'feature_importances_'):
+            specs.append(figure_spec(f'{version}_feature_importance', render_feature_importance,
+                                     {'importance': bundle.model.feature_importances_,
+                                      'features': bundle.features},
+                                     {'model_name': label}, subfolder='model_comparison'))
+    specs.append(figure_spec('roc_comparison', render_roc_comparison, {'y': y, 'scores': scores},
+                             subfolder='model_comparison'))
+    specs.append(figure_spec('pr_comparison', render_pr_comparison, {'y': y, 'scores': scores},
+                             subfolder='model_comparison'))
+    return specs
+
+
+def report_specs(df=None):
+    """Catálogo completo: EDA + comparação de modelos"""
+    if df is None:
+        from data.datasets import load_dataset
+        df, _ = load_dataset()
+    return eda_specs(df) + model_specs(df)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Pipeline de Renderização de Figuras
+
+Cada figura é descrita por uma spec (nome, subpasta, função de desenho,
+dados de entrada e parâmetros). O pipeline:
+
+- calcula uma chave por figura: hash dos dados, dos parâmetros, do código
+  do módulo da função de desenho (inclui auxiliares como _plt e _curves),
+  de RENDER_VERSION, do dpi e da versão do matplotlib;
+- pula figuras cuja chave é igual à do manifesto (04_reports/.render_cache.json)
+  e cujo arquivo ainda existe;
+- desenha as demais num pool de processos com o backend Agg;
+- grava cada PNG num arquivo temporário e renomeia (os.replace), de modo
+  que um relatório aberto nunca vê uma imagem pela metade.
+
+Sem os dados brutos, as figuras viriam de dados simulados: a execução é
+recusada, a menos que --allow-simulated seja passado; nesse caso as figuras
+vão para logs/simulated/reports e nunca sobrescrevem as de 04_reports.
+
+Uso:
+    python 08_src/reports/rendering.py [--workers N] [--force] [--output diretorio] [--allow-simulated]
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from clinical_fast.prediction_cache import data_hash
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+REPORTS_DIR = PROJECT_ROOT / '04_reports'
+MANIFEST_FILE = '.render_cache.json'
+DEFAULT_DPI = 300
+# Incrementar quando a renderização mudar fora do módulo das funções de desenho
+RENDER_VERSION = 1
+
+
+def figure_spec(name, render, inputs=None, params=None, subfolder='eda', dpi=DEFAULT_DPI):
+    """Spec de uma figura: render(inputs, **params) deve retornar uma Figure"""
+    return {
+        'name': name, 'subfolder': subfolder, 'render': render,
+        'inputs': inputs or {}, 'params': params or {}, 'dpi': dpi
+    }
+
+
+def spec_path(spec, output_dir=REPORTS_DIR):
+    return Path(output_dir) / spec['subfolder'] / f"{spec['name']}.png"
+
+
+_SOURCE_HASHES = {}
+
+
+def _source_hash(fn):
+    """
+    Hash do código do módulo da função de desenho: mudar o gráfico ou um
+    auxiliar que ele chama invalida o cache.
+    """
+    if fn not in _SOURCE_HASHES:
+        module = inspect.getmodule(fn)
+        source = inspect.getsource(module) if module is not None else inspect.getsource(fn)
+        _SOURCE_HASHES[fn] = hashlib.sha256(source.encode()).hexdigest()
+    return _SOURCE_HASHES[fn]
+
+
+def _input_hash(value):
+    if isinstance(value, dict):
+        return hashlib.sha256(json.dumps({str(k): _input_hash(v) for k, v in value.items()},
+                                         sort_keys=True).encode()).hexdigest()
+    if hasattr(value, 'shape') or isinstance(value, (list, tuple)):
+        try:
+            return data_hash(value)
+        except (TypeError, ValueError):
+            pass
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def spec_key(spec):
+    """Chave de cache da figura"""
+    import matplotlib
+
+    digest = hashlib.sha256()
+    digest.update(f"{spec['render'].__module__}.{spec['render'].__qualname__}".encode())
+    digest.update(_source_hash(spec['render']).encode())
+    digest.update(json.dumps(spec['params'], sort_keys=True, default=str).encode())
+    digest.update(f"{RENDER_VERSION}:{spec['dpi']}:{matplotlib.__version__}".encode())
+    for name in sorted(spec['inputs']):
+        digest.update(f'{name}={_input_hash(spec["inputs"][name])}'.encode())
+    return digest.hexdigest()[:32]
+
+
+def load_manifest(output_dir=REPORTS_DIR):
+    path = Path(output_dir) / MANIFEST_FILE
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, output_dir=REPORTS_DIR):
+    path = Path(output_dir) / MANIFEST_FILE
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def render_to_file(render, inputs, params, path, dpi=DEFAULT_DPI):
+    """Desenha uma figura e grava o PNG de forma atômica; retorna segundos"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fig = render(inputs, **params)
+    tmp_path = path.with_name(f'.{path.stem}.{os.getpid()}.tmp.png')
+    try:
+        fig.savefig(tmp_path, dpi=dpi, bbox_inches='tight', facecolor='white')
+        os.replace(tmp_path, path)
+    finally:
+        plt.close(fig)
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return time.perf_counter() - start
+
+
+def render_figures(specs, output_dir=REPORTS_DIR, max_workers=None, force=False):
+    """
+    Renderiza as specs alteradas. Retorna {'rendered', 'skipped', 'failed',
+    'seconds'}; falhas de uma figura não interrompem as demais.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    start = time.perf_counter()
+
+    pending, skipped = [], []
+    for spec in specs:
+        path = spec_path(spec, output_dir)
+        relative = str(path.relative_to(output_dir))
+        key = spec_key(spec)
+        if not force and manifest.get(relative) == key and path.exists():
+            skipped.append(relative)
+        else:
+            pending.append((spec, path, relative, key))
+
+    rendered, failed = {}, {}
+    max_workers = max_workers or os.cpu_count() or 1
+    if pending and max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+            futures = {
+                pool.submit(render_to_file, spec['render'], spec['inputs'], spec['params'],
+                            path, spec['dpi']): (relative, key)
+                for spec, path, relative, key in pending
+            }
+            for future in as_completed(futures):
+                relative, key = futures[future]
+                try:
+                    rendered[relative] = future.result()
+                    manifest[relative] = key
+                except Exception as e:
+                    failed[relative] = str(e)
+    else:
+        for spec, path, relative, key in pending:
+            try:
+                rendered[relative] = render_to_file(spec['render'], spec['inputs'], spec['params'],
+                                                    path, spec['dpi'])
+                manifest[relative] = key
+            except Exception as e:
+                failed[relative] = str(e)
+
+    save_manifest(manifest, output_dir)
+    return {'rendered': rendered, 'skipped': skipped, 'failed': failed,
+            'seconds': time.perf_counter() - start}
+
+
+def output_for_source(source, output=None, allow_simulated=False):
+    """
+    Diretório de saída para a origem dos dados; None quando a execução deve
+    ser recusada (dados simulados sem --allow-simulated ou apontando para
+    04_reports).
+    """
+    from data.datasets import SIMULATED_OUTPUT_DIR
+
+    if source == 'real':
+        return Path(output) if output else REPORTS_DIR
+    if not allow_simulated:
+        return None
+    output = Path(output).resolve() if output else SIMULATED_OUTPUT_DIR / 'reports'
+    if output == REPORTS_DIR or REPORTS_DIR in output.parents:
+        return None
+    return output
+
+
+def main(argv=None):
+    import argparse
+
+    from data.datasets import load_dataset
+    from reports.figures import report_specs
+
+    parser = argparse.ArgumentParser(description="Renderização das figuras de 04_reports")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="ignora o cache")
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--allow-simulated', action='store_true',
+                        help="sem dados brutos, renderiza dados simulados em logs/simulated/reports")
+    args = parser.parse_args(argv)
+
+    print("🎨 RENDERIZAÇÃO DAS FIGURAS DOS RELATÓRIOS")
+    print("=" * 80)
+    start = time.perf_counter()
+    df, source = load_dataset()
+    output_dir = output_for_source(source, args.output, args.allow_simulated)
+    if output_dir is None:
+        print("❌ Dados brutos não encontrados - figuras de dados simulados não vão para 04_reports")
+        print("   Use --allow-simulated (saída em logs/simulated/reports ou --output fora de 04_reports)")
+        return 1
+    if source != 'real':
+        print(f"⚠️ Dados simulados (apenas demonstração) - saída em {output_dir}")
+    specs = report_specs(df)
+    prepare_seconds = time.perf_counter() - start
+    result = render_figures(specs, output_dir, args.workers, args.force)
+
+    for relative, seconds in sorted(result['rendered'].items()):
+        print(f"   ✅ {relative:<60} {seconds:6.2f}s")
+    for relative, error in sorted(result['failed'].items()):
+        print(f"   ❌ {relative:<60} {error}")
+    print(f"\n📊 {len(specs)} figuras: {len(result['rendered'])} renderizadas, "
+          f"{len(result['skipped'])} em cache, {len(result['failed'])} com erro")
+    print(f"⏱️ Preparação dos dados {prepare_seconds:.1f}s | renderização {result['seconds']:.1f}s")
+    return 1 if result['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
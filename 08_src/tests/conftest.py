@@ -0,0 +1,13 @@
+"""
+Configuração comum dos testes (pytest): 08_src no sys.path
+
+Uso:
+    python -m pytest -q 08_src/tests
+"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
@@ -0,0 +1,151 @@
+"""
+Testes do cliente assíncrono da API de predição (user-050)
+"""
+
+import asyncio
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from client.async_client import (BATCH_PATH, PREDICT_PATH, ApiError, AsyncPredictionClient,
+                                 _server_url, start_standin_server)
+
+PATIENT = {
+    'sexo': 1, 'idade': 55, 'fumante_atualmente': 0, 'cigarros_por_dia': 0,
+    'medicamento_pressao': 0, 'diabetes': 0, 'colesterol_total': 220,
+    'pressao_sistolica': 140, 'pressao_diastolica': 90, 'imc': 27.5,
+    'frequencia_cardiaca': 78, 'glicose': 90
+}
+
+
+def _run(coroutine_fn, **options):
+    """Executa coroutine_fn(client) num cliente apontado para um host que nunca é contatado"""
+    async def run():
+        async with AsyncPredictionClient('http://127.0.0.1:9', **options) as client:
+            return await coroutine_fn(client)
+    return asyncio.run(run())
+
+
+def _fake_request(responses, calls=None):
+    async def request(method, path, payload=None):
+        if calls is not None:
+            calls.append(path)
+        response = responses[path]
+        if isinstance(response, Exception):
+            raise response
+        return response
+    return request
+
+
+@pytest.mark.parametrize('response', [
+    {'predictions': [{'probability': 0.1}]},
+    {'predictions': [{'probability': 0.1}, 'texto']},
+    {'predictions': None},
+    {'erro': 'sem predictions'},
+    None,
+    ['lista']
+])
+def test_short_or_malformed_batch_fails_pending_patients(response):
+    async def scenario(client):
+        client.request = _fake_request({BATCH_PATH: response})
+        return await asyncio.wait_for(client.predict_many([PATIENT] * 3, return_exceptions=True), 5)
+
+    results = _run(scenario, batching=True)
+    assert len(results) == 3
+    assert all(isinstance(result, (dict, ApiError)) for result in results)
+    ok = response['predictions'][:1] if isinstance(response, dict) and response.get('predictions') else []
+    assert results[:len(ok)] == ok
+    assert all(isinstance(result, ApiError) for result in results[len(ok):])
+
+
+def test_batch_error_entries_become_api_errors():
+    async def scenario(client):
+        client.request = _fake_request({BATCH_PATH: {'predictions': [
+            {'probability': 0.3}, {'error': 'invalid_input', 'errors': ['idade deve ser numérico']}
+        ]}})
+        return await client.predict_many([PATIENT, PATIENT], return_exceptions=True)
+
+    ok, failed = _run(scenario, batching=True)
+    assert ok == {'probability': 0.3}
+    assert failed.status == 422 and 'idade deve ser numérico' in str(failed)
+
+
+@pytest.mark.parametrize('status', [400, 403, 404, 405, 422])
+def test_probe_4xx_falls_back_to_single_predictions(status):
+    calls = []
+
+    async def scenario(client):
+        client.request = _fake_request({BATCH_PATH: ApiError(status), PREDICT_PATH: {'probability': 0.2}}, calls)
+        return await client.predict(PATIENT), client.batching
+
+    assert _run(scenario) == ({'probability': 0.2}, False)
+    assert calls == [BATCH_PATH, PREDICT_PATH]
+
+
+def test_probe_server_error_propagates():
+    async def scenario(client):
+        client.request = _fake_request({BATCH_PATH: ApiError(500)})
+        with pytest.raises(ApiError):
+            await client.predict(PATIENT)
+        return client.batching
+
+    assert _run(scenario) is None
+
+
+def test_retries_on_retryable_status():
+    replies = [(503, b''), (429, b'{}'), (200, b'{"probability": 0.4}')]
+
+    async def scenario(client):
+        async def send(method, path, body):
+            return replies.pop(0)
+        client._send = send
+        return await client.request('POST', PREDICT_PATH, PATIENT), client.stats
+
+    result, stats = _run(scenario, backoff=0)
+    assert result == {'probability': 0.4}
+    assert stats['retries'] == 2 and stats['requests'] == 3
+
+
+def test_gives_up_after_max_retries():
+    async def scenario(client):
+        async def send(method, path, body):
+            return 503, b'{"errors": ["indisponivel"]}'
+        client._send = send
+        with pytest.raises(ApiError) as error:
+            await client.request('POST', PREDICT_PATH, PATIENT)
+        return error.value.status, client.stats['requests']
+
+    assert _run(scenario, backoff=0, max_retries=2) == (503, 3)
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = start_standin_server('gb_v1')
+    yield server
+    server.shutdown()
+
+
+def test_batched_matches_single_against_standin_server(server):
+    patients = [PATIENT, {**PATIENT, 'idade': 300}, {**PATIENT, 'imc': 31.0}]
+
+    async def scenario(batching):
+        async with AsyncPredictionClient(_server_url(server), batching=batching) as client:
+            return await client.predict_many(patients, return_exceptions=True), client.stats
+
+    (single, _), (batched, stats) = asyncio.run(scenario(False)), asyncio.run(scenario(None))
+    assert stats['batches'] == 1
+    assert single[0] == batched[0] and single[2] == batched[2]
+    assert isinstance(single[1], ApiError) and isinstance(batched[1], ApiError)
+    assert (single[1].status, batched[1].status) == (422, 422)
+
+
+@pytest.mark.parametrize('body', [b'[1, 2]', b'"texto"', b'{"patients": {}}', b'{'])
+def test_standin_batch_rejects_non_object_body(server, body):
+    request = Request(_server_url(server) + BATCH_PATH, data=body, method='POST')
+    with pytest.raises(HTTPError) as error:
+        urlopen(request, timeout=5)
+    assert error.value.code == 400
+    assert json.loads(error.value.read()) == {'error': 'bad_request'}
+    error.value.close()
@@ -0,0 +1,121 @@
+"""
+Testes do log de auditoria assíncrono (user-032)
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from inference.audit import AuditBackpressureError, AuditLogger, read_audit_log
+
+
+def test_records_written_and_read_back(tmp_path):
+    logger = AuditLogger(tmp_path, batch_size=8, flush_interval=0.05)
+    for i in range(50):
+        logger.log({'i': i})
+    assert logger.flush(5.0)
+    logger.close()
+    assert [record['i'] for record in read_audit_log(tmp_path)] == list(range(50))
+    assert logger.stats['written'] == 50
+    assert logger.stats['errors'] == 0
+
+
+def test_write_failure_keeps_batch_and_thread(tmp_path, monkeypatch):
+    logger = AuditLogger(tmp_path, batch_size=4, flush_interval=0.02)
+    original = AuditLogger._write_batch
+    failures = []
+
+    def flaky(self, batch):
+        if not failures:
+            failures.append(len(batch))
+            raise OSError("disco cheio")
+        return original(self, batch)
+
+    monkeypatch.setattr(AuditLogger, '_write_batch', flaky)
+    for i in range(10):
+        logger.log({'i': i})
+    assert logger.flush(5.0)
+    logger.close()
+    assert failures
+    assert logger.stats['errors'] == 1
+    assert 'disco cheio' in logger.last_error
+    assert sorted(record['i'] for record in read_audit_log(tmp_path)) == list(range(10))
+
+
+def test_flush_times_out_while_writes_fail(tmp_path, monkeypatch):
+    def broken(self, batch):
+        raise OSError("sem permissão")
+
+    monkeypatch.setattr(AuditLogger, '_write_batch', broken)
+    logger = AuditLogger(tmp_path, flush_interval=0.01)
+    logger.log({'i': 0})
+    assert not logger.flush(0.2)
+    assert len(logger._buffer) == 1
+    assert logger.stats['errors'] >= 1
+    logger.close()
+
+
+def test_capacity_is_exact_under_concurrency(tmp_path, monkeypatch):
+    gate = threading.Event()
+    original = AuditLogger._write_batch
+
+    def blocked(self, batch):
+        gate.wait()
+        return original(self, batch)
+
+    monkeypatch.setattr(AuditLogger, '_write_batch', blocked)
+    logger = AuditLogger(tmp_path, capacity=100, batch_size=1000, flush_interval=60, overflow='drop')
+    accepted = []
+
+    def producer():
+        accepted.append(sum(logger.log({'x': 1}) for _ in range(200)))
+
+    threads = [threading.Thread(target=producer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(accepted) == 100
+    assert logger.stats['dropped'] == 700
+    gate.set()
+    logger.close()
+
+
+def test_reject_overflow_raises(tmp_path):
+    logger = AuditLogger(tmp_path, capacity=1, batch_size=10, flush_interval=60)
+    logger.log({'i': 0})
+    with pytest.raises(AuditBackpressureError):
+        logger.log({'i': 1})
+    logger.close()
+
+
+def test_log_many_is_all_or_nothing(tmp_path):
+    logger = AuditLogger(tmp_path, capacity=3, batch_size=10, flush_interval=60, overflow='drop')
+    assert logger.log_many([{'i': 0}, {'i': 1}])
+    assert not logger.log_many([{'i': 2}, {'i': 3}])
+    assert logger.stats['enqueued'] == 2 and logger.stats['dropped'] == 2
+    assert logger.log_many([{'i': 4}])
+    logger.close()
+    assert [record['i'] for record in read_audit_log(tmp_path)] == [0, 1, 4]
+
+
+def test_unserializable_record_rejected_at_enqueue(tmp_path):
+    logger = AuditLogger(tmp_path, capacity=10, batch_size=2, flush_interval=0.02)
+    with pytest.raises(ValueError):
+        logger.log({'inputs': object()})
+    with pytest.raises(ValueError):
+        logger.log_many([{'i': 0}, {'inputs': {1, 2}}])
+    with pytest.raises(ValueError):
+        logger.log(['não', 'é', 'dict'])
+    assert logger.stats['enqueued'] == 0
+
+    # Nada ficou preso no buffer: os registros seguintes são gravados normalmente
+    logger.log({'i': 1, 'probability': np.float32(0.25)})
+    logger.log({})
+    assert logger.flush(5.0)
+    logger.close()
+    assert logger.stats['errors'] == 0
+    records = list(read_audit_log(tmp_path))
+    assert [(record.get('i'), record.get('probability')) for record in records] == [(1, 0.25), (None, None)]
+    assert all('ts' in record for record in records)
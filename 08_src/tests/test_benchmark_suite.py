@@ -0,0 +1,71 @@
+"""
+Testes da suíte de benchmarks (user-034)
+"""
+
+import json
+
+from benchmarks import suite
+
+
+def _payload(medians):
+    return {'meta': {}, 'results': {key: {'median': value} for key, value in medians.items()}}
+
+
+def test_compare_flags_regressions_by_factor():
+    base = _payload({'a': 1.0, 'b': 1.0, 'c': 1.0, 'so_base': 1.0})
+    new = _payload({'a': 1.3, 'b': 0.5, 'c': 1.1, 'so_novo': 1.0})
+    rows = {row['benchmark']: row for row in suite.compare(base, new, factor=1.2)}
+    assert set(rows) == {'a', 'b', 'c', 'so_base', 'so_novo'}
+    assert rows['a']['status'] == 'regression'
+    assert rows['b']['status'] == 'improvement'
+    assert rows['c']['status'] == 'unchanged'
+    assert rows['so_base']['status'] == 'removed' and rows['so_base']['new'] is None
+    assert rows['so_novo']['status'] == 'added' and rows['so_novo']['base'] is None
+
+
+def test_main_compare_fails_on_removed_benchmark(monkeypatch, tmp_path, capsys):
+    paths = []
+    for name, medians in (('base', {'a': 1.0, 'b': 1.0}), ('novo', {'a': 1.0})):
+        path = tmp_path / f'{name}.json'
+        path.write_text(json.dumps(_payload(medians)))
+        paths.append(str(path))
+    monkeypatch.setattr(suite.sys, 'argv', ['suite.py', 'compare', *paths])
+    assert suite.main() == 1
+    assert '1 removidos' in capsys.readouterr().out
+
+    monkeypatch.setattr(suite.sys, 'argv', ['suite.py', 'compare', paths[1], paths[0]])
+    assert suite.main() == 0
+
+
+def test_default_output_outside_reports(monkeypatch, tmp_path):
+    assert suite.RESULTS_DIR == suite.PROJECT_ROOT / 'logs' / 'benchmarks'
+    monkeypatch.setattr(suite, 'RESULTS_DIR', tmp_path / 'benchmarks')
+    path = suite.save_results({'meta': {'commit': None}, 'results': {}})
+    assert path.parent == tmp_path / 'benchmarks'
+
+
+def test_run_measures_registered_benchmarks_and_saves(monkeypatch, tmp_path):
+    calls = []
+    registry = []
+    monkeypatch.setattr(suite, 'BENCHMARKS', registry)
+    suite.benchmark('soma', setup=lambda size: list(range(size)), sizes=(10, 100_000), repeat=3)(
+        lambda state: calls.append(sum(state)))
+    suite.benchmark('outro', sizes=(None,), repeat=2)(lambda state: None)
+
+    payload = suite.run(quick=False, name_filter='soma')
+    assert set(payload['results']) == {'soma[10]', 'soma[100000]'}
+    # aquecimento + repetições por tamanho
+    assert len(calls) == 2 * (1 + 3)
+    result = payload['results']['soma[10]']
+    assert len(result['samples']) == 3
+    assert result['min'] <= result['median']
+
+    path = suite.save_results(payload, tmp_path / 'resultado.json')
+    assert json.loads(path.read_text())['results'].keys() == payload['results'].keys()
+
+
+def test_quick_keeps_only_base_size(monkeypatch):
+    registry = []
+    monkeypatch.setattr(suite, 'BENCHMARKS', registry)
+    suite.benchmark('tamanhos', sizes=suite.SIZES, repeat=1)(lambda state: None)
+    assert list(suite.run(quick=True)['results']) == [f'tamanhos[{suite.BASE_SIZE}]']
@@ -0,0 +1,139 @@
+"""
+Testes da calibração de probabilidades (user-028)
+"""
+
+import copy
+import json
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from data.datasets import PROJECT_ROOT, TARGET_COLUMN, create_simulated_data
+from inference import calibration, inference
+from inference.artifacts import load_bundle
+from inference.calibration import (CALIBRATION_FILE, CalibrationTable, build_table,
+                                   calibrator_predict, fit_bundle_calibration, fit_calibrator,
+                                   save_calibration)
+from inference.instrumentation import ScoringService
+from inference.inference import prediction_result
+
+PATIENT = {
+    'sexo': 1, 'idade': 55, 'fumante_atualmente': 0, 'cigarros_por_dia': 0,
+    'medicamento_pressao': 0, 'diabetes': 0, 'colesterol_total': 220,
+    'pressao_sistolica': 140, 'pressao_diastolica': 90, 'imc': 27.5,
+    'frequencia_cardiaca': 78, 'glicose': 90
+}
+
+
+def _scores(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    scores = rng.random(n)
+    y = (rng.random(n) < scores ** 2).astype(int)
+    return y, scores
+
+
+@pytest.mark.parametrize('method', ['isotonic', 'platt'])
+def test_table_matches_calibrator(method):
+    y, scores = _scores()
+    calibrator = fit_calibrator(y, scores, method)
+    table = build_table(calibrator, method, thresholds={'balanced': 0.5})
+    exact = calibrator_predict(calibrator, scores)
+    tolerance = 1e-12 if method == 'isotonic' else 1e-4
+    assert np.max(np.abs(table.apply(scores) - exact)) < tolerance
+    assert table.thresholds['balanced'] == pytest.approx(float(table.apply(0.5)))
+    restored = CalibrationTable.from_dict(json.loads(json.dumps(table.to_dict())))
+    assert np.array_equal(restored.apply(scores), table.apply(scores))
+
+
+def _bundle_dir(tmp_path):
+    (tmp_path / 'metadata.json').write_text(json.dumps({'model_version': 'test'}))
+    return tmp_path
+
+
+def test_save_refuses_simulated_in_bundle(tmp_path):
+    table = CalibrationTable([0.0, 1.0], 'isotonic', info={'data_source': 'simulated'})
+    with pytest.raises(ValueError):
+        save_calibration(table, _bundle_dir(tmp_path))
+    assert not (tmp_path / CALIBRATION_FILE).exists()
+
+    scratch = tmp_path / 'scratch'
+    save_calibration(table, scratch, register=False)
+    assert (scratch / CALIBRATION_FILE).exists()
+    assert 'artifacts' not in json.loads((tmp_path / 'metadata.json').read_text())
+
+
+def test_save_registers_real_calibration(tmp_path):
+    table = CalibrationTable([0.0, 1.0], 'isotonic', info={'data_source': 'real'})
+    path = save_calibration(table, _bundle_dir(tmp_path))
+    metadata = json.loads((tmp_path / 'metadata.json').read_text())
+    assert metadata['artifacts']['calibration'] == CALIBRATION_FILE
+    assert calibration.load_calibration(tmp_path).method == 'isotonic'
+    assert path == tmp_path / CALIBRATION_FILE
+
+
+def test_main_refuses_simulated_without_flag(monkeypatch):
+    monkeypatch.setattr('data.datasets.load_raw_dataset', lambda path=None: None)
+    monkeypatch.setattr(sys, 'argv', ['calibration.py', 'gb_v1'])
+    bundle_file = PROJECT_ROOT / '05_artifacts' / 'gb_v1' / CALIBRATION_FILE
+    existed = bundle_file.exists()
+    assert calibration.main() == 1
+    assert bundle_file.exists() == existed
+
+
+def test_fit_records_source_and_score_shift():
+    frame = create_simulated_data(600, random_state=3)
+    X, y = frame.drop(columns=[TARGET_COLUMN]), frame[TARGET_COLUMN].to_numpy()
+    _, table, oof = fit_bundle_calibration('gb_v1', X, y, n_splits=3, data_source='simulated')
+    assert table.info['data_source'] == 'simulated'
+    assert table.info['score_source'] == 'out_of_fold_clones'
+    assert 0.0 <= table.info['deployed_vs_oof_ks'] <= 1.0
+    assert len(oof) == len(y)
+
+
+def _plateau_table(low, high, level):
+    """Tabela com platô em [low, high] no valor level; o threshold bruto cai dentro do platô"""
+    return CalibrationTable([0.0, level, level, 1.0], 'isotonic', knots=[0.0, low, high, 1.0],
+                            thresholds={'balanced': level})
+
+
+def test_isotonic_plateau_straddling_threshold_keeps_raw_decision():
+    # Scores em [0.3, 0.6] com a mesma taxa de positivos: o isotônico cria um platô
+    scores = np.repeat([0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 0.9], 50)
+    y = np.zeros(len(scores), dtype=int)
+    for value, rate in ((0.1, 0.0), (0.2, 0.1), (0.3, 0.4), (0.4, 0.4), (0.5, 0.4), (0.6, 0.4),
+                        (0.8, 0.8), (0.9, 1.0)):
+        y[np.flatnonzero(scores == value)[:int(rate * 50)]] = 1
+    table = build_table(fit_calibrator(y, scores), 'isotonic', thresholds={'balanced': 0.5})
+    below = 0.45
+    # Na escala calibrada o score abaixo do threshold empata com ele
+    assert table.apply(below) == table.thresholds['balanced']
+
+    bundle = SimpleNamespace(thresholds={'balanced': 0.5}, model_name='m', model_version='v')
+    result = prediction_result(below, 'balanced', bundle, table)
+    assert result['prediction'] == 0
+    assert result['probability'] == result['threshold'] == pytest.approx(0.4)
+    assert prediction_result(0.5, 'balanced', bundle, table)['prediction'] == 1
+    assert prediction_result(below, 'balanced', bundle)['prediction'] == 0
+
+
+def test_predict_and_service_decide_on_raw_score(monkeypatch):
+    bundle = copy.copy(load_bundle('gb_v1'))
+    raw = float(bundle.predict_proba(PATIENT)[0])
+    bundle.thresholds = {'balanced': raw + 0.05}
+    table = _plateau_table(raw - 0.01, raw + 0.1, 0.5)
+
+    monkeypatch.setattr(inference, 'load_bundle', lambda version: bundle)
+    monkeypatch.setattr(inference, 'load_calibration', lambda path: table)
+    single = inference.predict(PATIENT, 'gb_v1')
+
+    service = ScoringService('gb_v1')
+    service.bundle, service.calibration = bundle, table
+    served = json.loads(service.handle(json.dumps(PATIENT))[1])
+    batched = json.loads(service.handle_batch(json.dumps({'patients': [PATIENT]}))[1])['predictions'][0]
+
+    for result in (single, served, batched):
+        assert result['calibrated']
+        assert result['probability'] == result['threshold'] == 0.5
+        assert result['prediction'] == 0
@@ -0,0 +1,79 @@
+"""
+Testes da validação clínica em chunks (user-038)
+"""
+
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.metrics import confusion_matrix
+
+from clinical_fast import chunked_validation
+from clinical_fast.chunked_validation import find_target_column, peak_memory_mb, run_chunked_validation
+from data.datasets import TARGET_COLUMN, create_simulated_data
+
+THRESHOLDS = {'screening': 0.2, 'balanced': 0.4}
+
+
+@pytest.fixture(scope='module')
+def dataset(tmp_path_factory):
+    df = create_simulated_data(1500, random_state=8).fillna(0.0)
+    features = [c for c in df.columns if c != TARGET_COLUMN]
+    model = GradientBoostingClassifier(n_estimators=20, random_state=0)
+    model.fit(df[features].to_numpy(), df[TARGET_COLUMN])
+    path = tmp_path_factory.mktemp('chunked') / 'dados.csv'
+    df.to_csv(path, index=False)
+    return model, df, features, path
+
+
+def _pearsons(results):
+    overall = results['validation_results']['correlations']['overall']
+    return np.array([overall[feature]['pearson'] for feature in sorted(overall)])
+
+
+def test_results_independent_of_chunk_size(dataset):
+    model, _, _, path = dataset
+    small = run_chunked_validation(model, path, chunk_size=128, thresholds=THRESHOLDS, spearman=False)
+    whole = run_chunked_validation(model, path, chunk_size=10_000, thresholds=THRESHOLDS, spearman=False)
+    assert small['n_rows'] == whole['n_rows'] == 1500
+    # Contagens dos histogramas: exatas; correlações: y_proba em float32, só arredondamento
+    assert small['validation_results']['performance'] == whole['validation_results']['performance']
+    assert small['threshold_optimization'] == whole['threshold_optimization']
+    np.testing.assert_allclose(_pearsons(small), _pearsons(whole), rtol=0, atol=1e-5)
+
+
+def test_metrics_match_in_memory_scoring(dataset):
+    model, df, features, path = dataset
+    results = run_chunked_validation(model, path, chunk_size=300, thresholds=THRESHOLDS, spearman=False)
+    y_proba = model.predict_proba(df[features].to_numpy())[:, 1]
+    for scenario, threshold in THRESHOLDS.items():
+        metrics = results['validation_results']['performance']['thresholds'][scenario]
+        tn, fp, fn, tp = confusion_matrix(df[TARGET_COLUMN], y_proba >= threshold).ravel()
+        assert (metrics['true_negatives'], metrics['false_positives'],
+                metrics['false_negatives'], metrics['true_positives']) == (tn, fp, fn, tp)
+
+
+def test_find_target_column():
+    assert find_target_column(['a', 'TenYearCHD', 'b']) == 'TenYearCHD'
+    assert find_target_column(['a', 'b']) == 'b'
+
+
+def test_peak_memory_linux_in_mb():
+    assert peak_memory_mb() > 1
+
+
+def test_peak_memory_macos_in_bytes(monkeypatch):
+    fake = types.SimpleNamespace(RUSAGE_SELF=0,
+                                 getrusage=lambda who: types.SimpleNamespace(ru_maxrss=512 * 2 ** 20))
+    monkeypatch.setitem(sys.modules, 'resource', fake)
+    monkeypatch.setattr(chunked_validation.sys, 'platform', 'darwin')
+    assert peak_memory_mb() == 512
+
+
+def test_peak_memory_without_resource_or_psutil(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'resource', None)
+    monkeypatch.setitem(sys.modules, 'psutil', None)
+    assert peak_memory_mb() is None
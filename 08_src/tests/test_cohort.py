@@ -0,0 +1,46 @@
+"""
+Testes do gerador de coortes sintéticas (user-035)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.cohort import (COLUMNS, MISSING_RATES, chunk_rng, generate_chunk, iter_cohort_chunks,
+                         load_cohort_metadata, write_cohort)
+from data.datasets import TARGET_COLUMN
+
+
+def _read(path, chunk_size):
+    return pd.concat(list(iter_cohort_chunks(path, chunk_size)), ignore_index=True)
+
+
+def test_output_independent_of_workers(tmp_path):
+    write_cohort(tmp_path / 'um', 25_000, chunk_size=10_000, seed=7, workers=1)
+    write_cohort(tmp_path / 'dois', 25_000, chunk_size=10_000, seed=7, workers=2)
+    one, two = _read(tmp_path / 'um', 6_000), _read(tmp_path / 'dois', 25_000)
+    pd.testing.assert_frame_equal(one, two)
+    assert list(one.columns) == COLUMNS
+    assert load_cohort_metadata(tmp_path / 'um')['n_rows'] == 25_000
+
+
+def test_chunks_match_generator(tmp_path):
+    write_cohort(tmp_path, 15_000, chunk_size=10_000, seed=3)
+    frame = _read(tmp_path, 4_000)
+    expected = generate_chunk(chunk_rng(3, 1), 5_000)
+    for name in COLUMNS:
+        np.testing.assert_array_equal(frame[name].to_numpy()[10_000:], expected[name])
+
+
+def test_clinical_dependencies_and_rates():
+    chunk = pd.DataFrame(generate_chunk(chunk_rng(42, 0), 200_000))
+    assert (chunk.loc[chunk['fumante_atualmente'] == 0, 'cigarros_por_dia'].fillna(0) == 0).all()
+    assert chunk[TARGET_COLUMN].mean() == pytest.approx(0.31, abs=0.04)
+    assert chunk['pressao_sistolica'].corr(chunk['pressao_diastolica']) > 0.6
+    for name, rate in MISSING_RATES.items():
+        assert chunk[name].isna().mean() == pytest.approx(rate, abs=0.003)
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        write_cohort(tmp_path, 10, fmt='csv')
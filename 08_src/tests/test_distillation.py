@@ -0,0 +1,73 @@
+"""
+Testes da destilação e do runtime NumPy do substituto (user-029)
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from inference.artifacts import load_bundle
+from inference.distillation import STUDENTS, _logit, agreement_report, format_rate, synthetic_samples
+from inference.surrogate import Surrogate
+
+
+@pytest.fixture(scope='module')
+def training():
+    teacher = load_bundle('gb_v1')
+    X = synthetic_samples(teacher.features, 4000, seed=1)
+    impute_values = np.asarray(teacher.imputer.statistics_, dtype=np.float64)
+    X_imputed = np.where(np.isnan(X), impute_values, X)
+    return teacher, X_imputed, _logit(teacher.predict_proba(X)), impute_values
+
+
+def _surrogate(training, kind, tmp_path):
+    teacher, X, target, impute_values = training
+    options = {'n_estimators': 30} if kind == 'tree_ensemble' else {}
+    arrays, student_logit = STUDENTS[kind](X, target, **options)
+    arrays['features'] = np.array(teacher.features)
+    arrays['impute_values'] = impute_values
+    # Mesmo caminho da implantação: .npz gravado e recarregado sem pickle
+    np.savez(tmp_path / 'surrogate.npz', **arrays)
+    return Surrogate.load(tmp_path / 'surrogate.npz'), student_logit
+
+
+@pytest.mark.parametrize('kind', ['tree_ensemble', 'binned_logistic'])
+def test_runtime_matches_fitted_student(training, kind, tmp_path):
+    teacher, _, _, impute_values = training
+    surrogate, student_logit = _surrogate(training, kind, tmp_path)
+    X_new = synthetic_samples(teacher.features, 3000, seed=7)
+    assert np.isnan(X_new).any()
+    expected = student_logit(np.where(np.isnan(X_new), impute_values, X_new))
+
+    np.testing.assert_allclose(surrogate.decision_function(X_new), expected, rtol=0, atol=1e-10)
+    np.testing.assert_allclose(surrogate.predict_proba(X_new), 1 / (1 + np.exp(-expected)), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize('kind', ['tree_ensemble', 'binned_logistic'])
+def test_runtime_accepts_records(training, kind, tmp_path):
+    teacher, _, _, _ = training
+    surrogate, _ = _surrogate(training, kind, tmp_path)
+    X_new = synthetic_samples(teacher.features, 50, seed=3)
+    records = [{f: v for f, v in zip(teacher.features, row) if v == v} for row in X_new]
+    np.testing.assert_array_equal(surrogate.predict_proba(records), surrogate.predict_proba(X_new))
+    np.testing.assert_array_equal(surrogate.predict_proba(records[0]), surrogate.predict_proba(X_new[:1]))
+
+
+def test_format_rate_handles_missing_class():
+    assert format_rate(None) == 'n/d'
+    assert format_rate(0.5) == '50.00%'
+
+
+def test_agreement_report_without_teacher_positives():
+    bundle = load_bundle('gb_v1')
+    teacher = SimpleNamespace(
+        features=bundle.features, predict_proba=bundle.predict_proba,
+        thresholds={'inalcancavel': 1.01, 'balanced': 0.5}
+    )
+    report = agreement_report(teacher, teacher, n_samples=500)
+    unreachable = report['thresholds']['inalcancavel']
+    assert unreachable['recall_vs_teacher'] is None
+    assert unreachable['agreement'] == 1.0
+    assert format_rate(unreachable['recall_vs_teacher']) == 'n/d'
+    assert report['mean_abs_error'] == 0.0
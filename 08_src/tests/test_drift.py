@@ -0,0 +1,76 @@
+"""
+Testes do monitor de drift (user-031)
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from data.datasets import TARGET_COLUMN, create_simulated_data
+from inference import drift
+from inference.artifacts import load_bundle
+from inference.drift import (BASELINE_FILE, DriftMonitor, build_baseline, load_baseline,
+                             save_baseline, training_partition)
+
+
+@pytest.fixture(scope='module')
+def baseline():
+    return build_baseline(create_simulated_data(2000, random_state=4), 'gb_v1', source='simulated')
+
+
+def test_training_partition_is_stratified_subset():
+    df = create_simulated_data(1000, random_state=4)
+    train = training_partition(df, 0.35)
+    assert len(train) == 650
+    assert set(train.index) <= set(df.index)
+    assert train[TARGET_COLUMN].mean() == pytest.approx(df[TARGET_COLUMN].mean(), abs=0.01)
+
+
+def test_load_baseline_missing_raises_without_writing(tmp_path):
+    (tmp_path / 'metadata.json').write_text('{}')
+    with pytest.raises(FileNotFoundError):
+        load_baseline(tmp_path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['metadata.json']
+
+
+def test_save_baseline_refuses_simulated(baseline, tmp_path):
+    with pytest.raises(ValueError):
+        save_baseline(baseline, tmp_path)
+    assert not (tmp_path / BASELINE_FILE).exists()
+
+
+def test_update_skips_non_numeric_values(baseline):
+    monitor = DriftMonitor(baseline)
+    record = {feature: 1.0 for feature in monitor.features}
+    record['idade'] = 'cinquenta'
+    record['glicose'] = None
+    monitor.update(record, 0.4)
+    report = monitor.report()
+    assert report['n_requests'] == 1
+    assert report['n_invalid'] == 1
+    assert report['columns']['idade']['n'] == 0
+    assert report['columns']['glicose']['missing_rate'] == 1.0
+
+
+def test_single_updates_match_batch_and_merge(baseline):
+    bundle = load_bundle('gb_v1')
+    sample = create_simulated_data(300, random_state=9)
+    X = sample[bundle.features].to_numpy(dtype=np.float64)
+    probabilities = bundle.predict_proba(X)
+
+    single = DriftMonitor(baseline)
+    for record, probability in zip(sample[bundle.features].to_dict('records'), probabilities):
+        single.update(record, probability)
+    batch = DriftMonitor(baseline)
+    batch.update_batch(X[:100], probabilities[:100])
+    rest = DriftMonitor(baseline)
+    rest.update_batch(X[100:], probabilities[100:])
+    batch.merge(rest)
+    assert single.counts == batch.counts
+    assert json.dumps(single.report()) == json.dumps(batch.report())
+
+
+def test_build_main_refuses_without_real_data(monkeypatch):
+    monkeypatch.setattr('data.datasets.load_raw_dataset', lambda path=None: None)
+    assert drift.build_main(['gb_v1']) == 1
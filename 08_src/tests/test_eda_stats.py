@@ -0,0 +1,80 @@
+"""
+Testes das estatísticas incrementais da EDA (user-042)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.datasets import TARGET_COLUMN, create_simulated_data
+from reports.eda_stats import EDAStatsAccumulator, ValueCounts, per_feature_statistics
+
+
+@pytest.fixture(scope='module')
+def df():
+    return create_simulated_data(3000, random_state=5).select_dtypes(include=[np.number])
+
+
+def _chunks(df, sizes):
+    bounds = np.cumsum([0] + list(sizes))
+    return [df.iloc[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _assert_same(acc, expected):
+    pd.testing.assert_frame_equal(acc.correlation(), expected.correlation(), rtol=1e-10, atol=1e-12)
+    pd.testing.assert_frame_equal(acc.vif(), expected.vif(), rtol=1e-8)
+    pd.testing.assert_frame_equal(acc.group_stats(), expected.group_stats(), rtol=1e-9)
+
+
+def test_merge_equals_single_pass(df):
+    single = EDAStatsAccumulator.from_frame(df)
+    parts = [EDAStatsAccumulator(df.columns).update(chunk) for chunk in _chunks(df, [700, 1, 1299, 1000])]
+    merged = EDAStatsAccumulator(df.columns)
+    for part in reversed(parts):
+        merged.merge(part)
+    assert merged.n_rows == single.n_rows == len(df)
+    _assert_same(merged, single)
+
+
+def test_chunked_update_and_save_load_equal_single_pass(df, tmp_path):
+    single = EDAStatsAccumulator.from_frame(df)
+    first, rest = df.iloc[:2000], df.iloc[2000:]
+    EDAStatsAccumulator.from_frame(first).save(tmp_path / 'estado.npz')
+    resumed = EDAStatsAccumulator.load(tmp_path / 'estado.npz').update(rest)
+    _assert_same(resumed, single)
+
+
+def test_matches_pandas_and_per_feature_reference(df):
+    acc = EDAStatsAccumulator.from_frame(df)
+    pd.testing.assert_frame_equal(acc.correlation(), df.corr(), rtol=1e-9, atol=1e-12)
+
+    _, vif, reference = per_feature_statistics(df)
+    features = acc.features
+    centered = acc.vif(centered=True).set_index('Feature').loc[features, 'VIF'].to_numpy()
+    uncentered = acc.vif(centered=False).set_index('Feature').loc[features, 'VIF'].to_numpy()
+    np.testing.assert_allclose(centered, vif[True], rtol=1e-6)
+    np.testing.assert_allclose(uncentered, vif[False], rtol=1e-6)
+
+    stats = acc.group_stats().set_index('variavel')
+    np.testing.assert_allclose(stats['cohens_d'], reference.loc[stats.index, 'cohens_d'], rtol=1e-9)
+    np.testing.assert_allclose(stats['p_value'], reference.loc[stats.index, 'p_value'], rtol=1e-6, atol=1e-300)
+    assert stats['exato'].all()
+
+
+def test_coarsened_counts_bound_the_exact_u():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=5000)
+    y = (rng.random(5000) < 0.4).astype(int)
+    exact = ValueCounts().update(x, y).mann_whitney()
+    binned = ValueCounts(max_distinct=64).update(x[:2500], y[:2500])
+    binned.merge(ValueCounts().update(x[2500:], y[2500:]))
+    assert not binned.exact and binned.counts.sum() == 5000
+    approx = binned.mann_whitney()
+    assert abs(approx['u'] - exact['u']) <= approx['u_error_bound']
+
+
+def test_merge_rejects_different_columns(df):
+    acc = EDAStatsAccumulator.from_frame(df)
+    other = EDAStatsAccumulator([c for c in df.columns if c != 'imc'], TARGET_COLUMN)
+    with pytest.raises(ValueError):
+        acc.merge(other)
@@ -0,0 +1,65 @@
+"""
+Testes do serving de ensembles com modelos base compartilhados (user-044)
+"""
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier, StackingClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import LinearSVC
+
+from inference.ensemble import SharedBaseScorer, independent_predict_proba, train_reference_models
+
+
+@pytest.fixture(scope='module')
+def data():
+    X, y = make_classification(n_samples=600, n_features=8, weights=[0.7], random_state=0)
+    return X[:400], y[:400], X[400:]
+
+
+def _assert_matches_sklearn(models, X):
+    shared = SharedBaseScorer(models).predict_proba_all(X)
+    for name, model in models.items():
+        np.testing.assert_array_equal(shared[name], model.predict_proba(X))
+
+
+def test_reference_lineup_shares_three_bases(data):
+    X, y, X_new = data
+    models = train_reference_models(X, y)
+    scorer = SharedBaseScorer(models)
+    assert scorer.n_bases == 3
+    reference = independent_predict_proba(models, X_new)
+    shared = scorer.predict_proba(X_new)
+    for name in models:
+        np.testing.assert_array_equal(shared[name], reference[name])
+
+
+def test_voting_weights_and_drop(data):
+    X, y, X_new = data
+    bases = lambda: [('lr', LogisticRegression(max_iter=500)),
+                     ('rf', RandomForestClassifier(n_estimators=10, random_state=0)),
+                     ('skip', 'drop')]
+    models = {
+        'weighted': VotingClassifier(bases(), voting='soft', weights=[2, 1, 5]).fit(X, y),
+        'plain': VotingClassifier(bases(), voting='soft').fit(X, y)
+    }
+    _assert_matches_sklearn(models, X_new)
+
+
+def test_stacking_decision_function_and_passthrough(data):
+    X, y, X_new = data
+    models = {
+        'stack': StackingClassifier(
+            [('svc', LinearSVC(random_state=0)), ('rf', RandomForestClassifier(n_estimators=10, random_state=0))],
+            final_estimator=LogisticRegression(), passthrough=True, cv=3).fit(X, y)
+    }
+    assert models['stack'].stack_method_ == ['decision_function', 'predict_proba']
+    _assert_matches_sklearn(models, X_new)
+
+
+def test_hard_voting_rejected(data):
+    X, y, _ = data
+    hard = VotingClassifier([('lr', LogisticRegression(max_iter=500))], voting='hard').fit(X, y)
+    with pytest.raises(ValueError):
+        SharedBaseScorer({'hard': hard})
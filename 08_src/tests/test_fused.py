@@ -0,0 +1,61 @@
+"""
+Testes do imputer + scaler fundidos (user-049)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler
+
+from inference.fused import FusedPreprocessor, fuse_preprocessing
+
+
+def _data(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(loc=[50, 120, 26], scale=[10, 15, 4], size=(n, 3))
+    X[rng.random(X.shape) < 0.1] = np.nan
+    return X
+
+
+@pytest.mark.parametrize('strategy', ['mean', 'median', 'most_frequent'])
+@pytest.mark.parametrize('batch_size', [1, 500])
+def test_identical_to_sklearn(strategy, batch_size):
+    X = _data()
+    imputer = SimpleImputer(strategy=strategy).fit(X)
+    scaler = StandardScaler().fit(imputer.transform(X))
+    fused = fuse_preprocessing(imputer, scaler)
+    X_new = _data(seed=1)[:batch_size]
+    original = X_new.copy()
+    np.testing.assert_array_equal(fused.transform(X_new), scaler.transform(imputer.transform(X_new)))
+    np.testing.assert_array_equal(X_new, original)
+
+
+def test_identical_with_feature_names():
+    X = pd.DataFrame(_data(), columns=['idade', 'pressao_sistolica', 'imc'])
+    imputer = SimpleImputer(strategy='median').fit(X)
+    scaler = StandardScaler().fit(imputer.transform(X))
+    fused = fuse_preprocessing(imputer, scaler)
+    np.testing.assert_array_equal(fused.transform(X.to_numpy()), scaler.transform(imputer.transform(X)))
+
+
+@pytest.mark.parametrize('imputer_kwargs, scaler_kwargs', [
+    ({}, {'with_mean': False}),
+    ({}, {'with_std': False}),
+    ({'add_indicator': True}, {}),
+    ({'missing_values': -1.0}, {})
+])
+def test_unsupported_combinations(imputer_kwargs, scaler_kwargs):
+    X = np.nan_to_num(_data(), nan=-1.0)
+    imputer = SimpleImputer(**imputer_kwargs).fit(X)
+    scaler = StandardScaler(**scaler_kwargs).fit(imputer.transform(X))
+    assert FusedPreprocessor.from_steps(imputer, scaler) is None
+
+
+@pytest.mark.filterwarnings("ignore:Skipping features")
+def test_all_missing_column_not_fused():
+    X = _data()
+    X[:, 1] = np.nan
+    # Coluna toda ausente: statistics_ NaN e o sklearn descarta a coluna na saída
+    imputer = SimpleImputer().fit(X)
+    assert fuse_preprocessing(imputer, StandardScaler().fit(imputer.transform(X))) is None
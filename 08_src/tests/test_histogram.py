@@ -0,0 +1,71 @@
+"""
+Testes do treino out-of-core por histogramas (user-047)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import HistGradientBoostingClassifier
+
+from clinical_fast.chunked_validation import chunk_source, find_target_column
+from data.cohort import write_cohort
+from inference.artifacts import ArtifactBundle
+from training.histogram import HIST_PARAMS, check_sklearn_version, export_bundle, train_from_source
+
+PARAMS = {'max_iter': 15}
+
+
+@pytest.fixture(scope='module')
+def cohort(tmp_path_factory):
+    path = tmp_path_factory.mktemp('coorte')
+    write_cohort(path, 12_000, chunk_size=5_000, seed=3)
+    return path
+
+
+@pytest.fixture(scope='module')
+def trained(cohort, tmp_path_factory):
+    return train_from_source(cohort, chunk_size=4_000, params=PARAMS,
+                             work_dir=tmp_path_factory.mktemp('trabalho'))
+
+
+def _train_rows(cohort, result):
+    frame = pd.concat(list(chunk_source(cohort, 100_000)()), ignore_index=True)
+    train = frame[~result['holdout_mask']]
+    target = find_target_column(list(train.columns))
+    X = result['scaler'].transform(result['imputer'].transform(train[result['features']].astype(np.float64)))
+    return X, train[target].to_numpy().astype(int)
+
+
+def test_matches_in_memory_hist_gradient_boosting(cohort, trained):
+    X, y = _train_rows(cohort, trained)
+    assert trained['n_train'] == len(y) == 12_000 - len(trained['holdout_y'])
+    params = dict(HIST_PARAMS, **PARAMS)
+    reference = HistGradientBoostingClassifier(early_stopping=False, random_state=42, **params).fit(X, y)
+    np.testing.assert_allclose(trained['model'].predict_proba(X), reference.predict_proba(X),
+                               rtol=0, atol=1e-12)
+
+
+def test_independent_of_chunk_size(cohort, trained, tmp_path):
+    other = train_from_source(cohort, chunk_size=12_000, params=PARAMS, work_dir=tmp_path)
+    np.testing.assert_array_equal(other['holdout_mask'], trained['holdout_mask'])
+    X, _ = _train_rows(cohort, trained)
+    np.testing.assert_array_equal(other['model'].predict_proba(X), trained['model'].predict_proba(X))
+    assert not list(tmp_path.iterdir())
+
+
+def test_exported_bundle_loads(trained, tmp_path):
+    path, thresholds, metrics = export_bundle(trained, 'hgb_teste', artifacts_dir=tmp_path)
+    bundle = ArtifactBundle(path)
+    assert bundle.model_name == 'HistGradientBoostingClassifier'
+    assert set(thresholds) == {'screening', 'balanced', 'confirmation'}
+    proba = bundle.predict_proba(trained['holdout_X'])
+    expected = trained['model'].predict_proba(
+        trained['scaler'].transform(trained['imputer'].transform(trained['holdout_X'])))[:, 1]
+    np.testing.assert_allclose(proba, expected, rtol=1e-12)
+    assert 0.5 < metrics['roc_auc'] <= 1.0
+
+
+def test_unsupported_sklearn_version_fails_clearly():
+    check_sklearn_version()
+    with pytest.raises(ImportError, match='internos privados do scikit-learn.*instalado: 1.99.0'):
+        check_sklearn_version('1.99.0')
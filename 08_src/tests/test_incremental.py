@@ -0,0 +1,64 @@
+"""
+Testes do retreino incremental dos bundles (user-046)
+"""
+
+import pytest
+
+from data.datasets import TARGET_COLUMN, create_simulated_data
+from inference.artifacts import ArtifactBundle, load_bundle
+from training.incremental import (model_type_mismatch, next_version, quality_gate,
+                                  retrain_incremental, split_holdout)
+
+
+def _evaluation(auc=0.80, screening=(0.91, 0.40), f2=0.70):
+    return {'roc_auc': auc, 'scenarios': {
+        'screening': {'recall': screening[0], 'specificity': screening[1]},
+        'balanced': {'f2': f2}
+    }}
+
+
+@pytest.mark.parametrize('candidate, failed', [
+    (_evaluation(), None),
+    (_evaluation(auc=0.78), 'roc_auc'),
+    (_evaluation(screening=(0.85, 0.40)), 'screening_sensitivity'),
+    (_evaluation(screening=(0.89, 0.40)), None),
+    (_evaluation(screening=(0.93, 0.30)), 'screening_specificity'),
+    (_evaluation(f2=0.60), 'balanced_f2')
+])
+def test_quality_gate_checks(candidate, failed):
+    gate = quality_gate(_evaluation(), candidate)
+    assert gate['passed'] is (failed is None)
+    assert [name for name, ok in gate['checks'].items() if not ok] == ([failed] if failed else [])
+
+
+def test_split_holdout_is_disjoint_and_stratified():
+    holdout = create_simulated_data(1000, random_state=4)
+    tuning, gate = split_holdout(holdout)
+    assert len(tuning) + len(gate) == 1000
+    assert not set(tuning.index) & set(gate.index)
+    assert abs(tuning[TARGET_COLUMN].mean() - gate[TARGET_COLUMN].mean()) < 0.01
+
+
+def test_loaded_model_type_is_reported():
+    assert model_type_mismatch(load_bundle('gb_v1')) is None
+    assert model_type_mismatch(load_bundle('rf_v1')) == ('RandomForestClassifier',
+                                                         'GradientBoostingClassifier')
+
+
+def test_retrain_compares_like_for_like_and_writes_bundle(tmp_path):
+    new_exams = create_simulated_data(2000, random_state=9)
+    report = retrain_incremental('gb_v1', new_exams, n_new_estimators=5,
+                                 artifacts_dir=tmp_path, force=True)
+    assert report['new_version'] == next_version('gb_v1') == 'gb_v2'
+    assert report['previous_model'] == 'GradientBoostingClassifier'
+    # Anterior com thresholds reajustados na mesma metade que o candidato; publicados à parte
+    assert report['previous']['scenarios'].keys() == report['candidate']['scenarios'].keys()
+    published = load_bundle('gb_v1').thresholds
+    assert {s: c['threshold'] for s, c in report['previous_published']['scenarios'].items()} == published
+
+    bundle = ArtifactBundle(tmp_path / 'gb_v2')
+    training = bundle.metadata['training']
+    assert training['threshold_samples'] + training['gate_samples'] == training['holdout_samples']
+    assert len(bundle.model.estimators_) == len(load_bundle('gb_v1').model.estimators_) + 5
+    with pytest.raises(FileExistsError):
+        retrain_incremental('gb_v1', new_exams, 'gb_v2', n_new_estimators=5, artifacts_dir=tmp_path, force=True)
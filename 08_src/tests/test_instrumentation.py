@@ -0,0 +1,173 @@
+"""
+Testes do caminho instrumentado de /predict (user-033) e do lote /predict/batch (user-050)
+"""
+
+import json
+from urllib.request import urlopen
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.datasets import create_simulated_data
+from inference.artifacts import load_bundle
+from inference.audit import AuditLogger, read_audit_log
+from inference.calibration import CalibrationTable
+from inference.drift import DriftMonitor, build_baseline
+from inference.instrumentation import (STAGES, Instrumentation, LatencyHistogram, SamplingProfiler,
+                                       ScoringService, parse_object)
+from inference.metrics_endpoint import is_loopback, start_metrics_server
+
+PATIENT = {
+    'sexo': 1, 'idade': 55, 'fumante_atualmente': 0, 'cigarros_por_dia': 0,
+    'medicamento_pressao': 0, 'diabetes': 0, 'colesterol_total': 220,
+    'pressao_sistolica': 140, 'pressao_diastolica': 90, 'imc': 27.5,
+    'frequencia_cardiaca': 78, 'glicose': 90
+}
+
+
+@pytest.fixture(scope='module')
+def service():
+    return ScoringService('gb_v1', Instrumentation())
+
+
+@pytest.mark.parametrize('body', [b'{"idade": ', b'\xff\xfe', b'[1, 2]', b'"texto"', b'null', b'42'])
+def test_bad_request_for_invalid_json_or_non_object(service, body):
+    status, payload = service.handle(body)
+    assert status == 400
+    assert json.loads(payload) == {'error': 'bad_request'}
+
+
+def test_parse_object():
+    assert parse_object('{"a": 1}') == {'a': 1}
+    assert parse_object('[]') is None
+    assert parse_object('{') is None
+
+
+def test_invalid_field_is_422(service):
+    status, payload = service.handle(json.dumps({**PATIENT, 'idade': 300}))
+    assert status == 422
+    assert json.loads(payload)['error'] == 'invalid_input'
+
+
+def test_probability_matches_bundle_and_records_stages(service):
+    status, payload = service.handle(json.dumps(PATIENT))
+    assert status == 200
+    result = json.loads(payload)
+    expected = float(load_bundle('gb_v1').predict_proba(PATIENT)[0])
+    if service.calibration is not None:
+        expected = float(service.calibration.apply(expected))
+    assert result['probability'] == pytest.approx(expected, abs=1e-12)
+    histograms = service.instrumentation.histograms
+    assert set(histograms) == set(STAGES)
+    assert all(histograms[stage].count >= 1 for stage in STAGES)
+
+
+def test_histogram_percentile_relative_error():
+    histogram = LatencyHistogram()
+    values = np.random.default_rng(0).integers(1_000, 10_000_000, 5000)
+    for value in values:
+        histogram.record(int(value))
+    expected = np.percentile(values, 99)
+    assert abs(histogram.percentile(0.99) - expected) / expected <= 0.0625 + 1e-3
+
+
+@pytest.mark.parametrize('body', [b'{"patients": ', b'[1, 2]', b'"texto"', b'null',
+                                  b'{"patients": {}}', b'{"patients": [1]}'])
+def test_batch_bad_request(service, body):
+    assert service.handle_batch(body) == (400, b'{"error": "bad_request"}')
+
+
+def test_batch_matches_single_and_records_stages():
+    service = ScoringService('gb_v1', Instrumentation())
+    patients = [PATIENT, {**PATIENT, 'idade': 300}, {**PATIENT, 'imc': 31.0}]
+    status, payload = service.handle_batch(json.dumps({'patients': patients}))
+    assert status == 200
+    predictions = json.loads(payload)['predictions']
+    assert predictions[0] == json.loads(service.handle(json.dumps(PATIENT))[1])
+    assert predictions[1] == json.loads(service.handle(json.dumps(patients[1]))[1])
+    assert predictions[2] == json.loads(service.handle(json.dumps(patients[2]))[1])
+    histograms = service.instrumentation.histograms
+    # handle_batch + três handle (um 422 para antes do pré-processamento)
+    assert histograms['total'].count == 3
+    assert histograms['parse'].count == histograms['validation'].count == 4
+    assert histograms['scaling'].count == 3
+
+
+@pytest.fixture(scope='module')
+def baseline():
+    return build_baseline(create_simulated_data(1000, random_state=4), 'gb_v1', source='simulated')
+
+
+BATCH = [PATIENT, {**PATIENT, 'idade': 300}, {**PATIENT, 'imc': 31.0}]
+
+
+def test_audit_and_drift_see_single_and_batch_predictions(baseline, tmp_path):
+    services = []
+    for name in ('single', 'batch'):
+        audit = AuditLogger(tmp_path / name, flush_interval=60)
+        services.append(ScoringService('gb_v1', audit=audit, drift=DriftMonitor(baseline)))
+    single, batch = services
+    for patient in BATCH:
+        single.handle(json.dumps(patient))
+    batch.handle_batch(json.dumps({'patients': BATCH}))
+
+    records = {}
+    for name, service in zip(('single', 'batch'), services):
+        service.audit.close()
+        records[name] = [{k: v for k, v in record.items() if k not in ('ts', 'latency_ms')}
+                         for record in read_audit_log(tmp_path / name)]
+    assert [record['inputs'] for record in records['single']] == [BATCH[0], BATCH[2]]
+    assert records['single'] == records['batch']
+    assert single.drift.n_requests == batch.drift.n_requests == 2
+    assert single.drift.counts == batch.drift.counts
+
+
+def test_drift_gets_raw_score_when_calibrated(baseline):
+    # Calibração que comprime tudo para perto de 0.5: o baseline está na escala bruta
+    table = CalibrationTable(np.linspace(0.45, 0.55, 11), 'teste', thresholds={'balanced': 0.5})
+    service = ScoringService('gb_v1', drift=DriftMonitor(baseline))
+    service.calibration = table
+    reference = DriftMonitor(baseline)
+    raw = load_bundle('gb_v1').predict_proba(pd.DataFrame([PATIENT, BATCH[2]]))
+
+    assert json.loads(service.handle(json.dumps(PATIENT))[1])['calibrated']
+    service.handle_batch(json.dumps({'patients': [BATCH[2]]}))
+    reference.update(PATIENT, raw[0])
+    reference.update(BATCH[2], raw[1])
+    assert service.drift.counts == reference.counts
+
+
+def test_batch_audit_is_all_or_nothing(tmp_path, baseline):
+    audit = AuditLogger(tmp_path, capacity=2, batch_size=100, flush_interval=60)
+    service = ScoringService('gb_v1', audit=audit, drift=DriftMonitor(baseline))
+    assert service.handle(json.dumps(PATIENT))[0] == 200
+    status, payload = service.handle_batch(json.dumps({'patients': [PATIENT, BATCH[2]]}))
+    assert (status, json.loads(payload)) == (503, {'error': 'audit_unavailable'})
+    assert len(audit._buffer) == 1
+    assert audit.stats['enqueued'] == 1
+    assert service.drift.n_requests == 1
+    assert service.handle(json.dumps(PATIENT))[0] == 200
+    assert service.handle(json.dumps(PATIENT))[0] == 503
+    audit.close()
+
+
+def test_profile_route_only_on_loopback_unless_opted_in():
+    routes = {'/debug/profile': SamplingProfiler(interval=0.001).http_route()}
+    for host in ('0.0.0.0', '::', '10.0.0.5'):
+        with pytest.raises(ValueError):
+            start_metrics_server([], host=host, port=0, routes=routes)
+    assert is_loopback('localhost') and is_loopback('::1') and not is_loopback('meu-host')
+
+    server = start_metrics_server([lambda: 'metrica 1\n'], host='127.0.0.1', port=0, routes=routes)
+    try:
+        host, port = server.server_address[:2]
+        with urlopen(f'http://{host}:{port}/debug/profile?seconds=0.05', timeout=5) as response:
+            assert response.read().startswith(b'<svg')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    server = start_metrics_server([], host='0.0.0.0', port=0, routes=routes, allow_remote_routes=True)
+    server.shutdown()
+    server.server_close()
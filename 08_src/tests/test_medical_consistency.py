@@ -0,0 +1,78 @@
+"""
+Testes do validador de consistência médica (user-026)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import spearmanr
+
+from clinical_fast.medical_consistency import (FEATURES, CorrelationAccumulator,
+                                          MedicalConsistencyValidator, _synthetic_chunk,
+                                          medical_consistency_report)
+
+
+def _frame(n=3000, seed=0):
+    X, y = _synthetic_chunk(n, seed)
+    return pd.DataFrame(X, columns=FEATURES), y
+
+
+def test_pearson_matches_corrcoef():
+    frame, y = _frame()
+    result = MedicalConsistencyValidator(FEATURES, strata=(), spearman=False).compute(frame, y)
+    for feature in ('idade', 'pressao_sistolica', 'glicose'):
+        values = frame[feature].to_numpy()
+        valid = ~np.isnan(values)
+        expected = np.corrcoef(values[valid], y[valid])[0, 1]
+        assert result['overall'][feature]['pearson'] == pytest.approx(expected, abs=1e-4)
+
+
+def test_spearman_exact_on_single_chunk():
+    frame, y = _frame(2000)
+    result = MedicalConsistencyValidator(FEATURES, strata=()).compute(frame, y)
+    assert result['spearman_bins']['exact']
+    values = frame['idade'].to_numpy()
+    assert result['overall']['idade']['spearman'] == pytest.approx(spearmanr(values, y)[0], abs=1e-4)
+
+
+def test_accumulator_merge_equals_single_pass():
+    frame, y = _frame(4000)
+    X = frame.to_numpy(dtype=np.float32)
+    single = CorrelationAccumulator(1, X.shape[1]).update(X, y)
+    left = CorrelationAccumulator(1, X.shape[1]).update(X[:1500], y[:1500])
+    right = CorrelationAccumulator(1, X.shape[1]).update(X[1500:], y[1500:])
+    merged = left.merge(right)
+    np.testing.assert_allclose(merged.correlation(), single.correlation(), atol=1e-5)
+    np.testing.assert_array_equal(merged.n, single.n)
+
+
+def test_chunked_equals_in_memory_and_flags_approximation():
+    frame, y = _frame(4000)
+    validator = MedicalConsistencyValidator(FEATURES)
+    whole = validator.compute(frame, y)
+    chunked = validator.compute_chunked(lambda: [(frame.iloc[:2000], y[:2000]), (frame.iloc[2000:], y[2000:])])
+    assert chunked['n_rows'] == whole['n_rows'] == 4000
+    for feature in FEATURES:
+        assert chunked['overall'][feature]['pearson'] == pytest.approx(whole['overall'][feature]['pearson'], abs=1e-5)
+    # Bordas de rank vêm só do primeiro chunk: resultado marcado como aproximado
+    assert not chunked['spearman_bins']['exact']
+    assert 'spearman_note' in medical_consistency_report(chunked, FEATURES)
+
+
+def test_undefined_correlation_counts_as_failed():
+    frame, y = _frame(500)
+    frame['imc'] = 25.0  # constante: correlação indefinida
+    correlations = MedicalConsistencyValidator(FEATURES, strata=()).compute(frame, y)
+    report = medical_consistency_report(correlations, FEATURES)
+    imc = report['correlations']['IMC']
+    assert imc['correlation'] is None and imc['meets_expectation'] is False
+    checked = [entry for entry in report['correlations'].values() if 'meets_expectation' in entry]
+    met = sum(entry['meets_expectation'] for entry in checked)
+    assert report['consistency_score'] == pytest.approx(met / len(checked))
+
+
+def test_non_numeric_column_raises_clear_error():
+    frame, y = _frame(100)
+    frame['sexo'] = np.where(frame['sexo'] > 0, 'M', 'F')
+    with pytest.raises(ValueError, match='não numéricas'):
+        MedicalConsistencyValidator(FEATURES).compute(frame, y)
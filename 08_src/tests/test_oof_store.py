@@ -0,0 +1,88 @@
+"""
+Testes do store de predições out-of-fold (user-045)
+"""
+
+import numpy as np
+import pytest
+import sklearn
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier, StackingClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+
+from training.oof_store import OOFStore, fit_stacking, fold_assignment, model_oof
+
+CV = StratifiedKFold(n_splits=3, shuffle=True, random_state=0)
+
+
+@pytest.fixture(scope='module')
+def data():
+    X, y = make_classification(n_samples=300, n_features=6, weights=[0.7], random_state=1)
+    return X, y
+
+
+def _bases():
+    return [('lr', LogisticRegression(max_iter=500)),
+            ('rf', RandomForestClassifier(n_estimators=10, random_state=0))]
+
+
+def test_fit_stacking_matches_sklearn(data, tmp_path):
+    X, y = data
+    stacking = StackingClassifier(_bases(), final_estimator=LogisticRegression(), cv=CV)
+    reference = StackingClassifier(_bases(), final_estimator=LogisticRegression(), cv=CV).fit(X, y)
+    fitted = fit_stacking(stacking, X, y, OOFStore(tmp_path))
+    np.testing.assert_allclose(fitted.predict_proba(X), reference.predict_proba(X), rtol=1e-12)
+    # Atributos privados definidos à mão: os mesmos que o fit do sklearn define
+    assert fitted._n_feature_outs == reference._n_feature_outs
+    np.testing.assert_array_equal(fitted._label_encoder.classes_, reference._label_encoder.classes_)
+
+
+def test_oof_matches_cross_val_predict_and_hits_store(data, tmp_path):
+    X, y = data
+    store = OOFStore(tmp_path)
+    folds = fold_assignment(CV, X, y)
+    model = RandomForestClassifier(n_estimators=10, random_state=0)
+    oof = store.oof_predictions(model, X, y, folds)
+    np.testing.assert_allclose(oof, cross_val_predict(model, X, y, cv=CV, method='predict_proba'))
+    store.oof_predictions(model, X, y, folds)
+    assert store.stats['oof_hits'] == 1 and store.stats['oof_folds'] == 3
+
+
+def test_voting_oof_is_average_of_base_oof(data, tmp_path):
+    X, y = data
+    store = OOFStore(tmp_path)
+    folds = fold_assignment(CV, X, y)
+    voting = VotingClassifier(_bases(), voting='soft', weights=[1, 3])
+    expected = np.average([store.oof_predictions(est, X, y, folds) for _, est in _bases()],
+                          axis=0, weights=[1, 3])
+    np.testing.assert_array_equal(model_oof(voting, X, y, folds, store), expected)
+
+
+def test_interrupted_run_resumes_from_next_fold(tmp_path):
+    store = OOFStore(tmp_path)
+    folds = np.repeat([0, 1, 2], 4)
+    calls = []
+
+    def failing(train, test):
+        calls.append(int(folds[test[0]]))
+        if len(calls) == 2:
+            raise RuntimeError('interrompido')
+        return np.full(len(test), folds[test[0]], dtype=float)
+
+    with pytest.raises(RuntimeError):
+        store.predictions('chave', folds, failing)
+    result = store.predictions('chave', folds, failing)
+    assert calls == [0, 1, 1, 2]
+    np.testing.assert_array_equal(result[:, 0], folds)
+
+
+def test_library_version_changes_fit_key(data, tmp_path, monkeypatch):
+    X, y = data
+    store = OOFStore(tmp_path)
+    model = LogisticRegression(max_iter=500)
+    store.fit(model, X, y)
+    store.fit(model, X, y)
+    assert (store.stats['fits'], store.stats['fit_hits']) == (1, 1)
+    monkeypatch.setattr(sklearn, '__version__', '0.0.0')
+    store.fit(model, X, y)
+    assert store.stats['fits'] == 2
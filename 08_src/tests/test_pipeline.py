@@ -0,0 +1,112 @@
+"""
+Testes do runner do pipeline de notebooks (user-041)
+"""
+
+import fnmatch
+from pathlib import Path
+
+import pytest
+
+from pipeline.runner import run_pipeline, stage_graph
+from pipeline.stages import STAGES, pipeline_stage
+
+
+def copy_upper(root):
+    root = Path(root)
+    (root / 'b.txt').write_text((root / 'a.txt').read_text().upper())
+
+
+def constant_output(root):
+    (Path(root) / 'c.txt').write_text('fixo')
+
+
+def derived_output(root):
+    root = Path(root)
+    (root / 'd.txt').write_text((root / 'c.txt').read_text() * 2)
+
+
+def broken(root):
+    raise RuntimeError('falhou')
+
+
+def _statuses(result):
+    return {name: entry['status'] for name, entry in result['stages'].items()}
+
+
+def _run(stages, root, **kwargs):
+    return run_pipeline(stages, root=root, max_workers=1, **kwargs)
+
+
+def test_unchanged_inputs_skip_and_changed_inputs_rerun(tmp_path):
+    stages = [pipeline_stage('copia', ['a.txt'], ['b.txt'], action=copy_upper)]
+    (tmp_path / 'a.txt').write_text('x')
+    assert _statuses(_run(stages, tmp_path)) == {'copia': 'executed'}
+    assert _statuses(_run(stages, tmp_path)) == {'copia': 'skipped'}
+
+    (tmp_path / 'a.txt').write_text('y')
+    assert _statuses(_run(stages, tmp_path)) == {'copia': 'executed'}
+    assert (tmp_path / 'b.txt').read_text() == 'Y'
+
+    (tmp_path / 'b.txt').unlink()
+    result = _run(stages, tmp_path)
+    assert result['stages']['copia']['reason'] == 'saídas ausentes'
+    assert _statuses(_run(stages, tmp_path, force=True)) == {'copia': 'executed'}
+
+
+def test_identical_upstream_outputs_do_not_rerun_downstream(tmp_path):
+    stages = [
+        pipeline_stage('constante', ['a.txt'], ['c.txt'], action=constant_output),
+        pipeline_stage('derivado', ['c.txt'], ['d.txt'], action=derived_output)
+    ]
+    (tmp_path / 'a.txt').write_text('x')
+    _run(stages, tmp_path)
+    (tmp_path / 'a.txt').write_text('y')
+    assert _statuses(_run(stages, tmp_path)) == {'constante': 'executed', 'derivado': 'skipped'}
+
+
+def test_failure_blocks_only_dependents(tmp_path):
+    stages = [
+        pipeline_stage('quebrado', ['a.txt'], ['c.txt'], action=broken),
+        pipeline_stage('derivado', ['c.txt'], ['d.txt'], action=derived_output),
+        pipeline_stage('copia', ['a.txt'], ['b.txt'], action=copy_upper)
+    ]
+    (tmp_path / 'a.txt').write_text('x')
+    assert _statuses(_run(stages, tmp_path)) == {
+        'quebrado': 'failed', 'derivado': 'blocked', 'copia': 'executed'
+    }
+
+
+def test_dry_run_reports_downstream_of_pending_stage(tmp_path):
+    stages = [
+        pipeline_stage('copia', ['a.txt'], ['b.txt'], action=copy_upper),
+        pipeline_stage('derivado', ['b.txt'], ['d.txt'], action=derived_output)
+    ]
+    (tmp_path / 'a.txt').write_text('x')
+    result = _run(stages, tmp_path, dry_run=True)
+    assert _statuses(result) == {'copia': 'would_run', 'derivado': 'would_run'}
+    assert not (tmp_path / 'b.txt').exists()
+
+
+def test_cycle_is_rejected():
+    stages = [pipeline_stage('a', ['x'], ['y'], action=copy_upper),
+              pipeline_stage('b', ['y'], ['x'], action=copy_upper)]
+    with pytest.raises(ValueError):
+        stage_graph(stages)
+
+
+@pytest.mark.parametrize('stage, path', [
+    ('04_optimization', '04_reports/modeling/final_model_results.csv'),
+    ('04_optimization', '04_reports/model_comparison/model_results.csv'),
+    ('05_interpretability', '04_reports/models/model_training_summary.json'),
+    ('05_interpretability', '03_models/final/gb_optimized.pkl'),
+    ('05_interpretability', '00_data/processed_data_full.csv')
+])
+def test_notebook_reads_are_declared(stage, path):
+    inputs = next(s['inputs'] for s in STAGES if s['name'] == stage)
+    assert any(fnmatch.fnmatch(path, pattern) for pattern in inputs)
+
+
+def test_project_graph():
+    graph = stage_graph(STAGES)
+    assert '03_training' in graph['04_optimization']
+    assert graph['06_model_metrics'] == ['03_training']
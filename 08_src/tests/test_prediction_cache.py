@@ -0,0 +1,56 @@
+"""
+Testes do cache de predições da validação clínica (user-037)
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.preprocessing import StandardScaler
+
+from clinical_fast.prediction_cache import (PredictionCache, cached_predictions, data_hash,
+                                       derive_predictions, predict_once)
+
+
+def _fitted(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 4)), columns=['a', 'b', 'c', 'd'])
+    y = (X['a'] + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = GradientBoostingClassifier(n_estimators=20, random_state=0).fit(scaler.transform(X), y)
+    return model, scaler, X
+
+
+def test_single_pass_matches_predict():
+    model, scaler, X = _fitted()
+    y_proba, y_pred = predict_once(model, X, scaler)
+    X_scaled = scaler.transform(X)
+    np.testing.assert_array_equal(y_proba, model.predict_proba(X_scaled)[:, 1])
+    np.testing.assert_array_equal(y_pred, model.predict(X_scaled))
+
+
+def test_derive_predictions_uses_model_classes():
+    model = type('Model', (), {'classes_': np.array(['nao', 'sim'])})()
+    assert derive_predictions(model, [0.2, 0.5, 0.7]).tolist() == ['nao', 'nao', 'sim']
+
+
+def test_cache_hit_on_rerun_and_miss_on_changed_data(tmp_path):
+    model, scaler, X = _fitted()
+    cache = PredictionCache(tmp_path)
+    first = cached_predictions(model, X, scaler, cache=cache)
+    second = cached_predictions(model, X, scaler, cache=cache)
+    assert (first[2], second[2]) == (False, True)
+    np.testing.assert_array_equal(first[0], second[0])
+    np.testing.assert_array_equal(first[1], second[1])
+
+    changed = X.copy()
+    changed.iloc[0, 0] += 1e-9
+    assert cached_predictions(model, changed, scaler, cache=cache)[2] is False
+    assert not list(tmp_path.glob('*.tmp.npy'))
+
+
+def test_data_hash_sensitive_to_columns_and_dtypes():
+    X = pd.DataFrame({'a': [1.0, 2.0], 'b': [3.0, 4.0]})
+    assert data_hash(X) == data_hash(X.copy())
+    assert data_hash(X) != data_hash(X.rename(columns={'b': 'c'}))
+    assert data_hash(X) != data_hash(X.astype(np.float32))
+    assert data_hash(X) != data_hash(X[['b', 'a']])
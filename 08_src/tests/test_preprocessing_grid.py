@@ -0,0 +1,72 @@
+"""
+Testes da grade de experimentos do pré-processamento (user-043)
+"""
+
+import pandas as pd
+import pytest
+
+from data import preprocessing_grid
+from data.datasets import create_simulated_data
+from data.preprocessing_grid import (CELL_COLUMNS, CELLS_FILE, grid_cells, output_for_source,
+                                     prepare_data, run_grid)
+
+CELLS = grid_cells(test_sizes=(0.2, 0.3), repetitions=1, scalers=('none', 'StandardScaler'))
+
+
+@pytest.fixture(scope='module')
+def data():
+    return prepare_data(create_simulated_data(600, random_state=3))
+
+
+def _ids(result):
+    return sorted(result['cells']['cell'])
+
+
+def test_resume_skips_cells_with_same_signature(data, tmp_path):
+    X, y = data
+    first = run_grid(X, y, CELLS, tmp_path, max_workers=1, n_estimators=5)
+    assert (first['executed'], first['skipped']) == (4, 0)
+    again = run_grid(X, y, CELLS, tmp_path, max_workers=1, n_estimators=5)
+    assert (again['executed'], again['skipped']) == (0, 4)
+    pd.testing.assert_frame_equal(again['cells'].reset_index(drop=True),
+                                  first['cells'].reset_index(drop=True))
+
+
+def test_changed_data_or_config_is_not_resumed(data, tmp_path):
+    X, y = data
+    base = run_grid(X, y, CELLS, tmp_path, max_workers=1, n_estimators=5)
+    changed = X.copy()
+    changed[0, 0] += 1.0
+    other_data = run_grid(changed, y, CELLS, tmp_path, max_workers=1, n_estimators=5)
+    assert other_data['executed'] == 4 and other_data['signature'] != base['signature']
+    other_config = run_grid(X, y, CELLS, tmp_path, max_workers=1, n_estimators=6)
+    assert other_config['executed'] == 4
+    assert _ids(other_config) == _ids(base)
+    assert (other_config['cells']['signature'] == other_config['signature']).all()
+
+
+def test_results_independent_of_workers(data, tmp_path):
+    X, y = data
+    sequential = run_grid(X, y, CELLS, tmp_path / 'seq', max_workers=1, n_estimators=5)
+    parallel = run_grid(X, y, CELLS, tmp_path / 'par', max_workers=2, n_estimators=5)
+    columns = ['cell', 'recall', 'precision', 'f2', 'fn', 'fp']
+    pd.testing.assert_frame_equal(
+        sequential['cells'].sort_values('cell')[columns].reset_index(drop=True),
+        parallel['cells'].sort_values('cell')[columns].reset_index(drop=True))
+
+
+def test_old_cells_file_is_rewritten(data, tmp_path):
+    X, y = data
+    (tmp_path / CELLS_FILE).write_text('cell,f2\n0.20|0|none,0.5\n')
+    result = run_grid(X, y, CELLS[:1], tmp_path, max_workers=1, n_estimators=5)
+    assert result['executed'] == 1
+    assert list(pd.read_csv(tmp_path / CELLS_FILE).columns) == CELL_COLUMNS
+
+
+def test_simulated_data_never_targets_reports_dir(tmp_path):
+    assert output_for_source('real') == preprocessing_grid.OUTPUT_DIR
+    assert output_for_source('simulated') is None
+    assert output_for_source('simulated', preprocessing_grid.OUTPUT_DIR, allow_simulated=True) is None
+    redirected = output_for_source('simulated', allow_simulated=True)
+    assert preprocessing_grid.REPORTS_DIR not in redirected.parents
+    assert output_for_source('simulated', tmp_path, allow_simulated=True) == tmp_path.resolve()
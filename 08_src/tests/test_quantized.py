@@ -0,0 +1,61 @@
+"""
+Testes da inferência quantizada (user-030)
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+from inference.quantized import QuantizedEnsemble, boosting_baseline, code_dtype
+
+
+def _data(n=1500, p=5, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, p))
+    y = (X[:, 0] + 0.5 * X[:, 1] + rng.normal(scale=0.7, size=n) > 0).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize('model', [
+    GradientBoostingClassifier(n_estimators=30, max_depth=3, random_state=0),
+    RandomForestClassifier(n_estimators=10, max_depth=4, random_state=0),
+    RandomForestClassifier(n_estimators=5, random_state=0)  # > 64 folhas: travessia por nível
+])
+def test_matches_sklearn(model):
+    X, y = _data()
+    model.fit(X, y)
+    ensemble = QuantizedEnsemble(model, X.shape[1])
+    X_new, _ = _data(800, seed=1)
+    expected = model.predict_proba(X_new)[:, 1]
+    np.testing.assert_allclose(ensemble.predict_proba(X_new), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(ensemble.predict_proba_float(X_new), expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize('model', [
+    GradientBoostingClassifier(n_estimators=5, random_state=0),
+    RandomForestClassifier(n_estimators=5, random_state=0)
+])
+def test_trees_without_splits(model):
+    X = np.ones((50, 3))
+    y = np.r_[np.zeros(30), np.ones(20)].astype(int)
+    model.fit(X, y)
+    ensemble = QuantizedEnsemble(model, 3)
+    np.testing.assert_allclose(ensemble.predict_proba(X), model.predict_proba(X)[:, 1], atol=1e-12)
+
+
+def test_code_dtype_bounds():
+    assert code_dtype(255) == np.uint8
+    assert code_dtype(256) == np.uint16
+    assert code_dtype(65_535) == np.uint16
+    assert code_dtype(65_536) == np.uint32
+
+
+def test_boosting_baseline_public_fallback():
+    X, y = _data()
+    model = GradientBoostingClassifier(n_estimators=20, random_state=0).fit(X, y)
+    public = SimpleNamespace(estimators_=model.estimators_, learning_rate=model.learning_rate,
+                             decision_function=model.decision_function)
+    assert boosting_baseline(public, X.shape[1]) == pytest.approx(
+        boosting_baseline(model, X.shape[1]), abs=1e-12)
@@ -0,0 +1,76 @@
+"""
+Testes do pipeline de renderização de figuras (user-040)
+"""
+
+import importlib
+import linecache
+import sys
+
+import pytest
+
+from reports import rendering
+from reports.rendering import figure_spec, output_for_source, render_figures, spec_key
+
+MODULE = '''
+def _plt():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _color():
+    return {color!r}
+
+
+def render(inputs):
+    fig, ax = _plt().subplots(figsize=(2, 2))
+    ax.plot(inputs['values'], color=_color())
+    return fig
+'''
+
+
+@pytest.fixture
+def figure_module(tmp_path, monkeypatch):
+    path = tmp_path / 'figuras_teste.py'
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def load(color):
+        path.write_text(MODULE.format(color=color))
+        linecache.checkcache(str(path))
+        sys.modules.pop('figuras_teste', None)
+        importlib.invalidate_caches()
+        return importlib.import_module('figuras_teste')
+
+    yield load
+    sys.modules.pop('figuras_teste', None)
+
+
+def test_helper_change_invalidates_key(figure_module):
+    first = figure_module('red')
+    key = spec_key(figure_spec('linha', first.render, {'values': [1, 2, 3]}))
+    assert spec_key(figure_spec('linha', first.render, {'values': [1, 2, 3]})) == key
+    assert spec_key(figure_spec('linha', first.render, {'values': [1, 2, 4]})) != key
+
+    second = figure_module('blue')
+    assert spec_key(figure_spec('linha', second.render, {'values': [1, 2, 3]})) != key
+
+
+def test_render_skips_cached_and_rerenders_on_force(figure_module, tmp_path):
+    module = figure_module('red')
+    specs = [figure_spec('linha', module.render, {'values': [1, 2, 3]}, dpi=20)]
+    output = tmp_path / 'saida'
+    first = render_figures(specs, output, max_workers=1)
+    assert list(first['rendered']) == ['eda/linha.png'] and not first['failed']
+    assert render_figures(specs, output, max_workers=1)['skipped'] == ['eda/linha.png']
+    assert list(render_figures(specs, output, max_workers=1, force=True)['rendered']) == ['eda/linha.png']
+    assert not list(output.rglob('*.tmp.png'))
+
+
+def test_simulated_data_never_targets_reports_dir(tmp_path):
+    assert output_for_source('real') == rendering.REPORTS_DIR
+    assert output_for_source('simulated') is None
+    assert output_for_source('simulated', rendering.REPORTS_DIR / 'eda', allow_simulated=True) is None
+    redirected = output_for_source('simulated', allow_simulated=True)
+    assert rendering.REPORTS_DIR not in redirected.parents
+    assert output_for_source('simulated', tmp_path, allow_simulated=True) == tmp_path.resolve()
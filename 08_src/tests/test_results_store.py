@@ -0,0 +1,88 @@
+"""
+Testes do histórico indexado de validações clínicas (user-039)
+"""
+
+import pytest
+
+from clinical_fast import results_store
+from clinical_fast.results_store import (UNVERSIONED, ResultsStore, model_version_from_path, record_run,
+                                    resolve_model_version)
+
+
+def _demo_run(timestamp, specificity, version=None):
+    results = {
+        'timestamp': timestamp,
+        'demo_info': {'samples': 100},
+        'validations': {
+            'medical': {'consistency_score': 0.8},
+            'thresholds': {'scenarios': {
+                'screening': {'threshold': 0.3, 'sensitivity': 0.9, 'specificity': specificity,
+                              'accuracy': 0.7, 'precision': 0.5,
+                              'confusion_matrix': {'tp': 9, 'fp': 4, 'tn': 6, 'fn': 1}},
+                'broken': {'error': 'sem dados'}
+            }}
+        },
+        'summary': {'status': 'ok'}
+    }
+    if version is not None:
+        results['model_version'] = version
+    return results
+
+
+@pytest.fixture
+def store():
+    with ResultsStore(':memory:') as store:
+        yield store
+
+
+def test_ingest_is_idempotent_by_source(store):
+    run_id = store.ingest(_demo_run('2025-01-01T00:00:00', 0.6), source='a.json', model_version='gb_v1')
+    assert store.ingest(_demo_run('2025-01-02T00:00:00', 0.7), source='a.json') is None
+    assert [run['id'] for run in store.runs()] == [run_id]
+    assert store.payload(run_id)['summary'] == {'status': 'ok'}
+
+
+def test_threshold_history_filters_by_version_newest_first(store):
+    store.ingest_many([
+        (_demo_run('2025-01-01T00:00:00', 0.60), 'a', 'gb_v1'),
+        (_demo_run('2025-01-03T00:00:00', 0.70), 'b', 'gb_v1'),
+        (_demo_run('2025-01-02T00:00:00', 0.65), 'c', 'rf_v1')
+    ])
+    history = store.threshold_history('screening', 'specificity', 'gb_v1')
+    assert [row['specificity'] for row in history] == [0.70, 0.60]
+    assert len(store.threshold_history('screening', last=2)) == 2
+    assert store.threshold_history('broken') == []
+    with pytest.raises(ValueError):
+        store.threshold_history('screening', metric='roc_auc')
+
+
+def test_compare_runs_delta(store):
+    a = store.ingest(_demo_run('2025-01-01T00:00:00', 0.60), model_version='gb_v1')
+    b = store.ingest(_demo_run('2025-01-02T00:00:00', 0.75), model_version='gb_v1')
+    specificity = store.compare_runs(a, b)['screening']['specificity']
+    assert specificity['delta'] == pytest.approx(0.15)
+
+
+def test_missing_version_is_flagged(store, tmp_path, capsys):
+    store.ingest(_demo_run('2025-01-01T00:00:00', 0.6))
+    store.ingest(_demo_run('2025-01-02T00:00:00', 0.6, version='demo_simulated'))
+    assert [run['model_version'] for run in store.runs()] == ['demo_simulated', UNVERSIONED]
+
+    record_run(_demo_run('2025-01-03T00:00:00', 0.6), tmp_path / 'r.json', db_path=tmp_path / 'db.sqlite')
+    assert UNVERSIONED in capsys.readouterr().out
+    assert resolve_model_version({'model_version': 'gb_v1'}, 'gb_v2') == 'gb_v2'
+
+
+def test_model_version_from_path(tmp_path, monkeypatch):
+    bundle = tmp_path / '05_artifacts' / 'gb_v1'
+    bundle.mkdir(parents=True)
+    (bundle / 'pipeline.pkl').write_bytes(b'modelo')
+    monkeypatch.setattr(results_store, 'ARTIFACTS_DIR', tmp_path / '05_artifacts')
+    assert model_version_from_path(bundle / 'pipeline.pkl') == 'gb_v1'
+
+    loose = tmp_path / 'Gradient_Boosting.pkl'
+    loose.write_bytes(b'modelo')
+    version = model_version_from_path(loose)
+    assert version.startswith('Gradient_Boosting@')
+    loose.write_bytes(b'outro modelo')
+    assert model_version_from_path(loose) != version
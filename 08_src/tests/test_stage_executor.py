@@ -0,0 +1,85 @@
+"""
+Testes da execução concorrente dos estágios da validação clínica (user-036)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from clinical_fast.stage_executor import (_threshold_scenario_stage, frame_arrays, frame_from_arrays,
+                                     run_stages)
+
+
+def _frame(n=500, index=None):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'idade': rng.integers(30, 70, n).astype(np.int16),
+        'imc': rng.normal(26, 4, n).astype(np.float32),
+        'glicose': np.where(rng.random(n) < 0.1, np.nan, rng.normal(80, 15, n)),
+        'diabetes': rng.random(n) < 0.05,
+        'risco_hipertensao': (rng.random(n) < 0.3).astype(np.int64)
+    }, index=index)
+    return df, df.drop(columns=['risco_hipertensao']), df['risco_hipertensao']
+
+
+def _frame_stage(arrays, meta):
+    """Estágio de teste: o que um estágio real vê de df, X e y"""
+    df, X, y = frame_from_arrays(arrays, meta)
+    return {
+        'dtypes': {name: str(dtype) for name, dtype in df.dtypes.items()},
+        'x_columns': list(X.columns),
+        'sums': {name: float(X[name].sum()) for name in X.columns},
+        'positives': int(y.sum()),
+        'index_head': df.index[:3].tolist()
+    }
+
+
+@pytest.mark.parametrize('index', [None, pd.Index(np.arange(1000, 1500), name='paciente')])
+def test_frame_roundtrip_preserves_dtypes(index):
+    df, X, y = _frame(index=index)
+    arrays, meta = frame_arrays(df, X, y)
+    assert meta['x_from_df'] and meta['y_from_df']
+    df2, X2, y2 = frame_from_arrays(arrays, meta)
+    pd.testing.assert_frame_equal(df2, df)
+    pd.testing.assert_frame_equal(X2, X)
+    pd.testing.assert_series_equal(y2, y)
+
+
+def test_independent_x_and_y_are_shared_separately():
+    df, X, y = _frame()
+    X = X * 2.0
+    y = pd.Series(y.to_numpy(dtype=np.float64), name='alvo')
+    arrays, meta = frame_arrays(df, X, y)
+    assert not meta['x_from_df'] and not meta['y_from_df']
+    _, X2, y2 = frame_from_arrays(arrays, meta)
+    pd.testing.assert_frame_equal(X2, X)
+    pd.testing.assert_series_equal(y2, y)
+
+
+def test_non_numeric_frames_are_not_shareable():
+    df, X, y = _frame()
+    assert frame_arrays(df, X, y.map({0: 'nao', 1: 'sim'}).astype(object)) is None
+    with_text = df.assign(grupo='a')
+    assert frame_arrays(with_text, X, y) is None
+
+
+def test_parallel_matches_sequential():
+    df, X, y = _frame()
+    arrays, meta = frame_arrays(df, X, y)
+    arrays = {**arrays, 'y': y.to_numpy(), 'y_proba': np.linspace(0, 1, len(y))}
+    stages = {
+        'frame': (_frame_stage, {'meta': meta}),
+        'balanced': (_threshold_scenario_stage, {'scenario': 'balanced'})
+    }
+    sequential, _ = run_stages(stages, arrays, parallel=False)
+    parallel, _ = run_stages(stages, arrays, parallel=True, max_workers=2)
+    assert parallel == sequential
+    assert sequential['frame']['dtypes']['imc'] == 'float32'
+
+
+def test_stage_errors_are_isolated():
+    def broken(arrays):
+        raise ValueError("falhou")
+
+    results, _ = run_stages({'broken': (broken, {}), 'ok': (lambda arrays: 1, {})}, {}, parallel=False)
+    assert results == {'broken': {'error': 'falhou'}, 'ok': 1}
@@ -0,0 +1,75 @@
+"""
+Testes do acumulador de métricas em streaming (user-027)
+"""
+
+import numpy as np
+import pytest
+from sklearn.metrics import average_precision_score, confusion_matrix, roc_auc_score
+
+from clinical_fast.streaming_metrics import StreamingMetricsAccumulator
+
+THRESHOLDS = {'screening': 0.2, 'balanced': 0.45, 'confirmation': 0.7}
+
+
+def _scores(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n) < 0.3).astype(int)
+    proba = np.clip(rng.normal(0.35 + 0.3 * y, 0.15), 0.0, 1.0)
+    return y, proba
+
+
+def test_merge_equals_single_pass():
+    y, proba = _scores()
+    single = StreamingMetricsAccumulator(THRESHOLDS).update(y, proba)
+    merged = StreamingMetricsAccumulator(THRESHOLDS)
+    for part in np.array_split(np.arange(len(y)), 7):
+        merged.merge(StreamingMetricsAccumulator(THRESHOLDS).update(y[part], proba[part]))
+    assert np.array_equal(single.counts, merged.counts)
+    assert single.summary() == merged.summary()
+
+
+def test_confusion_matches_sklearn_at_thresholds():
+    y, proba = _scores()
+    accumulator = StreamingMetricsAccumulator(THRESHOLDS).update(y, proba)
+    for threshold in THRESHOLDS.values():
+        cm = accumulator.confusion_at(threshold)
+        tn, fp, fn, tp = confusion_matrix(y, (proba >= threshold).astype(int)).ravel()
+        assert cm['exact']
+        assert (cm['tn'], cm['fp'], cm['fn'], cm['tp']) == (tn, fp, fn, tp)
+
+
+def test_auc_within_error_bound():
+    y, proba = _scores()
+    accumulator = StreamingMetricsAccumulator(n_bins=200).update(y, proba)
+    roc = accumulator.roc_auc()
+    assert abs(roc['auc'] - roc_auc_score(y, proba)) <= roc['error_bound'] + 1e-12
+    pr = accumulator.pr_auc()
+    assert pr['lower'] - 1e-9 <= average_precision_score(y, proba) <= pr['upper'] + 1e-9
+
+
+def test_nan_scores_are_dropped_and_counted():
+    y, proba = _scores(1000)
+    proba_nan = proba.copy()
+    proba_nan[:10] = np.nan
+    accumulator = StreamingMetricsAccumulator(THRESHOLDS).update(y, proba_nan)
+    reference = StreamingMetricsAccumulator(THRESHOLDS).update(y[10:], proba[10:])
+    assert accumulator.n_missing == 10
+    assert accumulator.n_samples == 990
+    assert np.array_equal(accumulator.counts, reference.counts)
+    assert accumulator.summary()['n_missing'] == 10
+
+
+def test_threshold_one_counts_scores_equal_to_one():
+    y = np.array([1, 1, 0, 0])
+    proba = np.array([1.0, 0.9999999, 1.0, 0.1])
+    cm = StreamingMetricsAccumulator().update(y, proba).confusion_at(1.0)
+    assert cm == {'tn': 1, 'fp': 1, 'fn': 1, 'tp': 1, 'exact': True}
+
+
+def test_rejects_labels_outside_binary():
+    accumulator = StreamingMetricsAccumulator()
+    with pytest.raises(ValueError):
+        accumulator.update([0, 1, 2], [0.1, 0.5, 0.9])
+    with pytest.raises(ValueError):
+        accumulator.update([0, 1], [0.1])
+    assert accumulator.n_samples == 0
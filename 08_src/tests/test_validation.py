@@ -0,0 +1,78 @@
+"""
+Testes da validação compilada dos dados do paciente (user-048)
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inference.validation import REQUIRED_FIELDS, compile_schema, validate_patient
+
+VALID = {
+    'sexo': 1, 'idade': 50, 'fumante_atualmente': 0, 'cigarros_por_dia': 0,
+    'medicamento_pressao': 0, 'diabetes': 0, 'colesterol_total': 210,
+    'pressao_sistolica': 130, 'pressao_diastolica': 85, 'imc': 26.5,
+    'frequencia_cardiaca': 72, 'glicose': 90
+}
+
+
+@pytest.fixture(scope='module')
+def schema():
+    return compile_schema(REQUIRED_FIELDS)
+
+
+def _with(**changes):
+    record = dict(VALID, **changes)
+    return {k: v for k, v in record.items() if v is not ...}
+
+
+LEGACY_CASES = [
+    VALID,
+    _with(idade=10),
+    _with(pressao_sistolica=300, imc=60),
+    _with(glicose=...),
+    _with(sexo='', idade=120)
+]
+
+
+@pytest.mark.parametrize('record', LEGACY_CASES)
+def test_same_result_as_validate_patient(schema, record):
+    assert schema.validate(record) == validate_patient(record)
+
+
+@pytest.mark.parametrize('changes, error', [
+    ({'diabetes': 2}, 'diabetes deve ser 0 ou 1'),
+    ({'idade': 'abc'}, 'idade deve ser numérico'),
+    ({'idade': float('inf')}, 'idade deve ser numérico'),
+    ({'imc': float('nan')}, 'Campo obrigatório: imc')
+])
+def test_stricter_rules(schema, changes, error):
+    assert schema.validate(_with(**changes))['errors'] == [error]
+
+
+def test_pack_writes_feature_order_in_float32(schema):
+    row, errors = schema.pack(_with(idade='50'))
+    assert errors == [] and row.dtype == np.float32 and row.shape == (1, len(REQUIRED_FIELDS))
+    np.testing.assert_array_equal(row[0], np.float32([VALID[f] for f in REQUIRED_FIELDS]))
+    assert schema.pack(_with(idade=10)) == (None, ['idade deve estar entre 18 e 100'])
+
+
+def test_rows_are_per_thread(schema):
+    rows = []
+    thread = threading.Thread(target=lambda: rows.append(schema.pack(VALID)[0]))
+    thread.start()
+    thread.join()
+    assert rows[0] is not schema.pack(VALID)[0]
+
+
+def test_batch_matches_per_record(schema):
+    records = LEGACY_CASES + [_with(diabetes=2), _with(idade='abc'), _with(imc=float('nan'))]
+    for batch in (records, pd.DataFrame.from_records(records)):
+        X, valid, errors = schema.validate_batch(batch)
+        for i, record in enumerate(records):
+            expected = schema.validate(record)
+            assert valid[i] == expected['is_valid']
+            assert errors.get(i, []) == expected['errors']
+        np.testing.assert_array_equal(X[0], schema.pack(VALID)[0][0])
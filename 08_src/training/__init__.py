@@ -0,0 +1,3 @@
+"""
+Treino e comparação de modelos fora dos notebooks
+"""
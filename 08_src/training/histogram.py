@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Treino Out-of-Core com Gradient Boosting por Histogramas
+
+Os notebooks carregam X_train_balanced.npy inteiro (já inflado pelo SMOTE)
+e treinam o GradientBoostingClassifier do sklearn, que usa um único núcleo
+e escala mal acima de algumas centenas de milhares de linhas. Aqui:
+
+1. a fonte (CSV ou diretório de coorte de data.cohort) é lida em chunks;
+   uma amostra de até 200 mil linhas ajusta imputer, scaler e os cortes de
+   bins (o mesmo _BinMapper do HistGradientBoostingClassifier);
+2. cada chunk é imputado, escalonado e convertido uma única vez para bins
+   uint8, gravados num memmap em ordem Fortran (1 byte por célula, contra
+   8 do float64); o float completo nunca fica em memória;
+3. o boosting roda sobre o memmap com o TreeGrower do sklearn (histogramas
+   em OpenMP, todos os núcleos), com class_weight='balanced' em vez de
+   materializar as linhas sintéticas do SMOTE;
+4. o resultado é um HistGradientBoostingClassifier comum (predict_proba
+   sobre features escalonadas), exportado com imputer, scaler e thresholds
+   do holdout como um bundle padrão de 05_artifacts.
+
+Com a amostra igual ao treino (até 200 mil linhas), o modelo é idêntico ao
+HistGradientBoostingClassifier.fit em memória com os mesmos parâmetros.
+
+O passo 3 usa internos privados do sklearn (TreeGrower,
+_update_raw_predictions, _loss, _bin_mapper, _encode_y,
+_finalize_sample_weight, _feature_subsample_rng, _predictors), que mudam sem
+aviso entre versões: o módulo só importa com as versões do scikit-learn em
+SUPPORTED_SKLEARN, verificadas contra o fit em memória (tests/test_histogram.py).
+
+Uso:
+    python 08_src/training/histogram.py <fonte> [versao]
+    python 08_src/training/histogram.py benchmark [n_linhas ...]
+"""
+
+import sys
+import tempfile
+import time
+from datetime import datetime
+from importlib.metadata import version as package_version
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from clinical_fast.chunked_validation import chunk_source, find_target_column
+from data.cohort import FEATURES
+from inference.artifacts import ARTIFACTS_DIR
+from training.incremental import (BUNDLE_ARTIFACTS, _json_params, evaluate,
+                                  holdout_thresholds, write_bundle)
+
+DEFAULT_VERSION = 'hgb_v1'
+DEFAULT_CHUNK_SIZE = 1_000_000
+# Mesmo subsample do _BinMapper do sklearn
+SAMPLE_ROWS = 200_000
+HOLDOUT_FRACTION = 0.1
+MAX_HOLDOUT_ROWS = 200_000
+
+# Versões (major.minor) do scikit-learn verificadas com os internos usados em boost_binned
+SUPPORTED_SKLEARN = ('1.6',)
+
+HIST_PARAMS = {
+    'max_iter': 200,
+    'learning_rate': 0.1,
+    'max_leaf_nodes': 31,
+    'max_depth': None,
+    'min_samples_leaf': 20,
+    'l2_regularization': 0.0,
+    'max_bins': 255,
+    'class_weight': 'balanced'
+}
+
+
+def check_sklearn_version(installed=None):
+    """ImportError com mensagem clara fora das versões do scikit-learn em SUPPORTED_SKLEARN"""
+    installed = installed or package_version('scikit-learn')
+    if '.'.join(installed.split('.')[:2]) not in SUPPORTED_SKLEARN:
+        raise ImportError(
+            f"training.histogram usa internos privados do scikit-learn e foi verificado com "
+            f"{', '.join(v + '.x' for v in SUPPORTED_SKLEARN)}; instalado: {installed}. "
+            "Instale uma versão suportada ou valide boost_binned com tests/test_histogram.py "
+            "e inclua a versão em SUPPORTED_SKLEARN."
+        )
+
+
+check_sklearn_version()
+
+
+def _n_threads(n_threads=None):
+    from sklearn.utils._openmp_helpers import _openmp_effective_n_threads
+    return _openmp_effective_n_threads(n_threads)
+
+
+def _split_frame(frame, features, target):
+    """Features em float64, como ArtifactBundle.as_array na inferência (coortes gravam float32)"""
+    return frame[features].astype(np.float64), frame[target].to_numpy()
+
+
+def scan_source(source, holdout_fraction=HOLDOUT_FRACTION, sample_rows=SAMPLE_ROWS,
+                max_holdout_rows=MAX_HOLDOUT_ROWS, random_state=42):
+    """
+    Passadas 1 e 2: conta as linhas, sorteia o holdout e a amostra de ajuste
+    (linhas de treino) e devolve (n_linhas, máscara de holdout, amostra, holdout).
+    """
+    n_rows, target = 0, None
+    for frame in source():
+        target = target or find_target_column(list(frame.columns))
+        n_rows += len(frame)
+    if n_rows == 0:
+        raise ValueError("Fonte sem linhas")
+
+    rng = np.random.default_rng(random_state)
+    n_holdout = min(int(n_rows * holdout_fraction), max_holdout_rows)
+    holdout_mask = np.zeros(n_rows, dtype=bool)
+    holdout_mask[rng.choice(n_rows, n_holdout, replace=False)] = True
+    train_index = np.flatnonzero(~holdout_mask)
+    sample_mask = np.zeros(n_rows, dtype=bool)
+    sample_mask[train_index if len(train_index) <= sample_rows
+                else rng.choice(train_index, sample_rows, replace=False)] = True
+
+    sample, holdout, start = [], [], 0
+    for frame in source():
+        rows = slice(start, start + len(frame))
+        sample.append(frame[sample_mask[rows]])
+        holdout.append(frame[holdout_mask[rows]])
+        start += len(frame)
+    return n_rows, target, holdout_mask, pd.concat(sample), pd.concat(holdout)
+
+
+def fit_preprocessing(sample_X):
+    """Imputer (mediana, com nomes das features) e StandardScaler, como nos bundles oficiais"""
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import StandardScaler
+
+    imputer = SimpleImputer(strategy='median').fit(sample_X)
+    scaler = StandardScaler().fit(imputer.transform(sample_X))
+    return imputer, scaler
+
+
+def template_model(X_sample, y_sample, params=None, random_state=42):
+    """
+    HistGradientBoostingClassifier ajustado com 1 iteração na amostra: define
+    classes, loss e o _BinMapper (cortes de bins) usados no treino completo.
+    """
+    from sklearn.ensemble import HistGradientBoostingClassifier
+
+    params = dict(HIST_PARAMS, **(params or {}))
+    max_iter = params.pop('max_iter')
+    model = HistGradientBoostingClassifier(
+        max_iter=1, early_stopping=False, random_state=random_state, **params
+    ).fit(X_sample, y_sample)
+    model.set_params(max_iter=max_iter)
+    return model
+
+
+def bin_source(source, features, target, holdout_mask, imputer, scaler, bin_mapper, path):
+    """Passada 3: linhas de treino imputadas, escalonadas e em bins uint8 (memmap Fortran)"""
+    n_train = int((~holdout_mask).sum())
+    X_binned = np.lib.format.open_memmap(
+        path, mode='w+', dtype=np.uint8, shape=(n_train, len(features)), fortran_order=True
+    )
+    y = np.empty(n_train, dtype=np.float64)
+    start, offset = 0, 0
+    for frame in source():
+        train = ~holdout_mask[start:start + len(frame)]
+        start += len(frame)
+        X_chunk, y_chunk = _split_frame(frame[train], features, target)
+        size = len(y_chunk)
+        X_binned[offset:offset + size] = bin_mapper.transform(scaler.transform(imputer.transform(X_chunk)))
+        y[offset:offset + size] = y_chunk
+        offset += size
+    X_binned.flush()
+    return X_binned, y
+
+
+def boost_binned(model, X_binned, y, n_threads=None):
+    """Boosting sobre X_binned (uint8, Fortran) com o TreeGrower do sklearn; preenche model"""
+    from sklearn.ensemble._hist_gradient_boosting._gradient_boosting import _update_raw_predictions
+    from sklearn.ensemble._hist_gradient_boosting.common import G_H_DTYPE
+    from sklearn.ensemble._hist_gradient_boosting.grower import TreeGrower
+
+    n_threads = _n_threads(n_threads)
+    bin_mapper = model._bin_mapper
+    loss = model._loss
+    y = model._encode_y(y)
+    sample_weight = model._finalize_sample_weight(None, y)
+
+    missing_bin = bin_mapper.missing_values_bin_idx_
+    has_missing_values = np.array(
+        [(X_binned[:, j] == missing_bin).any() for j in range(X_binned.shape[1])], dtype=np.uint8
+    )
+
+    baseline = loss.fit_intercept_only(y_true=y, sample_weight=sample_weight).reshape((1, -1))
+    raw_predictions = np.zeros((len(y), 1), dtype=baseline.dtype, order='F')
+    raw_predictions += baseline
+    gradient, hessian = loss.init_gradient_and_hessian(n_samples=len(y), dtype=G_H_DTYPE, order='F')
+    rng = model._feature_subsample_rng  # mesmo gerador do fit do modelo-molde
+
+    predictors = []
+    for _ in range(model.max_iter):
+        loss.gradient_hessian(
+            y_true=y, raw_prediction=raw_predictions, sample_weight=sample_weight,
+            gradient_out=gradient, hessian_out=hessian, n_threads=n_threads
+        )
+        grower = TreeGrower(
+            X_binned=X_binned, gradients=gradient, hessians=hessian,
+            n_bins=model.max_bins + 1, n_bins_non_missing=bin_mapper.n_bins_non_missing_,
+            has_missing_values=has_missing_values, is_categorical=None,
+            monotonic_cst=None, interaction_cst=None,
+            max_leaf_nodes=model.max_leaf_nodes, max_depth=model.max_depth,
+            min_samples_leaf=model.min_samples_leaf, l2_regularization=model.l2_regularization,
+            feature_fraction_per_split=model.max_features, rng=rng,
+            shrinkage=model.learning_rate, n_threads=n_threads
+        )
+        grower.grow()
+        predictors.append([grower.make_predictor(binning_thresholds=bin_mapper.bin_thresholds_)])
+        _update_raw_predictions(raw_predictions[:, 0], grower, n_threads)
+
+    model._baseline_prediction = baseline
+    model._predictors = predictors
+    model.train_score_ = np.asarray([])
+    model.validation_score_ = np.asarray([])
+    return model
+
+
+def train_from_source(data_path, chunk_size=DEFAULT_CHUNK_SIZE, params=None, n_threads=None,
+                      work_dir=None, random_state=42):
+    """Treino completo a partir de CSV ou coorte; retorna modelo, pré-processamento e holdout"""
+    source = chunk_source(data_path, chunk_size)
+    timings = {}
+
+    start = time.perf_counter()
+    n_rows, target, holdout_mask, sample, holdout = scan_source(source, random_state=random_state)
+    features = [f for f in FEATURES if f in sample.columns] or [c for c in sample.columns if c != target]
+    sample_X, sample_y = _split_frame(sample, features, target)
+    imputer, scaler = fit_preprocessing(sample_X)
+    model = template_model(scaler.transform(imputer.transform(sample_X)), sample_y, params, random_state)
+    timings['sample'] = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        start = time.perf_counter()
+        X_binned, y = bin_source(source, features, target, holdout_mask, imputer, scaler,
+                                 model._bin_mapper, Path(tmp) / 'X_binned.npy')
+        timings['binning'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        boost_binned(model, X_binned, y, n_threads)
+        timings['boosting'] = time.perf_counter() - start
+        binned_bytes = int(X_binned.nbytes)
+        del X_binned
+
+    holdout_X, holdout_y = _split_frame(holdout, features, target)
+    return {
+        'model': model, 'imputer': imputer, 'scaler': scaler, 'features': features,
+        'holdout_X': holdout_X, 'holdout_y': holdout_y.astype(int), 'holdout_mask': holdout_mask,
+        'n_rows': int(n_rows), 'n_train': int(len(y)), 'binned_bytes': binned_bytes,
+        'seconds': timings, 'n_threads': _n_threads(n_threads)
+    }
+
+
+def holdout_report(result):
+    """Thresholds clínicos e métricas do modelo no holdout"""
+    X = result['scaler'].transform(result['imputer'].transform(result['holdout_X']))
+    proba = result['model'].predict_proba(X)[:, 1]
+    thresholds = holdout_thresholds(result['holdout_y'], proba)
+    metrics = evaluate(
+        result['holdout_y'], proba, {scenario: config['threshold'] for scenario, config in thresholds.items()}
+    )
+    return thresholds, metrics
+
+
+def export_bundle(result, version=DEFAULT_VERSION, artifacts_dir=ARTIFACTS_DIR, data_path=None):
+    """Grava o bundle padrão (imputer, scaler, model, features, thresholds, metadata)"""
+    thresholds, metrics = holdout_report(result)
+    model = result['model']
+    metadata = {
+        'model': type(model).__name__,
+        'params': _json_params(model),
+        'data': {
+            'source': str(data_path) if data_path else None,
+            'n_samples': result['n_rows'],
+            'n_features': len(result['features']),
+            'train_samples': result['n_train'],
+            'holdout_samples': int(len(result['holdout_y']))
+        },
+        'artifacts': dict(BUNDLE_ARTIFACTS),
+        'model_version': version,
+        'training': {
+            'mode': 'histogram_out_of_core',
+            'trained_at': datetime.now().isoformat(),
+            'binned_bytes': result['binned_bytes'],
+            'n_threads': result['n_threads'],
+            'seconds': result['seconds']
+        },
+        'holdout_metrics': {'roc_auc': metrics['roc_auc'], 'brier': metrics['brier']}
+    }
+    path = write_bundle(Path(artifacts_dir) / version, result['imputer'], result['scaler'],
+                        model, result['features'], thresholds, metadata)
+    return path, thresholds, metrics
+
+
+def _smote_gradient_boosting(X, y, random_state=42):
+    """Caminho dos notebooks: SMOTE materializado + GradientBoostingClassifier (params de gb_v1)"""
+    from imblearn.over_sampling import SMOTE
+    from sklearn.ensemble import GradientBoostingClassifier
+
+    X_balanced, y_balanced = SMOTE(random_state=random_state, k_neighbors=5).fit_resample(X, y)
+    model = GradientBoostingClassifier(
+        n_estimators=100, learning_rate=0.05, max_depth=3, random_state=random_state
+    ).fit(X_balanced, y_balanced)
+    return model, len(y_balanced)
+
+
+def run_benchmark(sizes=(100_000, 1_000_000, 10_000_000), baseline_max_rows=1_000_000,
+                  work_dir=None, random_state=42):
+    """Tempo de treino e AUC no holdout: histogramas out-of-core vs SMOTE + GradientBoosting"""
+    from sklearn.metrics import roc_auc_score
+
+    from data.cohort import write_cohort
+
+    results = []
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+            write_cohort(tmp, n_rows, chunk_size=min(n_rows, DEFAULT_CHUNK_SIZE), seed=random_state)
+
+            start = time.perf_counter()
+            result = train_from_source(tmp, work_dir=work_dir, random_state=random_state)
+            hist_seconds = time.perf_counter() - start
+            _, metrics = holdout_report(result)
+            row = {
+                'n_rows': int(n_rows),
+                'histogram': {
+                    'seconds': hist_seconds, 'stages': result['seconds'],
+                    'roc_auc': metrics['roc_auc'],
+                    'binned_mb': result['binned_bytes'] / 1e6,
+                    'float64_mb': result['n_train'] * len(result['features']) * 8 / 1e6
+                },
+                'n_threads': result['n_threads']
+            }
+
+            if n_rows <= baseline_max_rows:
+                # Baseline em memória: treino completo em float64 (sem o holdout)
+                frame = pd.concat(list(chunk_source(tmp, DEFAULT_CHUNK_SIZE)()), ignore_index=True)
+                train = frame[~result['holdout_mask']]
+                X_train = result['scaler'].transform(result['imputer'].transform(train[result['features']]))
+                y_train = train[find_target_column(list(train.columns))].to_numpy().astype(int)
+                X_holdout = result['scaler'].transform(result['imputer'].transform(result['holdout_X']))
+                del frame, train
+
+                start = time.perf_counter()
+                baseline, n_balanced = _smote_gradient_boosting(X_train, y_train, random_state)
+                row['smote_gradient_boosting'] = {
+                    'seconds': time.perf_counter() - start,
+                    'roc_auc': float(roc_auc_score(result['holdout_y'], baseline.predict_proba(X_holdout)[:, 1])),
+                    'balanced_rows': int(n_balanced)
+                }
+            results.append(row)
+    return results
+
+
+def main(argv):
+    if not argv:
+        print(__doc__)
+        return 1
+
+    if argv[0] == 'benchmark':
+        sizes = [int(n) for n in argv[1:]] or [100_000, 1_000_000, 10_000_000]
+        print("🚀 BENCHMARK - TREINO OUT-OF-CORE POR HISTOGRAMAS")
+        print("=" * 80)
+        for row in run_benchmark(sizes):
+            hist = row['histogram']
+            print(f"\n📊 {row['n_rows']:,} linhas ({row['n_threads']} threads)")
+            print(f"   histogramas: {hist['seconds']:8.1f}s | AUC {hist['roc_auc']:.4f} | "
+                  f"bins {hist['binned_mb']:.0f} MB (float64 seria {hist['float64_mb']:.0f} MB)")
+            print("   etapas: " + ", ".join(f"{k} {v:.1f}s" for k, v in hist['stages'].items()))
+            if 'smote_gradient_boosting' in row:
+                base = row['smote_gradient_boosting']
+                print(f"   SMOTE + GB:  {base['seconds']:8.1f}s | AUC {base['roc_auc']:.4f} | "
+                      f"{base['balanced_rows']:,} linhas após SMOTE "
+                      f"({base['seconds'] / hist['seconds']:.1f}x mais lento)")
+        return 0
+
+    data_path = Path(argv[0])
+    version = argv[1] if len(argv) > 1 else DEFAULT_VERSION
+    print("🌲 TREINO OUT-OF-CORE POR HISTOGRAMAS")
+    print("=" * 80)
+    result = train_from_source(data_path)
+    print(f"Linhas: {result['n_rows']:,} (treino {result['n_train']:,}) | "
+          f"{result['n_threads']} threads | bins {result['binned_bytes'] / 1e6:.0f} MB")
+    print("Etapas: " + ", ".join(f"{k} {v:.1f}s" for k, v in result['seconds'].items()))
+    path, thresholds, metrics = export_bundle(result, version, data_path=data_path)
+    print(f"AUC no holdout: {metrics['roc_auc']:.4f}")
+    for scenario, config in thresholds.items():
+        print(f"   {scenario:<13} threshold {config['threshold']:.2f} | "
+              f"sens {config['recall']:.1%} | espec {config['specificity']:.1%}")
+    print(f"\n✅ Bundle gravado em {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Retreino Incremental dos Bundles (05_artifacts)
+
+Quando chegam novos exames rotulados, em vez de retreinar do zero sobre
+todo o histórico, o modelo da versão anterior é continuado com warm_start:
+
+- RandomForest: novas árvores treinadas só com os exames novos são
+  adicionadas às existentes;
+- GradientBoosting: novos estágios de boosting continuam a partir das
+  predições atuais do ensemble sobre os exames novos.
+
+Imputer e scaler da versão anterior são mantidos (as árvores antigas
+dependem dessa escala). Uma parte estratificada dos exames novos fica de
+fora como holdout, dividido em duas metades disjuntas:
+
+- ajuste: os thresholds clínicos (regras de CLINICAL_SCENARIOS) são
+  recalculados para o candidato e, pelo mesmo procedimento, para a versão
+  anterior, de modo que os dois são comparados em pé de igualdade;
+- gate: onde os dois modelos são avaliados, com os thresholds ajustados
+  na outra metade (sem o otimismo de escolher e medir nos mesmos exames).
+
+O quality gate exige, contra a versão anterior: queda máxima de AUC,
+sensibilidade da triagem perto do mínimo clínico, e pisos de especificidade
+da triagem e de F2 do cenário balanceado. A versão anterior nos thresholds
+publicados é informada à parte. Só com o gate aprovado o novo bundle é
+gravado em 05_artifacts/<versao>.
+
+O tipo do modelo é o do objeto carregado, não o nome da versão: rf_v1 não
+tem model.pkl e o pipeline.pkl dele contém um GradientBoosting (o
+metadata.json descreve um RandomForest); o CLI avisa quando divergem.
+
+Uso:
+    python 08_src/training/incremental.py <versao_anterior> <novos_exames.csv> [nova_versao]
+    python 08_src/training/incremental.py benchmark [n_historico] [n_novos]
+"""
+
+import copy
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from clinical_fast.streaming_metrics import CLINICAL_SCENARIOS, StreamingMetricsAccumulator
+from data.datasets import TARGET_COLUMN, translate_columns
+from inference.artifacts import ARTIFACTS_DIR, ArtifactBundle
+
+HOLDOUT_FRACTION = 0.3
+# Fração do holdout usada no gate (o restante ajusta os thresholds)
+GATE_FRACTION = 0.5
+MAX_AUC_DROP = 0.01
+# Thresholds ajustados em outra metade: tolerância abaixo do mínimo clínico da triagem
+MAX_SENSITIVITY_SHORTFALL = 0.02
+MAX_SPECIFICITY_DROP = 0.02
+MAX_F2_DROP = 0.02
+# Fração de estimadores adicionados quando não informado
+NEW_ESTIMATORS_FRACTION = 0.25
+# Mesma granularidade (0.01) dos thresholds publicados
+THRESHOLD_BINS = 100
+
+BUNDLE_ARTIFACTS = {
+    'imputer': 'imputer.pkl',
+    'scaler': 'scaler.pkl',
+    'model': 'model.pkl',
+    'features': 'features.json',
+    'thresholds': 'thresholds.json'
+}
+
+
+def next_version(version):
+    """gb_v1 -> gb_v2 (sem sufixo _vN, acrescenta _v2)"""
+    match = re.match(r'^(.*_v)(\d+)$', version)
+    return f'{match.group(1)}{int(match.group(2)) + 1}' if match else f'{version}_v2'
+
+
+def model_type_mismatch(bundle):
+    """(descrito em metadata.json, carregado) quando divergem; None se coincidem"""
+    described = bundle.metadata.get('model')
+    if described and described != bundle.model_name:
+        return described, bundle.model_name
+    return None
+
+
+def load_new_exams(source):
+    """Exames novos (CSV ou DataFrame) com colunas traduzidas e alvo preenchido"""
+    df = source if isinstance(source, pd.DataFrame) else pd.read_csv(source)
+    df = translate_columns(df)
+    if TARGET_COLUMN not in df.columns:
+        raise ValueError(f"Exames novos sem a coluna alvo '{TARGET_COLUMN}'")
+    return df[df[TARGET_COLUMN].notna()].reset_index(drop=True)
+
+
+def warm_start_update(model, X_new, y_new, n_new_estimators=None):
+    """Cópia do modelo continuada nos dados novos (árvores ou estágios adicionais)"""
+    from sklearn.ensemble import GradientBoostingClassifier
+    from sklearn.ensemble._forest import ForestClassifier
+
+    if not isinstance(model, (ForestClassifier, GradientBoostingClassifier)):
+        raise ValueError(f"Retreino incremental não suportado para {type(model).__name__}")
+
+    model = copy.deepcopy(model)
+    n_old = len(model.estimators_)
+    if n_new_estimators is None:
+        n_new_estimators = max(1, math.ceil(n_old * NEW_ESTIMATORS_FRACTION))
+    class_weight = model.get_params().get('class_weight')
+    if class_weight in ('balanced', 'balanced_subsample'):
+        # Preset com warm_start gera aviso no sklearn: pesos explícitos dos exames novos
+        from sklearn.utils.class_weight import compute_class_weight
+        classes = np.unique(y_new)
+        weights = compute_class_weight('balanced', classes=classes, y=y_new)
+        model.set_params(class_weight=dict(zip(classes.tolist(), weights)))
+
+    model.set_params(warm_start=True, n_estimators=n_old + n_new_estimators)
+    model.fit(X_new, y_new)
+    model.set_params(warm_start=False)
+    if class_weight is not None:
+        model.set_params(class_weight=class_weight)
+    return model, n_new_estimators
+
+
+def split_holdout(holdout, gate_fraction=GATE_FRACTION, random_state=42):
+    """Holdout em (ajuste dos thresholds, avaliação do gate), estratificado"""
+    from sklearn.model_selection import train_test_split
+
+    return train_test_split(holdout, test_size=gate_fraction, stratify=holdout[TARGET_COLUMN],
+                            random_state=random_state)
+
+
+def threshold_values(thresholds):
+    """thresholds.json (cenário -> config) para cenário -> threshold"""
+    return {scenario: config['threshold'] for scenario, config in thresholds.items()}
+
+
+def holdout_thresholds(y, proba):
+    """thresholds.json recalculado no holdout (cenários de CLINICAL_SCENARIOS)"""
+    accumulator = StreamingMetricsAccumulator(n_bins=THRESHOLD_BINS).update(y, proba)
+    thresholds = {}
+    for scenario in CLINICAL_SCENARIOS:
+        result = accumulator.scenario_threshold(scenario)
+        thresholds[scenario] = {
+            'threshold': round(result['threshold'], 6),
+            'recall': result['sensitivity'],
+            'specificity': result['specificity']
+        }
+    return thresholds
+
+
+def evaluate(y, proba, thresholds):
+    """AUC, Brier e sensibilidade/especificidade/F2 em cada threshold (dict cenário -> valor)"""
+    from sklearn.metrics import roc_auc_score
+
+    accumulator = StreamingMetricsAccumulator(thresholds).update(y, proba)
+    return {
+        'roc_auc': float(roc_auc_score(y, proba)),
+        'brier': float(np.mean((np.asarray(proba) - np.asarray(y)) ** 2)),
+        'scenarios': {
+            scenario: {
+                'threshold': float(threshold),
+                'recall': metrics['recall'],
+                'specificity': metrics['specificity'],
+                'f2': metrics['f2_score']
+            }
+            for scenario, threshold in thresholds.items()
+            for metrics in [accumulator.metrics_at(threshold)]
+        }
+    }
+
+
+def quality_gate(previous, candidate, max_auc_drop=MAX_AUC_DROP,
+                 max_sensitivity_shortfall=MAX_SENSITIVITY_SHORTFALL,
+                 max_specificity_drop=MAX_SPECIFICITY_DROP, max_f2_drop=MAX_F2_DROP):
+    """
+    Candidato aprovado se, contra a versão anterior avaliada do mesmo jeito:
+    a AUC não cair mais que max_auc_drop, a sensibilidade da triagem ficar
+    no máximo max_sensitivity_shortfall abaixo do mínimo clínico e a
+    especificidade da triagem e o F2 do cenário balanceado não caírem mais
+    que os respectivos limites.
+    """
+    metric, minimum = CLINICAL_SCENARIOS['screening']['constraint']
+    screening = candidate['scenarios'].get('screening', {})
+    previous_screening = previous['scenarios'].get('screening', {})
+    balanced = candidate['scenarios'].get('balanced', {})
+    previous_balanced = previous['scenarios'].get('balanced', {})
+    checks = {
+        'roc_auc': candidate['roc_auc'] >= previous['roc_auc'] - max_auc_drop,
+        'screening_sensitivity': screening.get('recall', 0.0) >= minimum - max_sensitivity_shortfall,
+        'screening_specificity': (screening.get('specificity', 0.0)
+                                  >= previous_screening.get('specificity', 0.0) - max_specificity_drop),
+        'balanced_f2': balanced.get('f2', 0.0) >= previous_balanced.get('f2', 0.0) - max_f2_drop
+    }
+    return {
+        'passed': all(checks.values()),
+        'checks': checks,
+        'previous_roc_auc': previous['roc_auc'],
+        'candidate_roc_auc': candidate['roc_auc'],
+        'max_auc_drop': max_auc_drop,
+        f'min_screening_{metric}': minimum,
+        'max_sensitivity_shortfall': max_sensitivity_shortfall,
+        'max_specificity_drop': max_specificity_drop,
+        'max_f2_drop': max_f2_drop
+    }
+
+
+def _json_params(model):
+    """get_params só com valores serializáveis (mesmo formato de rf_v1/metadata.json)"""
+    return {
+        name: value for name, value in sorted(model.get_params(deep=False).items())
+        if value is None or isinstance(value, (bool, int, float, str))
+    }
+
+
+def write_bundle(target_dir, imputer, scaler, model, features, thresholds, metadata):
+    """Grava um bundle num diretório temporário e renomeia (versões nunca são sobrescritas)"""
+    import joblib
+
+    target_dir = Path(target_dir)
+    if target_dir.exists():
+        raise FileExistsError(f"Versão já existe: {target_dir}")
+    tmp_dir = target_dir.with_name(f'.{target_dir.name}.tmp')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    joblib.dump(imputer, tmp_dir / BUNDLE_ARTIFACTS['imputer'])
+    joblib.dump(scaler, tmp_dir / BUNDLE_ARTIFACTS['scaler'])
+    joblib.dump(model, tmp_dir / BUNDLE_ARTIFACTS['model'])
+    for name, content in (
+        (BUNDLE_ARTIFACTS['features'], {'features': list(features), 'target': TARGET_COLUMN}),
+        (BUNDLE_ARTIFACTS['thresholds'], thresholds),
+        ('metadata.json', metadata)
+    ):
+        with open(tmp_dir / name, 'w', encoding='utf-8') as f:
+            json.dump(content, f, indent=2, ensure_ascii=False)
+
+    os.replace(tmp_dir, target_dir)
+    return target_dir
+
+
+def retrain_incremental(previous_version, new_exams, new_version=None, n_new_estimators=None,
+                        holdout_fraction=HOLDOUT_FRACTION, max_auc_drop=MAX_AUC_DROP,
+                        artifacts_dir=ARTIFACTS_DIR, force=False, random_state=42):
+    """
+    Continua o modelo de previous_version com os exames novos, recalcula os
+    thresholds numa metade do holdout, avalia o quality gate na outra e grava
+    05_artifacts/<new_version> se ele passar (ou com force=True). Retorna o
+    relatório do retreino.
+    """
+    from sklearn.model_selection import train_test_split
+
+    previous = ArtifactBundle(previous_version)
+    new_version = new_version or next_version(previous.model_version)
+    df = load_new_exams(new_exams)
+    train, holdout = train_test_split(
+        df, test_size=holdout_fraction, stratify=df[TARGET_COLUMN], random_state=random_state
+    )
+    tuning, gate_set = split_holdout(holdout, random_state=random_state)
+    X_train, y_train = previous.transform(train), train[TARGET_COLUMN].to_numpy().astype(int)
+    X_tuning, y_tuning = previous.transform(tuning), tuning[TARGET_COLUMN].to_numpy().astype(int)
+    X_gate, y_gate = previous.transform(gate_set), gate_set[TARGET_COLUMN].to_numpy().astype(int)
+
+    start = time.perf_counter()
+    model, n_added = warm_start_update(previous.model, X_train, y_train, n_new_estimators)
+    train_seconds = time.perf_counter() - start
+
+    # Mesmo procedimento para os dois modelos: thresholds no ajuste, métricas no gate
+    thresholds = holdout_thresholds(y_tuning, model.predict_proba(X_tuning)[:, 1])
+    previous_thresholds = holdout_thresholds(y_tuning, previous.model.predict_proba(X_tuning)[:, 1])
+    previous_gate_proba = previous.model.predict_proba(X_gate)[:, 1]
+    previous_eval = evaluate(y_gate, previous_gate_proba, threshold_values(previous_thresholds))
+    published_eval = evaluate(y_gate, previous_gate_proba, previous.thresholds)
+    candidate_eval = evaluate(y_gate, model.predict_proba(X_gate)[:, 1], threshold_values(thresholds))
+    gate = quality_gate(previous_eval, candidate_eval, max_auc_drop)
+
+    metadata = copy.deepcopy(previous.metadata)
+    metadata.update({
+        'model': type(model).__name__,
+        'params': _json_params(model),
+        'data': {'n_features': len(previous.features)},
+        'artifacts': dict(BUNDLE_ARTIFACTS),
+        'model_version': new_version,
+        'parent_version': previous.model_version,
+        'training': {
+            'mode': 'incremental',
+            'trained_at': datetime.now().isoformat(),
+            'new_samples': int(len(df)),
+            'train_samples': int(len(train)),
+            'holdout_samples': int(len(holdout)),
+            'threshold_samples': int(len(tuning)),
+            'gate_samples': int(len(gate_set)),
+            'estimators_added': int(n_added),
+            'n_estimators': int(len(model.estimators_)),
+            'train_seconds': train_seconds
+        },
+        'quality_gate': gate
+    })
+
+    path = None
+    if gate['passed'] or force:
+        path = write_bundle(Path(artifacts_dir) / new_version, previous.imputer, previous.scaler,
+                            model, previous.features, thresholds, metadata)
+
+    return {
+        'previous_version': previous.model_version,
+        'previous_model': previous.model_name,
+        'model_type_mismatch': model_type_mismatch(previous),
+        'new_version': new_version,
+        'path': str(path) if path else None,
+        'train_seconds': train_seconds,
+        'estimators_added': int(n_added),
+        'previous': previous_eval,
+        'previous_published': published_eval,
+        'candidate': candidate_eval,
+        'thresholds': thresholds,
+        'quality_gate': gate
+    }
+
+
+def _previous_models(random_state=42):
+    """
+    Modelos de referência: gb_v1 (model.pkl) e um RandomForest com os params
+    de rf_v1/metadata.json. O modelo carregado de rf_v1 (pipeline.pkl) é um
+    GradientBoosting, por isso o RF aparece com o nome da origem dos params.
+    """
+    from sklearn.base import clone
+    from sklearn.ensemble import RandomForestClassifier
+    from inference.artifacts import load_bundle, load_metadata
+
+    rf_params = dict(load_metadata('rf_v1')['params'], random_state=random_state)
+    return {
+        'gb_v1': clone(load_bundle('gb_v1').model),
+        'RF (params de rf_v1/metadata.json)': RandomForestClassifier(**rf_params)
+    }
+
+
+def run_benchmark(n_history=50_000, n_new=10_000, random_state=42):
+    """Retreino incremental vs retreino completo (histórico + novos) para RF e GB"""
+    from sklearn.base import clone
+    from sklearn.model_selection import train_test_split
+
+    from data.datasets import create_simulated_data
+    from inference.artifacts import load_bundle
+
+    bundle = load_bundle('gb_v1')
+    history = create_simulated_data(n_history, random_state=1)
+    new = create_simulated_data(n_new, random_state=2)
+    train, holdout = train_test_split(
+        new, test_size=HOLDOUT_FRACTION, stratify=new[TARGET_COLUMN], random_state=random_state
+    )
+    tuning, gate_set = split_holdout(holdout, random_state=random_state)
+    X_history, y_history = bundle.transform(history), history[TARGET_COLUMN].to_numpy()
+    X_train, y_train = bundle.transform(train), train[TARGET_COLUMN].to_numpy()
+    X_tuning, y_tuning = bundle.transform(tuning), tuning[TARGET_COLUMN].to_numpy()
+    X_gate, y_gate = bundle.transform(gate_set), gate_set[TARGET_COLUMN].to_numpy()
+    X_full, y_full = np.vstack([X_history, X_train]), np.concatenate([y_history, y_train])
+
+    results = {}
+    for version, estimator in _previous_models(random_state).items():
+        previous = clone(estimator).fit(X_history, y_history)
+
+        start = time.perf_counter()
+        incremental, n_added = warm_start_update(previous, X_train, y_train)
+        incremental_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        full = clone(estimator).fit(X_full, y_full)
+        full_seconds = time.perf_counter() - start
+
+        row = {'seconds': {'incremental': incremental_seconds, 'full': full_seconds},
+               'estimators_added': n_added}
+        for name, model in (('previous', previous), ('incremental', incremental), ('full', full)):
+            thresholds = holdout_thresholds(y_tuning, model.predict_proba(X_tuning)[:, 1])
+            row[name] = evaluate(y_gate, model.predict_proba(X_gate)[:, 1], threshold_values(thresholds))
+        row['quality_gate'] = quality_gate(row['previous'], row['incremental'])['passed']
+        results[version] = row
+
+    return {'n_history': int(n_history), 'n_new': int(n_new),
+            'n_holdout': int(len(holdout)), 'models': results}
+
+
+def main(argv):
+    if not argv:
+        print(__doc__)
+        return 1
+
+    if argv[0] == 'benchmark':
+        n_history = int(argv[1]) if len(argv) > 1 else 50_000
+        n_new = int(argv[2]) if len(argv) > 2 else 10_000
+        print("🚀 BENCHMARK - RETREINO INCREMENTAL vs COMPLETO")
+        print("=" * 80)
+        result = run_benchmark(n_history, n_new)
+        print(f"Histórico: {result['n_history']:,} | novos: {result['n_new']:,} "
+              f"(holdout {result['n_holdout']:,})")
+        for version, row in result['models'].items():
+            print(f"\n📊 {version} (+{row['estimators_added']} estimadores)")
+            print(f"   tempo: incremental {row['seconds']['incremental']:.2f}s | "
+                  f"completo {row['seconds']['full']:.2f}s "
+                  f"({row['seconds']['full'] / row['seconds']['incremental']:.1f}x)")
+            for name in ('previous', 'incremental', 'full'):
+                screening = row[name]['scenarios']['screening']
+                print(f"   {name:<12} AUC {row[name]['roc_auc']:.4f} | Brier {row[name]['brier']:.4f} | "
+                      f"triagem t={screening['threshold']:.2f} "
+                      f"sens {screening['recall']:.1%} espec {screening['specificity']:.1%}")
+            print(f"   quality gate (incremental): {'✅' if row['quality_gate'] else '❌'}")
+        return 0
+
+    previous_version, source = argv[0], argv[1]
+    new_version = argv[2] if len(argv) > 2 else None
+
+    print("🔄 RETREINO INCREMENTAL")
+    print("=" * 80)
+    report = retrain_incremental(previous_version, source, new_version)
+    print(f"{report['previous_version']} ({report['previous_model']}) -> {report['new_version']} "
+          f"(+{report['estimators_added']} estimadores em {report['train_seconds']:.2f}s)")
+    if report['model_type_mismatch']:
+        described, loaded = report['model_type_mismatch']
+        print(f"⚠️ {report['previous_version']}: metadata.json descreve {described}, "
+              f"mas o modelo carregado é {loaded} - o retreino continua o {loaded}")
+    print(f"AUC no gate: {report['previous']['roc_auc']:.4f} -> {report['candidate']['roc_auc']:.4f}")
+    published = report['previous_published']['scenarios']['screening']
+    print(f"Versão anterior nos thresholds publicados (triagem): "
+          f"sens {published['recall']:.1%} | espec {published['specificity']:.1%}")
+    for scenario, config in report['thresholds'].items():
+        print(f"   {scenario:<13} threshold {config['threshold']:.2f} | "
+              f"sens {config['recall']:.1%} | espec {config['specificity']:.1%}")
+    if report['path']:
+        print(f"\n✅ Quality gate aprovado: bundle gravado em {report['path']}")
+        return 0
+    print(f"\n❌ Quality gate reprovado: {report['quality_gate']['checks']}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
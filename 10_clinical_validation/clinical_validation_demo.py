@@ -4,12 +4,21 @@ Demonstração do Sistema de Validação Clínica
 Versão simplificada para funcionar sem dependências externas
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from pathlib import Path
 import json
 
+# Adicionar 08_src ao path (módulos de validação vetorizada)
+src_path = Path(__file__).resolve().parent.parent / '08_src'
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from clinical_fast.medical_consistency import MedicalConsistencyValidator, medical_consistency_report
+from clinical_fast.results_store import record_run
+
 def simple_confusion_matrix(y_true, y_pred):
     """Implementação simples da matriz de confusão"""
     tp = sum(1 for true, pred in zip(y_true, y_pred) if true == 1 and pred == 1)
@@ -109,6 +118,8 @@ def run_clinical_validation_demo():
     # Executar validações
     results = {
         'timestamp': datetime.now().isoformat(),
+        # Predições simuladas, sem modelo treinado: versão própria no histórico
+        'model_version': 'demo_simulated',
         'demo_info': {
             'mode': 'demonstration',
             'data_source': 'real' if data_path.exists() else 'synthetic',
@@ -223,48 +234,14 @@ def validate_medical_logic_simple(X, y, y_proba):
         'interpretation': ''
     }
     
-    correlations_found = 0
-    total_checked = 0
+    # Correlações de todas as features numéricas calculadas de uma vez (Pearson e Spearman)
+    numeric = list(X.select_dtypes(include=['number', 'bool']).columns)
+    validator = MedicalConsistencyValidator(numeric, strata=())
+    correlations = validator.compute(X[numeric], y_proba)
+    report = medical_consistency_report(correlations, numeric, medical_features)
     
-    for feature_name, keywords in medical_features.items():
-        # Buscar features que contenham as palavras-chave
-        matching_features = []
-        for keyword in keywords:
-            matches = [f for f in X.columns if keyword.lower() in f.lower()]
-            matching_features.extend(matches)
-        
-        if matching_features:
-            feature = matching_features[0]  # Usar primeira correspondência
-            
-            try:
-                # Calcular correlação com probabilidades preditas
-                feature_values = X[feature].values
-                correlation = np.corrcoef(feature_values, y_proba)[0, 1]
-                
-                # Para features médicas, esperamos correlação positiva com risco
-                meets_expectation = correlation > 0.1
-                
-                validation['correlations'][feature_name] = {
-                    'feature_used': feature,
-                    'correlation': float(correlation),
-                    'expected_positive': True,
-                    'meets_expectation': meets_expectation
-                }
-                
-                if meets_expectation:
-                    correlations_found += 1
-                total_checked += 1
-                
-            except Exception as e:
-                validation['correlations'][feature_name] = {
-                    'error': str(e)
-                }
-    
-    # Calcular score de consistência
-    if total_checked > 0:
-        consistency_score = correlations_found / total_checked
-    else:
-        consistency_score = 0
+    validation['correlations'] = report['correlations']
+    consistency_score = report['consistency_score']
     
     validation['consistency_score'] = consistency_score
     
@@ -451,9 +428,16 @@ def save_demo_results(results):
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
     # Salvar JSON completo
-    with open(save_path / f'clinical_validation_demo_{timestamp}.json', 'w', encoding='utf-8') as f:
+    json_path = save_path / f'clinical_validation_demo_{timestamp}.json'
+    with open(json_path, 'w', encoding='utf-8') as f:
         json.dump(results, f, indent=2, ensure_ascii=False, default=str)
     
+    # Registrar no histórico indexado (SQLite) para comparações entre execuções
+    try:
+        record_run(results, json_path)
+    except Exception as e:
+        print(f"⚠️ Execução não registrada no histórico: {e}")
+    
     # Criar relatório em texto
     report_content = create_demo_report(results, timestamp)
     
@@ -15,6 +15,11 @@ from datetime import datetime
 # Adicionar src ao path
 project_root = Path(__file__).parent
 sys.path.append(str(project_root / 'src'))
+sys.path.append(str(project_root.parent / '08_src'))
+
+from clinical_fast.chunked_validation import DEFAULT_CHUNK_SIZE, run_chunked_validation
+from clinical_fast.prediction_cache import cached_predictions, predict_once
+from clinical_fast.results_store import model_version_from_path, record_run
 
 # Imports dos módulos de validação
 try:
@@ -27,38 +32,49 @@ except ImportError as e:
     sys.exit(1)
 
 
+# Caminhos dos arquivos
+MODEL_PATH = project_root / '02_notebooks' / '06_model_metrics' / '3_GradientBoosting' / 'All_Features' / 'Gradient_Boosting.pkl'
+SCALER_PATH = project_root / '02_notebooks' / '06_model_metrics' / '3_GradientBoosting' / 'All_Features' / 'feature_scaler.pkl'
+DATA_PATH = project_root / 'results' / 'data' / 'feature_engineered_enhanced_selected.csv'
+
+
+def load_model():
+    """Carregar modelo e scaler (se disponível)"""
+    
+    if not MODEL_PATH.exists():
+        print(f"❌ Modelo não encontrado: {MODEL_PATH}")
+        return None, None
+    
+    model = joblib.load(MODEL_PATH)
+    print(f"✅ Modelo carregado: {type(model).__name__}")
+    
+    scaler = None
+    if SCALER_PATH.exists():
+        scaler = joblib.load(SCALER_PATH)
+        print("✅ Scaler carregado")
+    
+    return model, scaler
+
+
 def load_model_and_data():
     """Carregar modelo e dados para validação"""
     
     print("📁 Carregando modelo e dados...")
     
-    # Caminhos dos arquivos
-    model_path = project_root / '02_notebooks' / '06_model_metrics' / '3_GradientBoosting' / 'All_Features' / 'Gradient_Boosting.pkl'
-    scaler_path = project_root / '02_notebooks' / '06_model_metrics' / '3_GradientBoosting' / 'All_Features' / 'feature_scaler.pkl'
-    data_path = project_root / 'results' / 'data' / 'feature_engineered_enhanced_selected.csv'
-    
     # Verificar se arquivos existem
-    if not model_path.exists():
-        print(f"❌ Modelo não encontrado: {model_path}")
+    if not MODEL_PATH.exists():
+        print(f"❌ Modelo não encontrado: {MODEL_PATH}")
         return None, None, None, None, None
     
-    if not data_path.exists():
-        print(f"❌ Dados não encontrados: {data_path}")
+    if not DATA_PATH.exists():
+        print(f"❌ Dados não encontrados: {DATA_PATH}")
         return None, None, None, None, None
     
     try:
-        # Carregar modelo
-        model = joblib.load(model_path)
-        print(f"✅ Modelo carregado: {type(model).__name__}")
-        
-        # Carregar scaler se disponível
-        scaler = None
-        if scaler_path.exists():
-            scaler = joblib.load(scaler_path)
-            print("✅ Scaler carregado")
+        model, scaler = load_model()
         
         # Carregar dados
-        df = pd.read_csv(data_path)
+        df = pd.read_csv(DATA_PATH)
         print(f"✅ Dados carregados: {df.shape}")
         
         # Separar features e target
@@ -87,8 +103,98 @@ def load_model_and_data():
         return None, None, None, None, None
 
 
-def run_clinical_validation(model, df, X, y, scaler=None):
-    """Executar validação clínica completa"""
+def medical_validation_stage(data, feature_importance=None):
+    """Estágio 1: validação contra conhecimento médico"""
+    validator = ClinicalValidator()
+    return validator.validate_against_medical_knowledge(
+        data['df'], data['y_proba'], feature_importance
+    )
+
+
+def threshold_optimization_stage(data):
+    """Estágio 2: otimização de thresholds clínicos"""
+    threshold_optimizer = ThresholdOptimizer()
+    return threshold_optimizer.optimize_thresholds_systematic(data['y'], data['y_proba'])
+
+
+def proportion_optimization_stage(data):
+    """Estágio 3: otimização de proporções"""
+    proportion_optimizer = ProportionOptimizer()
+    return proportion_optimizer.optimize_proportions_systematic(data['X'], data['y'])
+
+
+def show_medical_validation(validation_results):
+    consistency_score = validation_results['medical_consistency']['overall_consistency_score']
+    print(f"📊 Score de consistência médica: {consistency_score:.3f}")
+    print(f"📋 Interpretação: {validation_results['medical_consistency']['interpretation']}")
+
+
+def show_threshold_optimization(threshold_results):
+    print(f"\n📊 MELHORES THRESHOLDS:")
+    for scenario, config in threshold_results['best_thresholds'].items():
+        print(f"   {scenario}: {config['threshold']:.3f} "
+              f"(Sens: {config['sensitivity']:.1%}, Spec: {config['specificity']:.1%})")
+
+
+def show_proportion_optimization(proportion_results):
+    print(f"\n📊 MELHORES PROPORÇÕES:")
+    for scenario, config in proportion_results['best_configurations'].items():
+        print(f"   {scenario}: {config['optimal_proportion']:.1%} "
+              f"(Modelo: {config['best_model']}, Score: {config['weighted_score']:.3f})")
+
+
+# Estágios: chave em results -> (título, função, exibição, mensagem de erro)
+VALIDATION_STAGES = {
+    'validation_results': (
+        '🔍 1. VALIDAÇÃO CONTRA CONHECIMENTO MÉDICO', medical_validation_stage,
+        show_medical_validation, 'Erro na validação médica'
+    ),
+    'threshold_optimization': (
+        '⚖️ 2. OTIMIZAÇÃO DE THRESHOLDS CLÍNICOS', threshold_optimization_stage,
+        show_threshold_optimization, 'Erro na otimização de thresholds'
+    ),
+    'proportion_optimization': (
+        '📊 3. OTIMIZAÇÃO DE PROPORÇÕES', proportion_optimization_stage,
+        show_proportion_optimization, 'Erro na otimização de proporções'
+    )
+}
+
+
+def _stage_from_shared(arrays, stage, meta, **kwargs):
+    """Reconstrói df, X e y (mesmos dtypes) a partir da memória compartilhada e executa o estágio"""
+    from clinical_fast.stage_executor import frame_from_arrays
+
+    df, X, y = frame_from_arrays(arrays, meta)
+    data = {'df': df, 'X': X, 'y': y, 'y_proba': arrays['y_proba']}
+    return VALIDATION_STAGES[stage][1](data, **kwargs)
+
+
+def _run_stages_parallel(data, shared, stage_kwargs, max_workers=None):
+    """Agenda os três estágios num pool de processos com entradas compartilhadas"""
+    from clinical_fast.stage_executor import run_stages
+
+    arrays, meta = shared
+    arrays = {**arrays, 'y_proba': np.asarray(data['y_proba'], dtype=np.float64)}
+    stages = {
+        key: (_stage_from_shared, {'stage': key, 'meta': meta, **stage_kwargs.get(key, {})})
+        for key in VALIDATION_STAGES
+    }
+    outcomes, timings = run_stages(stages, arrays, parallel=True, max_workers=max_workers)
+    for key, seconds in timings.items():
+        print(f"   ⏱️ {key}: {seconds:.1f}s")
+    return outcomes
+
+
+def run_clinical_validation(model, df, X, y, scaler=None, parallel=False, max_workers=None,
+                            model_path=None, use_cache=True):
+    """
+    Executar validação clínica completa.
+    parallel=True executa os três estágios num pool de processos (colunas de
+    df com os dtypes originais, X, y e y_proba em memória compartilhada); o
+    dict de resultados é o mesmo do modo sequencial.
+    model_path (arquivo do modelo) identifica o modelo na chave do cache de
+    y_proba; use_cache=False sempre refaz a inferência.
+    """
     
     print("\n" + "="*80)
     print("🏥 INICIANDO VALIDAÇÃO CLÍNICA AUTOMATIZADA")
@@ -97,99 +203,115 @@ def run_clinical_validation(model, df, X, y, scaler=None):
     results = {
         'timestamp': datetime.now().isoformat(),
         'model_type': type(model).__name__,
+        'model_version': model_version_from_path(model_path) if model_path is not None else None,
         'validation_results': {},
         'threshold_optimization': {},
         'proportion_optimization': {},
         'summary': {}
     }
     
-    # Preparar dados
-    X_scaled = X.copy()
-    if scaler is not None:
-        X_scaled = pd.DataFrame(
-            scaler.transform(X), 
-            columns=X.columns, 
-            index=X.index
-        )
-        print("✅ Dados escalonados aplicados")
-    
-    # Fazer predições
+    # Predições: um único predict_proba (y_pred derivado dele), com y_proba em
+    # cache por hash do modelo + scaler + dados para reexecuções
     try:
-        y_pred = model.predict(X_scaled)
-        y_proba = model.predict_proba(X_scaled)[:, 1] if hasattr(model, 'predict_proba') else y_pred
-        print("✅ Predições geradas")
+        if use_cache:
+            y_proba, y_pred, cache_hit = cached_predictions(model, X, scaler, model_path=model_path)
+        else:
+            (y_proba, y_pred), cache_hit = predict_once(model, X, scaler), False
+        if scaler is not None and not cache_hit:
+            print("✅ Dados escalonados aplicados")
+        print("✅ Predições carregadas do cache" if cache_hit else "✅ Predições geradas")
     except Exception as e:
         print(f"❌ Erro nas predições: {e}")
         return results
     
-    # 1. Validação contra conhecimento médico
-    print(f"\n🔍 1. VALIDAÇÃO CONTRA CONHECIMENTO MÉDICO")
-    print("-" * 50)
-    
-    try:
-        validator = ClinicalValidator()
+    # Obter feature importance
+    feature_importance = None
+    if hasattr(model, 'feature_importances_'):
+        feature_importance = pd.Series(model.feature_importances_, index=X.columns)
+    
+    data = {'df': df, 'X': X, 'y': y, 'y_proba': y_proba}
+    stage_kwargs = {'validation_results': {'feature_importance': feature_importance}}
+    
+    # df, X e y precisam ser numéricos para ir para a memória compartilhada
+    shared = None
+    if parallel:
+        from clinical_fast.stage_executor import frame_arrays
+        shared = frame_arrays(df, X, y)
+        if shared is None:
+            print("⚠️ Colunas ou target não numéricos: executando estágios em modo sequencial")
+    
+    outcomes = None
+    if shared is not None:
+        print(f"\n🚀 Executando estágios em paralelo...")
+        outcomes = _run_stages_parallel(data, shared, stage_kwargs, max_workers)
+    
+    for key, (title, stage_fn, show, error_message) in VALIDATION_STAGES.items():
+        print(f"\n{title}")
+        print("-" * 50)
         
-        # Obter feature importance
-        feature_importance = None
-        if hasattr(model, 'feature_importances_'):
-            feature_importance = pd.Series(model.feature_importances_, index=X.columns)
-        
-        validation_results = validator.validate_against_medical_knowledge(
-            df, y_proba, feature_importance
-        )
-        
-        results['validation_results'] = validation_results
-        
-        # Mostrar resumo
-        consistency_score = validation_results['medical_consistency']['overall_consistency_score']
-        print(f"📊 Score de consistência médica: {consistency_score:.3f}")
-        print(f"📋 Interpretação: {validation_results['medical_consistency']['interpretation']}")
-        
-    except Exception as e:
-        print(f"❌ Erro na validação médica: {e}")
-        results['validation_results'] = {'error': str(e)}
+        try:
+            if outcomes is None:
+                stage_results = stage_fn(data, **stage_kwargs.get(key, {}))
+            else:
+                stage_results = outcomes[key]
+                if isinstance(stage_results, dict) and set(stage_results) == {'error'}:
+                    raise RuntimeError(stage_results['error'])
+            results[key] = stage_results
+            show(stage_results)
+        except Exception as e:
+            print(f"❌ {error_message}: {e}")
+            results[key] = {'error': str(e)}
     
-    # 2. Otimização de thresholds
-    print(f"\n⚖️ 2. OTIMIZAÇÃO DE THRESHOLDS CLÍNICOS")
+    # 4. Resumo executivo
+    print(f"\n📋 4. RESUMO EXECUTIVO")
     print("-" * 50)
     
-    try:
-        threshold_optimizer = ThresholdOptimizer()
-        
-        threshold_results = threshold_optimizer.optimize_thresholds_systematic(y, y_proba)
-        results['threshold_optimization'] = threshold_results
-        
-        # Mostrar resumo dos melhores thresholds
-        print(f"\n📊 MELHORES THRESHOLDS:")
-        for scenario, config in threshold_results['best_thresholds'].items():
-            print(f"   {scenario}: {config['threshold']:.3f} "
-                  f"(Sens: {config['sensitivity']:.1%}, Spec: {config['specificity']:.1%})")
-        
-    except Exception as e:
-        print(f"❌ Erro na otimização de thresholds: {e}")
-        results['threshold_optimization'] = {'error': str(e)}
+    summary = generate_executive_summary(results)
+    results['summary'] = summary
     
-    # 3. Otimização de proporções
-    print(f"\n📊 3. OTIMIZAÇÃO DE PROPORÇÕES")
-    print("-" * 50)
+    for key, value in summary.items():
+        print(f"   {key}: {value}")
+    
+    return results
+
+
+def run_chunked_clinical_validation(model, data_path, scaler=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                                    model_path=None):
+    """
+    Validação clínica lendo o CSV em chunks (memória limitada ao chunk).
+    Mesma estrutura de resultados de run_clinical_validation; a otimização
+    de proporções, que re-treina com a base em memória, não é executada.
+    """
+    model_version = model_version_from_path(model_path) if model_path is not None else None
+    
+    print("\n" + "="*80)
+    print(f"🏥 INICIANDO VALIDAÇÃO CLÍNICA EM CHUNKS ({chunk_size:,} linhas por chunk)")
+    print("="*80)
     
     try:
-        proportion_optimizer = ProportionOptimizer()
-        
-        proportion_results = proportion_optimizer.optimize_proportions_systematic(X, y)
-        results['proportion_optimization'] = proportion_results
-        
-        # Mostrar resumo das melhores proporções
-        print(f"\n📊 MELHORES PROPORÇÕES:")
-        for scenario, config in proportion_results['best_configurations'].items():
-            print(f"   {scenario}: {config['optimal_proportion']:.1%} "
-                  f"(Modelo: {config['best_model']}, Score: {config['weighted_score']:.3f})")
-        
+        results = run_chunked_validation(model, data_path, scaler, chunk_size=chunk_size)
+        results['model_version'] = model_version
+        print(f"✅ {results['n_rows']:,} linhas avaliadas")
     except Exception as e:
-        print(f"❌ Erro na otimização de proporções: {e}")
-        results['proportion_optimization'] = {'error': str(e)}
+        print(f"❌ Erro na validação em chunks: {e}")
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'model_type': type(model).__name__,
+            'model_version': model_version,
+            'validation_results': {'error': str(e)},
+            'threshold_optimization': {'error': str(e)},
+            'proportion_optimization': {},
+            'summary': {}
+        }
+    
+    for key, (title, _, show, _) in VALIDATION_STAGES.items():
+        print(f"\n{title}")
+        print("-" * 50)
+        if key == 'proportion_optimization':
+            print(f"⚠️ {results[key]['status']}")
+        else:
+            show(results[key])
     
-    # 4. Resumo executivo
     print(f"\n📋 4. RESUMO EXECUTIVO")
     print("-" * 50)
     
@@ -269,9 +391,16 @@ def save_validation_results(results, save_path=None):
     
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
-    with open(save_path / f'clinical_validation_complete_{timestamp}.json', 'w', encoding='utf-8') as f:
+    json_path = save_path / f'clinical_validation_complete_{timestamp}.json'
+    with open(json_path, 'w', encoding='utf-8') as f:
         json.dump(results, f, indent=2, ensure_ascii=False, default=str)
     
+    # Registrar no histórico indexado (SQLite) para comparações entre execuções
+    try:
+        record_run(results, json_path)
+    except Exception as e:
+        print(f"⚠️ Execução não registrada no histórico: {e}")
+    
     # Salvar resumo executivo
     summary_content = f"""
 RELATÓRIO DE VALIDAÇÃO CLÍNICA AUTOMATIZADA
@@ -326,6 +455,23 @@ def main():
     print("Baseado na metodologia do projeto A1_A2")
     print("="*80)
     
+    # --chunked [tamanho]: CSV lido em chunks, sem carregar a base inteira
+    if '--chunked' in sys.argv:
+        position = sys.argv.index('--chunked') + 1
+        chunk_size = int(sys.argv[position]) if position < len(sys.argv) and sys.argv[position].isdigit() \
+            else DEFAULT_CHUNK_SIZE
+        
+        model, scaler = load_model()
+        if model is None or not DATA_PATH.exists():
+            print("❌ Falha ao carregar dados necessários")
+            return 1
+        
+        results = run_chunked_clinical_validation(model, DATA_PATH, scaler, chunk_size, model_path=MODEL_PATH)
+        save_path = save_validation_results(results)
+        print(f"\n✅ VALIDAÇÃO CLÍNICA CONCLUÍDA!")
+        print(f"📁 Resultados salvos em: {save_path}")
+        return 0
+    
     # Carregar modelo e dados
     model, scaler, df, X, y = load_model_and_data()
     
@@ -333,8 +479,12 @@ def main():
         print("❌ Falha ao carregar dados necessários")
         return 1
     
-    # Executar validação
-    results = run_clinical_validation(model, df, X, y, scaler)
+    # Executar validação (--parallel: estágios em pool de processos;
+    # --no-cache: refaz a inferência mesmo com y_proba em cache)
+    results = run_clinical_validation(
+        model, df, X, y, scaler, parallel='--parallel' in sys.argv,
+        model_path=MODEL_PATH, use_cache='--no-cache' not in sys.argv
+    )
     
     # Salvar resultados
     save_path = save_validation_results(results)
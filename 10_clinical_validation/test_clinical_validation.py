@@ -4,12 +4,20 @@ Teste da Validação Clínica - Versão Simplificada
 Demonstra o sistema de validação implementado
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from pathlib import Path
 import json
 
+# Adicionar 08_src ao path (módulos de validação vetorizada)
+src_path = Path(__file__).resolve().parent.parent / '08_src'
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from clinical_fast.medical_consistency import MedicalConsistencyValidator, medical_consistency_report
+
 def simulate_clinical_validation():
     """Simular validação clínica com dados disponíveis"""
     
@@ -143,41 +151,17 @@ def validate_medical_logic(X, y, y_pred, y_proba):
         'score_risco': 'Score de Risco'
     }
     
-    correlations_found = 0
-    total_correlations = 0
-    
-    for feature_key, feature_name in medical_features.items():
-        # Buscar features que contenham a palavra-chave
-        matching_features = [f for f in X.columns if feature_key.lower() in f.lower()]
-        
-        if matching_features:
-            feature = matching_features[0]  # Usar primeira correspondência
-            
-            # Calcular correlação com predições
-            try:
-                correlation = np.corrcoef(X[feature], y_proba)[0, 1]
-                
-                validation['correlations'][feature_name] = {
-                    'feature_used': feature,
-                    'correlation': correlation,
-                    'expected_positive': True,  # Esperamos correlação positiva
-                    'meets_expectation': correlation > 0.1
-                }
-                
-                if correlation > 0.1:
-                    correlations_found += 1
-                total_correlations += 1
-                
-            except Exception as e:
-                validation['correlations'][feature_name] = {
-                    'error': str(e)
-                }
-    
-    # Calcular score de consistência
-    if total_correlations > 0:
-        consistency_score = correlations_found / total_correlations
-    else:
-        consistency_score = 0
+    # Correlações de todas as features numéricas calculadas de uma vez (Pearson e Spearman)
+    numeric = list(X.select_dtypes(include=['number', 'bool']).columns)
+    validator = MedicalConsistencyValidator(numeric, strata=())
+    correlations = validator.compute(X[numeric], y_proba)
+    report = medical_consistency_report(
+        correlations, numeric,
+        {feature_name: [feature_key] for feature_key, feature_name in medical_features.items()}
+    )
+    
+    validation['correlations'] = report['correlations']
+    consistency_score = report['consistency_score']
     
     validation['consistency_score'] = consistency_score
     